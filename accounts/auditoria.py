@@ -0,0 +1,89 @@
+"""
+Buffer em memória para a auditoria de login/logout.
+
+Os signals de login e logout só enfileiram um ``AuditoriaLogin`` ainda não
+salvo. O buffer grava tudo com um único ``bulk_create`` quando junta
+``AUDITORIA_LOGIN_TAMANHO_LOTE`` eventos ou, ao fim de uma requisição,
+quando o evento mais antigo espera há ``AUDITORIA_LOGIN_INTERVALO``
+segundos. Na troca de turno, dezenas de logins viram poucos INSERTs.
+
+A gravação acontece sempre na thread de uma requisição (nunca em uma thread
+de fundo com conexão própria) e, na saída do processo, o que restar no
+buffer é gravado (``atexit``). Um processo encerrado à força pode perder os
+eventos pendentes; por isso os signals continuam registrando cada evento
+também no log JSON.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE_PADRAO = 50
+INTERVALO_PADRAO = 5.0  # segundos
+
+
+class BufferAuditoria:
+    """Acumula eventos de auditoria e grava em lotes com ``bulk_create``."""
+
+    def __init__(self):
+        self._eventos = []
+        self._primeiro_evento = None
+        self._lock = threading.Lock()
+
+    @property
+    def tamanho_lote(self):
+        return getattr(settings, 'AUDITORIA_LOGIN_TAMANHO_LOTE', TAMANHO_LOTE_PADRAO)
+
+    @property
+    def intervalo(self):
+        return getattr(settings, 'AUDITORIA_LOGIN_INTERVALO', INTERVALO_PADRAO)
+
+    def __len__(self):
+        return len(self._eventos)
+
+    def registrar(self, auditoria):
+        """Enfileira um ``AuditoriaLogin`` não salvo; grava se o lote encheu."""
+        with self._lock:
+            if not self._eventos:
+                self._primeiro_evento = time.monotonic()
+            self._eventos.append(auditoria)
+            cheio = len(self._eventos) >= self.tamanho_lote
+        if cheio:
+            self.descarregar()
+
+    def vencido(self):
+        """Há eventos esperando há mais de ``intervalo`` segundos?"""
+        primeiro = self._primeiro_evento
+        return primeiro is not None and time.monotonic() - primeiro >= self.intervalo
+
+    def descarregar(self):
+        """Grava os eventos pendentes. Retorna quantos foram gravados."""
+        from .models import AuditoriaLogin
+
+        with self._lock:
+            eventos, self._eventos = self._eventos, []
+            self._primeiro_evento = None
+        if not eventos:
+            return 0
+        try:
+            AuditoriaLogin.objects.bulk_create(eventos, batch_size=self.tamanho_lote)
+        except Exception as e:
+            logger.error(
+                f"Erro ao gravar auditoria de login: {e}",
+                extra={'evento': 'auditoria.erro', 'dados': {'eventos': len(eventos)}}
+            )
+            return 0
+        return len(eventos)
+
+    def descarregar_se_vencido(self, **kwargs):
+        """Receiver de ``request_finished``: grava lotes parados há muito tempo."""
+        if self.vencido():
+            self.descarregar()
+
+
+buffer_auditoria = BufferAuditoria()
+atexit.register(buffer_auditoria.descarregar)
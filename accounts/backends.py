@@ -0,0 +1,24 @@
+from django.contrib.auth.backends import ModelBackend
+
+
+class CargoBackend(ModelBackend):
+    """
+    ``ModelBackend`` que também concede as permissões do cargo do usuário.
+
+    As permissões de cada cargo vêm da matriz compilada em
+    ``accounts.permissoes`` (sem consultas); as do usuário e dos grupos
+    continuam vindo do banco, uma vez por requisição ou do snapshot da sessão.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        from .permissoes import permissoes_cargo
+
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            user_obj._perm_cache = {
+                *permissoes_cargo(user_obj.cargo),
+                *self.get_user_permissions(user_obj),
+                *self.get_group_permissions(user_obj),
+            }
+        return user_obj._perm_cache
@@ -0,0 +1,62 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import AuditoriaLogin
+
+
+class Command(BaseCommand):
+    help = (
+        'Aplica a retenção da auditoria de logins: exclui eventos mais antigos que '
+        '--dias em lotes curtos (sem travar o banco) e, opcionalmente, compacta o arquivo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=365,
+            help='Mantém apenas os eventos dos últimos N dias (padrão: 365).',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=5000,
+            help='Eventos excluídos por transação (padrão: 5000).',
+        )
+        parser.add_argument(
+            '--vacuum',
+            action='store_true',
+            help='No SQLite, executa VACUUM ao final para devolver o espaço ao disco.',
+        )
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options['dias'])
+        inicio = time.perf_counter()
+        total = 0
+
+        # Lotes pequenos pelo índice de data: cada transação segura o lock por pouco tempo
+        while True:
+            with transaction.atomic():
+                pks = list(
+                    AuditoriaLogin.objects.filter(data__lt=limite)
+                    .order_by('data', 'id')
+                    .values_list('pk', flat=True)[:options['lote']]
+                )
+                if not pks:
+                    break
+                AuditoriaLogin.objects.filter(pk__in=pks).delete()
+            total += len(pks)
+            self.stdout.write(f'  {total} eventos excluídos...')
+
+        if options['vacuum'] and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} eventos anteriores a {limite:%d/%m/%Y} excluídos em {duracao:.1f}s.'
+        ))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import ResumoDashboard
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula o resumo materializado dos dashboards a partir das tabelas. '
+        'Use após cargas em massa (bulk_create/update não disparam signals) ou periodicamente.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            default=0,
+            help='Repete a reconstrução a cada N segundos (0 = executa uma vez).',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.reconstruir()
+            if not options['intervalo']:
+                return
+            time.sleep(options['intervalo'])
+
+    def reconstruir(self):
+        anterior = ResumoDashboard.objects.filter(pk=ResumoDashboard.ID_UNICO).first()
+        inicio = time.perf_counter()
+        resumo = ResumoDashboard.reconstruir()
+        duracao = (time.perf_counter() - inicio) * 1000
+
+        # Mostra as divergências encontradas (atualizações fora dos signals)
+        if anterior is not None:
+            for campo, valor in resumo.indicadores().items():
+                valor_anterior = anterior.indicadores()[campo]
+                if valor_anterior != valor:
+                    self.stdout.write(self.style.WARNING(
+                        f'  {campo}: {valor_anterior} -> {valor}'
+                    ))
+        self.stdout.write(self.style.SUCCESS(f'Resumo do dashboard reconstruído em {duracao:.0f} ms.'))
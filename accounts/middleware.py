@@ -0,0 +1,73 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.utils.functional import SimpleLazyObject
+
+from . import permissoes
+from .backends import CargoBackend
+
+
+def _usuario_do_snapshot(request, versao_atual):
+    """Recria o usuário a partir do snapshot da sessão, se ainda for válido."""
+    snapshot = request.session.get(permissoes.SESSAO_SNAPSHOT)
+    if not snapshot or snapshot.get('versao') != versao_atual:
+        return None
+    if snapshot.get('id') != str(request.session.get(auth.SESSION_KEY)):
+        return None
+    if request.session.get(auth.BACKEND_SESSION_KEY) not in settings.AUTHENTICATION_BACKENDS:
+        return None
+    try:
+        usuario = permissoes.restaurar_snapshot(snapshot)
+    except Exception:
+        # Snapshot de uma versão anterior do modelo: descarta e recarrega do banco
+        return None
+    # O hash da sessão foi conferido por auth.get_user ao criar o snapshot; trocar a
+    # senha grava o usuário e troca a versão, e aí o get_user confere de novo
+    if not usuario.is_active:
+        return None
+    usuario.backend = request.session[auth.BACKEND_SESSION_KEY]
+    return usuario
+
+
+def obter_usuario(request):
+    """
+    Usuário da requisição, vindo do snapshot da sessão quando possível.
+
+    Sem snapshot válido, carrega o usuário como o Django faz, calcula as
+    permissões uma vez e grava o snapshot. A versão é lida antes da consulta:
+    se o usuário mudar no meio do caminho, o snapshot já nasce vencido.
+    """
+    if hasattr(request, '_cached_user'):
+        return request._cached_user
+    usuario_id = request.session.get(auth.SESSION_KEY)
+    if usuario_id is None:
+        usuario = auth.get_user(request)
+    else:
+        versao_atual = permissoes.versao(usuario_id)
+        usuario = _usuario_do_snapshot(request, versao_atual)
+        if usuario is None:
+            usuario = auth.get_user(request)
+            if usuario.is_authenticated:
+                CargoBackend().get_all_permissions(usuario)
+                request.session[permissoes.SESSAO_SNAPSHOT] = permissoes.criar_snapshot(usuario, versao_atual)
+    request._cached_user = usuario
+    return usuario
+
+
+async def obter_usuario_async(request):
+    if not hasattr(request, '_acached_user'):
+        request._acached_user = await sync_to_async(obter_usuario)(request)
+    return request._acached_user
+
+
+class AutenticacaoEmSessaoMiddleware(AuthenticationMiddleware):
+    """
+    ``AuthenticationMiddleware`` que reaproveita o snapshot do usuário e das
+    permissões guardado na sessão (ver ``accounts.permissoes``).
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: obter_usuario(request))
+        request.auser = lambda: obter_usuario_async(request)
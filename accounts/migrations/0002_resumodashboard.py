@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoDashboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_funcionarios', models.IntegerField(default=0, verbose_name='Total de Funcionários')),
+                ('total_familias', models.IntegerField(default=0, verbose_name='Total de Famílias')),
+                ('total_falecidos', models.IntegerField(default=0, verbose_name='Total de Falecidos')),
+                ('total_itens', models.IntegerField(default=0, verbose_name='Total de Itens de Serviço')),
+                ('total_agendamentos', models.IntegerField(default=0, verbose_name='Total de Agendamentos')),
+                ('receitas_mes', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Receitas Pagas no Mês')),
+                ('servicos_mes', models.IntegerField(default=0, verbose_name='Serviços Contratados no Mês')),
+                ('mes_referencia', models.DateField(verbose_name='Mês de Referência')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Resumo do Dashboard',
+                'verbose_name_plural': 'Resumos do Dashboard',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_resumodashboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditoriaLogin',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=150, verbose_name='Nome de Usuário')),
+                ('evento', models.CharField(choices=[('login', 'Login'), ('logout', 'Logout')], max_length=10, verbose_name='Evento')),
+                ('ip', models.GenericIPAddressField(blank=True, null=True, verbose_name='Endereço IP')),
+                ('user_agent', models.CharField(blank=True, max_length=255, verbose_name='Navegador')),
+                ('data', models.DateTimeField(verbose_name='Data')),
+                ('usuario', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='auditoria_logins', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Auditoria de Login',
+                'verbose_name_plural': 'Auditoria de Logins',
+                'ordering': ['-data', '-id'],
+                'indexes': [models.Index(fields=['-data', '-id'], name='auditoria_data_idx'), models.Index(fields=['username', '-data'], name='auditoria_usuario_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+CARGOS_OPERACIONAIS = frozenset({'florista', 'coveiro', 'preparador'})
+
 
 class CustomUser(AbstractUser):
     """Modelo de usuário personalizado com cargos específicos."""
@@ -63,48 +65,182 @@ class CustomUser(AbstractUser):
     @property
     def is_funcionario_operacional(self):
         """Verifica se o usuário é funcionário operacional (florista, coveiro, preparador)."""
-        return self.cargo in ['florista', 'coveiro', 'preparador']
+        return self.cargo in CARGOS_OPERACIONAIS
     
     def get_dashboard_permissions(self):
-        """Retorna as permissões do dashboard baseadas no cargo."""
-        if self.is_admin:
-            return {
-                'funcionarios': True,
-                'familias': True,
-                'pessoas_falecidas': True,
-                'itens_servico': True,
-                'servicos_contratados': True,
-                'agendamentos': True,
-                'planejamentos': True,
-                'financeiro': True,
-                'estoque': True,
-                'relatorios': True,
-            }
-        elif self.is_vendedor:
-            return {
-                'funcionarios': False,
-                'familias': True,
-                'pessoas_falecidas': True,
-                'itens_servico': True,
-                'servicos_contratados': True,
-                'agendamentos': True,
-                'planejamentos': True,
-                'financeiro': True,
-                'estoque': False,
-                'relatorios': False,
-            }
-        elif self.is_funcionario_operacional:
-            return {
-                'funcionarios': False,
-                'familias': False,
-                'pessoas_falecidas': False,
-                'itens_servico': False,
-                'servicos_contratados': False,
-                'agendamentos': True,  # Apenas sua agenda
-                'planejamentos': False,
-                'financeiro': False,
-                'estoque': False,
-                'relatorios': False,
-            }
-        else:
-            return {}
+        """
+        Retorna as permissões do dashboard baseadas no cargo.
+
+        O dicionário vem da matriz compilada em ``accounts.permissoes`` e é
+        somente leitura (o mesmo objeto para todos os usuários do cargo).
+        """
+        from .permissoes import permissoes_dashboard
+
+        return permissoes_dashboard(self.cargo)
+
+
+class ResumoDashboard(models.Model):
+    """
+    Indicadores dos dashboards materializados em uma única linha.
+
+    Mantido incrementalmente pelos signals de ``accounts/signals.py`` e
+    reconstruído pelo comando ``reconstruir_resumo_dashboard``. Os indicadores
+    do mês são recalculados automaticamente na virada do mês.
+    """
+
+    ID_UNICO = 1
+    CAMPOS_MENSAIS = ('receitas_mes', 'servicos_mes')
+
+    total_funcionarios = models.IntegerField(default=0, verbose_name="Total de Funcionários")
+    total_familias = models.IntegerField(default=0, verbose_name="Total de Famílias")
+    total_falecidos = models.IntegerField(default=0, verbose_name="Total de Falecidos")
+    total_itens = models.IntegerField(default=0, verbose_name="Total de Itens de Serviço")
+    total_agendamentos = models.IntegerField(default=0, verbose_name="Total de Agendamentos")
+    receitas_mes = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name="Receitas Pagas no Mês"
+    )
+    servicos_mes = models.IntegerField(default=0, verbose_name="Serviços Contratados no Mês")
+    mes_referencia = models.DateField(verbose_name="Mês de Referência")
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
+    class Meta:
+        verbose_name = "Resumo do Dashboard"
+        verbose_name_plural = "Resumos do Dashboard"
+
+    def __str__(self):
+        return f"Resumo do dashboard ({self.mes_referencia.strftime('%m/%Y')})"
+
+    @staticmethod
+    def inicio_mes_atual():
+        """Primeiro dia do mês corrente, à meia-noite no fuso local."""
+        from django.utils import timezone
+
+        return timezone.localtime().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def calcular(cls):
+        """Calcula todos os indicadores direto nas tabelas."""
+        from familia.models import Familia
+        from pessoa_falecida.models import PessoaFalecida
+        from funcionario.models import Funcionario
+        from item_servico.models import ItemServico
+        from agendamento.models import Agendamento
+        from financeiro.models import Financeiro
+        from servico_contratado.models import ServicoContratado
+        from django.db.models import Sum
+
+        inicio_mes = cls.inicio_mes_atual()
+        return {
+            'total_funcionarios': Funcionario.objects.count(),
+            'total_familias': Familia.objects.count(),
+            'total_falecidos': PessoaFalecida.objects.count(),
+            'total_itens': ItemServico.objects.count(),
+            'total_agendamentos': Agendamento.objects.count(),
+            'receitas_mes': Financeiro.objects.filter(
+                tipo='receita',
+                status='pago',
+                data_pagamento__gte=inicio_mes
+            ).aggregate(total=Sum('valor'))['total'] or 0,
+            'servicos_mes': ServicoContratado.objects.filter(data_contratacao__gte=inicio_mes).count(),
+            'mes_referencia': inicio_mes.date(),
+        }
+
+    @classmethod
+    def reconstruir(cls):
+        """Recalcula a linha inteira a partir das tabelas."""
+        resumo, _ = cls.objects.update_or_create(pk=cls.ID_UNICO, defaults=cls.calcular())
+        return resumo
+
+    @classmethod
+    def obter(cls):
+        """Retorna o resumo em uma consulta, reconstruindo se não existir ou se o mês virou."""
+        resumo = cls.objects.filter(pk=cls.ID_UNICO).first()
+        if resumo is None or resumo.mes_referencia != cls.inicio_mes_atual().date():
+            resumo = cls.reconstruir()
+        return resumo
+
+    @classmethod
+    def aplicar_variacoes(cls, variacoes):
+        """
+        Soma as variações (campo -> delta) na linha do resumo, de forma atômica.
+
+        As variações mensais só são aplicadas se o resumo for do mês corrente;
+        caso contrário a próxima leitura reconstrói a linha.
+        """
+        from django.db.models import F
+        from django.utils import timezone
+
+        totais = {campo: F(campo) + delta for campo, delta in variacoes.items()
+                  if delta and campo not in cls.CAMPOS_MENSAIS}
+        mensais = {campo: F(campo) + delta for campo, delta in variacoes.items()
+                   if delta and campo in cls.CAMPOS_MENSAIS}
+        agora = timezone.now()
+        if totais:
+            cls.objects.filter(pk=cls.ID_UNICO).update(atualizado_em=agora, **totais)
+        if mensais:
+            cls.objects.filter(
+                pk=cls.ID_UNICO,
+                mes_referencia=cls.inicio_mes_atual().date()
+            ).update(atualizado_em=agora, **mensais)
+
+    def indicadores(self):
+        """Variáveis de template dos dashboards."""
+        return {
+            'total_funcionarios': self.total_funcionarios,
+            'total_familias': self.total_familias,
+            'total_falecidos': self.total_falecidos,
+            'total_itens': self.total_itens,
+            'total_agendamentos': self.total_agendamentos,
+            'receitas_mes': self.receitas_mes,
+            'servicos_mes': self.servicos_mes,
+            # Tarefas concluídas no mês (usando serviços contratados como proxy)
+            'tarefas_concluidas': self.servicos_mes,
+        }
+
+
+class AuditoriaLogin(models.Model):
+    """
+    Trilha de auditoria de login/logout.
+
+    As linhas são gravadas em lote pelo buffer de ``accounts/auditoria.py``
+    (alimentado pelos signals de login/logout), não uma a uma.
+    """
+
+    EVENTO_CHOICES = [
+        ('login', 'Login'),
+        ('logout', 'Logout'),
+    ]
+
+    # Sem constraint no banco: eventos chegam em lote, às vezes depois de o
+    # usuário ser excluído (o SET_NULL continua sendo aplicado pelo ORM)
+    usuario = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_constraint=False,
+        related_name='auditoria_logins',
+        verbose_name="Usuário"
+    )
+    # Guardado à parte para o histórico sobreviver à exclusão do usuário
+    username = models.CharField(max_length=150, verbose_name="Nome de Usuário")
+    evento = models.CharField(max_length=10, choices=EVENTO_CHOICES, verbose_name="Evento")
+    ip = models.GenericIPAddressField(null=True, blank=True, verbose_name="Endereço IP")
+    user_agent = models.CharField(max_length=255, blank=True, verbose_name="Navegador")
+    data = models.DateTimeField(verbose_name="Data")
+
+    class Meta:
+        verbose_name = "Auditoria de Login"
+        verbose_name_plural = "Auditoria de Logins"
+        ordering = ['-data', '-id']
+        indexes = [
+            # Listagem paginada por data (keyset) e retenção por data
+            models.Index(fields=['-data', '-id'], name='auditoria_data_idx'),
+            models.Index(fields=['username', '-data'], name='auditoria_usuario_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_evento_display()}: {self.username} - {self.data}"
@@ -0,0 +1,160 @@
+"""
+Matriz de permissões por cargo e snapshot do usuário na sessão.
+
+A matriz é compilada uma única vez, na importação, a partir de
+``CustomUser.CARGO_CHOICES``: para cada cargo, as áreas do dashboard
+liberadas. ``get_dashboard_permissions()`` passa a devolver sempre o mesmo
+dicionário somente leitura.
+
+O cargo só concede permissões do Django onde as views as exigem: as do
+estoque (``PermissionRequiredMixin``), para o ``adm``, que já tem a área
+liberada no dashboard. ``accounts.backends.CargoBackend`` as soma às do
+usuário e dos grupos; nas demais apps nada muda.
+
+O snapshot guarda na sessão os campos do usuário (menos a senha) e o
+conjunto final de permissões. Enquanto a versão do usuário e a dos grupos (no
+cache compartilhado) não mudarem, a requisição não consulta
+``accounts_customuser`` nem as tabelas de permissões. Os signals de
+``accounts.signals`` trocam as versões quando o usuário (inclusive a senha),
+seus grupos ou as permissões mudam.
+"""
+import datetime
+import uuid
+from types import MappingProxyType
+
+from django.core.cache import cache
+
+from .models import CARGOS_OPERACIONAIS, CustomUser
+
+# Áreas do dashboard, na ordem exibida
+AREAS = (
+    'funcionarios', 'familias', 'pessoas_falecidas', 'itens_servico', 'servicos_contratados',
+    'agendamentos', 'planejamentos', 'financeiro', 'estoque', 'relatorios',
+)
+
+_AREAS_VENDEDOR = {
+    'familias', 'pessoas_falecidas', 'itens_servico', 'servicos_contratados',
+    'agendamentos', 'planejamentos', 'financeiro',
+}
+
+
+def _areas_do_cargo(cargo):
+    if cargo == 'adm':
+        return set(AREAS)
+    if cargo == 'vendedor':
+        return _AREAS_VENDEDOR
+    if cargo in CARGOS_OPERACIONAIS:
+        return {'agendamentos'}  # Apenas sua agenda
+    return set()
+
+
+# Permissões exigidas pelas views do estoque
+PERMISSOES_ESTOQUE = frozenset(
+    f'estoque.{acao}_{modelo}'
+    for modelo in ('categoriaestoque', 'produtoestoque', 'movimentacaoestoque')
+    for acao in ('view', 'add', 'change', 'delete')
+)
+
+# Cargo -> permissões do Django concedidas sem atribuição por usuário ou grupo
+PERMISSOES_DJANGO_CARGO = {
+    'adm': PERMISSOES_ESTOQUE,
+}
+
+
+def _compilar():
+    dashboard, django = {}, {}
+    for cargo, _rotulo in CustomUser.CARGO_CHOICES:
+        areas = _areas_do_cargo(cargo)
+        dashboard[cargo] = MappingProxyType({area: area in areas for area in AREAS})
+        django[cargo] = PERMISSOES_DJANGO_CARGO.get(cargo, frozenset())
+    return dashboard, django
+
+
+MATRIZ_DASHBOARD, PERMISSOES_CARGO = _compilar()
+SEM_PERMISSOES = MappingProxyType({})
+
+
+def permissoes_dashboard(cargo):
+    return MATRIZ_DASHBOARD.get(cargo, SEM_PERMISSOES)
+
+
+def permissoes_cargo(cargo):
+    return PERMISSOES_CARGO.get(cargo, frozenset())
+
+
+# ---------------------------------------------------------------------------
+# Versões (invalidação do snapshot)
+# ---------------------------------------------------------------------------
+
+VERSAO_USUARIO_KEY = 'permissoes_usuario_versao:{}'
+VERSAO_GRUPOS_KEY = 'permissoes_grupos_versao'
+
+
+def _nova_versao():
+    return uuid.uuid4().hex
+
+
+def versao(usuario_id):
+    """Par (versão do usuário, versão dos grupos), criando o que faltar."""
+    chaves = [VERSAO_USUARIO_KEY.format(usuario_id), VERSAO_GRUPOS_KEY]
+    encontradas = cache.get_many(chaves)
+    resultado = []
+    for chave in chaves:
+        valor = encontradas.get(chave)
+        if valor is None:
+            cache.add(chave, _nova_versao(), None)
+            valor = cache.get(chave)
+        resultado.append(valor)
+    return resultado
+
+
+def invalidar_usuarios(*usuario_ids):
+    cache.set_many({VERSAO_USUARIO_KEY.format(pk): _nova_versao() for pk in usuario_ids}, None)
+
+
+def invalidar_grupos():
+    cache.set(VERSAO_GRUPOS_KEY, _nova_versao(), None)
+
+
+# ---------------------------------------------------------------------------
+# Snapshot na sessão
+# ---------------------------------------------------------------------------
+
+SESSAO_SNAPSHOT = '_usuario_snapshot'
+
+
+def _valor_json(campo, usuario):
+    valor = campo.get_prep_value(campo.value_from_object(usuario))
+    if isinstance(valor, datetime.date):
+        return valor.isoformat()
+    return valor
+
+
+def _campos_snapshot():
+    # A senha (hash) não vai para a sessão: trocá-la já vence o snapshot pela versão do usuário
+    return [campo for campo in CustomUser._meta.concrete_fields if campo.attname != 'password']
+
+
+def criar_snapshot(usuario, versao_usuario):
+    """Dados serializáveis em JSON para recriar o usuário sem consultar o banco."""
+    return {
+        'id': str(usuario.pk),
+        'versao': versao_usuario,
+        'campos': {campo.attname: _valor_json(campo, usuario) for campo in _campos_snapshot()},
+        'permissoes': sorted(usuario.get_all_permissions()),
+    }
+
+
+def restaurar_snapshot(snapshot):
+    """Usuário com a senha adiada: só é lida do banco se alguém precisar dela."""
+    campos = _campos_snapshot()
+    usuario = CustomUser.from_db(
+        'default',
+        [campo.attname for campo in campos],
+        [
+            None if snapshot['campos'][campo.attname] is None else campo.to_python(snapshot['campos'][campo.attname])
+            for campo in campos
+        ],
+    )
+    usuario._perm_cache = set(snapshot['permissoes'])
+    return usuario
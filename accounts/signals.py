@@ -2,16 +2,29 @@ from django.db.models.signals import post_save, post_delete
 from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from django.core.signals import request_finished
 from django.utils import timezone
+import ipaddress
+import logging
+
+from .auditoria import buffer_auditoria
+from .models import AuditoriaLogin
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=User)
 def log_criacao_usuario(sender, instance, created, **kwargs):
     """Registra log da criação de usuários."""
     if created:
-        print(f"[LOG USER] Novo usuário criado: {instance.username} - Cargo: {instance.cargo}")
+        logger.info(
+            f"Novo usuário criado: {instance.username} - Cargo: {instance.cargo}",
+            extra={'evento': 'usuario.criado', 'dados': {
+                'usuario': instance.username,
+                'cargo': instance.cargo,
+            }}
+        )
 
 
 @receiver(post_save, sender=User)
@@ -39,28 +52,67 @@ def log_login_usuario(sender, request, user, **kwargs):
     ip_address = get_client_ip(request)
     user_agent = request.META.get('HTTP_USER_AGENT', 'Unknown')
     
-    print(f"[LOG LOGIN] {user.username} ({user.cargo}) - IP: {ip_address} - {timezone.now()}")
+    logger.info(
+        f"Login: {user.username} ({user.cargo}) - IP: {ip_address}",
+        extra={'evento': 'usuario.login', 'dados': {
+            'usuario': user.username,
+            'cargo': user.cargo,
+            'ip': ip_address,
+            'user_agent': user_agent,
+            'data': timezone.now(),
+        }}
+    )
     
-    # Aqui poderia salvar em modelo de auditoria
-    # AuditoriaLogin.objects.create(
-    #     usuario=user,
-    #     ip_address=ip_address,
-    #     user_agent=user_agent,
-    #     data_login=timezone.now()
-    # )
+    _registrar_auditoria('login', request, user, ip_address, user_agent)
 
 
 @receiver(user_logged_out)
 def log_logout_usuario(sender, request, user, **kwargs):
     """Registra log de logout dos usuários."""
     if user:
-        print(f"[LOG LOGOUT] {user.username} - {timezone.now()}")
+        logger.info(
+            f"Logout: {user.username}",
+            extra={'evento': 'usuario.logout', 'dados': {
+                'usuario': user.username,
+                'data': timezone.now(),
+            }}
+        )
+        _registrar_auditoria(
+            'logout', request, user, get_client_ip(request), request.META.get('HTTP_USER_AGENT', 'Unknown')
+        )
 
 
 @receiver(post_delete, sender=User)
 def log_exclusao_usuario(sender, instance, **kwargs):
     """Registra log da exclusão de usuários."""
-    print(f"[LOG USER] Usuário excluído: {instance.username} - Cargo: {instance.cargo}")
+    logger.info(
+        f"Usuário excluído: {instance.username} - Cargo: {instance.cargo}",
+        extra={'evento': 'usuario.excluido', 'dados': {
+            'usuario': instance.username,
+            'cargo': instance.cargo,
+        }}
+    )
+
+
+def _registrar_auditoria(evento, request, user, ip_address, user_agent):
+    """Enfileira o evento no buffer da auditoria (gravado em lote)."""
+    try:
+        ipaddress.ip_address((ip_address or '').strip())
+        ip_address = ip_address.strip()
+    except ValueError:
+        ip_address = None
+    buffer_auditoria.registrar(AuditoriaLogin(
+        usuario_id=user.pk,
+        username=user.username,
+        evento=evento,
+        ip=ip_address,
+        user_agent=user_agent[:255],
+        data=timezone.now(),
+    ))
+
+
+# Grava ao fim da requisição os lotes que passaram do intervalo
+request_finished.connect(buffer_auditoria.descarregar_se_vencido, dispatch_uid='auditoria_login_descarregar')
 
 
 def get_client_ip(request):
@@ -75,24 +127,28 @@ def get_client_ip(request):
 
 # Signal personalizado para notificações
 from django.dispatch import Signal
+from notificacoes.caixa import notificar
 
 # Cria signal personalizado para notificações
 notificacao_sistema = Signal()
 
 
 @receiver(notificacao_sistema)
-def processar_notificacao(sender, tipo, mensagem, usuario=None, **kwargs):
+def processar_notificacao(sender, tipo, mensagem, usuario=None, link='', **kwargs):
     """Processa notificações do sistema."""
-    print(f"[NOTIFICAÇÃO] {tipo.upper()}: {mensagem}")
-    
-    # Aqui poderia implementar:
-    # - Envio de email
-    # - Notificação push
-    # - Integração com Slack/Discord
-    # - Armazenamento em banco de dados
-    
-    if usuario:
-        print(f"[NOTIFICAÇÃO] Destinatário: {usuario.username}")
+    logger.info(
+        f"{tipo.upper()}: {mensagem}",
+        extra={'evento': 'notificacao', 'dados': {
+            'tipo': tipo,
+            'mensagem': mensagem,
+            'destinatario': usuario.username if usuario else None,
+        }}
+    )
+
+    # Sem destinatário, a notificação vai para os administradores ativos.
+    # E-mail e webhook ficam por conta do despachante (notificacoes.despachante).
+    destinatarios = [usuario] if usuario else User.objects.filter(cargo='adm', is_active=True)
+    notificar(destinatarios, tipo, mensagem, link=link)
 
 
 # Exemplo de uso do signal personalizado:
@@ -101,7 +157,161 @@ def processar_notificacao(sender, tipo, mensagem, usuario=None, **kwargs):
 #     sender=None,
 #     tipo='estoque_baixo',
 #     mensagem='Produto X está com estoque baixo',
-#     usuario=admin_user
+#     usuario=admin_user,
+#     link='/estoque/produtos/',  # opcional
 # )
 
 
+
+
+# Resumo materializado dos dashboards (accounts.models.ResumoDashboard)
+from django.db.models.signals import pre_save
+from .models import ResumoDashboard
+
+
+def _contribuicao_servico(servico):
+    inicio_mes = ResumoDashboard.inicio_mes_atual()
+    return {'servicos_mes': 1 if servico.data_contratacao and servico.data_contratacao >= inicio_mes else 0}
+
+
+def _contribuicao_financeiro(registro):
+    inicio_mes = ResumoDashboard.inicio_mes_atual()
+    conta = (
+        registro.tipo == 'receita'
+        and registro.status == 'pago'
+        and registro.data_pagamento is not None
+        and registro.data_pagamento >= inicio_mes
+    )
+    return {'receitas_mes': registro.valor if conta else 0}
+
+
+# Modelo -> função que diz com quanto uma linha contribui para cada indicador
+CONTRIBUICOES_RESUMO = {
+    'funcionario.Funcionario': lambda instance: {'total_funcionarios': 1},
+    'familia.Familia': lambda instance: {'total_familias': 1},
+    'pessoa_falecida.PessoaFalecida': lambda instance: {'total_falecidos': 1},
+    'item_servico.ItemServico': lambda instance: {'total_itens': 1},
+    'agendamento.Agendamento': lambda instance: {'total_agendamentos': 1},
+    'servico_contratado.ServicoContratado': _contribuicao_servico,
+    'financeiro.Financeiro': _contribuicao_financeiro,
+}
+
+# Modelos cuja contribuição pode mudar numa edição (precisam do estado anterior)
+CONTRIBUICOES_VARIAVEIS = ('servico_contratado.ServicoContratado', 'financeiro.Financeiro')
+
+
+def guardar_contribuicao_anterior(sender, instance, raw=False, **kwargs):
+    """Antes de editar, guarda a contribuição da versão gravada no banco."""
+    if raw or instance.pk is None:
+        return
+    anterior = sender._base_manager.filter(pk=instance.pk).first()
+    if anterior is not None:
+        instance._contribuicao_resumo_anterior = CONTRIBUICOES_RESUMO[sender._meta.label](anterior)
+
+
+def atualizar_resumo_ao_salvar(sender, instance, created, raw=False, **kwargs):
+    """Aplica ao resumo a diferença entre a contribuição nova e a anterior."""
+    if raw:
+        return
+    nova = CONTRIBUICOES_RESUMO[sender._meta.label](instance)
+    if created:
+        anterior = {}
+    else:
+        anterior = instance.__dict__.pop('_contribuicao_resumo_anterior', nova)
+    variacoes = {campo: valor - anterior.get(campo, 0) for campo, valor in nova.items()}
+    ResumoDashboard.aplicar_variacoes(variacoes)
+
+
+def atualizar_resumo_ao_excluir(sender, instance, **kwargs):
+    """Remove do resumo a contribuição da linha excluída."""
+    contribuicao = CONTRIBUICOES_RESUMO[sender._meta.label](instance)
+    ResumoDashboard.aplicar_variacoes({campo: -valor for campo, valor in contribuicao.items()})
+
+
+for _modelo in CONTRIBUICOES_RESUMO:
+    post_save.connect(atualizar_resumo_ao_salvar, sender=_modelo, dispatch_uid=f'resumo_salvar_{_modelo}')
+    post_delete.connect(atualizar_resumo_ao_excluir, sender=_modelo, dispatch_uid=f'resumo_excluir_{_modelo}')
+for _modelo in CONTRIBUICOES_VARIAVEIS:
+    pre_save.connect(guardar_contribuicao_anterior, sender=_modelo, dispatch_uid=f'resumo_anterior_{_modelo}')
+
+
+# Cache de fragmentos dos dashboards (app.fragmentos): versão por domínio
+from django.db import transaction
+from app import fragmentos
+
+# Modelo -> domínios cujos fragmentos exibem dados dele
+DOMINIOS_POR_MODELO = {
+    'agendamento.Agendamento': ('agenda',),
+    'familia.Familia': ('agenda',),
+    'pessoa_falecida.PessoaFalecida': ('agenda',),
+    'servico_contratado.ServicoContratado': ('financeiro',),
+    'servico_contratado.ItemServicoContratado': ('financeiro',),
+    'item_servico.ItemServico': ('financeiro',),
+    'financeiro.Financeiro': ('financeiro',),
+    'funcionario.Funcionario': ('funcionarios',),
+}
+
+
+def invalidar_fragmentos(sender, instance, raw=False, **kwargs):
+    """Troca a versão dos domínios do modelo após o commit."""
+    if raw:
+        return
+    dominios = DOMINIOS_POR_MODELO[sender._meta.label]
+    # Só após o commit, para nenhum worker guardar no cache dados ainda não gravados
+    transaction.on_commit(lambda: fragmentos.invalidar(*dominios))
+
+
+for _modelo in DOMINIOS_POR_MODELO:
+    post_save.connect(invalidar_fragmentos, sender=_modelo, dispatch_uid=f'fragmentos_salvar_{_modelo}')
+    post_delete.connect(invalidar_fragmentos, sender=_modelo, dispatch_uid=f'fragmentos_excluir_{_modelo}')
+
+
+# Snapshot do usuário e das permissões na sessão (accounts.permissoes)
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed
+from . import permissoes
+
+
+def invalidar_snapshot_usuario(sender, instance, raw=False, **kwargs):
+    """Usuário alterado ou excluído: vence o snapshot de todas as sessões dele."""
+    if raw:
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: permissoes.invalidar_usuarios(pk))
+
+
+def invalidar_snapshot_relacoes_usuario(sender, instance, action, reverse, pk_set, **kwargs):
+    """Grupos ou permissões diretas de usuários alterados."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        usuario_ids = {instance.pk}
+    elif pk_set:
+        usuario_ids = set(pk_set)
+    else:
+        # clear() a partir do grupo/permissão: não sabemos quais usuários, vence todos os grupos
+        transaction.on_commit(permissoes.invalidar_grupos)
+        return
+    transaction.on_commit(lambda: permissoes.invalidar_usuarios(*usuario_ids))
+
+
+def invalidar_snapshot_grupos(sender, raw=False, **kwargs):
+    """Grupo ou permissões de grupo alterados: vence o snapshot de todos os usuários."""
+    if raw:
+        return
+    transaction.on_commit(permissoes.invalidar_grupos)
+
+
+post_save.connect(invalidar_snapshot_usuario, sender=User, dispatch_uid='snapshot_usuario_salvar')
+post_delete.connect(invalidar_snapshot_usuario, sender=User, dispatch_uid='snapshot_usuario_excluir')
+m2m_changed.connect(
+    invalidar_snapshot_relacoes_usuario, sender=User.groups.through, dispatch_uid='snapshot_usuario_grupos'
+)
+m2m_changed.connect(
+    invalidar_snapshot_relacoes_usuario, sender=User.user_permissions.through,
+    dispatch_uid='snapshot_usuario_permissoes',
+)
+post_save.connect(invalidar_snapshot_grupos, sender=Group, dispatch_uid='snapshot_grupo_salvar')
+post_delete.connect(invalidar_snapshot_grupos, sender=Group, dispatch_uid='snapshot_grupo_excluir')
+m2m_changed.connect(invalidar_snapshot_grupos, sender=Group.permissions.through, dispatch_uid='snapshot_grupo_permissoes')
+
@@ -1,3 +1,472 @@
-from django.test import TestCase
+import threading
+from io import StringIO
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from app import fragmentos
+
+from agendamento.models import Agendamento
+from familia.models import Familia
+from financeiro.models import Financeiro
+from funcionario.models import Funcionario
+from item_servico.models import ItemServico
+from pessoa_falecida.models import PessoaFalecida
+from servico_contratado.models import ItemServicoContratado, ServicoContratado
+
+from .auditoria import buffer_auditoria
+from .models import AuditoriaLogin, CustomUser, ResumoDashboard
+from .permissoes import SESSAO_SNAPSHOT
+from .views import TAREFAS_POR_CARGO, _consultas_dashboard_vendedor, _executar_assincrono, _montar_todo_cards
+
+
+class DashboardFuncionarioConsultasTest(TestCase):
+    """O to-do board do dashboard_funcionario usa um número fixo de consultas."""
+
+    def setUp(self):
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = CustomUser.objects.create_user('coveiro', password='senha123', cargo='coveiro')
+        cls.funcionario = Funcionario.objects.create(
+            nome='Funcionário Teste', cargo='coveiro', telefone='11999999999', email='func@teste.com'
+        )
+        cls.itens = [
+            ItemServico.objects.create(nome=f'Item {i}', descricao='Item de teste', quantidade=10,
+                                       preco_unitario=Decimal('100.00'))
+            for i in range(2)
+        ]
+        cls.sequencia = 0
+
+    def criar_sepultamentos(self, quantidade):
+        for _ in range(quantidade):
+            DashboardFuncionarioConsultasTest.sequencia += 1
+            familia = Familia.objects.create(
+                nome_responsavel=f'Responsável {self.sequencia}', grau_parentesco='Filho',
+                telefone='1133334444', endereco='Rua Teste, 1'
+            )
+            falecido = PessoaFalecida.objects.create(
+                nome=f'Falecido {self.sequencia}', data_nascimento=date(1950, 1, 1),
+                data_falecimento=date.today(), causa_obito='Natural', local_obito='Hospital',
+                documento_cpf_rg=f'{self.sequencia:011d}', familia=familia
+            )
+            contrato = ServicoContratado.objects.create(pessoa_falecida=falecido, taxa_imposto=Decimal('10.00'))
+            for item in self.itens:
+                ItemServicoContratado.objects.create(
+                    servico_contratado=contrato, item_servico=item, quantidade=1, valor_unitario=item.preco_unitario
+                )
+            Agendamento.objects.create(
+                pessoa_falecida=falecido, funcionario=self.funcionario,
+                data_agendamento=timezone.now(), hora_agendamento='10:00',
+                local_velorio='Capela 1', local_sepultamento='Cemitério Central',
+                data_sepultamento=timezone.now() + timedelta(days=self.sequencia % 6, hours=1),
+            )
+
+    def test_cards_usam_tres_consultas(self):
+        self.criar_sepultamentos(5)
+        hoje = date.today()
+
+        with self.assertNumQueries(3):
+            cards = _montar_todo_cards('coveiro', hoje, hoje + timedelta(days=7))
+            nomes = [item.item_servico.nome for card in cards for item in card['itens_contratados']]
+            contratos = [contrato.valor_total for card in cards for contrato in card['servicos_contratados']]
+
+        self.assertEqual(len(cards), 5)
+        self.assertEqual(len(nomes), 10)
+        self.assertEqual(len(contratos), 5)
+        self.assertEqual(cards[0]['tarefas_usuario'], list(TAREFAS_POR_CARGO['coveiro']))
+
+    def test_cargo_sem_tarefas(self):
+        self.criar_sepultamentos(1)
+        hoje = date.today()
+        cards = _montar_todo_cards('vendedor', hoje, hoje + timedelta(days=7))
+        self.assertEqual(cards[0]['tarefas_usuario'], [])
+
+    def test_consultas_da_pagina_nao_crescem_com_os_cards(self):
+        self.client.force_login(self.usuario)
+        url = reverse('dashboard_funcionario')
+        self.client.get(url)  # aquece caches (configuração, resumo do dashboard)
+        # Novos agendamentos invalidam os fragmentos: as duas medições renderizam tudo
+        with self.captureOnCommitCallbacks(execute=True):
+            self.criar_sepultamentos(2)
+
+        with CaptureQueriesContext(connection) as poucos:
+            resposta = self.client.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len(resposta.context['todo_cards']), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.criar_sepultamentos(8)
+        with CaptureQueriesContext(connection) as muitos:
+            resposta = self.client.get(url)
+        self.assertEqual(len(resposta.context['todo_cards']), 10)
+        self.assertEqual(len(muitos), len(poucos))
+        self.assertContains(resposta, 'Item 1')
+
+
+class ResumoDashboardTest(TestCase):
+    """O resumo mantido pelos signals confere com o cálculo direto nas tabelas."""
+
+    def setUp(self):
+        ResumoDashboard.reconstruir()
+        self.familia = Familia.objects.create(
+            nome_responsavel='Responsável', grau_parentesco='Filho', telefone='1133334444', endereco='Rua Teste, 1'
+        )
+        self.falecido = PessoaFalecida.objects.create(
+            nome='Falecido', data_nascimento=date(1950, 1, 1), data_falecimento=date.today(),
+            causa_obito='Natural', local_obito='Hospital', documento_cpf_rg='00000000001', familia=self.familia
+        )
+
+    def assertResumoConfere(self):
+        resumo = ResumoDashboard.obter()
+        calculado = ResumoDashboard.calcular()
+        self.assertEqual({campo: getattr(resumo, campo) for campo in calculado}, calculado)
+
+    def receita(self, **campos):
+        return Financeiro.objects.create(**{
+            'pessoa_falecida': self.falecido, 'tipo': 'receita', 'descricao': 'Parcela',
+            'valor': Decimal('150.00'), 'data_vencimento': date.today(), **campos,
+        })
+
+    def test_inclusoes_e_exclusoes(self):
+        funcionario = Funcionario.objects.create(
+            nome='Carlos', cargo='coveiro', telefone='11999999999', email='carlos@teste.com'
+        )
+        item = ItemServico.objects.create(
+            nome='Urna', descricao='Urna simples', quantidade=1, preco_unitario=Decimal('900.00')
+        )
+        servico = ServicoContratado.objects.create(pessoa_falecida=self.falecido)
+        self.assertResumoConfere()
+
+        servico.delete()
+        item.delete()
+        funcionario.delete()
+        self.assertResumoConfere()
+
+    def test_mudancas_de_status_valor_e_data_do_financeiro(self):
+        registro = self.receita()
+        self.assertResumoConfere()  # pendente não conta
+
+        registro.status, registro.data_pagamento = 'pago', timezone.now()
+        registro.save()
+        self.assertResumoConfere()
+
+        registro.valor = Decimal('275.50')
+        registro.save()
+        self.assertResumoConfere()
+
+        # Pagamento movido para o mês anterior sai da receita do mês
+        registro.data_pagamento = ResumoDashboard.inicio_mes_atual() - timedelta(days=1)
+        registro.save()
+        self.assertResumoConfere()
+
+        registro.data_pagamento = timezone.now()
+        registro.save()
+        registro.tipo = 'despesa'
+        registro.save()
+        self.assertResumoConfere()
+
+        registro.tipo = 'receita'
+        registro.save()
+        registro.delete()
+        self.assertResumoConfere()
+
+    def test_data_de_contratacao_fora_do_mes(self):
+        servico = ServicoContratado.objects.create(pessoa_falecida=self.falecido)
+        servico.data_contratacao = ResumoDashboard.inicio_mes_atual() - timedelta(days=3)
+        servico.save()
+        self.assertResumoConfere()
+        servico.data_contratacao = timezone.now()
+        servico.save()
+        self.assertResumoConfere()
+
+    def test_exclusao_em_cascata(self):
+        self.receita(status='pago', data_pagamento=timezone.now())
+        ServicoContratado.objects.create(pessoa_falecida=self.falecido)
+        self.assertResumoConfere()
+        self.familia.delete()  # leva o falecido, o contrato e o financeiro
+        self.assertResumoConfere()
+
+    def test_virada_do_mes_reconstroi_os_indicadores_mensais(self):
+        self.receita(status='pago', data_pagamento=timezone.now())
+        mes_passado = (ResumoDashboard.inicio_mes_atual() - timedelta(days=1)).replace(day=1).date()
+        ResumoDashboard.objects.update(mes_referencia=mes_passado, receitas_mes=Decimal('999.00'), servicos_mes=7)
+
+        # Variações mensais não são somadas a um resumo de outro mês
+        self.receita(status='pago', data_pagamento=timezone.now())
+        self.assertEqual(ResumoDashboard.objects.get().receitas_mes, Decimal('999.00'))
+        self.assertResumoConfere()
+        self.assertEqual(ResumoDashboard.objects.get().mes_referencia, ResumoDashboard.inicio_mes_atual().date())
+
+
+class DashboardFragmentosTest(TestCase):
+    """Fragmentos dos dashboards em cache por cargo e versão de domínio."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.vendedor = CustomUser.objects.create_user('vendedor', password='senha123', cargo='vendedor')
+        cls.familia = Familia.objects.create(
+            nome_responsavel='Maria Souza', grau_parentesco='Filha', telefone='1133334444', endereco='Rua Teste, 1'
+        )
+        cls.falecido = PessoaFalecida.objects.create(
+            nome='José Souza', data_nascimento=date(1940, 1, 1), data_falecimento=date.today(),
+            causa_obito='Natural', local_obito='Hospital', documento_cpf_rg='12345678900', familia=cls.familia
+        )
+        cls.funcionario = Funcionario.objects.create(
+            nome='Carlos', cargo='coveiro', telefone='11999999999', email='carlos@teste.com'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.vendedor)
+        self.url = reverse('dashboard_vendedor')
+
+    def agendar(self, local):
+        with self.captureOnCommitCallbacks(execute=True):
+            Agendamento.objects.create(
+                pessoa_falecida=self.falecido, funcionario=self.funcionario,
+                data_agendamento=timezone.now() + timedelta(days=1), hora_agendamento='10:00',
+                local_velorio=local, local_sepultamento='Cemitério Central',
+                data_sepultamento=timezone.now() + timedelta(days=1, hours=2),
+            )
+
+    def test_acerto_de_cache_nao_consulta_os_fragmentos(self):
+        self.agendar('Capela Central')
+        with CaptureQueriesContext(connection) as falta:
+            resposta = self.client.get(self.url)
+        self.assertContains(resposta, 'Capela Central')
+
+        with CaptureQueriesContext(connection) as acerto:
+            resposta = self.client.get(self.url)
+        self.assertContains(resposta, 'Capela Central')
+        self.assertLess(len(acerto), len(falta))
+        tabelas = ' '.join(consulta['sql'] for consulta in acerto.captured_queries)
+        for tabela in ('agendamento_agendamento', 'accounts_resumodashboard', 'item_servico_itemservico'):
+            self.assertNotIn(tabela, tabelas)
+
+    def test_gravacao_no_dominio_invalida_o_fragmento(self):
+        self.agendar('Capela Central')
+        self.client.get(self.url)
+        self.agendar('Capela Norte')
+        self.assertContains(self.client.get(self.url), 'Capela Norte')
+
+    def test_dashboard_assincrono_antecipa_so_os_fragmentos_em_falta(self):
+        executadas = []
+
+        async def executar(consultas):
+            executadas.append(set(consultas))
+            return {nome: None for nome in consultas}
+
+        with mock.patch('accounts.views.executar_em_paralelo', executar):
+            async_to_sync(_executar_assincrono)(_consultas_dashboard_vendedor(), 'vendedor', 'vendedor')
+            self.client.get(self.url)  # renderiza e guarda os fragmentos
+            async_to_sync(_executar_assincrono)(_consultas_dashboard_vendedor(), 'vendedor', 'vendedor')
+        self.assertEqual(executadas[0], {'indicadores', 'agendamentos_proximos', 'itens_servico'})
+        self.assertEqual(executadas[1], set())
+
+    def test_chave_varia_por_cargo_e_versao(self):
+        chave_vendedor = fragmentos.chave_fragmento('agenda', 'vendedor', ['agenda'])
+        self.assertNotEqual(chave_vendedor, fragmentos.chave_fragmento('agenda', 'adm', ['agenda']))
+        self.assertEqual(chave_vendedor, fragmentos.chave_fragmento('agenda', 'vendedor', ['agenda']))
+        fragmentos.invalidar('financeiro')
+        self.assertEqual(chave_vendedor, fragmentos.chave_fragmento('agenda', 'vendedor', ['agenda']))
+        fragmentos.invalidar('agenda')
+        self.assertNotEqual(chave_vendedor, fragmentos.chave_fragmento('agenda', 'vendedor', ['agenda']))
+
+    def test_single_flight_aguarda_quem_esta_renderizando(self):
+        chave = fragmentos.chave_fragmento('agenda', 'vendedor', ['agenda'])
+        cache.add(f'{chave}:lock', 1)  # outro worker já está renderizando
+        threading.Timer(0.2, lambda: cache.set(chave, '<p>pronto</p>')).start()
+
+        renderizacoes = []
+        conteudo = fragmentos.obter_ou_renderizar(chave, lambda: renderizacoes.append(1) or '<p>repetido</p>')
+        self.assertEqual(conteudo, '<p>pronto</p>')
+        self.assertEqual(renderizacoes, [])
+
+
+@override_settings(AUDITORIA_LOGIN_TAMANHO_LOTE=10, AUDITORIA_LOGIN_INTERVALO=3600)
+class AuditoriaLoginTest(TestCase):
+    """Auditoria de login/logout gravada em lotes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='senha123', cargo='adm')
+        cls.vendedor = CustomUser.objects.create_user('vendedor', password='senha123', cargo='vendedor')
+
+    def setUp(self):
+        cache.clear()
+        buffer_auditoria.descarregar()
+        AuditoriaLogin.objects.all().delete()
+
+    def test_logins_gravados_em_lote(self):
+        with CaptureQueriesContext(connection) as consultas:
+            for _ in range(30):
+                self.client.force_login(self.vendedor)
+        inserts = [c for c in consultas.captured_queries if c['sql'].startswith('INSERT INTO "accounts_auditorialogin"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(AuditoriaLogin.objects.filter(username='vendedor', evento='login').count(), 30)
+
+    def test_logout_e_eventos_pendentes_aparecem_na_listagem(self):
+        self.client.login(username='vendedor', password='senha123')
+        self.client.logout()
+        self.assertEqual(len(buffer_auditoria), 2)
+
+        self.client.force_login(self.admin)
+        resposta = self.client.get(reverse('accounts:auditoria'), {'usuario': 'vendedor'})
+        self.assertEqual([e.evento for e in resposta.context['eventos']], ['logout', 'login'])
+
+    def test_listagem_paginada_por_cursor(self):
+        agora = timezone.now()
+        AuditoriaLogin.objects.bulk_create(
+            AuditoriaLogin(username='vendedor', evento='login', data=agora - timedelta(minutes=i))
+            for i in range(120)
+        )
+        self.client.force_login(self.admin)
+        url = reverse('accounts:auditoria')
+
+        vistos = []
+        parametros = {'usuario': 'vendedor'}
+        while True:
+            with CaptureQueriesContext(connection) as consultas:
+                resposta = self.client.get(url, parametros)
+            self.assertFalse(any(
+                'COUNT(' in c['sql'] and 'accounts_auditorialogin' in c['sql'] for c in consultas.captured_queries
+            ))
+            vistos.extend(e.pk for e in resposta.context['eventos'])
+            if not resposta.context['proximo_cursor']:
+                break
+            parametros['cursor'] = resposta.context['proximo_cursor']
+        self.assertEqual(len(vistos), 120)
+        self.assertEqual(len(set(vistos)), 120)
+
+    def test_listagem_restrita_a_administradores(self):
+        self.client.force_login(self.vendedor)
+        self.assertEqual(self.client.get(reverse('accounts:auditoria')).status_code, 403)
+
+    def test_exclusao_de_usuario_continua_no_log(self):
+        usuario = CustomUser.objects.create_user('temporario', password='senha123', cargo='florista')
+        with self.assertLogs('accounts.signals', 'INFO') as logs:
+            usuario.delete()
+        self.assertEqual(
+            [registro.evento for registro in logs.records if hasattr(registro, 'evento')], ['usuario.excluido']
+        )
+
+    def test_retencao_exclui_eventos_antigos(self):
+        agora = timezone.now()
+        AuditoriaLogin.objects.bulk_create([
+            AuditoriaLogin(username='vendedor', evento='login', data=agora - timedelta(days=400)),
+            AuditoriaLogin(username='vendedor', evento='login', data=agora - timedelta(days=10)),
+        ])
+        call_command('compactar_auditoria_login', dias=365, lote=1, stdout=StringIO())
+        self.assertEqual(list(AuditoriaLogin.objects.values_list('data', flat=True)), [agora - timedelta(days=10)])
+
+
+class SnapshotPermissoesTest(TestCase):
+    """Matriz de permissões por cargo e snapshot do usuário na sessão."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='senha123', cargo='adm')
+        cls.vendedor = CustomUser.objects.create_user('vendedor', password='senha123', cargo='vendedor')
+
+    def setUp(self):
+        cache.clear()
+
+    def _consultas_de_usuario(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(url)
+        tabelas = ('"accounts_customuser"', '"auth_permission"', '"auth_group"')
+        return resposta, [c['sql'] for c in consultas.captured_queries if any(t in c['sql'] for t in tabelas)]
+
+    def test_matriz_compartilhada_entre_chamadas(self):
+        self.assertIs(self.admin.get_dashboard_permissions(), self.admin.get_dashboard_permissions())
+        self.assertTrue(self.admin.get_dashboard_permissions()['estoque'])
+        self.assertFalse(self.vendedor.get_dashboard_permissions()['estoque'])
+        with self.assertRaises(TypeError):
+            self.admin.get_dashboard_permissions()['estoque'] = False
+
+    def test_estoque_liberado_pelo_cargo(self):
+        url = reverse('estoque:categoria_list')
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.client.force_login(self.vendedor)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_cargo_concede_apenas_permissoes_do_estoque(self):
+        coveiro = CustomUser.objects.create_user('coveiro', password='senha123', cargo='coveiro')
+        self.assertTrue(self.admin.has_perm('estoque.delete_produtoestoque'))
+        self.assertFalse(self.admin.has_perm('funcionario.add_funcionario'))
+        self.assertFalse(self.vendedor.has_perm('financeiro.add_financeiro'))
+        self.assertFalse(self.vendedor.has_perm('servico_contratado.delete_servicocontratado'))
+        self.assertFalse(coveiro.has_perm('agendamento.change_agendamento'))
+
+    def test_snapshot_nao_guarda_a_senha(self):
+        self.client.force_login(self.admin)
+        self.client.get(reverse('estoque:categoria_list'))
+        snapshot = self.client.session[SESSAO_SNAPSHOT]
+        self.assertNotIn('password', snapshot['campos'])
+        self.assertNotIn(self.admin.password, str(snapshot))
+
+        resposta = self.client.get(reverse('estoque:categoria_list'))
+        usuario = resposta.wsgi_request.user
+        self.assertEqual(usuario.pk, self.admin.pk)
+        # A senha só é lida do banco quando alguém precisa dela
+        with self.assertNumQueries(1):
+            self.assertTrue(usuario.check_password('senha123'))
+
+    def test_requisicao_com_snapshot_nao_consulta_usuario(self):
+        url = reverse('estoque:categoria_list')
+        self.client.force_login(self.admin)
+        resposta, consultas = self._consultas_de_usuario(url)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(consultas)
+        self.assertIn(SESSAO_SNAPSHOT, self.client.session)
+
+        resposta, consultas = self._consultas_de_usuario(url)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(consultas, [])
+        self.assertEqual(resposta.wsgi_request.user.pk, self.admin.pk)
+
+    def test_alteracao_do_usuario_vence_snapshot(self):
+        url = reverse('estoque:categoria_list')
+        self.client.force_login(self.vendedor)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vendedor.cargo = 'adm'
+            self.vendedor.save()
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_alteracao_de_grupo_vence_snapshot(self):
+        url = reverse('estoque:categoria_list')
+        grupo = Group.objects.create(name='estoquistas')
+        self.client.force_login(self.vendedor)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vendedor.groups.add(grupo)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            grupo.permissions.add(Permission.objects.get(codename='view_categoriaestoque'))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_troca_de_senha_encerra_sessao(self):
+        url = reverse('estoque:categoria_list')
+        self.client.force_login(self.admin)
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.set_password('nova-senha')
+            self.admin.save()
+        self.assertEqual(self.client.get(url).status_code, 302)
@@ -2,11 +2,18 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.views.generic import CreateView, UpdateView
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.views.generic import CreateView, UpdateView, ListView
 from django.urls import reverse_lazy
 from django.contrib import messages
-from .models import CustomUser
+from django.conf import settings
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from asgiref.sync import sync_to_async
+from app import fragmentos
+from app.consultas_paralelas import executar_em_paralelo, renderizar
+from .auditoria import buffer_auditoria
+from .models import AuditoriaLogin, CustomUser, ResumoDashboard
 from .forms import CustomUserCreationForm, CustomUserChangeForm
 
 
@@ -83,280 +90,412 @@ class UserProfileView(LoginRequiredMixin, UpdateView):
         return response
 
 
-@login_required
-def dashboard_admin(request):
-    """Dashboard para administradores."""
-    from familia.models import Familia
-    from pessoa_falecida.models import PessoaFalecida
+class AuditoriaLoginListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+    """
+    Trilha de auditoria de login/logout (apenas administradores).
+
+    Paginação por cursor (data, id) sobre o índice ``auditoria_data_idx``:
+    cada página custa o mesmo, sem OFFSET nem COUNT(*) da tabela inteira.
+    """
+    model = AuditoriaLogin
+    template_name = 'accounts/auditoria_login.html'
+    context_object_name = 'eventos'
+    por_pagina = 50
+
+    def test_func(self):
+        return self.request.user.is_admin
+
+    def get(self, request, *args, **kwargs):
+        # Eventos ainda no buffer deste processo aparecem já na listagem
+        buffer_auditoria.descarregar()
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        from datetime import datetime
+        from django.db.models import Q
+
+        queryset = AuditoriaLogin.objects.only('usuario_id', 'username', 'evento', 'ip', 'user_agent', 'data')
+        usuario = self.request.GET.get('usuario', '').strip()
+        if usuario:
+            queryset = queryset.filter(username=usuario)
+        evento = self.request.GET.get('evento', '')
+        if evento in dict(AuditoriaLogin.EVENTO_CHOICES):
+            queryset = queryset.filter(evento=evento)
+
+        cursor = self.request.GET.get('cursor', '')
+        if cursor:
+            try:
+                data, pk = cursor.rsplit('_', 1)
+                data, pk = datetime.fromisoformat(data), int(pk)
+            except ValueError:
+                pass
+            else:
+                queryset = queryset.filter(Q(data__lt=data) | Q(data=data, id__lt=pk))
+        return queryset.order_by('-data', '-id')[:self.por_pagina + 1]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        eventos = list(context['eventos'])
+        ultimo = eventos[self.por_pagina - 1] if len(eventos) > self.por_pagina else None
+        context.update({
+            'eventos': eventos[:self.por_pagina],
+            'proximo_cursor': f'{ultimo.data.isoformat()}_{ultimo.pk}' if ultimo else None,
+            'usuario': self.request.GET.get('usuario', ''),
+            'evento': self.request.GET.get('evento', ''),
+            'eventos_choices': AuditoriaLogin.EVENTO_CHOICES,
+            'primeira_pagina': not self.request.GET.get('cursor'),
+        })
+        return context
+
+
+def _buscar_dashboard_admin(search_query, search_type):
+    """Busca rápida do dashboard de administradores (índice de busca textual)."""
+    from busca.indice import buscar
+
+    if not search_query:
+        return []
+    return buscar(search_query, tipos=[search_type], limite=10)
+
+
+def _consultas_dashboard_admin(search_query, search_type):
+    """
+    Consultas independentes do dashboard de administradores (nome -> função).
+
+    A view síncrona executa uma após a outra; a assíncrona, em paralelo.
+    Os indicadores vêm do resumo materializado (uma linha de ResumoDashboard).
+    As que estão em CONSULTAS_EM_FRAGMENTOS só rodam se o fragmento do
+    template não estiver em cache.
+    """
     from funcionario.models import Funcionario
+    from agendamento.models import Agendamento
+    from datetime import datetime, timedelta
+
+    hoje = datetime.now()
+    proxima_semana = hoje.date() + timedelta(days=7)
+
+    return {
+        # Estatísticas para administradores (totais, receitas e serviços do mês)
+        'indicadores': _indicadores,
+        # Próximos agendamentos (próximos 7 dias)
+        'agendamentos_proximos': lambda: list(Agendamento.objects.filter(
+            data_agendamento__range=[hoje.date(), proxima_semana]
+        ).select_related('pessoa_falecida__familia').order_by('data_agendamento', 'hora_agendamento')[:5]),
+        # Funcionários recentes
+        'funcionarios_recentes': lambda: list(Funcionario.objects.all().order_by('-id')[:4]),
+        # Funcionalidade de busca
+        'search_results': lambda: _buscar_dashboard_admin(search_query, search_type),
+    }
+
+
+def _consultas_dashboard_vendedor():
+    """Consultas independentes do dashboard de vendedores (nome -> função)."""
     from item_servico.models import ItemServico
     from agendamento.models import Agendamento
-    from financeiro.models import Financeiro
-    from servico_contratado.models import ServicoContratado
     from datetime import datetime, timedelta
-    from django.urls import reverse
-    from django.db.models import Q, Sum
-    
-    # Funcionalidade de busca
-    search_results = []
-    search_query = request.GET.get('search_query', '')
-    search_type = request.GET.get('search_type', 'familia')
-    
-    if search_query:
-        if search_type == 'familia':
-            familias = Familia.objects.filter(
-                Q(nome_responsavel__icontains=search_query) |
-                Q(telefone__icontains=search_query) |
-                Q(email__icontains=search_query)
-            )[:10]
-            for familia in familias:
-                search_results.append({
-                    'name': familia.nome_responsavel,
-                    'type': 'Família',
-                    'description': f'Telefone: {familia.telefone} | Email: {familia.email}',
-                    'url': reverse('familia:detail', kwargs={'pk': familia.pk})
-                })
-        
-        elif search_type == 'falecido':
-            falecidos = PessoaFalecida.objects.filter(
-                Q(nome__icontains=search_query) |
-                Q(documento_cpf_rg__icontains=search_query)
-            )[:10]
-            for falecido in falecidos:
-                search_results.append({
-                    'name': falecido.nome,
-                    'type': 'Falecido',
-                    'description': f'Família: {falecido.familia.nome_responsavel} | Data: {falecido.data_falecimento.strftime("%d/%m/%Y")}',
-                    'url': reverse('pessoa_falecida:detail', kwargs={'pk': falecido.pk}),
-                    'imagem_url': falecido.imagem.url if falecido.imagem else None
-                })
-        
-        elif search_type == 'funcionario':
-            funcionarios = Funcionario.objects.filter(
-                Q(nome__icontains=search_query) |
-                Q(telefone__icontains=search_query)
-            )[:10]
-            for funcionario in funcionarios:
-                search_results.append({
-                    'name': funcionario.nome,
-                    'type': 'Funcionário',
-                    'description': f'Cargo: {funcionario.cargo} | Telefone: {funcionario.telefone}',
-                    'url': reverse('funcionario:detail', kwargs={'pk': funcionario.pk}),
-                    'imagem_url': funcionario.usuario.foto_perfil.url if funcionario.usuario and funcionario.usuario.foto_perfil else None
-                })
-    
-    # Estatísticas para administradores
-    total_funcionarios = Funcionario.objects.count()
-    total_familias = Familia.objects.count()
-    total_falecidos = PessoaFalecida.objects.count()
-    total_itens = ItemServico.objects.count()
-    total_agendamentos = Agendamento.objects.count()
-    
-    # Receitas do mês atual
+
     hoje = datetime.now()
-    inicio_mes = hoje.replace(day=1)
-    receitas_mes = Financeiro.objects.filter(
-        tipo='receita',
-        status='pago',
-        data_pagamento__gte=inicio_mes
-    ).aggregate(total=Sum('valor'))['total'] or 0
-    
-    # Serviços contratados no mês
-    servicos_mes = ServicoContratado.objects.filter(
-        data_contratacao__gte=inicio_mes
-    ).count()
-    
-    # Próximos agendamentos (próximos 7 dias)
     proxima_semana = hoje.date() + timedelta(days=7)
-    agendamentos_proximos = Agendamento.objects.filter(
-        data_agendamento__range=[hoje.date(), proxima_semana]
-    ).order_by('data_agendamento', 'hora_agendamento')[:5]
 
-    # Funcionários recentes
-    funcionarios_recentes = Funcionario.objects.all().order_by('-id')[:4]
-    
+    return {
+        # Estatísticas para vendedores (totais, receitas e serviços do mês)
+        'indicadores': _indicadores,
+        # Próximos agendamentos (próximos 7 dias)
+        'agendamentos_proximos': lambda: list(Agendamento.objects.filter(
+            data_agendamento__range=[hoje.date(), proxima_semana]
+        ).select_related('pessoa_falecida__familia').order_by('data_agendamento', 'hora_agendamento')[:5]),
+        'itens_servico': lambda: list(ItemServico.objects.all()[:5]),
+    }
+
+
+# Tarefas exibidas nos cards de sepultamento, por cargo do usuário
+TAREFAS_POR_CARGO = {
+    'florista': (
+        'Preparar arranjos florais',
+        'Decorar local do velório',
+        'Organizar flores no caixão',
+        'Preparar coroas de flores',
+    ),
+    'preparador': (
+        'Preparar o corpo',
+        'Vestir o falecido',
+        'Aplicar maquiagem',
+        'Posicionar no caixão',
+    ),
+    'coveiro': (
+        'Preparar local do sepultamento',
+        'Escavar sepultura',
+        'Auxiliar no transporte',
+        'Realizar sepultamento',
+    ),
+}
+
+
+def _urgencia(dias_restantes):
+    """Classifica a urgência pela proximidade da data do sepultamento."""
+    if dias_restantes == 0:
+        return 'hoje'
+    if dias_restantes == 1:
+        return 'amanha'
+    if dias_restantes <= 3:
+        return 'urgente'
+    return 'normal'
+
+
+def _montar_todo_cards(cargo, hoje, proximos_7_dias):
+    """
+    Monta os cards de to-do list, organizados por sepultamento.
+
+    Usa sempre três consultas, independentemente do número de cards:
+    agendamentos, contratos dos falecidos e itens desses contratos.
+    """
+    from collections import defaultdict
+    from django.db.models import Prefetch
+    from agendamento.models import Agendamento
+    from servico_contratado.models import ServicoContratado, ItemServicoContratado
+
+    # Buscar todos os sepultamentos próximos (não apenas do funcionário)
+    # Funcionários operacionais trabalham em equipe nos sepultamentos
+    agendamentos_proximos = list(Agendamento.objects.filter(
+        data_sepultamento__date__range=[hoje, proximos_7_dias]
+    ).select_related('pessoa_falecida').order_by('data_sepultamento'))
+
+    # Contratos e itens de todos os falecidos de uma vez, agrupados em memória
+    contratos_por_falecido = defaultdict(list)
+    itens_por_falecido = defaultdict(list)
+    if agendamentos_proximos:
+        contratos = ServicoContratado.objects.filter(
+            pessoa_falecida_id__in={agendamento.pessoa_falecida_id for agendamento in agendamentos_proximos}
+        ).prefetch_related(
+            Prefetch('itens', queryset=ItemServicoContratado.objects.select_related('item_servico'))
+        )
+        for contrato in contratos:
+            contratos_por_falecido[contrato.pessoa_falecida_id].append(contrato)
+            itens_por_falecido[contrato.pessoa_falecida_id].extend(contrato.itens.all())
+
+    tarefas_usuario = list(TAREFAS_POR_CARGO.get(cargo, ()))
+
+    todo_cards = []
+    for agendamento in agendamentos_proximos:
+        dias_restantes = (agendamento.data_sepultamento.date() - hoje).days
+        todo_cards.append({
+            'agendamento': agendamento,
+            'servicos_contratados': contratos_por_falecido[agendamento.pessoa_falecida_id],
+            'itens_contratados': itens_por_falecido[agendamento.pessoa_falecida_id],
+            'tarefas_usuario': tarefas_usuario,
+            'urgencia': _urgencia(dias_restantes),
+            'dias_restantes': dias_restantes,
+        })
+    return todo_cards
+
+
+def _consultas_dashboard_funcionario(cargo):
+    """Consultas independentes do dashboard de funcionários (nome -> função)."""
+    from agendamento.models import Agendamento
+    from datetime import datetime, timedelta
+
+    hoje = datetime.now().date()
+    proximos_7_dias = hoje + timedelta(days=7)
+
+    return {
+        # Estatísticas gerais para funcionários (totais e tarefas concluídas no mês)
+        'indicadores': _indicadores,
+        # Agendamentos pendentes (próximos 7 dias)
+        'agendamentos_pendentes': Agendamento.objects.filter(
+            data_agendamento__range=[hoje, proximos_7_dias]
+        ).count,
+        'todo_cards': lambda: _montar_todo_cards(cargo, hoje, proximos_7_dias),
+    }
+
+
+def _resumo_todo_cards(todo_cards):
+    """Estatísticas dos cards de sepultamento para o dashboard."""
+    return {
+        'total_sepultamentos': len(todo_cards),
+        'sepultamentos_hoje': len([c for c in todo_cards if c['urgencia'] == 'hoje']),
+        'sepultamentos_urgentes': len([c for c in todo_cards if c['urgencia'] in ['hoje', 'amanha', 'urgente']]),
+    }
+
+
+def _indicadores():
+    """Indicadores do resumo materializado (uma linha de ResumoDashboard)."""
+    return ResumoDashboard.obter().indicadores()
+
+
+# Fragmentos de cada dashboard (templates/accounts/dashboard_*.html):
+# nome -> (domínios, varia com o dia, consultas exibidas só dentro dele)
+_TODOS_DOMINIOS = ('agenda', 'financeiro', 'funcionarios')
+FRAGMENTOS_DASHBOARDS = {
+    'admin': {
+        'estatisticas': (_TODOS_DOMINIOS, True, ('indicadores',)),
+        'gestao': (_TODOS_DOMINIOS, True, ('indicadores',)),
+        'funcionarios_recentes': (('funcionarios',), False, ('funcionarios_recentes',)),
+        'agenda': (('agenda',), True, ('agendamentos_proximos',)),
+    },
+    'vendedor': {
+        'estatisticas': (_TODOS_DOMINIOS, True, ('indicadores',)),
+        'gestao': (_TODOS_DOMINIOS, True, ('indicadores',)),
+        'itens_servico': (('financeiro',), False, ('itens_servico',)),
+        'agenda': (('agenda',), True, ('agendamentos_proximos',)),
+    },
+    'funcionario': {
+        'sepultamentos_topo': (('agenda', 'financeiro'), True, ('todo_cards',)),
+        'painel': (_TODOS_DOMINIOS, True, ('indicadores', 'agendamentos_pendentes', 'todo_cards')),
+    },
+}
+
+# Resultados exibidos só dentro de {% fragmento %} nos templates: viram
+# objetos preguiçosos e só consultam o banco numa falta de cache
+CONSULTAS_EM_FRAGMENTOS = frozenset(
+    consulta
+    for fragmentos_dashboard in FRAGMENTOS_DASHBOARDS.values()
+    for _dominios, _diario, consultas in fragmentos_dashboard.values()
+    for consulta in consultas
+)
+
+
+def _preguicosas(consultas):
+    return {
+        nome: SimpleLazyObject(consulta)
+        for nome, consulta in consultas.items() if nome in CONSULTAS_EM_FRAGMENTOS
+    }
+
+
+def _consultas_em_falta(dashboard, cargo):
+    """Consultas dos fragmentos do dashboard que não estão em cache."""
+    hoje = timezone.localdate().isoformat()  # o {% now "Y-m-d" as hoje %} dos templates
+    fragmentos_dashboard = FRAGMENTOS_DASHBOARDS[dashboard]
+    em_falta = fragmentos.em_falta(cargo, {
+        nome: (dominios, [hoje] if diario else [])
+        for nome, (dominios, diario, _consultas) in fragmentos_dashboard.items()
+    })
+    return {consulta for nome in em_falta for consulta in fragmentos_dashboard[nome][2]}
+
+
+def _executar_em_sequencia(consultas):
+    resultados = {nome: consulta() for nome, consulta in consultas.items() if nome not in CONSULTAS_EM_FRAGMENTOS}
+    resultados.update(_preguicosas(consultas))
+    return resultados
+
+
+async def _executar_assincrono(consultas, dashboard, cargo):
+    """
+    Executa em paralelo as consultas fora dos fragmentos e as dos fragmentos
+    em falta no cache; as demais ficam preguiçosas, como na view síncrona.
+    """
+    em_falta = await sync_to_async(_consultas_em_falta)(dashboard, cargo)
+    resultados = await executar_em_paralelo({
+        nome: consulta for nome, consulta in consultas.items()
+        if nome not in CONSULTAS_EM_FRAGMENTOS or nome in em_falta
+    })
+    resultados.update(_preguicosas({
+        nome: consulta for nome, consulta in consultas.items() if nome not in resultados
+    }))
+    return resultados
+
+
+@login_required
+def dashboard_admin(request):
+    """Dashboard para administradores."""
+    search_query = request.GET.get('search_query', '')
+    search_type = request.GET.get('search_type', 'familia')
+
     context = {
         'user': request.user,
         'permissions': request.user.get_dashboard_permissions(),
         'dashboard_type': 'admin',
-        'total_funcionarios': total_funcionarios,
-        'total_familias': total_familias,
-        'total_falecidos': total_falecidos,
-        'total_itens': total_itens,
-        'total_agendamentos': total_agendamentos,
-        'receitas_mes': receitas_mes,
-        'servicos_mes': servicos_mes,
-        'agendamentos_proximos': agendamentos_proximos,
-        'funcionarios_recentes': funcionarios_recentes,
-        'search_results': search_results,
         'search_query': search_query,
         'search_type': search_type,
     }
+    context.update(_executar_em_sequencia(_consultas_dashboard_admin(search_query, search_type)))
     return render(request, 'accounts/dashboard_admin.html', context)
 
 
+@login_required
+async def dashboard_admin_async(request):
+    """Dashboard para administradores (ASGI): consultas independentes em paralelo."""
+    user = await request.auser()
+    search_query = request.GET.get('search_query', '')
+    search_type = request.GET.get('search_type', 'familia')
+
+    context = {
+        'user': user,
+        'permissions': user.get_dashboard_permissions(),
+        'dashboard_type': 'admin',
+        'search_query': search_query,
+        'search_type': search_type,
+    }
+    context.update(await _executar_assincrono(
+        _consultas_dashboard_admin(search_query, search_type), 'admin', user.cargo
+    ))
+    return await renderizar(request, 'accounts/dashboard_admin.html', context)
+
+
 @login_required
 def dashboard_vendedor(request):
     """Dashboard para vendedores."""
-    from familia.models import Familia
-    from pessoa_falecida.models import PessoaFalecida
-    from item_servico.models import ItemServico
-    from agendamento.models import Agendamento
-    from financeiro.models import Financeiro
-    from servico_contratado.models import ServicoContratado
-    from datetime import datetime, timedelta
-    from django.db.models import Sum, Count
-    
-    # Estatísticas para vendedores
-    total_familias = Familia.objects.count()
-    total_falecidos = PessoaFalecida.objects.count()
-    total_itens = ItemServico.objects.count()
-    total_agendamentos = Agendamento.objects.count()
-    
-    # Receitas do mês atual
-    hoje = datetime.now()
-    inicio_mes = hoje.replace(day=1)
-    receitas_mes = Financeiro.objects.filter(
-        tipo='receita',
-        status='pago',
-        data_pagamento__gte=inicio_mes
-    ).aggregate(total=Sum('valor'))['total'] or 0
-    
-    # Serviços contratados no mês
-    servicos_mes = ServicoContratado.objects.filter(
-        data_contratacao__gte=inicio_mes
-    ).count()
-    
-    # Próximos agendamentos (próximos 7 dias)
-    proxima_semana = hoje.date() + timedelta(days=7)
-    agendamentos_proximos = Agendamento.objects.filter(
-        data_agendamento__range=[hoje.date(), proxima_semana]
-    ).order_by('data_agendamento', 'hora_agendamento')[:5]
-
-    itens_servico = ItemServico.objects.all()[:5]
-    
     context = {
         'user': request.user,
         'permissions': request.user.get_dashboard_permissions(),
         'dashboard_type': 'vendedor',
-        'total_familias': total_familias,
-        'total_falecidos': total_falecidos,
-        'total_itens': total_itens,
-        'total_agendamentos': total_agendamentos,
-        'receitas_mes': receitas_mes,
-        'servicos_mes': servicos_mes,
-        'agendamentos_proximos': agendamentos_proximos,
-        'itens_servico': itens_servico,
     }
+    context.update(_executar_em_sequencia(_consultas_dashboard_vendedor()))
     return render(request, 'accounts/dashboard_vendedor.html', context)
 
 
+@login_required
+async def dashboard_vendedor_async(request):
+    """Dashboard para vendedores (ASGI): consultas independentes em paralelo."""
+    user = await request.auser()
+    context = {
+        'user': user,
+        'permissions': user.get_dashboard_permissions(),
+        'dashboard_type': 'vendedor',
+    }
+    context.update(await _executar_assincrono(_consultas_dashboard_vendedor(), 'vendedor', user.cargo))
+    return await renderizar(request, 'accounts/dashboard_vendedor.html', context)
+
+
 @login_required
 def dashboard_funcionario(request):
     """Dashboard para funcionários operacionais - Sistema To-Do List."""
-    from agendamento.models import Agendamento
-    from servico_contratado.models import ServicoContratado
-    from pessoa_falecida.models import PessoaFalecida
-    from funcionario.models import Funcionario
-    from financeiro.models import Financeiro
-    from datetime import datetime, timedelta
-    from django.db.models import Sum, Count
-    
-    hoje = datetime.now().date()
-    proximos_7_dias = hoje + timedelta(days=7)
-    
-    # Estatísticas gerais para funcionários
-    total_funcionarios = Funcionario.objects.count()
-    total_agendamentos = Agendamento.objects.count()
-    
-    # Agendamentos pendentes (próximos 7 dias)
-    agendamentos_pendentes = Agendamento.objects.filter(
-        data_agendamento__range=[hoje, proximos_7_dias]
-    ).count()
-    
-    # Tarefas concluídas no mês (usando serviços contratados como proxy)
-    inicio_mes = datetime.now().replace(day=1)
-    tarefas_concluidas = ServicoContratado.objects.filter(
-        data_contratacao__gte=inicio_mes
-    ).count()
-    
-    # Buscar todos os sepultamentos próximos (não apenas do funcionário)
-    # Funcionários operacionais trabalham em equipe nos sepultamentos
-    agendamentos_proximos = Agendamento.objects.filter(
-        data_sepultamento__date__range=[hoje, proximos_7_dias]
-    ).select_related('pessoa_falecida').order_by('data_sepultamento')
-    
-    # Criar cards de to-do list organizados por sepultamento
-    todo_cards = []
-    
-    for agendamento in agendamentos_proximos:
-        # Buscar serviços contratados relacionados ao falecido
-        servicos_contratados = ServicoContratado.objects.filter(
-            pessoa_falecida=agendamento.pessoa_falecida
-        ).prefetch_related('itens__item_servico')
-        # Determinar tarefas específicas baseadas no cargo do usuário
-        tarefas_usuario = []
-        cargo = request.user.cargo
-        
-        if cargo == 'florista':
-            tarefas_usuario = [
-                'Preparar arranjos florais',
-                'Decorar local do velório',
-                'Organizar flores no caixão',
-                'Preparar coroas de flores'
-            ]
-        elif cargo == 'preparador':
-            tarefas_usuario = [
-                'Preparar o corpo',
-                'Vestir o falecido',
-                'Aplicar maquiagem',
-                'Posicionar no caixão'
-            ]
-        elif cargo == 'coveiro':
-            tarefas_usuario = [
-                'Preparar local do sepultamento',
-                'Escavar sepultura',
-                'Auxiliar no transporte',
-                'Realizar sepultamento'
-            ]
-        
-        # Calcular urgência baseada na proximidade da data
-        dias_restantes = (agendamento.data_sepultamento.date() - hoje).days
-        if dias_restantes == 0:
-            urgencia = 'hoje'
-        elif dias_restantes == 1:
-            urgencia = 'amanha'
-        elif dias_restantes <= 3:
-            urgencia = 'urgente'
-        else:
-            urgencia = 'normal'
-        
-        card = {
-            'agendamento': agendamento,
-            'servicos_contratados': servicos_contratados,
-            'tarefas_usuario': tarefas_usuario,
-            'urgencia': urgencia,
-            'dias_restantes': dias_restantes,
-        }
-        todo_cards.append(card)
-    
-    # Estatísticas para o dashboard
-    total_sepultamentos = len(todo_cards)
-    sepultamentos_hoje = len([c for c in todo_cards if c['urgencia'] == 'hoje'])
-    sepultamentos_urgentes = len([c for c in todo_cards if c['urgencia'] in ['hoje', 'amanha', 'urgente']])
-    
     context = {
         'user': request.user,
         'permissions': request.user.get_dashboard_permissions(),
         'dashboard_type': 'funcionario',
         'cargo': request.user.get_cargo_display(),
-        'total_funcionarios': total_funcionarios,
-        'total_agendamentos': total_agendamentos,
-        'agendamentos_pendentes': agendamentos_pendentes,
-        'tarefas_concluidas': tarefas_concluidas,
-        'todo_cards': todo_cards,
-        'total_sepultamentos': total_sepultamentos,
-        'sepultamentos_hoje': sepultamentos_hoje,
-        'sepultamentos_urgentes': sepultamentos_urgentes,
     }
+    context.update(_executar_em_sequencia(_consultas_dashboard_funcionario(request.user.cargo)))
+    context['sepultamentos'] = SimpleLazyObject(lambda: _resumo_todo_cards(context['todo_cards']))
     return render(request, 'accounts/dashboard_funcionario_todo.html', context)
+
+
+@login_required
+async def dashboard_funcionario_async(request):
+    """Dashboard para funcionários operacionais (ASGI): consultas independentes em paralelo."""
+    user = await request.auser()
+    context = {
+        'user': user,
+        'permissions': user.get_dashboard_permissions(),
+        'dashboard_type': 'funcionario',
+        'cargo': user.get_cargo_display(),
+    }
+    context.update(await _executar_assincrono(
+        _consultas_dashboard_funcionario(user.cargo), 'funcionario', user.cargo
+    ))
+    context['sepultamentos'] = SimpleLazyObject(lambda: _resumo_todo_cards(context['todo_cards']))
+    return await renderizar(request, 'accounts/dashboard_funcionario_todo.html', context)
+
+
+# Versões usadas nas URLs: assíncronas no ASGI (DASHBOARDS_ASSINCRONOS), síncronas no WSGI
+if settings.DASHBOARDS_ASSINCRONOS:
+    dashboards = {
+        'admin': dashboard_admin_async,
+        'vendedor': dashboard_vendedor_async,
+        'funcionario': dashboard_funcionario_async,
+    }
+else:
+    dashboards = {
+        'admin': dashboard_admin,
+        'vendedor': dashboard_vendedor,
+        'funcionario': dashboard_funcionario,
+    }
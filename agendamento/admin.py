@@ -4,7 +4,7 @@ from django.contrib import admin
 
 
 from django.contrib import admin
-from .models import Agendamento
+from .models import Agendamento, LembreteAgendamento
 
 
 @admin.register(Agendamento)
@@ -26,3 +26,8 @@ class AgendamentoAdmin(admin.ModelAdmin):
     ordering = ('-data_agendamento',)
 
 
+@admin.register(LembreteAgendamento)
+class LembreteAgendamentoAdmin(admin.ModelAdmin):
+    list_display = ('agendamento', 'destinatario', 'antecedencia', 'momento', 'status', 'tentativas', 'data_envio')
+    list_filter = ('status', 'destinatario')
+    raw_id_fields = ('agendamento',)
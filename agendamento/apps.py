@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AgendamentoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'agendamento'
+
+    def ready(self):
+        """Importa signals quando o app estiver pronto."""
+        import agendamento.signals
@@ -0,0 +1,179 @@
+"""
+Sugestão automática do funcionário responsável por um agendamento.
+
+Os candidatos são os funcionários ativos, de um cargo listado em
+``AGENDAMENTO_AFINIDADE_CARGO``, sem agendamento sobreposto ao período
+pedido, ordenados por:
+
+1. afinidade do cargo com a cerimônia (peso em ``AGENDAMENTO_AFINIDADE_CARGO``);
+2. carga na janela: horas já escaladas entre ``inicio - janela`` e
+   ``fim + janela`` (``AGENDAMENTO_ATRIBUICAO_JANELA_HORAS``), menor primeiro;
+3. nome, para o resultado ser estável.
+
+``Escala`` carrega de uma vez os funcionários ativos e os intervalos
+ocupados de todos no horizonte (duas consultas) e avalia os candidatos em
+memória: o custo de uma sugestão não cresce com o tamanho da equipe. Na
+atribuição em lote (``python manage.py atribuir_responsaveis``) a mesma
+escala atende todos os agendamentos e é atualizada a cada reserva.
+"""
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from funcionario.models import Funcionario
+
+from .models import Agendamento
+
+
+@dataclass(frozen=True)
+class Sugestao:
+    funcionario: Funcionario
+    afinidade: int
+    carga_horas: float
+
+
+def janela():
+    return timedelta(hours=settings.AGENDAMENTO_ATRIBUICAO_JANELA_HORAS)
+
+
+class Escala:
+    """Intervalos ocupados por funcionário em ``[inicio, fim)``, em memória."""
+
+    def __init__(self, inicio, fim):
+        self.inicio, self.fim = inicio, fim
+        self.funcionarios = list(
+            Funcionario.objects.filter(ativo=True, cargo__in=settings.AGENDAMENTO_AFINIDADE_CARGO)
+            .only('nome', 'cargo')
+            .order_by('nome', 'id')
+        )
+        # funcionario_id -> [(inicio, fim, agendamento_id)] em ordem de início
+        self.ocupados = defaultdict(list)
+        intervalos = (
+            Agendamento.objects.filter(data_agendamento__lt=fim, data_sepultamento__gt=inicio)
+            .order_by('data_agendamento', 'id')
+            .values_list('funcionario_id', 'data_agendamento', 'data_sepultamento', 'id')
+        )
+        for funcionario_id, comeco, termino, pk in intervalos:
+            self.ocupados[funcionario_id].append((comeco, termino, pk))
+
+    @classmethod
+    def para_periodo(cls, inicio, fim):
+        """Escala suficiente para sugerir responsáveis para ``[inicio, fim)``."""
+        return cls(inicio - janela(), fim + janela())
+
+    def _sobrepostos(self, funcionario_id, inicio, fim, excluir_pk=None):
+        intervalos = self.ocupados.get(funcionario_id, ())
+        # Só os que começam antes do fim pedido podem sobrepor
+        limite = bisect_left(intervalos, (fim,))
+        for comeco, termino, pk in intervalos[:limite]:
+            if termino > inicio and pk != excluir_pk:
+                yield comeco, termino, pk
+
+    def livre(self, funcionario_id, inicio, fim, excluir_pk=None):
+        return next(self._sobrepostos(funcionario_id, inicio, fim, excluir_pk), None) is None
+
+    def carga_horas(self, funcionario_id, inicio, fim, excluir_pk=None):
+        """Horas escaladas dentro de ``[inicio - janela, fim + janela)``."""
+        comeco_janela, fim_janela = inicio - janela(), fim + janela()
+        total = sum(
+            (min(termino, fim_janela) - max(comeco, comeco_janela)).total_seconds()
+            for comeco, termino, _pk in self._sobrepostos(funcionario_id, comeco_janela, fim_janela, excluir_pk)
+        )
+        return total / 3600
+
+    def sugerir(self, inicio, fim, excluir_pk=None, limite=None):
+        """Candidatos livres em ordem de preferência (lista de ``Sugestao``)."""
+        afinidades = settings.AGENDAMENTO_AFINIDADE_CARGO
+        sugestoes = [
+            Sugestao(
+                funcionario,
+                afinidades[funcionario.cargo],
+                round(self.carga_horas(funcionario.pk, inicio, fim, excluir_pk), 1),
+            )
+            for funcionario in self.funcionarios
+            if self.livre(funcionario.pk, inicio, fim, excluir_pk)
+        ]
+        sugestoes.sort(key=lambda s: (-s.afinidade, s.carga_horas, s.funcionario.nome, s.funcionario.pk))
+        return sugestoes[:limite] if limite else sugestoes
+
+    def reservar(self, funcionario_id, inicio, fim, pk):
+        insort(self.ocupados[funcionario_id], (inicio, fim, pk))
+
+    def liberar(self, funcionario_id, pk):
+        self.ocupados[funcionario_id] = [
+            intervalo for intervalo in self.ocupados.get(funcionario_id, ()) if intervalo[2] != pk
+        ]
+
+
+def melhor_funcionario(inicio, fim, excluir_pk=None):
+    """O funcionário mais indicado para ``[inicio, fim)``, ou None se ninguém estiver livre."""
+    sugestoes = Escala.para_periodo(inicio, fim).sugerir(inicio, fim, excluir_pk, limite=1)
+    return sugestoes[0].funcionario if sugestoes else None
+
+
+def pendentes(inicio, fim):
+    """
+    Agendamentos de ``[inicio, fim)`` que precisam de outro responsável.
+
+    O modelo exige um funcionário em todo agendamento, então "sem
+    responsável" é: responsável inativo ou escalado em outro agendamento
+    sobreposto (neste caso o mais recente do par é o que muda).
+    """
+    from .conflitos import conflitos_no_periodo
+
+    pks = set(
+        Agendamento.objects.filter(
+            data_agendamento__lt=fim, data_sepultamento__gt=inicio, funcionario__ativo=False
+        ).values_list('pk', flat=True)
+    )
+    pks.update(conflito['agendamentos'][1].pk for conflito in conflitos_no_periodo(inicio, fim))
+    return (
+        Agendamento.objects.filter(pk__in=pks)
+        .select_related('pessoa_falecida', 'funcionario')
+        .order_by('data_agendamento', 'id')
+    )
+
+
+def atribuir_pendentes(inicio, fim, simular=False):
+    """
+    Troca o responsável dos agendamentos pendentes pelo melhor candidato livre.
+
+    Returns:
+        tuple: ``(atribuidos, sem_candidato)``; ``atribuidos`` é uma lista de
+        ``(agendamento, funcionario_anterior, funcionario_novo)``
+    """
+    agendamentos = list(pendentes(inicio, fim))
+    if not agendamentos:
+        return [], []
+    escala = Escala(
+        min(a.data_agendamento for a in agendamentos) - janela(),
+        max(a.data_sepultamento for a in agendamentos) + janela(),
+    )
+    atribuidos, sem_candidato = [], []
+    for agendamento in agendamentos:
+        escala.liberar(agendamento.funcionario_id, agendamento.pk)
+        sugestoes = escala.sugerir(
+            agendamento.data_agendamento, agendamento.data_sepultamento, agendamento.pk, limite=1
+        )
+        if not sugestoes:
+            # Sem candidato: o agendamento continua ocupando o responsável atual
+            escala.reservar(
+                agendamento.funcionario_id, agendamento.data_agendamento, agendamento.data_sepultamento, agendamento.pk
+            )
+            sem_candidato.append(agendamento)
+            continue
+        novo = sugestoes[0].funcionario
+        escala.reservar(novo.pk, agendamento.data_agendamento, agendamento.data_sepultamento, agendamento.pk)
+        atribuidos.append((agendamento, agendamento.funcionario, novo))
+
+    if not simular:
+        # save() por agendamento: os signals invalidam caches e a página pública
+        with transaction.atomic():
+            for agendamento, _anterior, novo in atribuidos:
+                agendamento.funcionario = novo
+                agendamento.save(update_fields=['funcionario'])
+    return atribuidos, sem_candidato
@@ -0,0 +1,178 @@
+"""
+Agenda por intervalo de datas: API JSON do calendário e feeds iCalendar.
+
+* ``agendamentos_no_intervalo``: cerimônias que tocam ``[inicio, fim)``,
+  pelos índices de ``data_agendamento``/``data_sepultamento`` (ou pelo de
+  funcionário quando filtrado), já com falecido e funcionário no mesmo JOIN.
+* ``linhas_ics``: gera o ``.ics`` evento a evento sobre ``.iterator()``; a
+  resposta é um ``StreamingHttpResponse`` e o feed nunca fica inteiro em memória.
+* ``validadores``: ETag e Last-Modified saem das versões dos domínios
+  ``agenda`` e ``funcionarios`` em ``app.fragmentos`` (só cache). Os
+  calendários de celular consultam o feed o tempo todo; sem alteração a
+  resposta é 304 sem nenhuma consulta às tabelas.
+
+Os feeds não exigem login (o aplicativo de calendário não tem sessão): o
+endereço leva um token assinado com a ``SECRET_KEY`` (``token_feed``).
+"""
+import hashlib
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+from app import fragmentos
+
+from .models import Agendamento
+
+DOMINIOS = ('agenda', 'funcionarios')
+SALT_FEED = 'agendamento.calendario.feed'
+TODOS = 'todos'
+CHUNK_FEED = 500
+
+CAMPOS = (
+    'id', 'data_agendamento', 'data_sepultamento', 'local_velorio', 'local_sepultamento',
+    'funcionario_id', 'pessoa_falecida__nome', 'funcionario__nome',
+)
+
+
+def agendamentos_no_intervalo(inicio, fim, funcionario_id=None):
+    """Agendamentos cujo período (agendamento a sepultamento) toca ``[inicio, fim)``."""
+    agendamentos = Agendamento.objects.filter(data_agendamento__lt=fim, data_sepultamento__gt=inicio)
+    if funcionario_id is not None:
+        agendamentos = agendamentos.filter(funcionario_id=funcionario_id)
+    return (
+        agendamentos
+        .select_related('pessoa_falecida', 'funcionario')
+        .only(*CAMPOS)
+        .order_by('data_agendamento', 'id')
+    )
+
+
+def evento_json(agendamento):
+    return {
+        'id': agendamento.pk,
+        'titulo': agendamento.pessoa_falecida.nome,
+        'inicio': agendamento.data_agendamento.isoformat(),
+        'fim': agendamento.data_sepultamento.isoformat(),
+        'funcionario_id': agendamento.funcionario_id,
+        'funcionario': agendamento.funcionario.nome,
+        'local_velorio': agendamento.local_velorio,
+        'local_sepultamento': agendamento.local_sepultamento,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Feeds iCalendar (RFC 5545)
+# ---------------------------------------------------------------------------
+
+def token_feed(funcionario_id=None):
+    """Token do endereço do feed: de um funcionário ou, sem id, da agenda geral."""
+    return signing.Signer(salt=SALT_FEED).sign(str(funcionario_id or TODOS))
+
+
+def ler_token(token):
+    """
+    Returns:
+        tuple: ``(valido, funcionario_id)``; ``funcionario_id`` é None no feed geral
+    """
+    try:
+        valor = signing.Signer(salt=SALT_FEED).unsign(token)
+    except signing.BadSignature:
+        return False, None
+    if valor == TODOS:
+        return True, None
+    return (True, int(valor)) if valor.isdigit() else (False, None)
+
+
+def janela_feed():
+    """Período publicado nos feeds, em torno do dia de hoje."""
+    hoje = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    return (
+        hoje - timedelta(days=settings.CALENDARIO_FEED_DIAS_PASSADOS),
+        hoje + timedelta(days=settings.CALENDARIO_FEED_DIAS_FUTUROS),
+    )
+
+
+def validadores(*extras):
+    """
+    ETag e Last-Modified das respostas do calendário, sem consultar o banco.
+
+    A janela dos feeds anda com o dia, então a data de hoje entra na ETag e
+    a meia-noite serve de piso para o Last-Modified.
+    """
+    hoje = timezone.localdate()
+    versoes = fragmentos.versoes(DOMINIOS)
+    partes = [versoes[dominio] for dominio in DOMINIOS] + [hoje.isoformat(), *map(str, extras)]
+    etag = hashlib.md5(':'.join(partes).encode()).hexdigest()
+    meia_noite = timezone.make_aware(datetime.combine(hoje, time.min))
+    modificado = datetime.fromtimestamp(fragmentos.modificado_em(DOMINIOS), tz=dt_timezone.utc)
+    return etag, max(modificado, meia_noite).replace(microsecond=0)
+
+
+def _escapar(texto):
+    return (
+        texto.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _dobrar(linha):
+    """Quebra a linha em pedaços de até 75 octetos, sem cortar caracteres UTF-8."""
+    if len(linha.encode()) <= 75:
+        return linha + '\r\n'
+    partes, atual, tamanho = [], '', 0
+    for caractere in linha:
+        octetos = len(caractere.encode())
+        if tamanho + octetos > 75:
+            partes.append(atual)
+            atual, tamanho = ' ', 1
+        atual += caractere
+        tamanho += octetos
+    partes.append(atual)
+    return '\r\n'.join(partes) + '\r\n'
+
+
+def _utc(momento):
+    return momento.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _vevent(agendamento, dominio, carimbo):
+    linhas = [
+        'BEGIN:VEVENT',
+        f'UID:agendamento-{agendamento.pk}@{dominio}',
+        f'DTSTAMP:{carimbo}',
+        f'DTSTART:{_utc(agendamento.data_agendamento)}',
+    ]
+    if agendamento.data_sepultamento > agendamento.data_agendamento:
+        linhas.append(f'DTEND:{_utc(agendamento.data_sepultamento)}')
+    descricao = (
+        f'Velório: {agendamento.local_velorio}\n'
+        f'Sepultamento: {agendamento.local_sepultamento}, '
+        f'{timezone.localtime(agendamento.data_sepultamento):%d/%m/%Y %H:%M}\n'
+        f'Responsável: {agendamento.funcionario.nome}'
+    )
+    linhas += [
+        f'SUMMARY:{_escapar(f"Cerimônia - {agendamento.pessoa_falecida.nome}")}',
+        f'LOCATION:{_escapar(agendamento.local_velorio)}',
+        f'DESCRIPTION:{_escapar(descricao)}',
+        'END:VEVENT',
+    ]
+    return ''.join(_dobrar(linha) for linha in linhas)
+
+
+def linhas_ics(agendamentos, nome_calendario, dominio):
+    """Gera o calendário em pedaços: cabeçalho, um VEVENT por agendamento e rodapé."""
+    carimbo = _utc(timezone.now())
+    yield ''.join(_dobrar(linha) for linha in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//ERP Funerarias//Agenda//PT-BR',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escapar(nome_calendario)}',
+        f'X-WR-TIMEZONE:{settings.TIME_ZONE}',
+    ])
+    for agendamento in agendamentos.iterator(chunk_size=CHUNK_FEED):
+        yield _vevent(agendamento, dominio, carimbo)
+    yield 'END:VCALENDAR\r\n'
@@ -0,0 +1,90 @@
+"""
+Detecção de conflitos de escala nos agendamentos.
+
+Cada agendamento ocupa o funcionário responsável no intervalo
+``[data_agendamento, data_sepultamento)``. Dois agendamentos do mesmo
+funcionário conflitam quando os intervalos se sobrepõem::
+
+    a.inicio < b.fim  e  b.inicio < a.fim
+
+* ``conflitos_do_funcionario``: "este funcionário está livre?" Uma consulta
+  pelo índice ``agendamento_func_periodo_idx`` (funcionário, fim, início),
+  que só percorre os agendamentos do funcionário que terminam depois do
+  início pedido.
+* ``conflitos_no_periodo``: "todos os conflitos da semana". Uma consulta
+  pelo índice de ``data_sepultamento`` traz os agendamentos que tocam o
+  período e uma varredura (sweep line) por funcionário encontra os pares
+  sobrepostos em O(n log n + k), sem comparar todos com todos.
+"""
+import heapq
+from itertools import groupby
+from operator import attrgetter
+
+from .models import Agendamento
+
+CAMPOS = ('funcionario_id', 'data_agendamento', 'data_sepultamento', 'pessoa_falecida__nome', 'funcionario__nome')
+
+
+def _sobrepostos(inicio, fim):
+    return Agendamento.objects.filter(data_agendamento__lt=fim, data_sepultamento__gt=inicio)
+
+
+def conflitos_do_funcionario(funcionario_id, inicio, fim, excluir_pk=None):
+    """Agendamentos do funcionário que se sobrepõem a ``[inicio, fim)``."""
+    conflitos = (
+        _sobrepostos(inicio, fim)
+        .filter(funcionario_id=funcionario_id)
+        .select_related('pessoa_falecida')
+        .only('data_agendamento', 'data_sepultamento', 'funcionario_id', 'pessoa_falecida__nome')
+        .order_by('data_agendamento', 'id')
+    )
+    if excluir_pk is not None:
+        conflitos = conflitos.exclude(pk=excluir_pk)
+    return conflitos
+
+
+def funcionario_livre(funcionario_id, inicio, fim, excluir_pk=None):
+    return not conflitos_do_funcionario(funcionario_id, inicio, fim, excluir_pk).exists()
+
+
+def pares_sobrepostos(agendamentos):
+    """
+    Pares (a, b) de agendamentos sobrepostos de uma lista do mesmo funcionário.
+
+    Varredura em ordem de início mantendo um heap dos que ainda estão em
+    andamento: ao chegar um novo, saem os que já terminaram e todos os que
+    restam conflitam com ele.
+    """
+    pares = []
+    ativos = []  # heap de (fim, sequência, agendamento)
+    for sequencia, atual in enumerate(sorted(agendamentos, key=attrgetter('data_agendamento', 'pk'))):
+        while ativos and ativos[0][0] <= atual.data_agendamento:
+            heapq.heappop(ativos)
+        pares.extend((anterior, atual) for _fim, _seq, anterior in sorted(ativos, key=lambda item: item[1]))
+        heapq.heappush(ativos, (atual.data_sepultamento, sequencia, atual))
+    return pares
+
+
+def conflitos_no_periodo(inicio, fim):
+    """
+    Todos os pares de agendamentos conflitantes que tocam ``[inicio, fim)``.
+
+    Returns:
+        list: dicts com ``funcionario`` (nome), ``funcionario_id`` e os dois agendamentos
+    """
+    agendamentos = (
+        _sobrepostos(inicio, fim)
+        .select_related('pessoa_falecida', 'funcionario')
+        .only('id', *CAMPOS)
+        .order_by('funcionario_id', 'data_agendamento', 'id')
+    )
+    conflitos = []
+    for funcionario_id, do_funcionario in groupby(agendamentos, key=attrgetter('funcionario_id')):
+        for anterior, atual in pares_sobrepostos(do_funcionario):
+            conflitos.append({
+                'funcionario_id': funcionario_id,
+                'funcionario': atual.funcionario.nome,
+                'agendamentos': (anterior, atual),
+            })
+    return conflitos
+
@@ -2,6 +2,12 @@ from django import forms
 from .models import Agendamento
 from pessoa_falecida.models import PessoaFalecida
 from funcionario.models import Funcionario
+from busca.widgets import AutocompleteSelect
+from .atribuicao import melhor_funcionario
+from .conflitos import conflitos_do_funcionario
+
+# Conflitos listados na mensagem de erro (os demais só são contados)
+CONFLITOS_EXIBIDOS = 3
 
 
 class AgendamentoForm(forms.ModelForm):
@@ -11,10 +17,10 @@ class AgendamentoForm(forms.ModelForm):
         model = Agendamento
         fields = ['pessoa_falecida', 'funcionario', 'data_agendamento', 'hora_agendamento', 'local_velorio', 'local_sepultamento', 'data_sepultamento']
         widgets = {
-            'pessoa_falecida': forms.Select(attrs={
+            'pessoa_falecida': AutocompleteSelect('falecido', attrs={
                 'class': 'form-select'
             }),
-            'funcionario': forms.Select(attrs={
+            'funcionario': AutocompleteSelect('funcionario', attrs={
                 'class': 'form-select'
             }),
             'data_agendamento': forms.DateTimeInput(attrs={
@@ -55,7 +61,12 @@ class AgendamentoForm(forms.ModelForm):
         self.fields['pessoa_falecida'].empty_label = "Selecione uma pessoa"
         
         self.fields['funcionario'].queryset = Funcionario.objects.all()
-        self.fields['funcionario'].empty_label = "Selecione um funcionário"
+        self.fields['funcionario'].empty_label = "Atribuir automaticamente"
+        # Em branco, o responsável é sugerido por agendamento.atribuicao ao salvar
+        self.fields['funcionario'].required = False
+        self.fields['funcionario'].help_text = (
+            'Deixe em branco para atribuir o funcionário livre mais indicado (cargo e carga de trabalho).'
+        )
         
     def clean_data_agendamento(self):
         """Validação personalizada para data do agendamento."""
@@ -65,3 +76,48 @@ class AgendamentoForm(forms.ModelForm):
             raise forms.ValidationError('A data do agendamento não pode ser no passado.')
         return data
 
+    def clean(self):
+        """
+        Valida o período e impede escalar o funcionário em agendamentos sobrepostos.
+
+        Sem funcionário informado, atribui o mais indicado entre os livres.
+        """
+        cleaned_data = super().clean()
+        funcionario = cleaned_data.get('funcionario')
+        inicio = cleaned_data.get('data_agendamento')
+        fim = cleaned_data.get('data_sepultamento')
+        if not (inicio and fim):
+            return cleaned_data
+        if fim < inicio:
+            self.add_error('data_sepultamento', 'O sepultamento não pode ser antes do agendamento.')
+            return cleaned_data
+        if 'funcionario' in self.errors:
+            return cleaned_data
+        if funcionario is None:
+            funcionario = melhor_funcionario(inicio, fim, excluir_pk=self.instance.pk)
+            if funcionario is None:
+                self.add_error('funcionario', 'Nenhum funcionário livre neste período. Escolha um manualmente.')
+            else:
+                cleaned_data['funcionario'] = funcionario
+        else:
+            conflitos = list(conflitos_do_funcionario(
+                funcionario.pk, inicio, fim, excluir_pk=self.instance.pk
+            )[:CONFLITOS_EXIBIDOS + 1])
+            if conflitos:
+                self.add_error('funcionario', self._mensagem_conflitos(funcionario, conflitos))
+        return cleaned_data
+
+    def _mensagem_conflitos(self, funcionario, conflitos):
+        from django.utils import timezone
+
+        descricoes = [
+            f"{conflito.pessoa_falecida.nome} "
+            f"({timezone.localtime(conflito.data_agendamento):%d/%m %H:%M} a "
+            f"{timezone.localtime(conflito.data_sepultamento):%d/%m %H:%M})"
+            for conflito in conflitos[:CONFLITOS_EXIBIDOS]
+        ]
+        if len(conflitos) > CONFLITOS_EXIBIDOS:
+            descricoes.append('e outros')
+        return forms.ValidationError(
+            f"{funcionario.nome} já está escalado(a) neste período: {'; '.join(descricoes)}."
+        )
@@ -0,0 +1,228 @@
+"""
+Lembretes das cerimônias, em uma fila ordenada pelo horário de envio.
+
+``agendar()`` troca os lembretes pendentes de um agendamento por novos: um
+por antecedência de ``AGENDAMENTO_LEMBRETES_ANTECEDENCIAS`` (minutos antes do
+início) e destinatário (funcionário responsável e família). O signal de
+``agendamento.signals`` o chama sempre que o horário é gravado. A troca é um
+DELETE pelo índice da chave estrangeira do agendamento e um ``bulk_create``:
+remarcar não varre a fila. Lembretes cujo horário já passou não são criados.
+
+O ``Enviador`` roda em um processo próprio (``python manage.py
+enviar_lembretes``). A cada ciclo lê em lote os pendentes vencidos, pelo
+índice parcial ``lembrete_pendente_idx`` (``momento``, só ``pendente``),
+entrega cada um pelo canal de ``AGENDAMENTO_LEMBRETES_CANAL`` e grava o
+resultado antes de passar ao próximo. O contato é lido na hora do envio:
+trocar o responsável ou o e-mail da família não exige reagendar. Falhas seguem a espera exponencial das notificações
+(``NOTIFICACOES_BACKOFF_*`` e ``NOTIFICACOES_MAX_TENTATIVAS``), nunca além
+do início da cerimônia; lembrete vencido de cerimônia já iniciada (enviador
+parado) é cancelado sem envio.
+
+Use um único enviador por banco: dois processos pegariam os mesmos lembretes.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import close_old_connections
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from notificacoes.caixa import notificar
+from notificacoes.despachante import MAX_TENTATIVAS_PADRAO, Despachante
+
+from .models import LembreteAgendamento
+
+logger = logging.getLogger(__name__)
+
+ANTECEDENCIAS_PADRAO = (24 * 60, 2 * 60)  # minutos
+LOTE_PADRAO = 200
+CANAL_PADRAO = 'agendamento.lembretes.canal_local'
+TIPO_NOTIFICACAO = 'lembrete_agendamento'
+DESTINATARIOS = ('funcionario', 'familia')
+CAMPOS_ESTADO = ['status', 'tentativas', 'momento', 'ultimo_erro', 'data_envio']
+
+
+class SemContato(Exception):
+    """O destinatário não tem contato cadastrado; o lembrete é cancelado sem novas tentativas."""
+
+
+def antecedencias():
+    return getattr(settings, 'AGENDAMENTO_LEMBRETES_ANTECEDENCIAS', ANTECEDENCIAS_PADRAO)
+
+
+def agendar(*agendamentos):
+    """
+    Substitui os lembretes pendentes dos agendamentos pelos do horário atual.
+
+    Lembretes já enviados ficam como estão. São duas consultas,
+    independentemente da quantidade de agendamentos.
+
+    Returns:
+        list: lembretes criados
+    """
+    LembreteAgendamento.objects.filter(
+        agendamento_id__in=[agendamento.pk for agendamento in agendamentos], status='pendente'
+    ).delete()
+    agora = timezone.now()
+    novos = [
+        LembreteAgendamento(
+            agendamento=agendamento, destinatario=destinatario, antecedencia=minutos,
+            momento=agendamento.data_agendamento - timedelta(minutes=minutos),
+        )
+        for agendamento in agendamentos
+        for minutos in antecedencias()
+        for destinatario in DESTINATARIOS
+        if agendamento.data_agendamento - timedelta(minutes=minutos) > agora
+    ]
+    return LembreteAgendamento.objects.bulk_create(novos) if novos else []
+
+
+def _prazo(minutos):
+    if minutos % 60:
+        return f'{minutos} minutos'
+    horas = minutos // 60
+    return '1 hora' if horas == 1 else f'{horas} horas'
+
+
+def mensagem(lembrete):
+    agendamento = lembrete.agendamento
+    inicio = timezone.localtime(agendamento.data_agendamento)
+    sepultamento = timezone.localtime(agendamento.data_sepultamento)
+    return (
+        f'Lembrete: a cerimônia de {agendamento.pessoa_falecida.nome} começa em '
+        f'{_prazo(lembrete.antecedencia)}. Velório em {agendamento.local_velorio} às '
+        f'{inicio:%d/%m/%Y %H:%M}; sepultamento em {agendamento.local_sepultamento} às '
+        f'{sepultamento:%d/%m/%Y %H:%M}.'
+    )
+
+
+# ---------------------------------------------------------------------------
+# Canais: recebem o lembrete e o texto; falhas são sinalizadas com exceção
+# ---------------------------------------------------------------------------
+
+def canal_local(lembrete, texto):
+    """
+    Canal padrão, sem serviço externo. O funcionário com acesso ao sistema
+    recebe na caixa de notificações (e por e-mail/webhook pelo despachante);
+    os demais destinatários recebem e-mail pelo servidor SMTP configurado.
+    """
+    agendamento = lembrete.agendamento
+    if lembrete.destinatario == 'funcionario':
+        funcionario = agendamento.funcionario
+        if funcionario.usuario_id:
+            link = reverse('agendamento:detail', args=[agendamento.pk])
+            notificar([funcionario.usuario], TIPO_NOTIFICACAO, texto, link)
+            return
+        email = funcionario.email
+    else:
+        email = agendamento.pessoa_falecida.familia.email
+    if not email:
+        raise SemContato('Destinatário sem e-mail cadastrado')
+    send_mail(
+        f'[Lembrete] Cerimônia de {agendamento.pessoa_falecida.nome}', texto, settings.DEFAULT_FROM_EMAIL, [email]
+    )
+
+
+def canal_log(lembrete, texto):
+    """Só registra o lembrete no log (desenvolvimento e homologação)."""
+    logger.info(
+        texto,
+        extra={'evento': 'lembrete.enviado', 'dados': {
+            'lembrete': lembrete.pk,
+            'agendamento': lembrete.agendamento_id,
+            'destinatario': lembrete.destinatario,
+        }}
+    )
+
+
+class Enviador:
+    """Entrega em lote os lembretes vencidos, com novas tentativas."""
+
+    def __init__(self, lote=None, canal=None):
+        self.lote = lote or getattr(settings, 'AGENDAMENTO_LEMBRETES_LOTE', LOTE_PADRAO)
+        self.canal = canal or import_string(getattr(settings, 'AGENDAMENTO_LEMBRETES_CANAL', CANAL_PADRAO))
+        self.max_tentativas = getattr(settings, 'NOTIFICACOES_MAX_TENTATIVAS', MAX_TENTATIVAS_PADRAO)
+        # Mesma espera exponencial das entregas de notificações
+        self.atraso = Despachante().atraso
+
+    def pendentes(self, agora):
+        return list(
+            LembreteAgendamento.objects.filter(status='pendente', momento__lte=agora)
+            .select_related('agendamento__pessoa_falecida__familia', 'agendamento__funcionario__usuario')
+            .order_by('momento', 'id')[:self.lote]
+        )
+
+    def executar_ciclo(self):
+        """Processa um lote. Retorna a contagem de lembretes por resultado."""
+        agora = timezone.now()
+        lembretes = self.pendentes(agora)
+        resumo = {'enviados': 0, 'reagendados': 0, 'cancelados': 0, 'falharam': 0}
+        for lembrete in lembretes:
+            self._processar(lembrete, agora, resumo)
+            # Gravado logo após o envio: se o processo cair no meio do lote,
+            # os já entregues não voltam como pendentes
+            lembrete.save(update_fields=CAMPOS_ESTADO)
+        return resumo
+
+    def _processar(self, lembrete, agora, resumo):
+        if lembrete.agendamento.data_agendamento <= agora:
+            # Enviador parado por muito tempo: avisar depois do início só confunde a família
+            lembrete.status = 'cancelado'
+            lembrete.ultimo_erro = 'A cerimônia já começou'
+            resumo['cancelados'] += 1
+            return
+        lembrete.tentativas += 1
+        try:
+            self.canal(lembrete, mensagem(lembrete))
+        except SemContato as e:
+            lembrete.status = 'cancelado'
+            lembrete.ultimo_erro = str(e)
+            resumo['cancelados'] += 1
+        except Exception as e:
+            self._registrar_falha(lembrete, e, resumo)
+        else:
+            lembrete.status = 'enviado'
+            lembrete.data_envio = timezone.now()
+            lembrete.ultimo_erro = ''
+            resumo['enviados'] += 1
+
+    def _registrar_falha(self, lembrete, erro, resumo):
+        lembrete.ultimo_erro = str(erro)[:1000]
+        proxima = timezone.now() + self.atraso(lembrete.tentativas)
+        # Sem nova tentativa depois do início da cerimônia
+        if lembrete.tentativas >= self.max_tentativas or proxima >= lembrete.agendamento.data_agendamento:
+            lembrete.status = 'falhou'
+            resumo['falharam'] += 1
+        else:
+            # Volta para a fila mais adiante
+            lembrete.momento = proxima
+            resumo['reagendados'] += 1
+        logger.warning(
+            f"Falha ao enviar o lembrete {lembrete.pk} do agendamento {lembrete.agendamento_id}: {erro}",
+            extra={'evento': 'lembrete.falha', 'dados': {
+                'lembrete': lembrete.pk,
+                'agendamento': lembrete.agendamento_id,
+                'destinatario': lembrete.destinatario,
+                'tentativas': lembrete.tentativas,
+            }}
+        )
+
+    def executar(self, intervalo, parar=None):
+        """Laço do processo enviador; termina quando ``parar`` é sinalizado."""
+        parar = parar or threading.Event()
+        while not parar.is_set():
+            close_old_connections()
+            resumo = self.executar_ciclo()
+            if sum(resumo.values()):
+                logger.info(
+                    f"Lembretes: {resumo['enviados']} enviados, {resumo['reagendados']} reagendados, "
+                    f"{resumo['cancelados']} cancelados, {resumo['falharam']} falharam",
+                    extra={'evento': 'lembrete.envio', 'dados': resumo}
+                )
+            # Lote cheio: provavelmente há mais vencidos, segue sem esperar
+            if sum(resumo.values()) < self.lote:
+                parar.wait(intervalo)
@@ -0,0 +1,52 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from agendamento.atribuicao import atribuir_pendentes
+
+
+class Command(BaseCommand):
+    help = (
+        'Atribui um responsável aos agendamentos futuros sem funcionário disponível '
+        '(responsável inativo ou escalado em agendamentos sobrepostos), escolhendo o '
+        'funcionário livre mais indicado por cargo e carga de trabalho.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=30,
+            help='Considera os agendamentos dos próximos N dias (padrão: 30).',
+        )
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help='Mostra as atribuições sem gravar.',
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        agora = timezone.now()
+        atribuidos, sem_candidato = atribuir_pendentes(
+            agora, agora + timedelta(days=options['dias']), simular=options['simular']
+        )
+
+        for agendamento, anterior, novo in atribuidos:
+            self.stdout.write(
+                f'  {agendamento.pessoa_falecida.nome} '
+                f'({timezone.localtime(agendamento.data_agendamento):%d/%m %H:%M}): {anterior.nome} -> {novo.nome}'
+            )
+        for agendamento in sem_candidato:
+            self.stderr.write(
+                f'  Sem funcionário livre: {agendamento.pessoa_falecida.nome} '
+                f'({timezone.localtime(agendamento.data_agendamento):%d/%m %H:%M})'
+            )
+        duracao = time.perf_counter() - inicio
+        acao = 'seriam atribuídos' if options['simular'] else 'atribuídos'
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(atribuidos)} agendamentos {acao} em {duracao:.1f}s '
+            f'({len(sem_candidato)} sem funcionário livre).'
+        ))
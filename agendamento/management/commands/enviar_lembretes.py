@@ -0,0 +1,80 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from agendamento.lembretes import Enviador, agendar
+from agendamento.models import Agendamento
+
+LOTE_AGENDAMENTOS = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Envia os lembretes vencidos das cerimônias ao funcionário responsável e à família, '
+        'em lotes pela ordem de horário, com novas tentativas. Rode um único processo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--uma-vez',
+            action='store_true',
+            help='Processa um lote e termina (para uso em cron).',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=30,
+            help='Segundos entre consultas quando não há lembretes vencidos (padrão: 30).',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=None,
+            help='Lembretes processados por ciclo (padrão: AGENDAMENTO_LEMBRETES_LOTE).',
+        )
+        parser.add_argument(
+            '--agendar-existentes',
+            action='store_true',
+            help='Antes de enviar, recria os lembretes pendentes de todos os agendamentos futuros.',
+        )
+
+    def handle(self, *args, **options):
+        if options['agendar_existentes']:
+            self.agendar_existentes()
+
+        enviador = Enviador(lote=options['lote'])
+        if options['uma_vez']:
+            resumo = enviador.executar_ciclo()
+            self.stdout.write(self.style.SUCCESS(
+                f"{resumo['enviados']} enviados, {resumo['reagendados']} reagendados, "
+                f"{resumo['cancelados']} cancelados, {resumo['falharam']} falharam."
+            ))
+            return
+
+        parar = threading.Event()
+        for sinal in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sinal, lambda *args: parar.set())
+        self.stdout.write(f"Enviador de lembretes iniciado (intervalo {options['intervalo']}s).")
+        enviador.executar(options['intervalo'], parar)
+        self.stdout.write('Enviador encerrado.')
+
+    def agendar_existentes(self):
+        agendamentos = (
+            Agendamento.objects.filter(data_agendamento__gt=timezone.now())
+            .only('id', 'data_agendamento')
+            .order_by('id')
+        )
+        lote, criados = [], 0
+        for agendamento in agendamentos.iterator(chunk_size=LOTE_AGENDAMENTOS):
+            lote.append(agendamento)
+            if len(lote) == LOTE_AGENDAMENTOS:
+                with transaction.atomic():
+                    criados += len(agendar(*lote))
+                lote = []
+        if lote:
+            with transaction.atomic():
+                criados += len(agendar(*lote))
+        self.stdout.write(f'{criados} lembretes agendados.')
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0001_initial'),
+        ('funcionario', '0004_funcionario_funcionario_nome_idx'),
+        ('pessoa_falecida', '0003_pessoafalecida_falecido_data_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agendamento',
+            index=models.Index(fields=['data_agendamento'], name='agendamento_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agendamento',
+            index=models.Index(fields=['data_sepultamento'], name='agendamento_sepultamento_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0002_indices_datas'),
+        ('funcionario', '0004_funcionario_funcionario_nome_idx'),
+        ('pessoa_falecida', '0003_pessoafalecida_falecido_data_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agendamento',
+            index=models.Index(fields=['funcionario', 'data_sepultamento', 'data_agendamento'], name='agendamento_func_periodo_idx'),
+        ),
+    ]
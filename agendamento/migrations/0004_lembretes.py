@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0003_indice_conflitos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LembreteAgendamento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('destinatario', models.CharField(choices=[('funcionario', 'Funcionário Responsável'), ('familia', 'Família')], max_length=20, verbose_name='Destinatário')),
+                ('antecedencia', models.PositiveIntegerField(verbose_name='Antecedência (minutos)')),
+                ('momento', models.DateTimeField(verbose_name='Enviar em')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviado', 'Enviado'), ('cancelado', 'Cancelado'), ('falhou', 'Falhou')], default='pendente', max_length=20, verbose_name='Status')),
+                ('tentativas', models.PositiveSmallIntegerField(default=0, verbose_name='Tentativas')),
+                ('ultimo_erro', models.TextField(blank=True, verbose_name='Último Erro')),
+                ('data_envio', models.DateTimeField(blank=True, null=True, verbose_name='Data de Envio')),
+                ('agendamento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lembretes', to='agendamento.agendamento', verbose_name='Agendamento')),
+            ],
+            options={
+                'verbose_name': 'Lembrete de Agendamento',
+                'verbose_name_plural': 'Lembretes de Agendamentos',
+                'ordering': ['momento', 'id'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pendente')), fields=['momento', 'id'], name='lembrete_pendente_idx')],
+            },
+        ),
+    ]
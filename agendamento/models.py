@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from funcionario.models import Funcionario
 from pessoa_falecida.models import PessoaFalecida
 
@@ -27,6 +28,85 @@ class Agendamento(models.Model):
         verbose_name = "Agendamento"
         verbose_name_plural = "Agendamentos"
         ordering = ['-data_agendamento']
+        indexes = [
+            # Filtros por intervalo (agenda, análise de carga dos funcionários)
+            models.Index(fields=['data_agendamento'], name='agendamento_data_idx'),
+            models.Index(fields=['data_sepultamento'], name='agendamento_sepultamento_idx'),
+            # Conflitos de escala: agendamentos do funcionário que terminam após um instante
+            models.Index(
+                fields=['funcionario', 'data_sepultamento', 'data_agendamento'],
+                name='agendamento_func_periodo_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.pessoa_falecida.nome} - {self.data_agendamento.strftime('%d/%m/%Y %H:%M')}"
+
+
+class LembreteAgendamento(models.Model):
+    """Lembrete de uma cerimônia, na fila por horário de envio (ver ``agendamento.lembretes``)."""
+
+    DESTINATARIO_CHOICES = [
+        ('funcionario', 'Funcionário Responsável'),
+        ('familia', 'Família'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('enviado', 'Enviado'),
+        ('cancelado', 'Cancelado'),
+        ('falhou', 'Falhou'),
+    ]
+
+    agendamento = models.ForeignKey(
+        Agendamento,
+        on_delete=models.CASCADE,
+        related_name='lembretes',
+        verbose_name="Agendamento"
+    )
+    destinatario = models.CharField(
+        max_length=20,
+        choices=DESTINATARIO_CHOICES,
+        verbose_name="Destinatário"
+    )
+    antecedencia = models.PositiveIntegerField(
+        verbose_name="Antecedência (minutos)"
+    )
+    momento = models.DateTimeField(
+        verbose_name="Enviar em"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pendente',
+        verbose_name="Status"
+    )
+    tentativas = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Tentativas"
+    )
+    ultimo_erro = models.TextField(
+        blank=True,
+        verbose_name="Último Erro"
+    )
+    data_envio = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Data de Envio"
+    )
+
+    class Meta:
+        verbose_name = "Lembrete de Agendamento"
+        verbose_name_plural = "Lembretes de Agendamentos"
+        ordering = ['momento', 'id']
+        indexes = [
+            # Fila do enviador: só os pendentes, pela ordem de vencimento
+            models.Index(
+                fields=['momento', 'id'],
+                condition=Q(status='pendente'),
+                name='lembrete_pendente_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.agendamento} - {self.get_destinatario_display()} ({self.get_status_display()})"
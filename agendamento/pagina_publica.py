@@ -0,0 +1,84 @@
+"""
+Cache da página pública do agendamento (``agendamento/public/<pk>/``).
+
+É o link que as famílias compartilham: quando circula, chegam centenas de
+acessos anônimos em poucos minutos, todos para a mesma página. A página
+inteira (HTML já renderizado) fica no cache compartilhado com a sua ETag::
+
+    pagina_publica:<pk>:<versão do agendamento>:<versão da configuração>:<hash do endereço>
+
+* Cada agendamento tem a sua versão (``invalidar``); os signals de
+  ``agendamento.signals`` a trocam quando o agendamento, o falecido ou o
+  funcionário responsável mudam. A versão da configuração da funerária
+  (cores e nome no template) também entra na chave.
+* A ETag é forte (hash do conteúdo): o navegador que já tem a página
+  recebe 304 sem renderização nem consulta ao banco.
+* Numa falta de cache os workers esperam quem já está renderizando
+  (single-flight de ``app.fragmentos.obter_ou_renderizar``). Só com um
+  cache de ``add()`` atômico (``REDIS_URL``) a renderização é única; no
+  cache em disco é um melhor esforço.
+* As versões expiram junto com as páginas (``AGENDAMENTO_PAGINA_PUBLICA_TIMEOUT``)
+  e ``invalidar`` as apaga em vez de gravar novas: endereços de agendamentos
+  inexistentes ou nunca abertos não deixam chaves permanentes no cache.
+"""
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from app import fragmentos
+from configuracoes.cache import versao_atual as versao_configuracao
+
+VERSAO_KEY = 'pagina_publica_versao:{}'
+PAGINA_KEY = 'pagina_publica:{}:{}:{}:{}'
+
+
+def _nova_versao():
+    return uuid.uuid4().hex
+
+
+def versao(pk):
+    chave = VERSAO_KEY.format(pk)
+    valor = cache.get(chave)
+    if valor is None:
+        cache.add(chave, _nova_versao(), settings.AGENDAMENTO_PAGINA_PUBLICA_TIMEOUT)
+        valor = cache.get(chave)
+    return valor
+
+
+def invalidar(*pks):
+    """Descarta a versão das páginas dos agendamentos; as cópias antigas deixam de ser lidas."""
+    if pks:
+        # O próximo acesso cria uma versão nova
+        cache.delete_many([VERSAO_KEY.format(pk) for pk in pks])
+
+
+def chave_pagina(request, pk):
+    # O endereço entra na chave porque as meta tags de compartilhamento usam o host
+    endereco = hashlib.md5(f'{request.scheme}://{request.get_host()}'.encode()).hexdigest()
+    return PAGINA_KEY.format(pk, versao(pk), versao_configuracao(), endereco)
+
+
+def obter(request, pk, renderizar):
+    """
+    Página em cache ou recém-renderizada (single-flight: ver o docstring do módulo).
+
+    Args:
+        renderizar: função sem argumentos que devolve o HTML (bytes).
+
+    Returns:
+        dict: ``conteudo``, ``etag`` (forte, entre aspas) e ``modificado`` (timestamp)
+    """
+    def montar():
+        conteudo = renderizar()
+        return {
+            'conteudo': conteudo,
+            'etag': '"{}"'.format(hashlib.md5(conteudo).hexdigest()),
+            'modificado': int(time.time()),
+        }
+
+    return fragmentos.obter_ou_renderizar(
+        chave_pagina(request, pk), montar, settings.AGENDAMENTO_PAGINA_PUBLICA_TIMEOUT
+    )
@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from funcionario.models import Funcionario
+from pessoa_falecida.models import PessoaFalecida
+
+from . import lembretes, pagina_publica
+from .models import Agendamento
+
+
+# Cache da página pública do agendamento (agendamento.pagina_publica)
+@receiver(post_save, sender=Agendamento, dispatch_uid='pagina_publica_salvar_agendamento')
+@receiver(post_delete, sender=Agendamento, dispatch_uid='pagina_publica_excluir_agendamento')
+@receiver(post_save, sender=PessoaFalecida, dispatch_uid='pagina_publica_salvar_falecido')
+@receiver(post_save, sender=Funcionario, dispatch_uid='pagina_publica_salvar_funcionario')
+def invalidar_pagina_publica(sender, instance, raw=False, **kwargs):
+    """Troca a versão da página dos agendamentos que exibem a instância, após o commit."""
+    if raw:
+        return
+    if sender is Agendamento:
+        pks = [instance.pk]
+    elif sender is PessoaFalecida:
+        pks = list(Agendamento.objects.filter(pessoa_falecida_id=instance.pk).values_list('pk', flat=True))
+    else:
+        pks = list(Agendamento.objects.filter(funcionario_id=instance.pk).values_list('pk', flat=True))
+    transaction.on_commit(lambda: pagina_publica.invalidar(*pks))
+
+
+# Lembretes das cerimônias (agendamento.lembretes)
+@receiver(post_save, sender=Agendamento, dispatch_uid='lembretes_agendamento_salvar')
+def reagendar_lembretes(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Troca os lembretes pendentes do agendamento pelos do horário gravado."""
+    if raw:
+        return
+    # O contato é lido no envio: gravar só o responsável não muda a fila
+    if update_fields is not None and 'data_agendamento' not in update_fields:
+        return
+    lembretes.agendar(instance)
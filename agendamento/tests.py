@@ -1,3 +1,540 @@
-from django.test import TestCase
+import random
+import threading
+from io import StringIO
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from familia.models import Familia
+from funcionario.models import Funcionario
+from pessoa_falecida.models import PessoaFalecida
+
+from notificacoes.models import Notificacao
+
+from . import calendario, lembretes, pagina_publica
+from .atribuicao import Escala
+from .conflitos import conflitos_do_funcionario, conflitos_no_periodo, pares_sobrepostos
+from .forms import AgendamentoForm
+from .models import Agendamento, LembreteAgendamento
+
+
+def _momento(dia, hora, minuto=0):
+    return timezone.make_aware(datetime.combine(dia, time(hora, minuto)))
+
+
+class AgendamentoTestBase(TestCase):
+    """Funcionários, falecido e um dia futuro comuns aos testes da agenda."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = CustomUser.objects.create_user('vendedor', password='senha123', cargo='vendedor')
+        cls.carlos, cls.flora = Funcionario.objects.bulk_create([
+            Funcionario(nome='Carlos', cargo='coveiro', telefone='11', email='c@x.com.br'),
+            Funcionario(nome='Flora', cargo='florista', telefone='11', email='f@x.com.br'),
+        ])
+        familia = Familia.objects.create(
+            nome_responsavel='Responsável', grau_parentesco='Filho', telefone='1133334444', endereco='Rua Teste, 1'
+        )
+        cls.falecido = PessoaFalecida.objects.create(
+            nome='Falecido', data_nascimento=date(1950, 1, 1), data_falecimento=date(2026, 10, 1),
+            causa_obito='Natural', local_obito='Hospital', documento_cpf_rg='00000000001', familia=familia
+        )
+        cls.dia = timezone.localdate() + timedelta(days=7)
+
+    def agendar(self, funcionario, inicio, fim):
+        return Agendamento.objects.create(
+            pessoa_falecida=self.falecido, funcionario=funcionario,
+            data_agendamento=inicio, hora_agendamento=timezone.localtime(inicio).time(),
+            local_velorio='Capela 1', local_sepultamento='Cemitério Central', data_sepultamento=fim,
+        )
+
+    def dados_form(self, funcionario, inicio, fim):
+        return {
+            'pessoa_falecida': self.falecido.pk, 'funcionario': funcionario.pk,
+            'data_agendamento': timezone.localtime(inicio).strftime('%Y-%m-%dT%H:%M'),
+            'hora_agendamento': timezone.localtime(inicio).strftime('%H:%M'),
+            'local_velorio': 'Capela 2', 'local_sepultamento': 'Cemitério Central',
+            'data_sepultamento': timezone.localtime(fim).strftime('%Y-%m-%dT%H:%M'),
+        }
+
+
+class ConflitosAgendamentoTest(AgendamentoTestBase):
+    """Detecção de agendamentos sobrepostos do mesmo funcionário."""
+
+    def test_varredura_intervalos_semiabertos(self):
+        a, b, c, d = (
+            SimpleNamespace(pk=pk, data_agendamento=inicio, data_sepultamento=fim)
+            for pk, inicio, fim in [(1, 0, 10), (2, 5, 15), (3, 10, 20), (4, 12, 13)]
+        )
+        pares = {(x.pk, y.pk) for x, y in pares_sobrepostos([d, c, b, a])}
+        self.assertEqual(pares, {(1, 2), (2, 3), (2, 4), (3, 4)})
+
+    def test_conflitos_do_periodo_iguais_a_forca_bruta(self):
+        rng = random.Random(7)
+        inicio_semana = _momento(self.dia, 0)
+        funcionarios = [self.carlos, self.flora]
+        Agendamento.objects.bulk_create([
+            Agendamento(
+                pessoa_falecida=self.falecido, funcionario=rng.choice(funcionarios),
+                data_agendamento=inicio, hora_agendamento=time(9),
+                local_velorio='Capela', local_sepultamento='Cemitério',
+                data_sepultamento=inicio + timedelta(hours=rng.randint(1, 30)),
+            )
+            for inicio in (inicio_semana + timedelta(hours=rng.randint(-24, 24 * 8)) for _ in range(300))
+        ])
+        fim_semana = inicio_semana + timedelta(weeks=1)
+
+        with self.assertNumQueries(1):
+            encontrados = {
+                tuple(sorted(agendamento.pk for agendamento in conflito['agendamentos']))
+                for conflito in conflitos_no_periodo(inicio_semana, fim_semana)
+            }
+
+        todos = list(Agendamento.objects.filter(
+            data_agendamento__lt=fim_semana, data_sepultamento__gt=inicio_semana
+        ))
+        esperados = {
+            (x.pk, y.pk)
+            for x in todos for y in todos
+            if x.pk < y.pk and x.funcionario_id == y.funcionario_id
+            and x.data_agendamento < y.data_sepultamento and y.data_agendamento < x.data_sepultamento
+        }
+        self.assertTrue(esperados)
+        self.assertEqual(encontrados, esperados)
+
+    def test_formulario_recusa_funcionario_ocupado(self):
+        existente = self.agendar(self.carlos, _momento(self.dia, 9), _momento(self.dia, 15))
+
+        form = AgendamentoForm(data=self.dados_form(self.carlos, _momento(self.dia, 14), _momento(self.dia, 18)))
+        self.assertFalse(form.is_valid())
+        self.assertIn('já está escalado', form.errors['funcionario'][0])
+
+        # Outro funcionário, ou encostado no fim do anterior: permitido
+        self.assertTrue(AgendamentoForm(
+            data=self.dados_form(self.flora, _momento(self.dia, 14), _momento(self.dia, 18))
+        ).is_valid())
+        self.assertTrue(AgendamentoForm(
+            data=self.dados_form(self.carlos, _momento(self.dia, 15), _momento(self.dia, 18))
+        ).is_valid())
+        # Edição do próprio agendamento não conflita com ele mesmo
+        self.assertTrue(AgendamentoForm(
+            data=self.dados_form(self.carlos, _momento(self.dia, 10), _momento(self.dia, 16)), instance=existente
+        ).is_valid())
+
+    def test_sepultamento_antes_do_agendamento(self):
+        form = AgendamentoForm(data=self.dados_form(self.carlos, _momento(self.dia, 14), _momento(self.dia, 10)))
+        self.assertFalse(form.is_valid())
+        self.assertIn('data_sepultamento', form.errors)
+
+    def test_disponibilidade_e_pagina_da_semana(self):
+        self.agendar(self.carlos, _momento(self.dia, 9), _momento(self.dia, 15))
+        self.agendar(self.carlos, _momento(self.dia, 12), _momento(self.dia, 13))
+        self.client.force_login(self.usuario)
+
+        resposta = self.client.get(reverse('agendamento:disponibilidade'), {
+            'funcionario': self.carlos.pk,
+            'inicio': _momento(self.dia, 14).isoformat(),
+            'fim': _momento(self.dia, 16).isoformat(),
+        })
+        self.assertEqual(resposta.json()['livre'], False)
+        self.assertEqual(len(resposta.json()['conflitos']), 1)
+
+        resposta = self.client.get(reverse('agendamento:conflitos'), {'semana': self.dia.isoformat()})
+        self.assertEqual(len(resposta.context['conflitos']), 1)
+        self.assertEqual(resposta.context['conflitos'][0]['funcionario'], 'Carlos')
+        self.assertFalse(conflitos_do_funcionario(self.flora.pk, _momento(self.dia, 0), _momento(self.dia, 23)))
+
+    def test_disponibilidade_com_e_sem_fuso_misturados(self):
+        self.agendar(self.carlos, _momento(self.dia, 9), _momento(self.dia, 15))
+        self.client.force_login(self.usuario)
+        inicio, fim = _momento(self.dia, 14), _momento(self.dia, 16)
+        misturados = (
+            (inicio.isoformat(), timezone.make_naive(fim).isoformat()),
+            (timezone.make_naive(inicio).isoformat(), fim.isoformat()),
+        )
+        for inicio, fim in misturados:
+            resposta = self.client.get(reverse('agendamento:disponibilidade'), {
+                'funcionario': self.carlos.pk, 'inicio': inicio, 'fim': fim,
+            })
+            self.assertEqual(resposta.status_code, 200)
+            self.assertEqual(resposta.json()['livre'], False)
+
+
+class CalendarioAgendamentoTest(AgendamentoTestBase):
+    """API JSON do calendário e feeds iCalendar com validação condicional."""
+
+    def setUp(self):
+        cache.clear()
+
+    def consultas_agenda(self, contexto):
+        return [q for q in contexto.captured_queries if 'agendamento_agendamento' in q['sql']]
+
+    def test_json_por_intervalo_e_funcionario(self):
+        dentro = self.agendar(self.carlos, _momento(self.dia, 9), _momento(self.dia, 15))
+        self.agendar(self.flora, _momento(self.dia, 10), _momento(self.dia, 11))
+        self.agendar(self.carlos, _momento(self.dia + timedelta(days=3), 9), _momento(self.dia + timedelta(days=3), 10))
+        self.client.force_login(self.usuario)
+        url = reverse('agendamento:calendario_json')
+
+        with CaptureQueriesContext(connection) as contexto:
+            resposta = self.client.get(url, {'inicio': self.dia.isoformat(), 'fim': (self.dia + timedelta(days=1)).isoformat()})
+        self.assertEqual([e['titulo'] for e in resposta.json()['eventos']], ['Falecido', 'Falecido'])
+        self.assertEqual(len(self.consultas_agenda(contexto)), 1)
+        self.assertTrue(resposta.has_header('ETag'))
+
+        resposta = self.client.get(url, {
+            'inicio': self.dia.isoformat(), 'fim': (self.dia + timedelta(days=1)).isoformat(),
+            'funcionario': self.carlos.pk,
+        })
+        self.assertEqual([e['id'] for e in resposta.json()['eventos']], [dentro.pk])
+        self.assertEqual(resposta.json()['eventos'][0]['funcionario'], 'Carlos')
+
+        resposta = self.client.get(url, {'inicio': self.dia.isoformat(), 'fim': (self.dia + timedelta(days=400)).isoformat()})
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_feed_em_streaming_e_304_sem_consultas(self):
+        agendamento = self.agendar(self.carlos, _momento(self.dia, 9), _momento(self.dia, 15))
+        agendamento.local_velorio = 'Capela São José, sala 2; térreo'
+        agendamento.save()
+        url = reverse('agendamento:calendario_feed', args=[calendario.token_feed(self.carlos.pk)])
+
+        resposta = self.client.get(url)
+        self.assertTrue(resposta.streaming)
+        corpo = b''.join(resposta.streaming_content).decode()
+        self.assertIn(f'UID:agendamento-{agendamento.pk}@testserver', corpo)
+        self.assertIn('LOCATION:Capela São José\\, sala 2\\; térreo', corpo)
+        self.assertIn('X-WR-CALNAME:Agenda - Carlos', corpo)
+        self.assertTrue(all(len(linha.encode()) <= 75 for linha in corpo.split('\r\n')))
+        etag, modificado = resposta['ETag'], resposta['Last-Modified']
+
+        with self.assertNumQueries(0):
+            resposta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 304)
+        with self.assertNumQueries(0):
+            resposta = self.client.get(url, HTTP_IF_MODIFIED_SINCE=modificado)
+        self.assertEqual(resposta.status_code, 304)
+
+        # Alteração na agenda troca a versão: o feed volta a ser gerado
+        with self.captureOnCommitCallbacks(execute=True):
+            self.agendar(self.carlos, _momento(self.dia, 16), _momento(self.dia, 18))
+        resposta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(b''.join(resposta.streaming_content).decode().count('BEGIN:VEVENT'), 2)
+
+    def test_feed_com_token_invalido(self):
+        token = calendario.token_feed(self.carlos.pk)
+        self.assertEqual(self.client.get(reverse('agendamento:calendario_feed', args=[token + 'x'])).status_code, 404)
+        self.assertEqual(calendario.ler_token(calendario.token_feed()), (True, None))
+
+    def test_pagina_mostra_semana_e_feeds(self):
+        self.agendar(self.carlos, _momento(self.dia, 9), _momento(self.dia, 15))
+        self.client.force_login(self.usuario)
+        resposta = self.client.get(reverse('agendamento:calendario'), {'semana': self.dia.isoformat()})
+        self.assertEqual(sum(len(agendamentos) for _dia, agendamentos in resposta.context['dias']), 1)
+        self.assertIn(calendario.token_feed(), resposta.context['feed_geral'])
+        self.assertNotIn('feed_pessoal', resposta.context)
+
+
+class PaginaPublicaTest(AgendamentoTestBase):
+    """Página pública do agendamento servida do cache com ETag forte."""
+
+    def setUp(self):
+        cache.clear()
+        self.agendamento = self.agendar(self.carlos, _momento(self.dia, 9), _momento(self.dia, 15))
+        self.url = reverse('agendamento:public_detail', args=[self.agendamento.pk])
+
+    def test_acerto_de_cache_e_304_sem_consultas(self):
+        primeira = self.client.get(self.url)
+        self.assertContains(primeira, 'Falecido')
+        etag = primeira['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertIn('public', primeira['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            segunda = self.client.get(self.url)
+        self.assertEqual(segunda.content, primeira.content)
+        self.assertEqual(segunda['ETag'], etag)
+
+        with self.assertNumQueries(0):
+            resposta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 304)
+        self.assertEqual(resposta['ETag'], etag)
+
+    def test_alteracoes_trocam_a_pagina(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.falecido.nome = 'Falecido Renomeado'
+            self.falecido.save()
+        resposta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(resposta, 'Falecido Renomeado')
+        etag = resposta['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.carlos.telefone = '(11) 5555-0000'
+            self.carlos.save()
+        resposta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(resposta, '(11) 5555-0000')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.agendamento.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_versoes_nao_ficam_para_sempre_no_cache(self):
+        inexistente = self.agendamento.pk + 1000
+        self.assertEqual(
+            self.client.get(reverse('agendamento:public_detail', args=[inexistente])).status_code, 404
+        )
+        chave = pagina_publica.VERSAO_KEY.format(inexistente)
+        self.assertIsNotNone(cache.get(chave))
+        depois = timezone.now().timestamp() + settings.AGENDAMENTO_PAGINA_PUBLICA_TIMEOUT + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=depois):
+            self.assertIsNone(cache.get(chave))
+
+        # Gravar um agendamento que ninguém abriu não cria versão
+        with self.captureOnCommitCallbacks(execute=True):
+            self.agendamento.local_velorio = 'Capela Norte'
+            self.agendamento.save()
+        self.assertIsNone(cache.get(pagina_publica.VERSAO_KEY.format(self.agendamento.pk)))
+
+    def test_cache_frio_renderiza_uma_vez(self):
+        requisicao = RequestFactory().get(self.url)
+        chave = pagina_publica.chave_pagina(requisicao, self.agendamento.pk)
+        cache.add(f'{chave}:lock', 1)  # outro worker já está renderizando
+        pronta = {'conteudo': b'<p>pronta</p>', 'etag': '"abc"', 'modificado': 0}
+        threading.Timer(0.2, lambda: cache.set(chave, pronta)).start()
+
+        with self.assertNumQueries(0):
+            resposta = self.client.get(self.url)
+        self.assertEqual(resposta.content, b'<p>pronta</p>')
+        self.assertEqual(resposta['ETag'], '"abc"')
+
+
+class AtribuicaoResponsavelTest(AgendamentoTestBase):
+    """Sugestão e atribuição automática do funcionário responsável."""
+
+    def setUp(self):
+        self.ana, self.bruno, self.dora, self.edu = Funcionario.objects.bulk_create([
+            Funcionario(nome='Ana', cargo='coveiro', telefone='11', email='a@x.com.br'),
+            Funcionario(nome='Bruno', cargo='coveiro', telefone='11', email='b@x.com.br'),
+            Funcionario(nome='Dora', cargo='preparador', telefone='11', email='d@x.com.br'),
+            Funcionario(nome='Edu', cargo='vendedor', telefone='11', email='e@x.com.br'),
+        ])
+        self.inicio, self.fim = _momento(self.dia, 10), _momento(self.dia, 14)
+
+    def test_ordem_por_cargo_carga_e_disponibilidade(self):
+        self.agendar(self.carlos, _momento(self.dia, 12), _momento(self.dia, 16))  # sobreposto
+        self.agendar(self.bruno, _momento(self.dia, 16), _momento(self.dia, 20))  # carga na janela
+
+        with self.assertNumQueries(2):
+            sugestoes = Escala.para_periodo(self.inicio, self.fim).sugerir(self.inicio, self.fim)
+        self.assertEqual([s.funcionario.nome for s in sugestoes], ['Ana', 'Bruno', 'Dora', 'Flora'])
+        self.assertEqual([s.carga_horas for s in sugestoes[:2]], [0, 4.0])
+
+        # Mais funcionários não mudam o número de consultas
+        Funcionario.objects.bulk_create([
+            Funcionario(nome=f'Extra {i}', cargo='florista', telefone='11', email=f'x{i}@x.com.br') for i in range(30)
+        ])
+        with self.assertNumQueries(2):
+            sugestoes = Escala.para_periodo(self.inicio, self.fim).sugerir(self.inicio, self.fim)
+        self.assertEqual(len(sugestoes), 34)
+
+    def test_formulario_atribui_quando_em_branco(self):
+        dados = self.dados_form(self.carlos, self.inicio, self.fim)
+        dados['funcionario'] = ''
+        form = AgendamentoForm(data=dados)
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.save().funcionario, self.ana)
+
+        Funcionario.objects.filter(cargo__in=['coveiro', 'preparador', 'florista']).update(ativo=False)
+        form = AgendamentoForm(data=dados)
+        self.assertFalse(form.is_valid())
+        self.assertIn('Nenhum funcionário livre', form.errors['funcionario'][0])
+
+    def test_comando_reatribui_pendentes(self):
+        Funcionario.objects.filter(pk=self.dora.pk).update(ativo=False)
+        inativo = self.agendar(self.dora, self.inicio, self.fim)
+        primeiro = self.agendar(self.carlos, _momento(self.dia, 9), _momento(self.dia, 12))
+        sobreposto = self.agendar(self.carlos, _momento(self.dia, 11), _momento(self.dia, 13))
+
+        saida = StringIO()
+        call_command('atribuir_responsaveis', '--simular', stdout=saida)
+        self.assertIn('2 agendamentos seriam atribuídos', saida.getvalue())
+        self.assertEqual(Agendamento.objects.get(pk=inativo.pk).funcionario, self.dora)
+
+        call_command('atribuir_responsaveis', stdout=StringIO())
+        inativo.refresh_from_db()
+        sobreposto.refresh_from_db()
+        primeiro.refresh_from_db()
+        self.assertEqual(primeiro.funcionario, self.carlos)
+        # Em ordem de início: Ana fica com o primeiro pendente e Bruno com o seguinte
+        self.assertEqual(inativo.funcionario, self.ana)
+        self.assertEqual(sobreposto.funcionario, self.bruno)
+        self.assertFalse(conflitos_no_periodo(_momento(self.dia, 0), _momento(self.dia, 23)))
+
+    def test_sugestoes_json(self):
+        self.client.force_login(self.usuario)
+        resposta = self.client.get(reverse('agendamento:sugestoes'), {
+            'inicio': timezone.localtime(self.inicio).strftime('%Y-%m-%dT%H:%M'),
+            'fim': timezone.localtime(self.fim).strftime('%Y-%m-%dT%H:%M'),
+        })
+        nomes = [s['nome'] for s in resposta.json()['sugestoes']]
+        self.assertEqual(nomes, ['Ana', 'Bruno', 'Carlos', 'Dora', 'Flora'])
+        self.assertNotIn('Edu', nomes)
+
+
+class LembretesAgendamentoTest(AgendamentoTestBase):
+    """Fila de lembretes das cerimônias e o enviador."""
+
+    def setUp(self):
+        self.inicio, self.fim = _momento(self.dia, 10), _momento(self.dia, 14)
+
+    def pendentes(self, agendamento):
+        return sorted(
+            agendamento.lembretes.filter(status='pendente').values_list('destinatario', 'antecedencia', 'momento')
+        )
+
+    def test_criar_e_remarcar_substitui_pendentes(self):
+        agendamento = self.agendar(self.carlos, self.inicio, self.fim)
+        self.assertEqual(self.pendentes(agendamento), [
+            ('familia', 120, self.inicio - timedelta(hours=2)),
+            ('familia', 1440, self.inicio - timedelta(hours=24)),
+            ('funcionario', 120, self.inicio - timedelta(hours=2)),
+            ('funcionario', 1440, self.inicio - timedelta(hours=24)),
+        ])
+
+        # Remarcar: um DELETE pelo agendamento e um INSERT, sem ler a fila
+        novo_inicio = _momento(self.dia + timedelta(days=1), 9)
+        agendamento.data_agendamento = novo_inicio
+        with CaptureQueriesContext(connection) as consultas:
+            lembretes.agendar(agendamento)
+        self.assertEqual(len(consultas), 2)
+        self.assertEqual({momento for _d, _a, momento in self.pendentes(agendamento)}, {
+            novo_inicio - timedelta(hours=2), novo_inicio - timedelta(hours=24),
+        })
+        self.assertEqual(LembreteAgendamento.objects.count(), 4)
+
+        # Trocar só o responsável não mexe na fila
+        ids = set(agendamento.lembretes.values_list('pk', flat=True))
+        agendamento.funcionario = self.flora
+        agendamento.save(update_fields=['funcionario'])
+        self.assertEqual(set(agendamento.lembretes.values_list('pk', flat=True)), ids)
+
+    def test_horarios_passados_nao_sao_agendados(self):
+        inicio = timezone.now() + timedelta(hours=3)
+        agendamento = self.agendar(self.carlos, inicio, inicio + timedelta(hours=2))
+        self.assertEqual([a for _d, a, _m in self.pendentes(agendamento)], [120, 120])
+
+    def test_enviador_entrega_vencidos(self):
+        usuario = CustomUser.objects.create_user('carlos', password='senha123', cargo='coveiro')
+        Funcionario.objects.filter(pk=self.carlos.pk).update(usuario=usuario)
+        self.falecido.familia.email = 'familia@x.com.br'
+        self.falecido.familia.save()
+        agendamento = self.agendar(self.carlos, self.inicio, self.fim)
+        futuro = self.agendar(self.flora, self.inicio + timedelta(days=5), self.fim + timedelta(days=5))
+        LembreteAgendamento.objects.filter(agendamento=agendamento, antecedencia=1440).update(
+            momento=timezone.now() - timedelta(minutes=1)
+        )
+
+        resumo = lembretes.Enviador().executar_ciclo()
+        self.assertEqual(resumo, {'enviados': 2, 'reagendados': 0, 'cancelados': 0, 'falharam': 0})
+        # Funcionário com usuário: caixa de notificações; família: e-mail
+        notificacao = Notificacao.objects.get(usuario=usuario)
+        self.assertEqual(notificacao.tipo, 'lembrete_agendamento')
+        self.assertIn('começa em 24 horas', notificacao.mensagem)
+        self.assertEqual([m.to for m in mail.outbox], [['familia@x.com.br']])
+        self.assertEqual(
+            set(LembreteAgendamento.objects.filter(status='enviado').values_list('agendamento', 'antecedencia')),
+            {(agendamento.pk, 1440)},
+        )
+        self.assertEqual(futuro.lembretes.filter(status='pendente').count(), 4)
+        self.assertEqual(lembretes.Enviador().executar_ciclo()['enviados'], 0)
+
+    def test_falha_reagenda_e_sem_contato_cancela(self):
+        agendamento = self.agendar(self.carlos, self.inicio, self.fim)
+        LembreteAgendamento.objects.filter(antecedencia=1440).update(momento=timezone.now())
+
+        def canal(lembrete, texto):
+            if lembrete.destinatario == 'funcionario':
+                raise OSError('SMTP fora do ar')
+            lembretes.canal_local(lembrete, texto)  # família sem e-mail
+
+        with self.assertLogs('agendamento.lembretes', 'WARNING'):
+            resumo = lembretes.Enviador(canal=canal).executar_ciclo()
+        self.assertEqual(resumo, {'enviados': 0, 'reagendados': 1, 'cancelados': 1, 'falharam': 0})
+        funcionario = agendamento.lembretes.get(antecedencia=1440, destinatario='funcionario')
+        self.assertEqual((funcionario.status, funcionario.tentativas), ('pendente', 1))
+        self.assertGreater(funcionario.momento, timezone.now())
+        self.assertEqual(agendamento.lembretes.get(antecedencia=1440, destinatario='familia').status, 'cancelado')
+
+    def test_queda_no_meio_do_lote_nao_reenvia_os_entregues(self):
+        class Queda(BaseException):
+            pass
+
+        agendamento = self.agendar(self.carlos, self.inicio, self.fim)
+        LembreteAgendamento.objects.filter(agendamento=agendamento, antecedencia=1440).update(
+            momento=timezone.now() - timedelta(minutes=1)
+        )
+        entregues = []
+
+        def canal(lembrete, texto):
+            if entregues:
+                raise Queda()
+            entregues.append(lembrete.pk)
+
+        with self.assertRaises(Queda):
+            lembretes.Enviador(canal=canal).executar_ciclo()
+        self.assertEqual(
+            list(LembreteAgendamento.objects.filter(status='enviado').values_list('pk', flat=True)), entregues
+        )
+
+    def test_cerimonia_iniciada_cancela_lembretes_atrasados(self):
+        # Enviador parado: a cerimônia começou antes de os lembretes saírem
+        agendamento = self.agendar(self.carlos, self.inicio, self.fim)
+        Agendamento.objects.filter(pk=agendamento.pk).update(data_agendamento=timezone.now() - timedelta(minutes=5))
+        agendamento.lembretes.update(momento=timezone.now() - timedelta(hours=1))
+
+        canal = mock.Mock()
+        resumo = lembretes.Enviador(canal=canal).executar_ciclo()
+        self.assertEqual(resumo, {'enviados': 0, 'reagendados': 0, 'cancelados': 4, 'falharam': 0})
+        canal.assert_not_called()
+        self.assertEqual(set(agendamento.lembretes.values_list('status', flat=True)), {'cancelado'})
+
+    def test_nova_tentativa_nunca_depois_do_inicio(self):
+        agendamento = self.agendar(self.carlos, self.inicio, self.fim)
+        # Lembrete de 2 h atrasado: a cerimônia começa em 30 s
+        inicio = timezone.now() + timedelta(seconds=30)
+        Agendamento.objects.filter(pk=agendamento.pk).update(data_agendamento=inicio)
+        agendamento.lembretes.exclude(antecedencia=120).delete()
+
+        canal = mock.Mock(side_effect=OSError('SMTP fora do ar'))
+        # Espera de 10 s cabe antes do início; a de 60 s não
+        for base, esperado in ((10, 'pendente'), (60, 'falhou')):
+            with self.settings(NOTIFICACOES_BACKOFF_BASE=base), self.assertLogs('agendamento.lembretes', 'WARNING'):
+                agendamento.lembretes.filter(status='pendente').update(momento=timezone.now(), tentativas=0)
+                lembretes.Enviador(canal=canal).executar_ciclo()
+            for lembrete in agendamento.lembretes.all():
+                self.assertEqual(lembrete.status, esperado)
+                self.assertLess(lembrete.momento, inicio)
+
+    def test_comando_agenda_existentes_e_envia(self):
+        agendamento = self.agendar(self.carlos, self.inicio, self.fim)
+        LembreteAgendamento.objects.all().delete()
+
+        saida = StringIO()
+        call_command('enviar_lembretes', '--uma-vez', '--agendar-existentes', stdout=saida)
+        self.assertIn('4 lembretes agendados', saida.getvalue())
+        self.assertIn('0 enviados', saida.getvalue())
+        self.assertEqual(agendamento.lembretes.count(), 4)
 
-# Create your tests here.
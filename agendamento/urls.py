@@ -7,6 +7,12 @@ urlpatterns = [
     path('', views.AgendamentoListView.as_view(), name='list'),
     path('<int:pk>/', views.AgendamentoDetailView.as_view(), name='detail'),
     path('novo/', views.AgendamentoCreateView.as_view(), name='create'),
+    path('conflitos/', views.ConflitosSemanaView.as_view(), name='conflitos'),
+    path('disponibilidade/', views.disponibilidade_json, name='disponibilidade'),
+    path('sugestoes/', views.sugestoes_json, name='sugestoes'),
+    path('calendario/', views.CalendarioView.as_view(), name='calendario'),
+    path('calendario/eventos/', views.calendario_json, name='calendario_json'),
+    path('calendario/feed/<str:token>.ics', views.calendario_feed, name='calendario_feed'),
     path('<int:pk>/editar/', views.AgendamentoUpdateView.as_view(), name='update'),
     path('<int:pk>/excluir/', views.AgendamentoDeleteView.as_view(), name='delete'),
     path("public/<int:pk>/", views.AgendamentoPublicDetailView.as_view(), name="public_detail"),
@@ -1,15 +1,49 @@
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
-from django.urls import reverse_lazy
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+from django.views.generic import DetailView, CreateView, UpdateView, DeleteView, TemplateView
+from django.urls import reverse, reverse_lazy
+from app.mixins import LoginRequiredMixin, ListaCursorView
+from funcionario.models import Funcionario
 from .models import Agendamento
 from .forms import AgendamentoForm
+from . import atribuicao, calendario, pagina_publica
+from . import conflitos as detector
+
+# Funcionários listados pela sugestão do formulário
+SUGESTOES_EXIBIDAS = 5
+
 
+def _semana(request):
+    """Segunda-feira da semana pedida em ``?semana=`` (qualquer data dela) e o contexto de navegação."""
+    try:
+        dia = datetime.strptime(request.GET.get('semana', ''), '%Y-%m-%d').date()
+    except ValueError:
+        dia = timezone.localdate()
+    segunda = dia - timedelta(days=dia.weekday())
+    return segunda, {
+        'segunda': segunda,
+        'domingo': segunda + timedelta(days=6),
+        'semana_anterior': segunda - timedelta(weeks=1),
+        'proxima_semana': segunda + timedelta(weeks=1),
+    }
 
-class AgendamentoListView(ListView):
+
+class AgendamentoListView(ListaCursorView):
     """View para listar agendamentos."""
     model = Agendamento
     template_name = 'agendamento/agendamento_list.html'
     context_object_name = 'agendamentos'
     paginate_by = 10
+    select_related = ('pessoa_falecida', 'funcionario')
+    campos = ('data_agendamento', 'local_velorio', 'pessoa_falecida__nome', 'funcionario__nome')
 
 
 class AgendamentoDetailView(DetailView):
@@ -44,11 +78,211 @@ class AgendamentoDeleteView(DeleteView):
 
 
 class AgendamentoPublicDetailView(DetailView):
-    """View pública para exibir detalhes de um agendamento com informações do falecido e botões de compartilhamento."""
+    """
+    View pública para exibir detalhes de um agendamento com informações do falecido e botões de compartilhamento.
+
+    A página sai do cache (``agendamento.pagina_publica``) com ETag forte;
+    quem já a tem recebe 304.
+    """
     model = Agendamento
     template_name = 'agendamento/agendamento_detail.html'
     context_object_name = 'agendamento'
     slug_field = 'id'
     slug_url_kwarg = 'pk'
 
+    def get_queryset(self):
+        return Agendamento.objects.select_related('pessoa_falecida', 'funcionario')
+
+    def get(self, request, *args, **kwargs):
+        pagina = pagina_publica.obter(request, kwargs['pk'], lambda: self._renderizar(request, *args, **kwargs))
+        resposta = HttpResponse(pagina['conteudo'])
+        resposta['ETag'] = pagina['etag']
+        resposta['Last-Modified'] = http_date(pagina['modificado'])
+        patch_cache_control(resposta, public=True, max_age=settings.AGENDAMENTO_PAGINA_PUBLICA_MAX_AGE)
+        return get_conditional_response(
+            request, etag=pagina['etag'], last_modified=pagina['modificado'], response=resposta
+        )
+
+    def _renderizar(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs).render().content
+
+
+class ConflitosSemanaView(LoginRequiredMixin, TemplateView):
+    """Conflitos de escala da semana (parâmetro GET ``semana``: qualquer data dela)."""
+    template_name = 'agendamento/conflitos.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        segunda, navegacao = _semana(self.request)
+        inicio = timezone.make_aware(datetime.combine(segunda, time.min))
+        context.update(navegacao)
+        context['conflitos'] = detector.conflitos_no_periodo(inicio, inicio + timedelta(weeks=1))
+        return context
+
+
+class CalendarioView(LoginRequiredMixin, TemplateView):
+    """Agenda da semana por dia, com os endereços dos feeds .ics para assinatura."""
+    template_name = 'agendamento/calendario.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        segunda, navegacao = _semana(self.request)
+        inicio = timezone.make_aware(datetime.combine(segunda, time.min))
+        dias = {segunda + timedelta(days=n): [] for n in range(7)}
+        for agendamento in calendario.agendamentos_no_intervalo(inicio, inicio + timedelta(weeks=1)):
+            # Cerimônias que começaram antes da segunda aparecem no primeiro dia
+            dia = max(timezone.localtime(agendamento.data_agendamento).date(), segunda)
+            dias[dia].append(agendamento)
+        context.update(navegacao)
+        context['dias'] = dias.items()
+
+        usuario = self.request.user
+        funcionario = Funcionario.objects.filter(usuario=usuario).only('id').first()
+        if funcionario:
+            context['feed_pessoal'] = self.request.build_absolute_uri(
+                reverse('agendamento:calendario_feed', args=[calendario.token_feed(funcionario.pk)])
+            )
+        if not usuario.is_funcionario_operacional:
+            context['feed_geral'] = self.request.build_absolute_uri(
+                reverse('agendamento:calendario_feed', args=[calendario.token_feed()])
+            )
+        return context
+
+
+def _validadores_calendario(request):
+    """ETag/Last-Modified da URL pedida, calculados uma vez por requisição e só com o cache."""
+    if not hasattr(request, '_validadores_calendario'):
+        request._validadores_calendario = calendario.validadores(request.path, request.GET.urlencode())
+    return request._validadores_calendario
+
+
+def _etag_calendario(request, *args, **kwargs):
+    return _validadores_calendario(request)[0]
+
+
+def _modificado_calendario(request, *args, **kwargs):
+    return _validadores_calendario(request)[1]
+
+
+def _momento(valor):
+    """Aceita data (AAAA-MM-DD, meia-noite local) ou data e hora ISO 8601."""
+    momento = parse_datetime(valor)
+    if momento is None:
+        dia = parse_date(valor)
+        if dia is None:
+            return None
+        momento = datetime.combine(dia, time.min)
+    return timezone.make_aware(momento) if timezone.is_naive(momento) else momento
+
+
+@login_required
+@condition(etag_func=_etag_calendario, last_modified_func=_modificado_calendario)
+def calendario_json(request):
+    """
+    Cerimônias de um intervalo para o calendário.
+
+    Parâmetros GET: ``inicio`` e ``fim`` (data ou data e hora ISO 8601, no
+    máximo ``CALENDARIO_MAX_DIAS`` entre eles) e, opcional, ``funcionario`` (id).
+    """
+    try:
+        inicio = _momento(request.GET['inicio'])
+        fim = _momento(request.GET['fim'])
+        funcionario_id = int(request.GET['funcionario']) if request.GET.get('funcionario') else None
+    except (KeyError, ValueError):
+        inicio = fim = None
+    if inicio is None or fim is None or fim <= inicio:
+        return JsonResponse({'erro': 'Informe inicio e fim válidos.'}, status=400)
+    if fim - inicio > timedelta(days=settings.CALENDARIO_MAX_DIAS):
+        return JsonResponse(
+            {'erro': f'O intervalo máximo é de {settings.CALENDARIO_MAX_DIAS} dias.'}, status=400
+        )
+    agendamentos = calendario.agendamentos_no_intervalo(inicio, fim, funcionario_id)
+    return JsonResponse({'eventos': [calendario.evento_json(agendamento) for agendamento in agendamentos]})
+
+
+@condition(etag_func=_etag_calendario, last_modified_func=_modificado_calendario)
+def calendario_feed(request, token):
+    """Feed iCalendar (geral ou de um funcionário) gerado em streaming."""
+    valido, funcionario_id = calendario.ler_token(token)
+    if not valido:
+        raise Http404('Feed não encontrado.')
+    if funcionario_id is None:
+        nome = 'Agenda de Cerimônias'
+    else:
+        nome = Funcionario.objects.filter(pk=funcionario_id).values_list('nome', flat=True).first()
+        if nome is None:
+            raise Http404('Feed não encontrado.')
+        nome = f'Agenda - {nome}'
+
+    inicio, fim = calendario.janela_feed()
+    agendamentos = calendario.agendamentos_no_intervalo(inicio, fim, funcionario_id)
+    resposta = StreamingHttpResponse(
+        calendario.linhas_ics(agendamentos, nome, request.get_host()),
+        content_type='text/calendar; charset=utf-8',
+    )
+    resposta['Content-Disposition'] = 'inline; filename="agenda.ics"'
+    # Sempre revalidar: a resposta 304 sai só do cache, sem consultar o banco
+    resposta['Cache-Control'] = 'private, no-cache'
+    return resposta
+
+
+@login_required
+def disponibilidade_json(request):
+    """
+    O funcionário está livre no intervalo?
+
+    Parâmetros GET: ``funcionario`` (id), ``inicio`` e ``fim`` (ISO 8601) e,
+    na edição, ``excluir`` (id do próprio agendamento).
+    """
+    try:
+        funcionario_id = int(request.GET['funcionario'])
+        excluir = int(request.GET['excluir']) if request.GET.get('excluir') else None
+        # Cada valor vira aware por si: um com fuso e outro sem não podem ser comparados
+        inicio = _momento(request.GET['inicio'])
+        fim = _momento(request.GET['fim'])
+    except (KeyError, ValueError):
+        inicio = fim = None
+    if inicio is None or fim is None or fim < inicio:
+        return JsonResponse({'erro': 'Informe funcionario, inicio e fim válidos.'}, status=400)
+
+    conflitos = detector.conflitos_do_funcionario(funcionario_id, inicio, fim, excluir_pk=excluir)
+    resultados = [
+        {
+            'id': conflito.pk,
+            'falecido': conflito.pessoa_falecida.nome,
+            'inicio': conflito.data_agendamento.isoformat(),
+            'fim': conflito.data_sepultamento.isoformat(),
+        }
+        for conflito in conflitos[:20]
+    ]
+    return JsonResponse({'livre': not resultados, 'conflitos': resultados})
+
+
+@login_required
+def sugestoes_json(request):
+    """
+    Funcionários livres sugeridos para o período, em ordem de preferência.
+
+    Parâmetros GET: ``inicio`` e ``fim`` (ISO 8601) e, na edição, ``excluir``
+    (id do próprio agendamento).
+    """
+    try:
+        inicio = _momento(request.GET['inicio'])
+        fim = _momento(request.GET['fim'])
+        excluir = int(request.GET['excluir']) if request.GET.get('excluir') else None
+    except (KeyError, ValueError):
+        inicio = fim = None
+    if inicio is None or fim is None or fim < inicio:
+        return JsonResponse({'erro': 'Informe inicio e fim válidos.'}, status=400)
 
+    escala = atribuicao.Escala.para_periodo(inicio, fim)
+    sugestoes = escala.sugerir(inicio, fim, excluir_pk=excluir, limite=SUGESTOES_EXIBIDAS)
+    return JsonResponse({'sugestoes': [
+        {
+            'id': sugestao.funcionario.pk,
+            'nome': sugestao.funcionario.nome,
+            'cargo': sugestao.funcionario.get_cargo_display(),
+            'carga_horas': sugestao.carga_horas,
+        }
+        for sugestao in sugestoes
+    ]})
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+# No ASGI os dashboards usam as versões assíncronas (consultas em paralelo)
+os.environ.setdefault('DASHBOARDS_ASSINCRONOS', '1')
 
 application = get_asgi_application()
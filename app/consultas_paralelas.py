@@ -0,0 +1,74 @@
+"""
+Execução concorrente de consultas independentes para views assíncronas.
+
+O ORM assíncrono do Django (``acount``, ``aaggregate``...) roda todas as
+consultas de uma requisição na mesma thread, uma depois da outra. Aqui cada
+consulta vai para um pool de threads próprio, com conexão de banco própria,
+e a view aguarda todas juntas::
+
+    resultados = await executar_em_paralelo({
+        'total_familias': Familia.objects.count,
+        'proximos': lambda: list(Agendamento.objects.filter(...)[:5]),
+    })
+
+As funções devem devolver valores já materializados (``list(queryset)``),
+pois querysets preguiçosos não podem ser avaliados no loop de eventos.
+"""
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.shortcuts import render
+
+MAX_WORKERS_PADRAO = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _executor_consultas():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'CONSULTAS_PARALELAS_MAX_WORKERS', MAX_WORKERS_PADRAO),
+                    thread_name_prefix='consultas',
+                )
+    return _executor
+
+
+def _executar(consulta):
+    try:
+        return consulta()
+    finally:
+        # As threads do pool vivem além da requisição: respeita CONN_MAX_AGE
+        # e descarta conexões com erro, como o Django faz ao fim de cada request.
+        close_old_connections()
+
+
+async def executar_em_paralelo(consultas):
+    """
+    Executa as consultas (nome -> função sem argumentos) em paralelo.
+
+    Returns:
+        dict: {nome: resultado}, na mesma ordem de ``consultas``.
+    """
+    loop = asyncio.get_running_loop()
+    executor = _executor_consultas()
+    nomes = list(consultas)
+    # Cada tarefa recebe uma cópia do contexto (coletor de métricas etc.)
+    resultados = await asyncio.gather(*(
+        loop.run_in_executor(executor, contextvars.copy_context().run, _executar, consultas[nome])
+        for nome in nomes
+    ))
+    return dict(zip(nomes, resultados))
+
+
+async def renderizar(request, template_name, context):
+    """``render()`` para views assíncronas (context processors podem consultar o banco)."""
+    return await sync_to_async(render)(request, template_name, context)
@@ -1,25 +1,64 @@
+import threading
+from collections import Counter
+
+from django.utils.functional import SimpleLazyObject
+
 from configuracoes.models import ConfiguracaoFuneraria
+from notificacoes.caixa import nao_lidas
 
 
-def configuracao_funeraria(request):
-    """Context processor para disponibilizar configurações da funerária em todos os templates."""
+# Contador de avaliações dos valores preguiçosos (por nome do context processor)
+_avaliacoes = Counter()
+_avaliacoes_lock = threading.Lock()
+
+
+def _registrar_avaliacao(nome):
+    """Incrementa o contador de avaliações de um valor do contexto."""
+    with _avaliacoes_lock:
+        _avaliacoes[nome] += 1
+
+
+def estatisticas_context_processors():
+    """Retorna quantas vezes cada valor preguiçoso foi de fato calculado."""
+    with _avaliacoes_lock:
+        return dict(_avaliacoes)
+
+
+def _valor_preguicoso(request, nome, calcular):
+    """
+    Retorna um objeto preguiçoso memorizado na requisição.
+
+    O valor só é calculado quando um template o lê, e no máximo uma vez
+    por requisição, mesmo que vários templates sejam renderizados.
+    """
+    cache = request.__dict__.setdefault('_contexto_preguicoso', {})
+    if nome not in cache:
+        def avaliar():
+            _registrar_avaliacao(nome)
+            return calcular(request)
+        cache[nome] = SimpleLazyObject(avaliar)
+    return cache[nome]
+
+
+def _configuracao_da_requisicao(request):
+    """Retorna a configuração ativa, compartilhando o mesmo objeto na requisição."""
+    if not hasattr(request, '_configuracao_funeraria'):
+        request._configuracao_funeraria = ConfiguracaoFuneraria.get_configuracao_ativa()
+    return request._configuracao_funeraria
+
+
+def _calcular_configuracao(request):
     try:
-        configuracao = ConfiguracaoFuneraria.get_configuracao_ativa()
-        return {
-            'configuracao_funeraria': configuracao
-        }
+        return _configuracao_da_requisicao(request)
     except Exception:
-        return {
-            'configuracao_funeraria': None
-        }
+        return None
 
 
-def meta_tags_globais(request):
-    """Context processor para meta tags globais do sistema."""
-    configuracao = ConfiguracaoFuneraria.get_configuracao_ativa()
-    
+def _calcular_meta_tags(request):
+    configuracao = _configuracao_da_requisicao(request)
+
     # Meta tags padrão do sistema
-    meta_tags = {
+    return {
         'site_name': configuracao.nome_funeraria if configuracao else 'Sistema Funerária',
         'site_description': f'Sistema de gestão funerária - {configuracao.slogan}' if configuracao and configuracao.slogan else 'Sistema completo de gestão funerária',
         'site_url': request.build_absolute_uri('/'),
@@ -30,8 +69,30 @@ def meta_tags_globais(request):
         'facebook_url': configuracao.facebook_url if configuracao else None,
         'instagram_url': configuracao.instagram_url if configuracao else None,
     }
-    
+
+
+def configuracao_funeraria(request):
+    """Context processor para disponibilizar configurações da funerária em todos os templates."""
     return {
-        'meta_tags': meta_tags
+        'configuracao_funeraria': _valor_preguicoso(request, 'configuracao_funeraria', _calcular_configuracao)
     }
 
+
+def meta_tags_globais(request):
+    """Context processor para meta tags globais do sistema."""
+    return {
+        'meta_tags': _valor_preguicoso(request, 'meta_tags', _calcular_meta_tags)
+    }
+
+
+def _calcular_notificacoes_nao_lidas(request):
+    if not request.user.is_authenticated:
+        return 0
+    return nao_lidas(request.user)
+
+
+def notificacoes_nao_lidas(request):
+    """Context processor com o total de notificações não lidas (badge da navbar, via cache)."""
+    return {
+        'notificacoes_nao_lidas': _valor_preguicoso(request, 'notificacoes_nao_lidas', _calcular_notificacoes_nao_lidas)
+    }
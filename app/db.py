@@ -0,0 +1,45 @@
+"""
+Utilitários para rodar o SQLite em produção com vários workers.
+
+Os PRAGMAs (WAL etc.), o busy timeout e as conexões persistentes ficam em
+``settings.DATABASES``. Aqui fica o serializador opcional de escritas: dentro
+de um mesmo processo, as requisições que escrevem no banco entram em fila em
+vez de disputarem o lock do arquivo e falharem com "database is locked".
+"""
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+_escrita_lock = threading.Lock()
+
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+@contextmanager
+def escrita_serializada():
+    """Executa o bloco com exclusividade de escrita neste processo."""
+    with _escrita_lock:
+        yield
+
+
+class SerializarEscritaMiddleware:
+    """
+    Serializa, por processo, as requisições que podem escrever no banco.
+
+    Ativado por ``SQLITE_SERIALIZAR_ESCRITA = True``. Entre processos, a
+    concorrência continua sendo resolvida pelo busy timeout do SQLite
+    (``timeout`` em ``DATABASES``).
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQLITE_SERIALIZAR_ESCRITA', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in METODOS_SEGUROS:
+            return self.get_response(request)
+        with escrita_serializada():
+            return self.get_response(request)
@@ -0,0 +1,146 @@
+"""
+Pipeline de arquivos estáticos para uso offline (intranet).
+
+- ``VENDOR``: bibliotecas de terceiros baixadas para ``static/vendor/`` pelo
+  comando ``vendorizar_estaticos``. Enquanto não forem baixadas, a tag
+  ``{% vendor_url %}`` continua apontando para o CDN.
+- ``EstaticosComprimidosStorage``: após o ``collectstatic`` (nomes com hash
+  de conteúdo), grava as variantes ``.gz`` e ``.br`` ao lado dos originais.
+- ``servir_estatico``: serve o ``STATIC_ROOT`` quando ``DEBUG = False``,
+  escolhendo a variante pré-comprimida e enviando cache de longa duração
+  para os arquivos com hash no nome.
+"""
+import gzip
+import mimetypes
+import os
+import posixpath
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, StaticFilesStorage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.templatetags.static import static
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele, apenas .gz é gerado
+    brotli = None
+
+
+VENDOR = {
+    'bootstrap/css/bootstrap.min.css': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'bootstrap/js/bootstrap.bundle.min.js': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    'bootstrap-icons/bootstrap-icons.css': 'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.0/font/bootstrap-icons.css',
+    'bootstrap-icons/fonts/bootstrap-icons.woff2': 'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.0/font/fonts/bootstrap-icons.woff2',
+    'bootstrap-icons/fonts/bootstrap-icons.woff': 'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.0/font/fonts/bootstrap-icons.woff',
+    'qrcode/qrcode.min.js': 'https://cdn.jsdelivr.net/npm/qrcode@1.5.3/build/qrcode.min.js',
+}
+
+EXTENSOES_COMPRIMIVEIS = ('.css', '.js', '.svg', '.json', '.txt', '.map', '.html', '.xml')
+TAMANHO_MINIMO_COMPRESSAO = 512
+
+# Arquivos gerados pelo ManifestStaticFilesStorage: nome.<12 hex>.ext
+PADRAO_HASH = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+CACHE_LONGO = 'public, max-age=31536000, immutable'
+CACHE_CURTO = 'public, max-age=300'
+
+
+@lru_cache(maxsize=None)
+def vendor_disponivel(caminho):
+    """Verifica (uma vez por processo) se o arquivo já foi vendorizado."""
+    return finders.find(f'vendor/{caminho}') is not None
+
+
+def vendor_url(caminho):
+    """URL local do arquivo vendorizado ou, na falta dele, a URL do CDN."""
+    if vendor_disponivel(caminho):
+        return static(f'vendor/{caminho}')
+    return VENDOR[caminho]
+
+
+class EstaticosComprimidosStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage que também grava variantes gzip/brotli."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        processados = set()
+        for original, processado, houve_processamento in super().post_process(paths, dry_run, **options):
+            if processado and not isinstance(houve_processamento, Exception):
+                processados.update((original, processado))
+            yield original, processado, houve_processamento
+
+        if dry_run:
+            return
+        for nome in sorted(processados):
+            for comprimido in self.comprimir(nome):
+                yield nome, comprimido, True
+
+    def comprimir(self, nome):
+        """Grava ``nome.gz`` e ``nome.br`` quando compensa comprimir."""
+        if not nome.endswith(EXTENSOES_COMPRIMIVEIS):
+            return []
+        caminho = self.path(nome)
+        with open(caminho, 'rb') as arquivo:
+            conteudo = arquivo.read()
+        if len(conteudo) < TAMANHO_MINIMO_COMPRESSAO:
+            return []
+
+        gerados = []
+        variantes = [('.gz', lambda dados: gzip.compress(dados, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variantes.append(('.br', lambda dados: brotli.compress(dados, quality=11)))
+        for extensao, compressor in variantes:
+            comprimido = compressor(conteudo)
+            if len(comprimido) < len(conteudo):
+                with open(caminho + extensao, 'wb') as arquivo:
+                    arquivo.write(comprimido)
+                gerados.append(nome + extensao)
+        return gerados
+
+    def url(self, name, force=False):
+        try:
+            return super().url(name, force)
+        except ValueError:
+            # Sem collectstatic (ex.: testes), usa o nome sem hash
+            return StaticFilesStorage.url(self, name)
+
+
+def _variante_comprimida(caminho, accept_encoding):
+    """Escolhe a melhor variante pré-comprimida aceita pelo cliente."""
+    for codificacao, extensao in (('br', '.br'), ('gzip', '.gz')):
+        if codificacao in accept_encoding and os.path.exists(caminho + extensao):
+            return caminho + extensao, codificacao
+    return caminho, None
+
+
+def servir_estatico(request, caminho):
+    """Serve arquivos do STATIC_ROOT com variantes comprimidas e cache longo."""
+    caminho = posixpath.normpath(caminho).lstrip('/')
+    try:
+        completo = safe_join(settings.STATIC_ROOT, caminho)
+    except Exception:
+        raise Http404
+    if not os.path.isfile(completo):
+        raise Http404
+
+    estado = os.stat(completo)
+    imutavel = bool(PADRAO_HASH.search(caminho))
+    if not imutavel and not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), estado.st_mtime):
+        return HttpResponseNotModified()
+    if imutavel and request.META.get('HTTP_IF_MODIFIED_SINCE'):
+        # O conteúdo de um arquivo com hash nunca muda
+        return HttpResponseNotModified()
+
+    arquivo, codificacao = _variante_comprimida(completo, request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    content_type, _ = mimetypes.guess_type(completo)
+    response = FileResponse(open(arquivo, 'rb'), content_type=content_type or 'application/octet-stream')
+    if codificacao:
+        response['Content-Encoding'] = codificacao
+    response['Vary'] = 'Accept-Encoding'
+    response['Last-Modified'] = http_date(estado.st_mtime)
+    response['Cache-Control'] = CACHE_LONGO if imutavel else CACHE_CURTO
+    return response
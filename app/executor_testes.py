@@ -0,0 +1,23 @@
+"""
+Executor de testes do projeto (``TEST_RUNNER``).
+
+Os testes usam um cache em memória no lugar do cache em disco de
+``CACHES``: cada execução começa vazia e não deixa arquivos em ``cache/``
+nem disputa as entradas com o servidor de desenvolvimento.
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+CACHES_TESTES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class ExecutorTestes(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._caches = override_settings(CACHES=CACHES_TESTES)
+        self._caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.disable()
+        super().teardown_test_environment(**kwargs)
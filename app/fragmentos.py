@@ -0,0 +1,132 @@
+"""
+Cache de fragmentos de template com versões por domínio.
+
+Os blocos dos dashboards (indicadores, agenda, funcionários recentes...)
+são iguais para todos os usuários de um mesmo cargo. A chave de cada
+fragmento combina o nome, o cargo, a versão de cada domínio de que ele
+depende e valores extras (ex.: a data do dia)::
+
+    fragmento:agenda:vendedor:<versão agenda>:<hash dos extras>
+
+Gravar ou excluir um modelo de um domínio troca a versão dele (ver
+``accounts.signals``), e as chaves antigas simplesmente deixam de ser lidas.
+A troca também registra o instante (``modificado_em``), usado como
+``Last-Modified`` por respostas que dependem dos mesmos domínios.
+
+Single-flight: numa falta de cache só quem obtém o lock (``cache.add``)
+renderiza; os demais aguardam o resultado no cache em vez de repetir as
+mesmas consultas. Se a espera passar de ``ESPERA_MAXIMA`` o fragmento é
+renderizado sem cache, para a página nunca travar.
+
+O lock só é exclusivo com um backend de ``add()`` atômico (Redis, com
+``REDIS_URL``; memcached; cache em banco). No ``FileBasedCache`` padrão o
+``add()`` é ``has_key()`` seguido de ``set()``: workers que chegam juntos
+podem todos obter o lock e renderizar. Ali o single-flight é só um melhor
+esforço, que reduz as renderizações repetidas sem garantir uma só.
+"""
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+DOMINIOS = ('agenda', 'financeiro', 'funcionarios')
+
+PREFIXO = 'fragmento'
+VERSAO_KEY = 'fragmento_versao:{}'
+MODIFICADO_KEY = 'fragmento_modificado:{}'
+TIMEOUT_PADRAO = 3600  # limite para dados que mudam sem signal (ex.: virada do dia)
+LOCK_TIMEOUT = 30  # segundos; libera o lock se o processo que renderiza morrer
+ESPERA_MAXIMA = 5.0
+INTERVALO_ESPERA = 0.05
+
+
+def _nova_versao():
+    """Gera um carimbo de versão único (evita corrida entre incrementos)."""
+    return uuid.uuid4().hex
+
+
+def versoes(dominios):
+    """Versões vigentes dos domínios, criando as que ainda não existem."""
+    chaves = {dominio: VERSAO_KEY.format(dominio) for dominio in dominios}
+    encontradas = cache.get_many(chaves.values())
+    resultado = {}
+    for dominio, chave in chaves.items():
+        versao = encontradas.get(chave)
+        if versao is None:
+            cache.add(chave, _nova_versao(), None)
+            versao = cache.get(chave)
+        resultado[dominio] = versao
+    return resultado
+
+
+def invalidar(*dominios):
+    """Troca a versão dos domínios; os fragmentos que dependem deles expiram."""
+    agora = time.time()
+    for dominio in dominios:
+        cache.set_many({VERSAO_KEY.format(dominio): _nova_versao(), MODIFICADO_KEY.format(dominio): agora}, None)
+
+
+def modificado_em(dominios):
+    """Timestamp da última alteração entre os domínios (agora, se nunca registrada)."""
+    chaves = [MODIFICADO_KEY.format(dominio) for dominio in dominios]
+    encontradas = cache.get_many(chaves)
+    for chave in chaves:
+        if chave not in encontradas:
+            cache.add(chave, time.time(), None)
+            encontradas[chave] = cache.get(chave, time.time())
+    return max(encontradas.values())
+
+
+def chave_fragmento(nome, cargo, dominios, extras=()):
+    versoes_dominios = versoes(dominios)
+    partes = [versoes_dominios[dominio] for dominio in dominios]
+    if extras:
+        partes.append(hashlib.md5(':'.join(str(extra) for extra in extras).encode()).hexdigest())
+    return ':'.join([PREFIXO, nome, cargo or '-', *partes])
+
+
+def em_falta(cargo, fragmentos):
+    """
+    Nomes dos fragmentos ausentes do cache, numa única leitura ``get_many``.
+
+    Args:
+        fragmentos: {nome: (domínios, extras)}, os mesmos argumentos do
+            ``{% fragmento %}`` no template.
+    """
+    chaves = {nome: chave_fragmento(nome, cargo, dominios, extras) for nome, (dominios, extras) in fragmentos.items()}
+    encontrados = cache.get_many(chaves.values())
+    return {nome for nome, chave in chaves.items() if chave not in encontrados}
+
+
+def obter_ou_renderizar(chave, renderizar, timeout=None):
+    """
+    Retorna o fragmento em cache ou o renderiza com proteção single-flight
+    (exclusiva só com ``add()`` atômico; ver o docstring do módulo).
+
+    Args:
+        renderizar: função sem argumentos que devolve o HTML do fragmento.
+    """
+    conteudo = cache.get(chave)
+    if conteudo is not None:
+        return conteudo
+
+    timeout = timeout or getattr(settings, 'FRAGMENTOS_CACHE_TIMEOUT', TIMEOUT_PADRAO)
+    lock = f'{chave}:lock'
+    if cache.add(lock, 1, LOCK_TIMEOUT):
+        try:
+            conteudo = renderizar()
+            cache.set(chave, conteudo, timeout)
+            return conteudo
+        finally:
+            cache.delete(lock)
+
+    # Outro worker já está renderizando: aguarda o resultado dele
+    limite = time.monotonic() + ESPERA_MAXIMA
+    while time.monotonic() < limite:
+        time.sleep(INTERVALO_ESPERA)
+        conteudo = cache.get(chave)
+        if conteudo is not None:
+            return conteudo
+    return renderizar()
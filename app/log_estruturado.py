@@ -0,0 +1,182 @@
+"""
+Pipeline de log estruturado (JSON) sem bloqueio das requisições.
+
+O ``FilaJSONHandler`` apenas coloca o registro em uma fila em memória. Uma
+thread ouvinte retira os registros, formata em JSON e grava em lotes em um
+arquivo rotativo local. Assim, signals executados dentro de ``save()`` não
+ficam presos a um stdout/disco lento.
+
+Uso nos módulos::
+
+    logger = logging.getLogger(__name__)
+    logger.info("Movimentação registrada", extra={'evento': 'estoque.movimentacao',
+                                                  'dados': {'produto': 'X'}})
+"""
+import atexit
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+
+class FormatadorJSON(logging.Formatter):
+    """Formata cada registro como um objeto JSON em uma única linha."""
+
+    def format(self, record):
+        registro = {
+            'data': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'evento': getattr(record, 'evento', None),
+            'mensagem': record.getMessage(),
+            'processo': record.process,
+            'thread': record.threadName,
+        }
+        dados = getattr(record, 'dados', None)
+        if dados:
+            registro['dados'] = dados
+        if record.exc_info:
+            registro['excecao'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            registro['excecao'] = record.exc_text
+        return json.dumps(registro, ensure_ascii=False, default=str)
+
+
+_formatador = FormatadorJSON()
+
+
+class ArquivoRotativoEmLote(logging.handlers.RotatingFileHandler):
+    """
+    Arquivo rotativo que acumula registros e grava em lotes.
+
+    O lote é gravado quando atinge ``tamanho_lote`` registros, quando chega
+    um registro de nível ERROR ou superior, ou quando o ouvinte chama
+    ``flush()`` após ``intervalo_lote`` segundos sem novos registros.
+    """
+
+    def __init__(self, filename, tamanho_lote=50, **kwargs):
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        super().__init__(filename, encoding=kwargs.pop('encoding', 'utf-8'), **kwargs)
+        self.tamanho_lote = tamanho_lote
+        self.lote = []
+
+    def emit(self, record):
+        self.lote.append(record)
+        if len(self.lote) >= self.tamanho_lote or record.levelno >= logging.ERROR:
+            self.gravar_lote()
+
+    def gravar_lote(self):
+        self.acquire()
+        try:
+            lote, self.lote = self.lote, []
+            for record in lote:
+                try:
+                    if self.shouldRollover(record):
+                        self.doRollover()
+                    logging.FileHandler.emit(self, record)
+                except Exception:
+                    self.handleError(record)
+        finally:
+            self.release()
+
+    def flush(self):
+        if self.lote:
+            self.gravar_lote()
+        super().flush()
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+class OuvinteEmLote(logging.handlers.QueueListener):
+    """QueueListener que descarrega os lotes quando a fila fica ociosa."""
+
+    def __init__(self, fila, *handlers, intervalo_lote=1.0):
+        super().__init__(fila, *handlers, respect_handler_level=True)
+        self.intervalo_lote = intervalo_lote
+
+    def dequeue(self, block):
+        ultimo_flush = time.monotonic()
+        while True:
+            try:
+                return self.queue.get(block, timeout=self.intervalo_lote)
+            except queue.Empty:
+                pass
+            if time.monotonic() - ultimo_flush >= self.intervalo_lote:
+                self.descarregar()
+                ultimo_flush = time.monotonic()
+
+    def descarregar(self):
+        for handler in self.handlers:
+            handler.flush()
+
+    def stop(self):
+        super().stop()
+        self.descarregar()
+
+
+class FilaJSONHandler(logging.handlers.QueueHandler):
+    """
+    Handler configurável via ``LOGGING`` que encaminha os registros para a
+    thread ouvinte, responsável por formatar e gravar em lote.
+    """
+
+    _ouvintes = []
+    _lock = threading.Lock()
+
+    def __init__(self, filename, maxBytes=10 * 1024 * 1024, backupCount=5,
+                 tamanho_lote=50, intervalo_lote=1.0, tamanho_fila=10000):
+        super().__init__(queue.Queue(maxsize=tamanho_fila))
+        arquivo = ArquivoRotativoEmLote(
+            filename,
+            tamanho_lote=tamanho_lote,
+            maxBytes=maxBytes,
+            backupCount=backupCount,
+        )
+        arquivo.setFormatter(FormatadorJSON())
+        self.ouvinte = OuvinteEmLote(self.queue, arquivo, intervalo_lote=intervalo_lote)
+        self.ouvinte.start()
+        with self._lock:
+            self._ouvintes.append(self.ouvinte)
+
+    def prepare(self, record):
+        """
+        Resolve a mensagem e guarda o traceback em ``exc_text``.
+
+        O ``prepare()`` do ``QueueHandler`` embutiria o traceback no texto da
+        mensagem e apagaria ``exc_info``: o ``FormatadorJSON`` do ouvinte nunca
+        gravaria o campo ``excecao``.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _formatador.formatException(record.exc_info)
+        # Os frames do traceback não atravessam a fila
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Nunca bloqueia a requisição: descarta quando a fila está cheia
+            pass
+
+    @classmethod
+    def parar_todos(cls):
+        """Para os ouvintes, gravando o que ainda estiver na fila."""
+        with cls._lock:
+            ouvintes, cls._ouvintes = cls._ouvintes, []
+        for ouvinte in ouvintes:
+            if ouvinte._thread is not None:
+                ouvinte.stop()
+
+
+atexit.register(FilaJSONHandler.parar_todos)
@@ -0,0 +1,313 @@
+import os
+import random
+import secrets
+import time
+import uuid
+from datetime import date, timedelta, time as hora
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import ResumoDashboard
+from agendamento.models import Agendamento
+from busca import indice as indice_busca
+from documentos.models import DocumentoGerado, TemplateDocumento
+from estoque.models import CategoriaEstoque, MovimentacaoEstoque, ProdutoEstoque
+from familia.models import Familia
+from financeiro.models import Financeiro
+from funcionario.models import Funcionario
+from item_servico.models import ItemServico
+from pessoa_falecida.models import PessoaFalecida
+from servico_contratado.models import ItemServicoContratado, ServicoContratado
+
+User = get_user_model()
+
+NOMES = [
+    'Ana', 'João', 'Maria', 'José', 'Antônio', 'Francisca', 'Carlos', 'Paulo', 'Adriana', 'Lucas',
+    'Juliana', 'Márcia', 'Luiz', 'Fernanda', 'Pedro', 'Patrícia', 'Aline', 'Rafael', 'Sebastião', 'Conceição',
+]
+SOBRENOMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes',
+    'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Araújo', 'Melo', 'Barbosa', 'Cardoso', 'Conceição', 'Simões',
+]
+PARENTESCOS = ['Filho(a)', 'Cônjuge', 'Irmão(ã)', 'Neto(a)', 'Sobrinho(a)', 'Pai/Mãe']
+CAUSAS = ['Causas naturais', 'Insuficiência cardíaca', 'Pneumonia', 'AVC', 'Complicações respiratórias']
+LOCAIS_OBITO = ['Hospital Municipal', 'Santa Casa', 'Residência', 'Hospital São Lucas', 'UPA Central']
+VELORIOS = ['Capela 1', 'Capela 2', 'Capela 3', 'Salão Principal', 'Capela Ecumênica']
+CEMITERIOS = ['Cemitério da Saudade', 'Cemitério São João Batista', 'Cemitério Municipal', 'Parque das Flores']
+ITENS = [
+    ('Urna Simples', '1200.00'), ('Urna Luxo', '4500.00'), ('Coroa de Flores', '350.00'),
+    ('Arranjo Floral', '180.00'), ('Tanatopraxia', '900.00'), ('Translado', '600.00'),
+    ('Velório (capela)', '800.00'), ('Ornamentação', '450.00'), ('Véu', '60.00'), ('Livro de Presença', '90.00'),
+]
+CATEGORIAS = ['Urnas', 'Flores', 'Paramentos', 'Higienização', 'Escritório']
+CARGOS_OPERACIONAIS = ['florista', 'coveiro', 'preparador']
+
+
+def nome_completo(rng):
+    return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+
+
+def telefone(rng):
+    return f"(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera dados sintéticos consistentes (famílias, falecidos, contratos, financeiro, '
+        'agendamentos, estoque e documentos) usando inserções em lote.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--familias', type=int, default=1000,
+                            help='Quantidade de famílias (e de falecidos, contratos e agendamentos).')
+        parser.add_argument('--funcionarios', type=int, default=30)
+        parser.add_argument('--produtos', type=int, default=200)
+        parser.add_argument('--movimentacoes-por-produto', type=int, default=10)
+        parser.add_argument('--tamanho-lote', type=int, default=2000)
+        parser.add_argument('--semente', type=int, default=None, help='Semente do gerador aleatório.')
+        parser.add_argument(
+            '--senha',
+            default=os.environ.get('DADOS_SINTETICOS_SENHA'),
+            help='Senha do usuário "sintetico" (padrão: $DADOS_SINTETICOS_SENHA ou uma senha aleatória).',
+        )
+        parser.add_argument(
+            '--forcar',
+            action='store_true',
+            help='Permite rodar com DEBUG desligado (o comando cria um usuário administrador).',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['forcar']:
+            raise CommandError(
+                'DEBUG está desligado: este banco pode ser de produção. Use --forcar para gerar os dados mesmo assim.'
+            )
+        self.rng = random.Random(options['semente'])
+        self.lote = options['tamanho_lote']
+        self.total_linhas = 0
+        # Prefixo único por execução, para códigos/nomes com restrição de unicidade
+        self.prefixo = uuid.uuid4().hex[:6].upper()
+        inicio = time.perf_counter()
+
+        with transaction.atomic():
+            usuario = self.garantir_usuario(options['senha'])
+            funcionarios = self.criar_funcionarios(options['funcionarios'])
+            itens = self.criar_itens_servico()
+            familias = self.criar_familias(options['familias'])
+            falecidos = self.criar_falecidos(familias)
+            servicos = self.criar_servicos(falecidos, itens)
+            self.criar_financeiro(servicos)
+            self.criar_agendamentos(falecidos, funcionarios)
+            produtos = self.criar_produtos(options['produtos'])
+            self.criar_movimentacoes(produtos, usuario, options['movimentacoes_por_produto'])
+            self.criar_documentos(servicos, usuario)
+            # bulk_create não dispara signals: recalcula os indicadores e o índice de busca
+            ResumoDashboard.reconstruir()
+            if indice_busca.disponivel():
+                indice_busca.reconstruir()
+
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{self.total_linhas} linhas inseridas em {duracao:.2f}s '
+            f'({self.total_linhas / duracao:.0f} linhas/s).'
+        ))
+
+    def inserir(self, modelo, objetos):
+        criados = modelo.objects.bulk_create(objetos, batch_size=self.lote)
+        self.total_linhas += len(criados)
+        self.stdout.write(f'  {modelo._meta.verbose_name_plural}: {len(criados)}')
+        return criados
+
+    def garantir_usuario(self, senha):
+        usuario, criado = User.objects.get_or_create(
+            username='sintetico',
+            defaults={'cargo': 'adm', 'first_name': 'Dados', 'last_name': 'Sintéticos'},
+        )
+        if criado:
+            aleatoria = not senha
+            senha = senha or secrets.token_urlsafe(12)
+            usuario.set_password(senha)
+            usuario.save()
+            if aleatoria:
+                # Exibida só agora: não fica gravada em lugar nenhum
+                self.stdout.write(self.style.WARNING(f'Usuário "sintetico" criado com a senha: {senha}'))
+        return usuario
+
+    def criar_funcionarios(self, quantidade):
+        # bulk_create não dispara o signal que cria contas de login
+        cargos = CARGOS_OPERACIONAIS + ['vendedor']
+        return self.inserir(Funcionario, [
+            Funcionario(
+                nome=nome_completo(self.rng),
+                cargo=cargos[i % len(cargos)],
+                telefone=telefone(self.rng),
+                email=f'func{self.prefixo.lower()}{i}@exemplo.com.br',
+                ativo=True,
+            )
+            for i in range(quantidade)
+        ])
+
+    def criar_itens_servico(self):
+        return self.inserir(ItemServico, [
+            ItemServico(nome=nome, descricao=f'{nome} (dados sintéticos)', quantidade=100, preco_unitario=Decimal(preco))
+            for nome, preco in ITENS
+        ])
+
+    def criar_familias(self, quantidade):
+        return self.inserir(Familia, [
+            Familia(
+                nome_responsavel=nome_completo(self.rng),
+                grau_parentesco=self.rng.choice(PARENTESCOS),
+                telefone=telefone(self.rng),
+                email=f'familia{self.prefixo.lower()}{i}@exemplo.com.br',
+                endereco=f'Rua {self.rng.choice(SOBRENOMES)}, {self.rng.randint(1, 2000)} - São Paulo/SP',
+            )
+            for i in range(quantidade)
+        ])
+
+    def criar_falecidos(self, familias):
+        hoje = date.today()
+        objetos = []
+        for familia in familias:
+            falecimento = hoje - timedelta(days=self.rng.randint(0, 365))
+            nascimento = falecimento - timedelta(days=self.rng.randint(40 * 365, 95 * 365))
+            objetos.append(PessoaFalecida(
+                nome=nome_completo(self.rng),
+                data_nascimento=nascimento,
+                data_falecimento=falecimento,
+                causa_obito=self.rng.choice(CAUSAS),
+                local_obito=self.rng.choice(LOCAIS_OBITO),
+                documento_cpf_rg=''.join(str(self.rng.randint(0, 9)) for _ in range(11)),
+                familia=familia,
+            ))
+        return self.inserir(PessoaFalecida, objetos)
+
+    def criar_servicos(self, falecidos, itens):
+        agora = timezone.now()
+        servicos = self.inserir(ServicoContratado, [
+            ServicoContratado(
+                pessoa_falecida=falecido,
+                taxa_imposto=Decimal('10.00'),
+                data_contratacao=agora - timedelta(days=self.rng.randint(0, 365), minutes=self.rng.randint(0, 1440)),
+            )
+            for falecido in falecidos
+        ])
+
+        itens_contrato = []
+        self.subtotais = {}
+        for servico in servicos:
+            subtotal = Decimal('0')
+            for item in self.rng.sample(itens, self.rng.randint(1, 4)):
+                quantidade = self.rng.randint(1, 3)
+                itens_contrato.append(ItemServicoContratado(
+                    servico_contratado=servico,
+                    item_servico=item,
+                    quantidade=quantidade,
+                    valor_unitario=item.preco_unitario,
+                ))
+                subtotal += item.preco_unitario * quantidade
+            self.subtotais[servico.pk] = subtotal
+        self.inserir(ItemServicoContratado, itens_contrato)
+        return servicos
+
+    def criar_financeiro(self, servicos):
+        objetos = []
+        for servico in servicos:
+            subtotal = self.subtotais[servico.pk]
+            pago = self.rng.random() < 0.6
+            objetos.append(Financeiro(
+                pessoa_falecida_id=servico.pessoa_falecida_id,
+                servico_contratado=servico,
+                tipo='receita',
+                descricao=f'Serviços funerários - contrato {servico.pk}',
+                valor=subtotal + subtotal * servico.taxa_imposto / 100,
+                data_vencimento=servico.data_contratacao.date() + timedelta(days=30),
+                data_pagamento=servico.data_contratacao + timedelta(days=self.rng.randint(0, 30)) if pago else None,
+                forma_pagamento=self.rng.choice([c[0] for c in Financeiro.FORMA_PAGAMENTO_CHOICES]) if pago else None,
+                status='pago' if pago else 'pendente',
+                data_criacao=servico.data_contratacao,
+            ))
+        return self.inserir(Financeiro, objetos)
+
+    def criar_agendamentos(self, falecidos, funcionarios):
+        hoje = timezone.localtime()
+        objetos = []
+        for falecido in falecidos:
+            # Maior parte no passado, uma fração nas próximas semanas
+            inicio = hoje.replace(
+                hour=self.rng.randint(7, 17), minute=self.rng.choice([0, 30]), second=0, microsecond=0
+            ) + timedelta(days=self.rng.randint(-180, 30))
+            objetos.append(Agendamento(
+                pessoa_falecida=falecido,
+                funcionario=self.rng.choice(funcionarios),
+                data_agendamento=inicio,
+                hora_agendamento=hora(inicio.hour, inicio.minute),
+                local_velorio=self.rng.choice(VELORIOS),
+                local_sepultamento=self.rng.choice(CEMITERIOS),
+                data_sepultamento=inicio + timedelta(hours=self.rng.randint(4, 24)),
+            ))
+        return self.inserir(Agendamento, objetos)
+
+    def criar_produtos(self, quantidade):
+        categorias = self.inserir(CategoriaEstoque, [
+            CategoriaEstoque(nome=f'{nome} {self.prefixo}') for nome in CATEGORIAS
+        ])
+        objetos = []
+        for i in range(quantidade):
+            custo = Decimal(self.rng.randint(500, 50000)) / 100
+            objetos.append(ProdutoEstoque(
+                codigo=f'SIN-{self.prefixo}-{i:05d}',
+                nome=f'Produto {i} {self.rng.choice(SOBRENOMES)}',
+                categoria=self.rng.choice(categorias),
+                unidade_medida='un',
+                preco_custo=custo,
+                preco_venda=(custo * Decimal('1.6')).quantize(Decimal('0.01')),
+                quantidade_minima=Decimal(self.rng.randint(1, 10)),
+            ))
+        return objetos  # Inseridos após as movimentações, com o saldo já calculado
+
+    def criar_movimentacoes(self, produtos, usuario, por_produto):
+        # bulk_create não chama MovimentacaoEstoque.save(): o saldo do produto
+        # é calculado aqui para manter estoque e movimentações consistentes
+        movimentacoes = []
+        for produto in produtos:
+            saldo = Decimal('0')
+            for _ in range(por_produto):
+                quantidade = Decimal(self.rng.randint(1, 20))
+                tipo = 'entrada' if saldo < quantidade or self.rng.random() < 0.5 else 'saida'
+                saldo += quantidade if tipo == 'entrada' else -quantidade
+                movimentacoes.append(MovimentacaoEstoque(
+                    produto=produto,
+                    tipo=tipo,
+                    quantidade=quantidade,
+                    preco_unitario=produto.preco_custo if tipo == 'entrada' else produto.preco_venda,
+                    usuario=usuario,
+                    fornecedor='Fornecedor Sintético' if tipo == 'entrada' else None,
+                ))
+            produto.quantidade_atual = saldo
+        self.inserir(ProdutoEstoque, produtos)
+        self.inserir(MovimentacaoEstoque, movimentacoes)
+
+    def criar_documentos(self, servicos, usuario):
+        template = TemplateDocumento.objects.create(
+            nome=f'Contrato sintético {self.prefixo}',
+            tipo='contrato',
+            conteudo_html='<h1>Contrato de Serviços</h1><p>{{ pessoa_falecida.nome }}</p>',
+        )
+        self.total_linhas += 1
+        return self.inserir(DocumentoGerado, [
+            DocumentoGerado(
+                template=template,
+                pessoa_falecida_id=servico.pessoa_falecida_id,
+                servico_contratado=servico,
+                titulo=f'Contrato de serviços nº {servico.pk}',
+                conteudo_html=f'<h1>Contrato de Serviços</h1><p>Contrato {servico.pk}</p>',
+                status='gerado',
+                usuario_criador=usuario,
+            )
+            for servico in servicos
+        ])
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from app import metricas
+
+
+class Command(BaseCommand):
+    help = 'Exibe p50/p95/p99 de consultas SQL e tempos por view, agregando todos os workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ordenar',
+            choices=['nome', 'consultas', 'total', 'requisicoes'],
+            default='total',
+            help='Critério de ordenação da tabela (padrão: p95 do tempo total).',
+        )
+
+    def handle(self, *args, **options):
+        resumo = metricas.resumir(metricas.amostras_compartilhadas())
+        if not resumo:
+            self.stdout.write(self.style.WARNING('Nenhuma métrica publicada ainda.'))
+            return
+
+        chaves = {
+            'nome': lambda item: item[0],
+            'consultas': lambda item: -item[1]['consultas']['p95'],
+            'total': lambda item: -item[1]['tempo_total_ms']['p95'],
+            'requisicoes': lambda item: -item[1]['requisicoes'],
+        }
+        linhas = sorted(resumo.items(), key=chaves[options['ordenar']])
+
+        cabecalho = (
+            f"{'View':<40} {'Req':>6} {'SQL p50/p95/p99':>16} {'Orç.':>5} "
+            f"{'DB p95':>8} {'Tpl p95':>8} {'Total ms p50/p95/p99':>22}"
+        )
+        self.stdout.write(cabecalho)
+        self.stdout.write('-' * len(cabecalho))
+
+        for nome, item in linhas:
+            consultas = item['consultas']
+            total = item['tempo_total_ms']
+            orcamento = item['orcamento_consultas']
+            sql = f"{consultas['p50']:g}/{consultas['p95']:g}/{consultas['p99']:g}"
+            latencia = f"{total['p50']:.1f}/{total['p95']:.1f}/{total['p99']:.1f}"
+            linha = (
+                f"{nome[:40]:<40} {item['requisicoes']:>6} {sql:>16} "
+                f"{orcamento if orcamento is not None else '-':>5} "
+                f"{item['tempo_db_ms']['p95']:>8.1f} {item['tempo_template_ms']['p95']:>8.1f} "
+                f"{latencia:>22}"
+            )
+            if orcamento is not None and consultas['p95'] > orcamento:
+                self.stdout.write(self.style.WARNING(linha))
+            else:
+                self.stdout.write(linha)
@@ -0,0 +1,235 @@
+import http.cookiejar
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from app.metricas import percentil
+from item_servico.models import ItemServico
+from pessoa_falecida.models import PessoaFalecida
+from servico_contratado.models import ServicoContratado
+
+User = get_user_model()
+
+# Peso padrão de cada cenário (ajustável com --cenarios)
+CENARIOS = {
+    'dashboard_admin': 3,
+    'dashboard_vendedor': 2,
+    'dashboard_funcionario': 3,
+    'lista_familias': 2,
+    'lista_falecidos': 2,
+    'lista_contratos': 2,
+    'lista_financeiro': 1,
+    'lista_agendamentos': 2,
+    'criar_contrato': 1,
+    'pdf_nota_fiscal': 1,
+}
+
+URLS_GET = {
+    'dashboard_admin': 'dashboard_admin',
+    'dashboard_vendedor': 'dashboard_vendedor',
+    'dashboard_funcionario': 'dashboard_funcionario',
+    'lista_familias': 'familia:list',
+    'lista_falecidos': 'pessoa_falecida:list',
+    'lista_contratos': 'servico_contratado:list',
+    'lista_financeiro': 'financeiro:list',
+    'lista_agendamentos': 'agendamento:list',
+}
+
+
+class ClienteDjango:
+    """Executa as requisições em processo, pelo Django test client."""
+
+    def __init__(self, usuario):
+        self.client = Client()
+        self.client.force_login(usuario)
+
+    def get(self, caminho):
+        return self.client.get(caminho).status_code
+
+    def post(self, caminho, dados):
+        return self.client.post(caminho, dados).status_code
+
+    def fechar(self):
+        connection.close()
+
+
+class ClienteHTTP:
+    """Executa as requisições contra um servidor local, com sessão autenticada."""
+
+    def __init__(self, base_url, username, senha):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        caminho_login = reverse('accounts:login')
+        html = self.opener.open(self.base_url + caminho_login).read().decode('utf-8', 'ignore')
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', html)
+        if not token:
+            raise CommandError('Não foi possível obter o token CSRF da página de login.')
+        status = self.post(caminho_login, {
+            'username': username, 'password': senha, 'csrfmiddlewaretoken': token.group(1),
+        })
+        if status >= 400 or not any(cookie.name == 'sessionid' for cookie in self.cookies):
+            raise CommandError(f'Falha no login de "{username}" em {self.base_url}.')
+
+    def _csrf(self):
+        return next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+
+    def _abrir(self, requisicao):
+        try:
+            with self.opener.open(requisicao, timeout=60) as resposta:
+                resposta.read()
+                return resposta.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def get(self, caminho):
+        return self._abrir(urllib.request.Request(self.base_url + caminho))
+
+    def post(self, caminho, dados):
+        corpo = urllib.parse.urlencode(dados).encode()
+        requisicao = urllib.request.Request(self.base_url + caminho, data=corpo, headers={
+            'X-CSRFToken': self._csrf(),
+            'Referer': self.base_url + caminho,
+        })
+        return self._abrir(requisicao)
+
+    def fechar(self):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de carga: repete cenários ponderados (dashboards, listas, criação de contrato, PDF) '
+        'com workers concorrentes e relata vazão e latências p50/p95/p99 por cenário.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='URL de um servidor local (ex.: http://127.0.0.1:8000). '
+                                          'Sem ela, usa o Django test client em processo.')
+        parser.add_argument('--usuario', default='sintetico')
+        parser.add_argument('--senha', default=os.environ.get('DADOS_SINTETICOS_SENHA'),
+                            help='Senha (apenas com --url; padrão: $DADOS_SINTETICOS_SENHA).')
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--requisicoes', type=int, default=200, help='Total de requisições.')
+        parser.add_argument('--cenarios', default='',
+                            help='Pesos, ex.: "dashboard_admin=5,criar_contrato=0".')
+        parser.add_argument('--semente', type=int, default=None)
+
+    def handle(self, *args, **options):
+        pesos = dict(CENARIOS)
+        for par in filter(None, options['cenarios'].split(',')):
+            nome, _, peso = par.partition('=')
+            if nome not in pesos:
+                raise CommandError(f'Cenário desconhecido: {nome}. Opções: {", ".join(pesos)}')
+            pesos[nome] = int(peso)
+        pesos = {nome: peso for nome, peso in pesos.items() if peso > 0}
+
+        if options['url'] and not options['senha']:
+            raise CommandError('Informe a senha do usuário com --senha ou $DADOS_SINTETICOS_SENHA.')
+
+        try:
+            usuario = User.objects.get(username=options['usuario'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Usuário "{options["usuario"]}" não encontrado. Rode "gerar_dados_sinteticos" antes.'
+            )
+
+        self.falecidos = list(PessoaFalecida.objects.values_list('pk', flat=True)[:2000])
+        self.servicos = list(ServicoContratado.objects.values_list('pk', flat=True)[:2000])
+        self.itens = list(ItemServico.objects.values_list('pk', flat=True))
+        if not (self.falecidos and self.servicos and self.itens):
+            raise CommandError('Banco sem dados. Rode "gerar_dados_sinteticos" antes.')
+
+        rng = random.Random(options['semente'])
+        nomes = list(pesos)
+        plano = rng.choices(nomes, weights=[pesos[n] for n in nomes], k=options['requisicoes'])
+        resultados = {nome: [] for nome in nomes}
+        erros = {nome: 0 for nome in nomes}
+        lock = threading.Lock()
+        proximo = iter(plano)
+
+        def worker(semente):
+            rng_worker = random.Random(semente)
+            if options['url']:
+                cliente = ClienteHTTP(options['url'], options['usuario'], options['senha'])
+            else:
+                cliente = ClienteDjango(usuario)
+            try:
+                while True:
+                    with lock:
+                        cenario = next(proximo, None)
+                    if cenario is None:
+                        return
+                    inicio = time.perf_counter()
+                    try:
+                        status = self.executar(cliente, cenario, rng_worker)
+                    except Exception:
+                        status = 599
+                    duracao = (time.perf_counter() - inicio) * 1000
+                    with lock:
+                        resultados[cenario].append(duracao)
+                        if status >= 400:
+                            erros[cenario] += 1
+            finally:
+                cliente.fechar()
+
+        threads = [threading.Thread(target=worker, args=(rng.random(),)) for _ in range(options['workers'])]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duracao_total = time.perf_counter() - inicio
+
+        self.relatorio(resultados, erros, duracao_total, options['workers'])
+
+    def executar(self, cliente, cenario, rng):
+        if cenario in URLS_GET:
+            return cliente.get(reverse(URLS_GET[cenario]))
+        if cenario == 'pdf_nota_fiscal':
+            pk = rng.choice(self.servicos)
+            return cliente.get(reverse('servico_contratado:visualizar_pdf', kwargs={'pk': pk}))
+        if cenario == 'criar_contrato':
+            return cliente.post(reverse('servico_contratado:create'), {
+                'pessoa_falecida': rng.choice(self.falecidos),
+                'descricao_adicional': 'Contrato gerado pelo teste de carga',
+                'taxa_imposto': '10.00',
+                'itens-TOTAL_FORMS': '1',
+                'itens-INITIAL_FORMS': '0',
+                'itens-MIN_NUM_FORMS': '1',
+                'itens-MAX_NUM_FORMS': '1000',
+                'itens-0-item_servico': rng.choice(self.itens),
+                'itens-0-quantidade': '1',
+                'itens-0-valor_unitario': '100.00',
+            })
+        raise CommandError(f'Cenário sem implementação: {cenario}')
+
+    def relatorio(self, resultados, erros, duracao_total, workers):
+        total = sum(len(lista) for lista in resultados.values())
+        self.stdout.write(
+            f'\n{total} requisições com {workers} workers em {duracao_total:.2f}s '
+            f'({total / duracao_total:.1f} req/s)\n'
+        )
+        cabecalho = f"{'Cenário':<24} {'Req':>6} {'Erros':>6} {'Req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        self.stdout.write(cabecalho)
+        self.stdout.write('-' * len(cabecalho))
+        for nome, lista in sorted(resultados.items()):
+            if not lista:
+                continue
+            valores = sorted(lista)
+            linha = (
+                f"{nome:<24} {len(lista):>6} {erros[nome]:>6} {len(lista) / duracao_total:>8.1f} "
+                f"{percentil(valores, 50):>9.1f} {percentil(valores, 95):>9.1f} {percentil(valores, 99):>9.1f}"
+            )
+            self.stdout.write(self.style.ERROR(linha) if erros[nome] else linha)
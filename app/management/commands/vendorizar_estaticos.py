@@ -0,0 +1,38 @@
+import os
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.estaticos import VENDOR
+
+
+class Command(BaseCommand):
+    help = 'Baixa as bibliotecas de terceiros (Bootstrap, ícones, QR Code) para static/vendor/, para uso offline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forcar', action='store_true', help='Baixa novamente arquivos já existentes.')
+
+    def handle(self, *args, **options):
+        destino = os.path.join(settings.STATICFILES_DIRS[0], 'vendor')
+        falhas = 0
+        for caminho, url in VENDOR.items():
+            arquivo = os.path.join(destino, caminho)
+            if os.path.exists(arquivo) and not options['forcar']:
+                self.stdout.write(f'Já existe: vendor/{caminho}')
+                continue
+            os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+            try:
+                with urllib.request.urlopen(url, timeout=30) as resposta:
+                    conteudo = resposta.read()
+            except OSError as e:
+                falhas += 1
+                self.stderr.write(self.style.ERROR(f'Erro ao baixar {url}: {e}'))
+                continue
+            with open(arquivo, 'wb') as saida:
+                saida.write(conteudo)
+            self.stdout.write(self.style.SUCCESS(f'Baixado: vendor/{caminho} ({len(conteudo)} bytes)'))
+
+        if falhas:
+            raise CommandError(f'{falhas} arquivo(s) não puderam ser baixados.')
+        self.stdout.write('Execute "python manage.py collectstatic" para gerar os arquivos com hash e comprimidos.')
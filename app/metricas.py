@@ -0,0 +1,221 @@
+"""
+Coleta de métricas por view (consultas SQL, tempo de banco, de template e total).
+
+As amostras ficam em um buffer circular em memória, separado por nome de URL.
+Periodicamente o processo publica um snapshot no cache compartilhado, para que
+o comando ``metricas_views`` consiga agregar os dados de todos os workers.
+"""
+import contextvars
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_BUFFER_PADRAO = 500
+INTERVALO_PUBLICACAO = 10  # segundos entre snapshots no cache compartilhado
+CACHE_PREFIXO = 'metricas_views'
+CACHE_INDICE = f'{CACHE_PREFIXO}:processos'
+CACHE_TIMEOUT = 60 * 60
+
+CAMPOS = ('consultas', 'tempo_db_ms', 'tempo_template_ms', 'tempo_total_ms')
+
+_buffers = {}
+_lock = threading.Lock()
+_ultima_publicacao = [0.0]
+# ContextVar em vez de thread-local: funciona por thread (WSGI) e por tarefa (ASGI)
+_coletor = contextvars.ContextVar('coletor_metricas', default=None)
+
+
+def tamanho_buffer():
+    return getattr(settings, 'METRICAS_TAMANHO_BUFFER', TAMANHO_BUFFER_PADRAO)
+
+
+def orcamento_consultas(url_name):
+    """Retorna o orçamento de consultas declarado para a view (ou None)."""
+    return getattr(settings, 'METRICAS_ORCAMENTO_CONSULTAS', {}).get(url_name)
+
+
+class ColetorRequisicao:
+    """Acumula as métricas de uma única requisição."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_db = 0.0
+        self.tempo_template = 0.0
+        self.profundidade_template = 0
+        # Views assíncronas podem executar consultas em várias threads ao mesmo tempo
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        """Wrapper de execução do Django: conta e cronometra cada consulta."""
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = time.perf_counter() - inicio
+            with self._lock:
+                self.tempo_db += duracao
+                self.consultas += 1
+
+
+def coletor_atual():
+    return _coletor.get()
+
+
+def definir_coletor(coletor):
+    _coletor.set(coletor)
+
+
+def _registrar_consulta(execute, sql, params, many, context):
+    """Wrapper instalado em todas as conexões; delega ao coletor do contexto atual."""
+    coletor = coletor_atual()
+    if coletor is None:
+        return execute(sql, params, many, context)
+    return coletor(execute, sql, params, many, context)
+
+
+def _instalar_wrapper(sender=None, connection=None, **kwargs):
+    if _registrar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_registrar_consulta)
+
+
+def _instrumentar_consultas():
+    """
+    Instala o wrapper de consultas em todas as conexões, inclusive nas abertas
+    por threads auxiliares (sync_to_async, consultas em paralelo), que herdam
+    o coletor da requisição pelo contexto.
+    """
+    connection_created.connect(_instalar_wrapper, dispatch_uid='metricas_consultas')
+    for conexao in connections.all(initialized_only=True):
+        _instalar_wrapper(connection=conexao)
+
+
+def _instrumentar_templates():
+    """Cronometra Template.render, contando apenas o template mais externo."""
+    from django.template.base import Template
+
+    if getattr(Template.render, '_metricas', False):
+        return
+    render_original = Template.render
+
+    def render(self, context):
+        coletor = coletor_atual()
+        if coletor is None:
+            return render_original(self, context)
+        coletor.profundidade_template += 1
+        inicio = time.perf_counter()
+        try:
+            return render_original(self, context)
+        finally:
+            coletor.profundidade_template -= 1
+            if coletor.profundidade_template == 0:
+                coletor.tempo_template += time.perf_counter() - inicio
+
+    render._metricas = True
+    Template.render = render
+
+
+def registrar_amostra(url_name, coletor, tempo_total):
+    """Guarda a amostra no buffer da view e verifica o orçamento de consultas."""
+    amostra = (
+        coletor.consultas,
+        coletor.tempo_db * 1000,
+        coletor.tempo_template * 1000,
+        tempo_total * 1000,
+    )
+    with _lock:
+        buffer = _buffers.get(url_name)
+        if buffer is None:
+            buffer = _buffers[url_name] = deque(maxlen=tamanho_buffer())
+        buffer.append(amostra)
+
+    orcamento = orcamento_consultas(url_name)
+    if orcamento is not None and coletor.consultas > orcamento:
+        logger.warning(
+            "View %s excedeu o orçamento de consultas: %d (orçamento: %d)",
+            url_name, coletor.consultas, orcamento,
+        )
+
+    agora = time.monotonic()
+    if agora - _ultima_publicacao[0] >= INTERVALO_PUBLICACAO:
+        _ultima_publicacao[0] = agora
+        publicar_snapshot()
+
+
+def amostras():
+    """Retorna uma cópia das amostras locais: {url_name: [amostra, ...]}."""
+    with _lock:
+        return {nome: list(buffer) for nome, buffer in _buffers.items()}
+
+
+def limpar():
+    with _lock:
+        _buffers.clear()
+
+
+def percentil(valores_ordenados, p):
+    """Percentil pelo método nearest-rank."""
+    if not valores_ordenados:
+        return 0
+    indice = max(0, math.ceil(p / 100 * len(valores_ordenados)) - 1)
+    return valores_ordenados[indice]
+
+
+def resumir(dados=None):
+    """
+    Calcula p50/p95/p99 de cada métrica por view.
+
+    Returns:
+        dict: {url_name: {'requisicoes': n, 'orcamento_consultas': x,
+               'consultas': {'p50': .., 'p95': .., 'p99': ..}, ...}}
+    """
+    if dados is None:
+        dados = amostras()
+    resumo = {}
+    for url_name, lista in sorted(dados.items()):
+        if not lista:
+            continue
+        item = {
+            'requisicoes': len(lista),
+            'orcamento_consultas': orcamento_consultas(url_name),
+        }
+        for posicao, campo in enumerate(CAMPOS):
+            valores = sorted(amostra[posicao] for amostra in lista)
+            item[campo] = {
+                'p50': round(percentil(valores, 50), 2),
+                'p95': round(percentil(valores, 95), 2),
+                'p99': round(percentil(valores, 99), 2),
+            }
+        resumo[url_name] = item
+    return resumo
+
+
+def publicar_snapshot():
+    """Publica as amostras deste processo no cache compartilhado."""
+    pid = os.getpid()
+    try:
+        cache.set(f'{CACHE_PREFIXO}:{pid}', amostras(), CACHE_TIMEOUT)
+        processos = set(cache.get(CACHE_INDICE) or ())
+        if pid not in processos:
+            processos.add(pid)
+            cache.set(CACHE_INDICE, processos, CACHE_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Erro ao publicar métricas de views: {e}")
+
+
+def amostras_compartilhadas():
+    """Junta os snapshots publicados por todos os processos."""
+    combinadas = {}
+    for pid in cache.get(CACHE_INDICE) or ():
+        for url_name, lista in (cache.get(f'{CACHE_PREFIXO}:{pid}') or {}).items():
+            combinadas.setdefault(url_name, []).extend(lista)
+    return combinadas
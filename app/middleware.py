@@ -0,0 +1,56 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from . import metricas
+
+
+class MetricasViewMiddleware:
+    """
+    Middleware que mede, por view, o número de consultas SQL, o tempo de
+    banco, o tempo de renderização de templates e a latência total.
+
+    As amostras são agrupadas pelo nome da URL (``namespace:nome``) e podem
+    ser consultadas em ``/metricas/`` ou pelo comando ``metricas_views``.
+    Funciona tanto no WSGI quanto no ASGI (views síncronas e assíncronas).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+        metricas._instrumentar_consultas()
+        metricas._instrumentar_templates()
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        coletor = metricas.ColetorRequisicao()
+        metricas.definir_coletor(coletor)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metricas.definir_coletor(None)
+        self.registrar(request, coletor, inicio)
+        return response
+
+    async def __acall__(self, request):
+        coletor = metricas.ColetorRequisicao()
+        metricas.definir_coletor(coletor)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metricas.definir_coletor(None)
+        self.registrar(request, coletor, inicio)
+        return response
+
+    def registrar(self, request, coletor, inicio):
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.view_name:
+            metricas.registrar_amostra(match.view_name, coletor, time.perf_counter() - inicio)
@@ -1,7 +1,18 @@
+import base64
+import binascii
+import datetime
+import decimal
+import hashlib
+import json
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.core.exceptions import PermissionDenied
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.contrib import messages
+from django.db.models import Q
 from django.shortcuts import redirect
+from django.views.generic import ListView
 
 
 class AdminRequiredMixin(UserPassesTestMixin):
@@ -49,3 +60,168 @@ class LoginRequiredMixin(LoginRequiredMixin):
     """
     pass
 
+
+
+class PaginaCursor:
+    """Página de uma listagem por cursor (substitui ``page_obj`` nos templates)."""
+
+    def __init__(self, object_list, anterior, proxima, total, parametros):
+        self.object_list = object_list
+        self.cursor_anterior = anterior
+        self.cursor_proximo = proxima
+        self.total = total
+        self._parametros = parametros
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_next(self):
+        return self.cursor_proximo is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    def _url(self, **cursor):
+        parametros = self._parametros.copy()
+        for chave in ('antes', 'depois', 'page'):
+            parametros.pop(chave, None)
+        parametros.update(cursor)
+        return f'?{parametros.urlencode()}'
+
+    @property
+    def url_primeira(self):
+        return self._url()
+
+    @property
+    def url_anterior(self):
+        return self._url(antes=self.cursor_anterior)
+
+    @property
+    def url_proxima(self):
+        return self._url(depois=self.cursor_proximo)
+
+
+class ListaCursorView(ListView):
+    """
+    ``ListView`` com paginação por cursor (keyset), colunas podadas e total em cache.
+
+    Em vez de ``OFFSET`` + ``COUNT(*)`` a cada página, a próxima página é
+    "os registros depois do último exibido" na ordenação da listagem, que o
+    índice da ordenação resolve sem percorrer as páginas anteriores::
+
+        WHERE (data < :d) OR (data = :d AND id < :id) ORDER BY data DESC, id DESC
+
+    Atributos declarados por listagem:
+
+    * ``ordenacao``: campos da ordenação (padrão: ``Meta.ordering`` do modelo);
+      o ``id`` entra como desempate. Os campos não podem ser nulos.
+    * ``select_related``: FKs exibidas na tabela (sem uma consulta por linha).
+    * ``campos``: colunas carregadas com ``only()``; os campos da ordenação
+      entram automaticamente. ``None`` carrega todas.
+    * ``paginate_by``: registros por página.
+
+    O total (``page_obj.total``) vem do cache por ``LISTAS_CONTAGEM_TIMEOUT``
+    segundos, por consulta filtrada: é aproximado logo após gravações.
+    Os templates usam ``includes/paginacao_cursor.html``.
+    """
+    paginate_by = 10
+    ordenacao = None
+    select_related = ()
+    campos = None
+
+    def get_ordenacao(self):
+        """Lista de ``(attname, descendente)`` terminada pelo ``id``."""
+        nomes = self.ordenacao or self.model._meta.ordering or ['pk']
+        ordenacao = []
+        for nome in nomes:
+            descendente = nome.startswith('-')
+            campo = self.model._meta.get_field(nome.lstrip('-')) if nome.lstrip('-') != 'pk' else self.model._meta.pk
+            ordenacao.append((campo.attname, descendente))
+        pk = self.model._meta.pk.attname
+        if not any(attname == pk for attname, _descendente in ordenacao):
+            ordenacao.append((pk, ordenacao[0][1]))
+        return ordenacao
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.campos is not None:
+            queryset = queryset.only(*self.campos, *(attname for attname, _desc in self.get_ordenacao()))
+        return queryset
+
+    def contar(self, queryset):
+        """Total da listagem filtrada, em cache por alguns segundos."""
+        consulta = str(queryset.order_by().query)
+        chave = 'lista_contagem:{}:{}'.format(self.model._meta.label_lower, hashlib.md5(consulta.encode()).hexdigest())
+        return cache.get_or_set(chave, queryset.count, settings.LISTAS_CONTAGEM_TIMEOUT)
+
+    # -- cursor ----------------------------------------------------------
+
+    def _codificar(self, objeto, ordenacao):
+        valores = []
+        for attname, _descendente in ordenacao:
+            valor = getattr(objeto, attname)
+            if isinstance(valor, (datetime.date, datetime.time)):
+                valor = valor.isoformat()
+            elif isinstance(valor, decimal.Decimal):
+                valor = str(valor)
+            valores.append(valor)
+        return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode().rstrip('=')
+
+    def _decodificar(self, cursor, ordenacao):
+        """Valores do cursor convertidos para os tipos dos campos, ou None se inválido."""
+        try:
+            valores = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            if not isinstance(valores, list) or len(valores) != len(ordenacao):
+                return None
+            campos = {campo.attname: campo for campo in self.model._meta.concrete_fields}
+            valores = [campos[attname].to_python(valor) for (attname, _desc), valor in zip(ordenacao, valores)]
+            # Campos da ordenação não são nulos: null só vem de cursor forjado
+            return None if None in valores else valores
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            return None
+
+    @staticmethod
+    def _filtro_apos(ordenacao, valores, invertido):
+        """Registros estritamente depois (ou antes, se ``invertido``) da posição do cursor."""
+        filtro = Q()
+        for posicao, (attname, descendente) in enumerate(ordenacao):
+            operador = 'lt' if descendente != invertido else 'gt'
+            iguais = {nome: valor for (nome, _desc), valor in zip(ordenacao[:posicao], valores)}
+            filtro |= Q(**iguais, **{f'{attname}__{operador}': valores[posicao]})
+        return filtro
+
+    def paginate_queryset(self, queryset, page_size):
+        ordenacao = self.get_ordenacao()
+        ordem = [f'-{attname}' if desc else attname for attname, desc in ordenacao]
+        ordem_inversa = [attname if desc else f'-{attname}' for attname, desc in ordenacao]
+        total = self.contar(queryset)
+
+        antes = self._decodificar(self.request.GET.get('antes', ''), ordenacao)
+        depois = self._decodificar(self.request.GET.get('depois', ''), ordenacao) if antes is None else None
+        if antes is not None:
+            linhas = list(queryset.filter(self._filtro_apos(ordenacao, antes, True)).order_by(*ordem_inversa)[:page_size + 1])
+            tem_anterior, tem_proxima = len(linhas) > page_size, True
+            linhas = linhas[:page_size][::-1]
+        else:
+            if depois is not None:
+                queryset = queryset.filter(self._filtro_apos(ordenacao, depois, False))
+            linhas = list(queryset.order_by(*ordem)[:page_size + 1])
+            tem_anterior, tem_proxima = depois is not None, len(linhas) > page_size
+            linhas = linhas[:page_size]
+
+        pagina = PaginaCursor(
+            linhas,
+            self._codificar(linhas[0], ordenacao) if linhas and tem_anterior else None,
+            self._codificar(linhas[-1], ordenacao) if linhas and tem_proxima else None,
+            total,
+            self.request.GET,
+        )
+        return None, pagina, linhas, pagina.has_other_pages()
@@ -76,14 +76,19 @@ INSTALLED_APPS = [
     'configuracoes',
     'estoque',
     'documentos',
+    'busca',
+    'notificacoes',
+    'app',
 ]
 
 MIDDLEWARE = [
+    'app.middleware.MetricasViewMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'app.db.SerializarEscritaMiddleware',
+    'accounts.middleware.AutenticacaoEmSessaoMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -102,6 +107,7 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
                 'app.context_processors.configuracao_funeraria',
                 'app.context_processors.meta_tags_globais',
+                'app.context_processors.notificacoes_nao_lidas',
             ],
         },
     },
@@ -117,9 +123,34 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Conexões persistentes, verificadas antes de reutilizar
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Modo produção: WAL permite leituras concorrentes com uma escrita.
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA cache_size=-20000;'
+            ),
+            # Reserva o lock de escrita no início da transação (evita deadlock
+            # de upgrade de leitura para escrita)
+            'transaction_mode': 'IMMEDIATE',
+            # Busy timeout (segundos): escritores esperam o lock em vez de falhar.
+            # Não repetir como PRAGMA busy_timeout no init_command, que o sobrescreveria.
+            'timeout': 20,
+        },
     }
 }
 
+# Serializa as requisições de escrita dentro de cada processo (app.db)
+SQLITE_SERIALIZAR_ESCRITA = os.environ.get('SQLITE_SERIALIZAR_ESCRITA', '0') == '1'
+
+# Dashboards assíncronos (consultas em paralelo); ativado por padrão em app/asgi.py
+DASHBOARDS_ASSINCRONOS = os.environ.get('DASHBOARDS_ASSINCRONOS', '0') == '1'
+CONSULTAS_PARALELAS_MAX_WORKERS = int(os.environ.get('CONSULTAS_PARALELAS_MAX_WORKERS', '8'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -161,6 +192,16 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
 
+# collectstatic gera nomes com hash de conteúdo e variantes .gz/.br (app.estaticos)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'app.estaticos.EstaticosComprimidosStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -184,3 +225,138 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 
 
+
+# Cache compartilhado entre os workers (configuração ativa, fragmentos, etc.)
+# Com REDIS_URL usa o Redis (add() atômico, sem varrer diretório). Sem ele, o cache
+# em disco: cada set() conta os arquivos e, passado MAX_ENTRIES, remove 1/CULL_FREQUENCY
+# das entradas ao acaso (inclusive carimbos de versão, que apenas viram um cache miss).
+# O limite cobre as páginas públicas por agendamento e os fragmentos por período.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(BASE_DIR, 'cache'),
+            'OPTIONS': {
+                'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '20000')),
+                'CULL_FREQUENCY': 10,
+            },
+        }
+    }
+
+# Testes usam cache em memória (app.executor_testes)
+TEST_RUNNER = 'app.executor_testes.ExecutorTestes'
+
+# Validade máxima (segundos) dos fragmentos de dashboard ({% fragmento %}).
+# A invalidação normal é pela versão do domínio (accounts.signals).
+FRAGMENTOS_CACHE_TIMEOUT = 3600
+
+# Auditoria de login/logout (accounts.auditoria): gravada em lotes com bulk_create
+# quando o buffer junta N eventos ou o mais antigo espera T segundos.
+AUDITORIA_LOGIN_TAMANHO_LOTE = 50
+AUDITORIA_LOGIN_INTERVALO = 5
+
+# Permissões por cargo (accounts.permissoes) somadas às do usuário e dos grupos.
+# ModelBackend continua listado para as sessões abertas antes do CargoBackend.
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.CargoBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Notificações (notificacoes): caixa de entrada + entregas por e-mail/webhook feitas
+# pelo processo `python manage.py despachar_notificacoes` (fora das requisições).
+NOTIFICACOES_CANAIS = ('email', 'webhook')
+NOTIFICACOES_WEBHOOK_URL = os.environ.get('NOTIFICACOES_WEBHOOK_URL', '')  # vazio desativa o canal
+NOTIFICACOES_WEBHOOK_TIMEOUT = 5
+NOTIFICACOES_MAX_TENTATIVAS = 5
+NOTIFICACOES_BACKOFF_BASE = 30  # segundos; dobra a cada falha
+NOTIFICACOES_BACKOFF_MAXIMO = 3600
+NOTIFICACOES_NAO_LIDAS_TIMEOUT = 300
+
+# SMTP local para desenvolvimento (ex.: `python -m aiosmtpd -n -l localhost:1025`)
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '1025'))
+EMAIL_TIMEOUT = 10
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'notificacoes@funeraria.local')
+
+# Importação de funcionários pelo admin (funcionario.importacao): processos usados no
+# hash das senhas temporárias. O admin roda dentro da requisição, então o padrão 1
+# faz o hash no próprio worker; o comando importar_funcionarios usa --processos.
+FUNCIONARIOS_IMPORTACAO_PROCESSOS = 1
+
+# Calendário dos agendamentos (agendamento.calendario): janela dos feeds .ics em
+# dias antes/depois de hoje e intervalo máximo aceito pela API JSON.
+CALENDARIO_FEED_DIAS_PASSADOS = 30
+CALENDARIO_FEED_DIAS_FUTUROS = 365
+CALENDARIO_MAX_DIAS = 92
+
+# Página pública do agendamento (agendamento.pagina_publica): HTML em cache até o
+# agendamento mudar (limite em segundos) e max-age enviado aos navegadores/proxies
+AGENDAMENTO_PAGINA_PUBLICA_TIMEOUT = 86400
+AGENDAMENTO_PAGINA_PUBLICA_MAX_AGE = 60
+
+# Sugestão do responsável (agendamento.atribuicao): cargos elegíveis com o peso da
+# afinidade com a cerimônia e horas antes/depois do período usadas para medir a carga
+AGENDAMENTO_AFINIDADE_CARGO = {'coveiro': 3, 'preparador': 2, 'florista': 1}
+AGENDAMENTO_ATRIBUICAO_JANELA_HORAS = 72
+
+# Lembretes das cerimônias (agendamento.lembretes): minutos antes do início de cada
+# lembrete, lembretes por ciclo do enviador e função do canal de entrega
+# ('agendamento.lembretes.canal_log' só registra no log)
+AGENDAMENTO_LEMBRETES_ANTECEDENCIAS = (24 * 60, 2 * 60)
+AGENDAMENTO_LEMBRETES_LOTE = 200
+AGENDAMENTO_LEMBRETES_CANAL = 'agendamento.lembretes.canal_local'
+
+# Listagens por cursor (app.mixins.ListaCursorView): segundos em cache do total exibido
+LISTAS_CONTAGEM_TIMEOUT = 60
+
+
+# Métricas por view (app.middleware.MetricasViewMiddleware)
+# Amostras mantidas por view no buffer circular de cada processo
+METRICAS_TAMANHO_BUFFER = 500
+
+# Orçamento de consultas SQL por view (namespace:nome). Ao exceder, registra um aviso.
+METRICAS_ORCAMENTO_CONSULTAS = {
+    'dashboard_admin': 15,
+    'dashboard_vendedor': 12,
+    'dashboard_funcionario': 10,
+    'familia:list': 5,
+    'pessoa_falecida:list': 5,
+    'servico_contratado:list': 5,
+    'financeiro:list': 8,
+    'agendamento:list': 5,
+}
+
+# Log estruturado (JSON) gravado em lote por uma thread ouvinte (app.log_estruturado)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'eventos_json': {
+            '()': 'app.log_estruturado.FilaJSONHandler',
+            'filename': os.path.join(BASE_DIR, 'logs', 'eventos.jsonl'),
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'tamanho_lote': 50,
+            'intervalo_lote': 1.0,
+        },
+    },
+    'loggers': {
+        app_label: {
+            'handlers': ['eventos_json'],
+            'level': 'INFO',
+            'propagate': False,
+        }
+        for app_label in (
+            'accounts', 'agendamento', 'app', 'configuracoes', 'documentos',
+            'estoque', 'financeiro', 'funcionario', 'notificacoes', 'servico_contratado',
+        )
+    },
+}
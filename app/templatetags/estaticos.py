@@ -0,0 +1,11 @@
+from django import template
+
+from app.estaticos import vendor_url as _vendor_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor_url(caminho):
+    """URL de uma biblioteca de terceiros: local se vendorizada, senão CDN."""
+    return _vendor_url(caminho)
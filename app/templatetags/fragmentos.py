@@ -0,0 +1,53 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from app import fragmentos
+
+register = template.Library()
+
+
+class FragmentoNode(template.Node):
+    def __init__(self, nodelist, nome, dominios, extras):
+        self.nodelist = nodelist
+        self.nome = nome
+        self.dominios = dominios
+        self.extras = extras
+
+    def render(self, context):
+        usuario = context.get('user')
+        chave = fragmentos.chave_fragmento(
+            self.nome.resolve(context),
+            getattr(usuario, 'cargo', None),
+            [dominio for dominio in self.dominios.resolve(context).split(',') if dominio],
+            [extra.resolve(context) for extra in self.extras],
+        )
+        return mark_safe(fragmentos.obter_ou_renderizar(chave, lambda: self.nodelist.render(context)))
+
+
+@register.tag('fragmento')
+def fragmento(parser, token):
+    """
+    Guarda o bloco no cache por cargo do usuário e versão dos domínios.
+
+    Uso::
+
+        {% load fragmentos %}
+        {% fragmento "agenda" "agenda" hoje %}
+            ... consultas preguiçosas só são avaliadas numa falta de cache ...
+        {% endfragmento %}
+
+    Argumentos: nome do fragmento, domínios separados por vírgula
+    (``app.fragmentos.DOMINIOS``) e, opcionalmente, valores que também
+    variam a chave.
+    """
+    partes = token.split_contents()
+    if len(partes) < 3:
+        raise template.TemplateSyntaxError(f"'{partes[0]}' requer o nome do fragmento e os domínios.")
+    nodelist = parser.parse(('endfragmento',))
+    parser.delete_first_token()
+    return FragmentoNode(
+        nodelist,
+        parser.compile_filter(partes[1]),
+        parser.compile_filter(partes[2]),
+        [parser.compile_filter(parte) for parte in partes[3:]],
+    )
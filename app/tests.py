@@ -0,0 +1,263 @@
+import contextvars
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+from django.utils import timezone
+
+from accounts import views as accounts_views
+from accounts.models import CustomUser
+from agendamento.models import Agendamento
+from familia.models import Familia
+from funcionario.models import Funcionario
+from item_servico.models import ItemServico
+from pessoa_falecida.models import PessoaFalecida
+
+from . import metricas
+from .consultas_paralelas import executar_em_paralelo
+from .db import SerializarEscritaMiddleware
+from .log_estruturado import FilaJSONHandler
+
+# URLs dos testes: as duas versões de cada dashboard, qualquer que seja DASHBOARDS_ASSINCRONOS
+urlpatterns = [
+    path(f'teste/{modo}/{nome}/', getattr(accounts_views, f'dashboard_{nome}{sufixo}'))
+    for nome in ('admin', 'vendedor', 'funcionario')
+    for modo, sufixo in (('sincrono', ''), ('assincrono', '_async'))
+] + [path('', include('app.urls'))]
+
+
+class LogEstruturadoTest(SimpleTestCase):
+    """Registros gravados em JSON pela thread ouvinte."""
+
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.arquivo = os.path.join(diretorio.name, 'eventos.json')
+        self.handler = FilaJSONHandler(self.arquivo, intervalo_lote=0.05)
+        self.logger = logging.getLogger('app.tests.log_estruturado')
+        self.logger.propagate = False
+        self.logger.addHandler(self.handler)
+        self.addCleanup(self.logger.removeHandler, self.handler)
+
+    def registros(self):
+        self.handler.ouvinte.stop()
+        for handler in self.handler.ouvinte.handlers:
+            handler.close()
+        with open(self.arquivo, encoding='utf-8') as arquivo:
+            return [json.loads(linha) for linha in arquivo]
+
+    def test_excecao_em_campo_proprio(self):
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            self.logger.exception(
+                'Falha ao processar %s', 'lote 7', extra={'evento': 'teste.falha', 'dados': {'lote': 7}}
+            )
+        registro, = self.registros()
+        self.assertEqual(registro['mensagem'], 'Falha ao processar lote 7')
+        self.assertEqual(registro['evento'], 'teste.falha')
+        self.assertEqual(registro['dados'], {'lote': 7})
+        self.assertIn('Traceback', registro['excecao'])
+        self.assertIn('ZeroDivisionError', registro['excecao'])
+
+    def test_registro_sem_excecao(self):
+        self.logger.warning('Sem erro')
+        registro, = self.registros()
+        self.assertEqual(registro['mensagem'], 'Sem erro')
+        self.assertNotIn('excecao', registro)
+
+
+class MetricasViewsTest(TestCase):
+    """Métricas por view coletadas pelo ``MetricasViewMiddleware``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='senha123', cargo='adm')
+        cls.vendedor = CustomUser.objects.create_user('vendedor', password='senha123', cargo='vendedor')
+
+    def setUp(self):
+        metricas.limpar()
+        self.addCleanup(metricas.limpar)
+
+    def test_amostra_com_consultas_e_tempos_da_requisicao(self):
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get(reverse('familia:list'))
+        amostra, = metricas.amostras()['familia:list']
+        total_consultas, tempo_db, tempo_template, tempo_total = amostra
+        self.assertEqual(total_consultas, len(consultas))
+        self.assertGreater(tempo_template, 0)
+        self.assertGreaterEqual(tempo_total, tempo_db + tempo_template)
+
+    @override_settings(METRICAS_ORCAMENTO_CONSULTAS={'familia:list': 1, 'metricas_views': 100})
+    def test_aviso_so_quando_excede_o_orcamento(self):
+        self.client.force_login(self.admin)
+        with self.assertLogs('app.metricas', 'WARNING') as logs:
+            self.client.get(reverse('familia:list'))
+        self.assertIn('familia:list excedeu o orçamento de consultas', logs.output[0])
+
+        with self.assertNoLogs('app.metricas', 'WARNING'):
+            self.client.get(reverse('metricas_views'))
+
+    @override_settings(METRICAS_TAMANHO_BUFFER=3)
+    def test_buffer_circular_guarda_as_ultimas_amostras(self):
+        self.client.force_login(self.admin)
+        for _ in range(5):
+            self.client.get(reverse('metricas_views'))
+        self.assertEqual(len(metricas.amostras()['metricas_views']), 3)
+
+        resumo = self.client.get(reverse('metricas_views')).json()['views']['metricas_views']
+        self.assertEqual(resumo['requisicoes'], 3)
+        self.assertEqual(set(resumo['consultas']), {'p50', 'p95', 'p99'})
+
+    def test_endpoint_so_para_administradores(self):
+        url = reverse('metricas_views')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(self.vendedor)
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class SqliteProducaoTest(TestCase):
+    """Configuração do SQLite e o serializador de escritas (``app.db``)."""
+
+    def test_busy_timeout_e_o_do_settings(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.DATABASES['default']['OPTIONS']['timeout'] * 1000)
+
+    @override_settings(SQLITE_SERIALIZAR_ESCRITA=False)
+    def test_desativado_sai_da_pilha(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            SerializarEscritaMiddleware(lambda request: HttpResponse())
+
+    def simultaneas(self, metodo, quantidade=4):
+        """Maior número de requisições ``metodo`` dentro da view ao mesmo tempo."""
+        ativas, maximo, lock = [0], [0], threading.Lock()
+
+        def view(request):
+            with lock:
+                ativas[0] += 1
+                maximo[0] = max(maximo[0], ativas[0])
+            time.sleep(0.05)
+            with lock:
+                ativas[0] -= 1
+            return HttpResponse()
+
+        with self.settings(SQLITE_SERIALIZAR_ESCRITA=True):
+            middleware = SerializarEscritaMiddleware(view)
+        requisicao = RequestFactory().generic(metodo, '/')
+        threads = [threading.Thread(target=middleware, args=(requisicao,)) for _ in range(quantidade)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return maximo[0]
+
+    def test_escritas_em_fila_e_leituras_em_paralelo(self):
+        self.assertEqual(self.simultaneas('POST'), 1)
+        self.assertEqual(self.simultaneas('DELETE'), 1)
+        self.assertGreater(self.simultaneas('GET'), 1)
+
+
+@override_settings(ROOT_URLCONF='app.tests')
+class DashboardsAssincronosTest(TransactionTestCase):
+    """
+    Dashboards assíncronos (ASGI): mesmo contexto das versões síncronas.
+
+    ``TransactionTestCase``: as consultas em paralelo usam conexões de outras
+    threads, que só enxergam dados gravados.
+    """
+
+    CONSULTAS = {
+        'admin': ('indicadores', 'agendamentos_proximos', 'funcionarios_recentes', 'search_results'),
+        'vendedor': ('indicadores', 'agendamentos_proximos', 'itens_servico'),
+        'funcionario': ('indicadores', 'agendamentos_pendentes', 'todo_cards', 'sepultamentos'),
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.usuarios = {
+            'admin': CustomUser.objects.create_user('admin', password='senha123', cargo='adm'),
+            'vendedor': CustomUser.objects.create_user('vendedor', password='senha123', cargo='vendedor'),
+            'funcionario': CustomUser.objects.create_user('coveiro', password='senha123', cargo='coveiro'),
+        }
+        familia = Familia.objects.create(
+            nome_responsavel='Maria Souza', grau_parentesco='Filha', telefone='1133334444', endereco='Rua Teste, 1'
+        )
+        falecido = PessoaFalecida.objects.create(
+            nome='José Souza', data_nascimento=date(1940, 1, 1), data_falecimento=date.today(),
+            causa_obito='Natural', local_obito='Hospital', documento_cpf_rg='12345678900', familia=familia
+        )
+        funcionario = Funcionario.objects.create(
+            nome='Carlos', cargo='coveiro', telefone='11999999999', email='carlos@teste.com'
+        )
+        ItemServico.objects.create(
+            nome='Urna', descricao='Urna simples', quantidade=3, preco_unitario=Decimal('900.00')
+        )
+        Agendamento.objects.create(
+            pessoa_falecida=falecido, funcionario=funcionario,
+            data_agendamento=timezone.now() + timedelta(days=1), hora_agendamento='10:00',
+            local_velorio='Capela Central', local_sepultamento='Cemitério Central',
+            data_sepultamento=timezone.now() + timedelta(days=1, hours=2),
+        )
+
+    @staticmethod
+    def materializar(valor):
+        # Resultados de fragmentos chegam como SimpleLazyObject; isinstance enxerga o tipo real
+        if isinstance(valor, dict):
+            return dict(valor)
+        if isinstance(valor, list):
+            return list(valor)
+        return valor
+
+    def valores(self, resposta, nome):
+        return {consulta: self.materializar(resposta.context[consulta]) for consulta in self.CONSULTAS[nome]}
+
+    async def test_contexto_igual_ao_da_versao_sincrona(self):
+        for nome, usuario in self.usuarios.items():
+            with self.subTest(dashboard=nome):
+                await self.async_client.aforce_login(usuario)
+                await sync_to_async(cache.clear)()
+                sincrono = await self.async_client.get(f'/teste/sincrono/{nome}/')
+                await sync_to_async(cache.clear)()  # fragmentos em falta: as consultas vão para o pool
+                assincrono = await self.async_client.get(f'/teste/assincrono/{nome}/')
+                self.assertEqual(sincrono.status_code, 200)
+                self.assertEqual(assincrono.status_code, 200)
+                self.assertEqual(assincrono.content.count(b'Capela Central'), sincrono.content.count(b'Capela Central'))
+                esperado = await sync_to_async(self.valores)(sincrono, nome)
+                obtido = await sync_to_async(self.valores)(assincrono, nome)
+                self.assertEqual(esperado['indicadores']['total_familias'], 1)
+                self.assertEqual(obtido, esperado)
+
+    async def test_contexto_e_coletor_de_metricas_chegam_as_threads(self):
+        await sync_to_async(metricas._instrumentar_consultas)()
+        requisicao = contextvars.ContextVar('requisicao')
+        requisicao.set('abc')
+        coletor = metricas.ColetorRequisicao()
+        metricas.definir_coletor(coletor)
+        try:
+            resultados = await executar_em_paralelo({
+                'requisicao': requisicao.get,
+                'familias': Familia.objects.count,
+                'itens': lambda: list(ItemServico.objects.values_list('nome', flat=True)),
+            })
+        finally:
+            metricas.definir_coletor(None)
+        self.assertEqual(resultados, {'requisicao': 'abc', 'familias': 1, 'itens': ['Urna']})
+        self.assertEqual(coletor.consultas, 2)
@@ -15,9 +15,10 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.views.generic import TemplateView
 from accounts import views as accounts_views
+from app import views as app_views
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -27,9 +28,9 @@ urlpatterns = [
     path("accounts/", include("accounts.urls")),
     
     # URLs dos dashboards (sem namespace para facilitar redirecionamento)
-    path('dashboard/admin/', accounts_views.dashboard_admin, name='dashboard_admin'),
-    path('dashboard/vendedor/', accounts_views.dashboard_vendedor, name='dashboard_vendedor'),
-    path('dashboard/funcionario/', accounts_views.dashboard_funcionario, name='dashboard_funcionario'),
+    path('dashboard/admin/', accounts_views.dashboards['admin'], name='dashboard_admin'),
+    path('dashboard/vendedor/', accounts_views.dashboards['vendedor'], name='dashboard_vendedor'),
+    path('dashboard/funcionario/', accounts_views.dashboards['funcionario'], name='dashboard_funcionario'),
     
     path('funcionarios/', include('funcionario.urls')),
     path('familias/', include('familia.urls')),
@@ -42,8 +43,19 @@ urlpatterns = [
     path("estoque/", include("estoque.urls")),
     path("configuracoes/", include("configuracoes.urls")),
     path("documentos/", include("documentos.urls")),
+    path("busca/", include("busca.urls")),
+    path("notificacoes/", include("notificacoes.urls")),
+    
+    # Métricas de desempenho por view (apenas administradores)
+    path('metricas/', app_views.metricas_views, name='metricas_views'),
 ]
 
 # Serve media files during development
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+else:
+    # Estáticos com hash: variantes pré-comprimidas e cache de longa duração
+    from app.estaticos import servir_estatico
+    urlpatterns += [
+        re_path(r'^%s(?P<caminho>.*)$' % settings.STATIC_URL.lstrip('/'), servir_estatico),
+    ]
@@ -0,0 +1,20 @@
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import JsonResponse
+
+from . import metricas
+
+
+def is_admin(user):
+    """Verifica se o usuário é administrador."""
+    return user.is_authenticated and getattr(user, 'is_admin', False)
+
+
+@login_required
+@user_passes_test(is_admin)
+def metricas_views(request):
+    """Retorna p50/p95/p99 de consultas e tempos por view (apenas administradores)."""
+    if request.GET.get('escopo') == 'todos':
+        dados = metricas.amostras_compartilhadas()
+    else:
+        dados = metricas.amostras()
+    return JsonResponse({'views': metricas.resumir(dados)})
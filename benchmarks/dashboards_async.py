@@ -0,0 +1,183 @@
+"""
+Benchmark dos dashboards: versões síncronas (WSGI) x assíncronas (ASGI).
+
+Gera um banco temporário com ``gerar_dados_sinteticos`` e, em processos
+separados, mede os três dashboards:
+
+- sync:   views síncronas pelo handler WSGI (django.test.Client), uma thread
+          por requisição concorrente
+- async:  views assíncronas pelo handler ASGI (django.test.AsyncClient), com
+          as consultas independentes executadas em paralelo
+
+Uso:
+    python benchmarks/dashboards_async.py --familias 5000 --requisicoes 30 --concorrencia 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+MODOS = ('sync', 'async')
+DASHBOARDS = ('dashboard_admin', 'dashboard_vendedor', 'dashboard_funcionario')
+
+
+def configurar_django(caminho_banco):
+    """Configura o Django apontando para o banco do benchmark."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = caminho_banco
+    settings.LOGGING = {'version': 1, 'disable_existing_loggers': True}
+    settings.ALLOWED_HOSTS = ['*']
+
+    import django
+    django.setup()
+
+
+def preparar_banco(caminho_banco, familias):
+    configurar_django(caminho_banco)
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    call_command('gerar_dados_sinteticos', familias=familias, semente=42, forcar=True, verbosity=0)
+
+
+def medir_sync(usuario, url, requisicoes, concorrencia):
+    from django.db import connection
+    from django.test import Client
+
+    latencias = []
+    lock = threading.Lock()
+    restantes = [requisicoes]
+
+    def worker():
+        client = Client()
+        client.force_login(usuario)
+        try:
+            while True:
+                with lock:
+                    if restantes[0] <= 0:
+                        return
+                    restantes[0] -= 1
+                inicio = time.perf_counter()
+                resposta = client.get(url)
+                duracao = time.perf_counter() - inicio
+                assert resposta.status_code == 200, resposta.status_code
+                with lock:
+                    latencias.append(duracao * 1000)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concorrencia)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencias, time.perf_counter() - inicio
+
+
+def medir_async(usuario, url, requisicoes, concorrencia):
+    from django.test import AsyncClient
+
+    async def executar():
+        latencias = []
+        fila = asyncio.Queue()
+        for _ in range(requisicoes):
+            fila.put_nowait(url)
+
+        async def worker():
+            client = AsyncClient()
+            await client.aforce_login(usuario)
+            while not fila.empty():
+                caminho = fila.get_nowait()
+                inicio = time.perf_counter()
+                resposta = await client.get(caminho)
+                duracao = time.perf_counter() - inicio
+                assert resposta.status_code == 200, resposta.status_code
+                latencias.append(duracao * 1000)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concorrencia)))
+        return latencias, time.perf_counter() - inicio
+
+    return asyncio.run(executar())
+
+
+def executar_modo(modo, caminho_banco, requisicoes, concorrencia):
+    """Roda em um processo próprio (o modo define as URLs na importação)."""
+    os.environ['DASHBOARDS_ASSINCRONOS'] = '1' if modo == 'async' else '0'
+    configurar_django(caminho_banco)
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from app.metricas import percentil
+
+    usuario = get_user_model().objects.get(username='sintetico')
+    medir = medir_async if modo == 'async' else medir_sync
+    resultado = {}
+    for nome in DASHBOARDS:
+        url = reverse(nome)
+        medir(usuario, url, 2, 1)  # aquecimento
+        latencias, duracao = medir(usuario, url, requisicoes, concorrencia)
+        latencias.sort()
+        resultado[nome] = {
+            'req_s': len(latencias) / duracao,
+            'p50': percentil(latencias, 50),
+            'p95': percentil(latencias, 95),
+        }
+    print(json.dumps(resultado))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--familias', type=int, default=5000)
+    parser.add_argument('--requisicoes', type=int, default=30, help='Requisições por dashboard.')
+    parser.add_argument('--concorrencia', type=int, default=4)
+    parser.add_argument('--modo', choices=MODOS, help=argparse.SUPPRESS)
+    parser.add_argument('--preparar', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--banco', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.preparar:
+        preparar_banco(args.banco, args.familias)
+        return
+    if args.modo:
+        executar_modo(args.modo, args.banco, args.requisicoes, args.concorrencia)
+        return
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_banco = os.path.join(diretorio, 'benchmark.sqlite3')
+        print(f'Gerando dados sintéticos ({args.familias} famílias)...')
+        subprocess.run(
+            [sys.executable, __file__, '--preparar', '--banco', caminho_banco, '--familias', str(args.familias)],
+            check=True, cwd=BASE_DIR,
+        )
+
+        resultados = {}
+        for modo in MODOS:
+            processo = subprocess.run(
+                [sys.executable, __file__, '--modo', modo, '--banco', caminho_banco,
+                 '--requisicoes', str(args.requisicoes), '--concorrencia', str(args.concorrencia)],
+                check=True, capture_output=True, text=True, cwd=BASE_DIR,
+            )
+            resultados[modo] = json.loads(processo.stdout.strip().splitlines()[-1])
+
+    print(f'\n{args.requisicoes} requisições por dashboard, concorrência {args.concorrencia}\n')
+    print(f"{'Dashboard':<24} {'Modo':<6} {'Req/s':>8} {'p50 ms':>9} {'p95 ms':>9}")
+    print('-' * 60)
+    for nome in DASHBOARDS:
+        for modo in MODOS:
+            r = resultados[modo][nome]
+            print(f"{nome:<24} {modo:<6} {r['req_s']:>8.1f} {r['p50']:>9.1f} {r['p95']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark de inicialização a frio da aplicação WSGI.
+
+Cada repetição abre um interpretador novo com ``python -X importtime``,
+importa ``app.wsgi`` e carrega o URLconf (o que a primeira requisição faria,
+importando as views de todos os apps). Mede:
+
+- tempo total de importação (ms)
+- memória residente (RSS) do processo ao final
+- custo de importação por pacote de nível superior (tempo "self" somado)
+- se módulos pesados (ex.: reportlab) foram carregados na inicialização
+
+Uso:
+    python benchmarks/inicializacao.py --repeticoes 5
+    python benchmarks/inicializacao.py --limite-ms 1500 --limite-rss-mb 120  # falha se regredir
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que não devem ser carregados na inicialização dos workers
+MODULOS_PREGUICOSOS = ('reportlab',)
+
+CODIGO_FILHO = f"""
+import json, sys, time
+inicio = time.perf_counter()
+import app.wsgi
+from django.urls import get_resolver
+get_resolver().url_patterns
+tempo_ms = (time.perf_counter() - inicio) * 1000
+
+rss_kb = 0
+try:
+    with open('/proc/self/status') as status:
+        for linha in status:
+            if linha.startswith('VmRSS:'):
+                rss_kb = int(linha.split()[1])
+except OSError:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+print(json.dumps({{
+    'tempo_ms': tempo_ms,
+    'rss_kb': rss_kb,
+    'modulos': len(sys.modules),
+    'preguicosos_carregados': [m for m in {MODULOS_PREGUICOSOS!r} if m in sys.modules],
+}}))
+"""
+
+
+def executar_uma_vez():
+    """Roda um interpretador novo e retorna (métricas, custo por pacote em µs)."""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='app.settings', PYTHONDONTWRITEBYTECODE='')
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CODIGO_FILHO],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    metricas = json.loads(processo.stdout.strip().splitlines()[-1])
+
+    por_pacote = Counter()
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, _cumulativo, modulo = linha[len('import time:'):].split('|')
+        por_pacote[modulo.strip().split('.')[0]] += int(proprio)
+    return metricas, por_pacote
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='Quantidade de pacotes no ranking.')
+    parser.add_argument('--limite-ms', type=float, help='Falha se a mediana do tempo passar deste valor.')
+    parser.add_argument('--limite-rss-mb', type=float, help='Falha se a mediana do RSS passar deste valor.')
+    parser.add_argument('--json', action='store_true', help='Imprime o resultado em JSON.')
+    args = parser.parse_args()
+
+    tempos, rss, modulos = [], [], []
+    preguicosos = set()
+    por_pacote = Counter()
+    for _ in range(args.repeticoes):
+        metricas, pacotes = executar_uma_vez()
+        tempos.append(metricas['tempo_ms'])
+        rss.append(metricas['rss_kb'] / 1024)
+        modulos.append(metricas['modulos'])
+        preguicosos.update(metricas['preguicosos_carregados'])
+        por_pacote.update(pacotes)
+
+    resultado = {
+        'repeticoes': args.repeticoes,
+        'tempo_ms_mediana': round(statistics.median(tempos), 1),
+        'tempo_ms_min': round(min(tempos), 1),
+        'rss_mb_mediana': round(statistics.median(rss), 1),
+        'modulos': int(statistics.median(modulos)),
+        'preguicosos_carregados': sorted(preguicosos),
+        'pacotes_ms': {
+            pacote: round(total / args.repeticoes / 1000, 1)
+            for pacote, total in por_pacote.most_common(args.top)
+        },
+    }
+
+    if args.json:
+        print(json.dumps(resultado, indent=2))
+    else:
+        print(f"Repetições:           {resultado['repeticoes']}")
+        print(f"Tempo (mediana/mín):  {resultado['tempo_ms_mediana']} / {resultado['tempo_ms_min']} ms")
+        print(f"RSS (mediana):        {resultado['rss_mb_mediana']} MB")
+        print(f"Módulos carregados:   {resultado['modulos']}")
+        print(f"Módulos preguiçosos carregados na inicialização: "
+              f"{', '.join(resultado['preguicosos_carregados']) or 'nenhum'}")
+        print(f"\n{'Pacote':<30} {'Importação (ms)':>16}")
+        print('-' * 47)
+        for pacote, ms in resultado['pacotes_ms'].items():
+            print(f'{pacote:<30} {ms:>16.1f}')
+
+    falhas = []
+    if args.limite_ms is not None and resultado['tempo_ms_mediana'] > args.limite_ms:
+        falhas.append(f"tempo {resultado['tempo_ms_mediana']} ms > limite {args.limite_ms} ms")
+    if args.limite_rss_mb is not None and resultado['rss_mb_mediana'] > args.limite_rss_mb:
+        falhas.append(f"RSS {resultado['rss_mb_mediana']} MB > limite {args.limite_rss_mb} MB")
+    if resultado['preguicosos_carregados']:
+        falhas.append(f"módulos carregados na inicialização: {', '.join(resultado['preguicosos_carregados'])}")
+    if falhas:
+        print('\nREGRESSÃO: ' + '; '.join(falhas), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
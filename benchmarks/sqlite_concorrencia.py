@@ -0,0 +1,168 @@
+"""
+Benchmark de escrita concorrente no SQLite.
+
+Simula vários workers (processos) com várias threads criando contratos
+(ServicoContratado + itens + Financeiro em uma transação, como em
+``servico_contratado_create``) e compara três modos de banco:
+
+- padrao:       configuração original do Django (sem PRAGMAs)
+- producao:     WAL, synchronous=NORMAL, busy_timeout e BEGIN IMMEDIATE
+- serializado:  modo produção + serializador de escrita em processo
+
+Uso:
+    python benchmarks/sqlite_concorrencia.py --processos 4 --threads 4 --contratos 50
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+MODOS = ('padrao', 'producao', 'serializado')
+
+
+def configurar_django(modo, caminho_banco):
+    """Configura o Django apontando para o banco do benchmark."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    from django.conf import settings
+
+    banco = settings.DATABASES['default']
+    banco['NAME'] = caminho_banco
+    if modo == 'padrao':
+        banco['OPTIONS'] = {}
+        banco['CONN_MAX_AGE'] = 0
+    settings.LOGGING = {'version': 1, 'disable_existing_loggers': True}
+
+    import django
+    django.setup()
+
+
+def preparar_banco(modo, caminho_banco):
+    configurar_django(modo, caminho_banco)
+    from django.core.management import call_command
+    from item_servico.models import ItemServico
+
+    call_command('migrate', verbosity=0)
+    ItemServico.objects.bulk_create([
+        ItemServico(nome=f'Item {i}', descricao='Item de benchmark', quantidade=10, preco_unitario=100 + i)
+        for i in range(5)
+    ])
+
+
+def criar_contrato(indice):
+    """Reproduz as escritas de servico_contratado_create em uma transação."""
+    from datetime import date, timedelta
+    from decimal import Decimal
+    from django.db import transaction
+    from familia.models import Familia
+    from pessoa_falecida.models import PessoaFalecida
+    from item_servico.models import ItemServico
+    from servico_contratado.models import ServicoContratado, ItemServicoContratado
+    from financeiro.models import Financeiro
+
+    with transaction.atomic():
+        familia = Familia.objects.create(
+            nome_responsavel=f'Responsável {indice}', grau_parentesco='Filho(a)',
+            telefone='(11) 99999-0000', endereco='Rua do Benchmark, 1',
+        )
+        pessoa = PessoaFalecida.objects.create(
+            nome=f'Falecido {indice}', data_nascimento=date(1940, 1, 1),
+            data_falecimento=date(2024, 1, 1), causa_obito='Natural',
+            local_obito='Hospital', documento_cpf_rg='12345678901', familia=familia,
+        )
+        servico = ServicoContratado.objects.create(pessoa_falecida=pessoa, taxa_imposto=Decimal('10.00'))
+        for item in ItemServico.objects.all()[:3]:
+            ItemServicoContratado.objects.create(
+                servico_contratado=servico, item_servico=item, quantidade=1,
+                valor_unitario=item.preco_unitario,
+            )
+        servico.pdf_nota_fiscal = f'notas_fiscais/nota_fiscal_{servico.pk}.pdf'
+        servico.save(update_fields=['pdf_nota_fiscal'])
+        Financeiro.objects.create(
+            pessoa_falecida=pessoa, servico_contratado=servico, tipo='receita',
+            descricao=f'Serviços funerários - {pessoa.nome}', valor=servico.valor_total,
+            data_vencimento=date.today() + timedelta(days=30), status='pendente',
+        )
+
+
+def _worker(modo, caminho_banco, threads, contratos, fila):
+    configurar_django(modo, caminho_banco)
+    from django.db import OperationalError, connection
+    from app.db import escrita_serializada
+
+    resultados = {'ok': 0, 'erros': 0}
+    lock = threading.Lock()
+
+    def executar(thread_id):
+        for i in range(contratos):
+            try:
+                if modo == 'serializado':
+                    with escrita_serializada():
+                        criar_contrato(f'{os.getpid()}-{thread_id}-{i}')
+                else:
+                    criar_contrato(f'{os.getpid()}-{thread_id}-{i}')
+                with lock:
+                    resultados['ok'] += 1
+            except OperationalError:
+                with lock:
+                    resultados['erros'] += 1
+        connection.close()
+
+    lista = [threading.Thread(target=executar, args=(t,)) for t in range(threads)]
+    for thread in lista:
+        thread.start()
+    for thread in lista:
+        thread.join()
+    fila.put(resultados)
+
+
+def executar_modo(modo, processos, threads, contratos, diretorio):
+    contexto = multiprocessing.get_context('spawn')
+    caminho_banco = os.path.join(diretorio, f'{modo}.sqlite3')
+
+    preparo = contexto.Process(target=preparar_banco, args=(modo, caminho_banco))
+    preparo.start()
+    preparo.join()
+
+    fila = contexto.Queue()
+    lista = [
+        contexto.Process(target=_worker, args=(modo, caminho_banco, threads, contratos, fila))
+        for _ in range(processos)
+    ]
+    inicio = time.perf_counter()
+    for processo in lista:
+        processo.start()
+    resultados = [fila.get() for _ in lista]
+    for processo in lista:
+        processo.join()
+    duracao = time.perf_counter() - inicio
+
+    ok = sum(r['ok'] for r in resultados)
+    erros = sum(r['erros'] for r in resultados)
+    return {'modo': modo, 'ok': ok, 'erros': erros, 'duracao': duracao, 'vazao': ok / duracao}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processos', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--contratos', type=int, default=25, help='Contratos por thread')
+    parser.add_argument('--modos', nargs='+', choices=MODOS, default=list(MODOS))
+    args = parser.parse_args()
+
+    total = args.processos * args.threads * args.contratos
+    print(f'{args.processos} processos x {args.threads} threads x {args.contratos} contratos = {total} transações\n')
+    print(f"{'Modo':<14} {'OK':>6} {'Erros':>6} {'Tempo (s)':>10} {'Contratos/s':>12}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for modo in args.modos:
+            r = executar_modo(modo, args.processos, args.threads, args.contratos, diretorio)
+            print(f"{r['modo']:<14} {r['ok']:>6} {r['erros']:>6} {r['duracao']:>10.2f} {r['vazao']:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class BuscaConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'busca'
+    verbose_name = 'Busca'
+
+    def ready(self):
+        """Importa signals quando o app estiver pronto."""
+        import busca.signals
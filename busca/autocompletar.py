@@ -0,0 +1,65 @@
+"""
+Autocomplete paginado para os campos de escolha dos formulários.
+
+Substitui os ``<select>`` com todas as linhas de famílias, falecidos e
+funcionários: o navegador pede uma página por vez a
+``busca:autocompletar`` e o widget (``busca.widgets.AutocompleteSelect``)
+renderiza no servidor apenas a opção selecionada.
+
+Com texto, a página vem do índice FTS5 (``busca.indice``); sem texto, da
+ordenação padrão do modelo, coberta pelos índices (nome/data + id).
+"""
+from django.apps import apps as apps_instalados
+
+from . import indice
+
+POR_PAGINA = 20
+
+# Colunas necessárias para o rótulo (__str__) e a ordenação de cada tipo
+ENTIDADES = {
+    'familia': {
+        'campos': ('nome_responsavel', 'grau_parentesco'),
+        'ordenacao': ('nome_responsavel', 'id'),
+    },
+    'falecido': {
+        'campos': ('nome', 'data_falecimento'),
+        'ordenacao': ('-data_falecimento', '-id'),
+    },
+    'funcionario': {
+        'campos': ('nome', 'cargo'),
+        'ordenacao': ('nome', 'id'),
+    },
+}
+
+
+def modelo_da_entidade(entidade):
+    return apps_instalados.get_model(indice.TIPOS[entidade]['modelo'])
+
+
+def paginar(entidade, termo='', pagina=1, por_pagina=POR_PAGINA):
+    """
+    Uma página de resultados do autocomplete.
+
+    Busca ``por_pagina + 1`` linhas para saber se há próxima página sem
+    precisar de ``COUNT(*)``.
+
+    Returns:
+        tuple: (lista de objetos, há mais páginas?)
+    """
+    config = ENTIDADES[entidade]
+    deslocamento = (max(pagina, 1) - 1) * por_pagina
+    queryset = modelo_da_entidade(entidade).objects.only('pk', *config['campos'])
+    termo = (termo or '').strip()
+
+    if termo and indice.disponivel():
+        encontrados = indice.buscar_ids(termo, [entidade], por_pagina + 1, deslocamento)
+        if not encontrados:
+            return [], False
+        pks = [pk for _, pk in encontrados[:por_pagina]]
+        objetos = queryset.in_bulk(pks)
+        return [objetos[pk] for pk in pks if pk in objetos], len(encontrados) > por_pagina
+
+    if termo:
+        queryset = queryset.filter(indice.TIPOS[entidade]['filtro_simples'](termo))
+    objetos = list(queryset.order_by(*config['ordenacao'])[deslocamento:deslocamento + por_pagina + 1])
+    return objetos[:por_pagina], len(objetos) > por_pagina
@@ -0,0 +1,337 @@
+"""
+Índice de busca textual para famílias, falecidos e funcionários.
+
+No SQLite, uma tabela virtual FTS5 (``busca_indice``) funciona como índice
+"sombra" das três tabelas. Cada linha guarda o texto já normalizado
+(minúsculas, sem acentos) e os números (CPF/RG, telefones) só com dígitos,
+de modo que "joao" encontra "João" e "123.456" encontra "12345678900".
+Os signals de ``busca.signals`` mantêm o índice sincronizado e o comando
+``reconstruir_indice_busca`` o recria do zero.
+
+Em outros bancos (ou antes da migração) a busca usa ``icontains``.
+"""
+import re
+import unicodedata
+
+from django.apps import apps as apps_instalados
+from django.db import connection
+from django.db.models import Q
+from django.urls import reverse
+
+TABELA = 'busca_indice'
+# Pesos do bm25 por coluna: titulo, texto, digitos
+PESOS_BM25 = (10.0, 2.0, 5.0)
+# rowid = pk * FATOR_ROWID + código do tipo
+FATOR_ROWID = 4
+LIMITE_PADRAO = 10
+
+_tabela_existe = False
+
+
+# ---------------------------------------------------------------------------
+# Normalização
+# ---------------------------------------------------------------------------
+
+def normalizar(texto):
+    """Minúsculas, sem acentos e apenas letras/números separados por espaço."""
+    if not texto:
+        return ''
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(re.findall(r'[a-z0-9]+', sem_acentos.lower()))
+
+
+def somente_digitos(texto):
+    return re.sub(r'\D', '', texto or '')
+
+
+def variantes_numero(texto):
+    """
+    Dígitos de um documento/telefone e seus finais (sem DDI/DDD), para que
+    a busca por prefixo encontre "99999-8888" ou "8888" em "(11) 99999-8888".
+    """
+    digitos = somente_digitos(texto)
+    if not digitos:
+        return []
+    variantes = [digitos]
+    for tamanho in (9, 8, 4):
+        if len(digitos) > tamanho:
+            variantes.append(digitos[-tamanho:])
+    return list(dict.fromkeys(variantes))
+
+
+def _eh_numero(termo):
+    """Termo formado só por dígitos e pontuação de documentos/telefones."""
+    return bool(re.fullmatch(r'[\d\s.\-/()+]+', termo)) and any(c.isdigit() for c in termo)
+
+
+def montar_consulta(termo):
+    """
+    Converte o texto digitado em uma consulta FTS5 com busca por prefixo.
+
+    Todos os termos precisam aparecer (AND implícito). Um número com
+    pontuação ("123.456.789-00") vira um único termo só com dígitos.
+    """
+    termo = (termo or '').strip()
+    if not termo:
+        return None
+    if _eh_numero(termo):
+        tokens = [somente_digitos(termo)]
+    else:
+        tokens = normalizar(termo).split()
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+# ---------------------------------------------------------------------------
+# Tipos indexados
+# ---------------------------------------------------------------------------
+
+def _documento_familia(familia):
+    return (
+        familia.nome_responsavel,
+        ' '.join(filter(None, [familia.email, familia.grau_parentesco])),
+        variantes_numero(familia.telefone),
+    )
+
+
+def _documento_falecido(falecido):
+    return (
+        falecido.nome,
+        falecido.documento_cpf_rg or '',
+        variantes_numero(falecido.documento_cpf_rg),
+    )
+
+
+def _documento_funcionario(funcionario):
+    return (
+        funcionario.nome,
+        ' '.join(filter(None, [funcionario.email, funcionario.cargo])),
+        variantes_numero(funcionario.telefone),
+    )
+
+
+def _resultado_familia(familia):
+    return {
+        'name': familia.nome_responsavel,
+        'type': 'Família',
+        'description': f'Telefone: {familia.telefone} | Email: {familia.email}',
+        'url': reverse('familia:detail', kwargs={'pk': familia.pk}),
+    }
+
+
+def _resultado_falecido(falecido):
+    return {
+        'name': falecido.nome,
+        'type': 'Falecido',
+        'description': f'Família: {falecido.familia.nome_responsavel} | Data: {falecido.data_falecimento.strftime("%d/%m/%Y")}',
+        'url': reverse('pessoa_falecida:detail', kwargs={'pk': falecido.pk}),
+        'imagem_url': falecido.imagem.url if falecido.imagem else None,
+    }
+
+
+def _resultado_funcionario(funcionario):
+    return {
+        'name': funcionario.nome,
+        'type': 'Funcionário',
+        'description': f'Cargo: {funcionario.cargo} | Telefone: {funcionario.telefone}',
+        'url': reverse('funcionario:detail', kwargs={'pk': funcionario.pk}),
+        'imagem_url': funcionario.usuario.foto_perfil.url if funcionario.usuario and funcionario.usuario.foto_perfil else None,
+    }
+
+
+TIPOS = {
+    'familia': {
+        'codigo': 1,
+        'modelo': 'familia.Familia',
+        'documento': _documento_familia,
+        'resultado': _resultado_familia,
+        'campos': ('nome_responsavel', 'email', 'grau_parentesco', 'telefone'),
+        'select_related': (),
+        # Busca sem índice (icontains), igual à busca original do dashboard
+        'filtro_simples': lambda termo: (
+            Q(nome_responsavel__icontains=termo) | Q(telefone__icontains=termo) | Q(email__icontains=termo)
+        ),
+    },
+    'falecido': {
+        'codigo': 2,
+        'modelo': 'pessoa_falecida.PessoaFalecida',
+        'documento': _documento_falecido,
+        'resultado': _resultado_falecido,
+        'campos': ('nome', 'documento_cpf_rg'),
+        'select_related': ('familia',),
+        'filtro_simples': lambda termo: Q(nome__icontains=termo) | Q(documento_cpf_rg__icontains=termo),
+    },
+    'funcionario': {
+        'codigo': 3,
+        'modelo': 'funcionario.Funcionario',
+        'documento': _documento_funcionario,
+        'resultado': _resultado_funcionario,
+        'campos': ('nome', 'email', 'cargo', 'telefone'),
+        'select_related': ('usuario',),
+        'filtro_simples': lambda termo: Q(nome__icontains=termo) | Q(telefone__icontains=termo),
+    },
+}
+TIPO_POR_MODELO = {config['modelo']: tipo for tipo, config in TIPOS.items()}
+TIPO_POR_CODIGO = {config['codigo']: tipo for tipo, config in TIPOS.items()}
+
+
+# ---------------------------------------------------------------------------
+# Manutenção do índice
+# ---------------------------------------------------------------------------
+
+def disponivel(conexao=None):
+    """Indica se o índice FTS5 pode ser usado na conexão."""
+    global _tabela_existe
+    conexao = conexao or connection
+    if conexao.vendor != 'sqlite':
+        return False
+    if not _tabela_existe:
+        _tabela_existe = TABELA in conexao.introspection.table_names()
+    return _tabela_existe
+
+
+def _rowid(tipo, pk):
+    return pk * FATOR_ROWID + TIPOS[tipo]['codigo']
+
+
+def _linha(tipo, instancia):
+    titulo, texto, numeros = TIPOS[tipo]['documento'](instancia)
+    return (_rowid(tipo, instancia.pk), normalizar(titulo), normalizar(texto), ' '.join(numeros))
+
+
+def indexar(instancia):
+    """Insere ou atualiza a instância no índice."""
+    tipo = TIPO_POR_MODELO[instancia._meta.label]
+    linha = _linha(tipo, instancia)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA} WHERE rowid = %s', [linha[0]])
+        cursor.execute(f'INSERT INTO {TABELA} (rowid, titulo, texto, digitos) VALUES (%s, %s, %s, %s)', linha)
+
+
+def indexar_em_lote(instancias):
+    """Insere no índice instâncias novas (criadas com ``bulk_create``, sem signals)."""
+    linhas = [_linha(TIPO_POR_MODELO[instancia._meta.label], instancia) for instancia in instancias]
+    if linhas:
+        with connection.cursor() as cursor:
+            _inserir_lote(cursor, linhas)
+
+
+def remover(instancia):
+    """Remove a instância do índice."""
+    tipo = TIPO_POR_MODELO[instancia._meta.label]
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA} WHERE rowid = %s', [_rowid(tipo, instancia.pk)])
+
+
+def reconstruir(conexao=None, obter_modelo=apps_instalados.get_model, tamanho_lote=2000):
+    """
+    Recria o índice a partir das tabelas.
+
+    Args:
+        obter_modelo: permite usar os modelos históricos dentro de migrações.
+
+    Returns:
+        dict: {tipo: quantidade de linhas indexadas}
+    """
+    conexao = conexao or connection
+    totais = {}
+    with conexao.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA}')
+        for tipo, config in TIPOS.items():
+            modelo = obter_modelo(*config['modelo'].split('.'))
+            lote = []
+            totais[tipo] = 0
+            for instancia in modelo.objects.only('pk', *config['campos']).iterator(chunk_size=tamanho_lote):
+                lote.append(_linha(tipo, instancia))
+                if len(lote) >= tamanho_lote:
+                    _inserir_lote(cursor, lote)
+                    totais[tipo] += len(lote)
+                    lote = []
+            if lote:
+                _inserir_lote(cursor, lote)
+                totais[tipo] += len(lote)
+        cursor.execute(f"INSERT INTO {TABELA} ({TABELA}) VALUES ('optimize')")
+    return totais
+
+
+def _inserir_lote(cursor, lote):
+    cursor.executemany(f'INSERT INTO {TABELA} (rowid, titulo, texto, digitos) VALUES (%s, %s, %s, %s)', lote)
+
+
+# ---------------------------------------------------------------------------
+# Busca
+# ---------------------------------------------------------------------------
+
+def buscar(termo, tipos=None, limite=LIMITE_PADRAO):
+    """
+    Busca nos tipos informados (padrão: todos), ordenando por relevância.
+
+    Returns:
+        list: dicionários com tipo, name, type, description, url e imagem_url.
+    """
+    tipos = [tipo for tipo in (tipos or TIPOS) if tipo in TIPOS]
+    if not tipos or not (termo or '').strip():
+        return []
+    if not disponivel():
+        return _buscar_sem_indice(termo.strip(), tipos, limite)
+
+    encontrados = buscar_ids(termo, tipos, limite)
+    if encontrados is None:
+        return []
+
+    # Uma consulta por tipo para montar os resultados, mantendo a ordem do ranking
+    pks_por_tipo = {}
+    for tipo, pk in encontrados:
+        pks_por_tipo.setdefault(tipo, []).append(pk)
+    objetos = {}
+    for tipo, pks in pks_por_tipo.items():
+        config = TIPOS[tipo]
+        modelo = apps_instalados.get_model(config['modelo'])
+        for pk, objeto in modelo.objects.select_related(*config['select_related']).in_bulk(pks).items():
+            objetos[(tipo, pk)] = objeto
+
+    resultados = []
+    for tipo, pk in encontrados:
+        objeto = objetos.get((tipo, pk))
+        if objeto is not None:
+            resultados.append({'tipo': tipo, **TIPOS[tipo]['resultado'](objeto)})
+    return resultados
+
+
+def buscar_ids(termo, tipos, limite, deslocamento=0):
+    """
+    Consulta só o índice FTS5, ordenando por relevância.
+
+    Returns:
+        list: pares (tipo, pk), ou None se o termo não gera consulta.
+    """
+    consulta = montar_consulta(termo)
+    if consulta is None:
+        return None
+
+    codigos = ', '.join(str(TIPOS[tipo]['codigo']) for tipo in tipos)
+    pesos = ', '.join(str(peso) for peso in PESOS_BM25)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {TABELA} WHERE {TABELA} MATCH %s '
+            f'AND (rowid %% {FATOR_ROWID}) IN ({codigos}) '
+            f'ORDER BY bm25({TABELA}, {pesos}) LIMIT %s OFFSET %s',
+            [consulta, limite, deslocamento],
+        )
+        return [
+            (TIPO_POR_CODIGO[codigo], pk)
+            for pk, codigo in (divmod(rowid, FATOR_ROWID) for (rowid,) in cursor.fetchall())
+        ]
+
+
+def _buscar_sem_indice(termo, tipos, limite):
+    """Busca por ``icontains`` (bancos sem FTS5 ou índice ainda não criado)."""
+    resultados = []
+    for tipo in tipos:
+        config = TIPOS[tipo]
+        modelo = apps_instalados.get_model(config['modelo'])
+        objetos = modelo.objects.select_related(*config['select_related']).filter(config['filtro_simples'](termo))
+        resultados.extend({'tipo': tipo, **config['resultado'](objeto)} for objeto in objetos[:limite])
+    return resultados[:limite]
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from busca import indice
+
+
+class Command(BaseCommand):
+    help = 'Recria o índice de busca (FTS5) de famílias, falecidos e funcionários.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanho-lote', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not indice.disponivel():
+            raise CommandError(
+                'Índice de busca indisponível: requer SQLite com FTS5 e a migração "busca" aplicada.'
+            )
+        inicio = time.perf_counter()
+        totais = indice.reconstruir(tamanho_lote=options['tamanho_lote'])
+        duracao = time.perf_counter() - inicio
+        for tipo, total in totais.items():
+            self.stdout.write(f'  {tipo}: {total}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Índice de busca reconstruído com {sum(totais.values())} registros em {duracao:.2f}s.'
+        ))
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+from busca import indice
+
+
+def criar_indice(apps, schema_editor):
+    conexao = schema_editor.connection
+    if conexao.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {indice.TABELA} '
+        f'USING fts5(titulo, texto, digitos, tokenize = "unicode61 remove_diacritics 2")'
+    )
+    indice.reconstruir(conexao, obter_modelo=apps.get_model)
+
+
+def remover_indice(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {indice.TABELA}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('familia', '0001_initial'),
+        ('funcionario', '0003_funcionario_ativo_funcionario_usuario'),
+        ('pessoa_falecida', '0002_pessoafalecida_imagem'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save, post_delete
+
+from . import indice
+
+
+def atualizar_indice(sender, instance, raw=False, **kwargs):
+    """Mantém o índice de busca sincronizado ao salvar."""
+    if raw or not indice.disponivel():
+        return
+    indice.indexar(instance)
+
+
+def remover_do_indice(sender, instance, **kwargs):
+    """Remove do índice de busca os registros excluídos."""
+    if not indice.disponivel():
+        return
+    indice.remover(instance)
+
+
+for _modelo in indice.TIPO_POR_MODELO:
+    post_save.connect(atualizar_indice, sender=_modelo, dispatch_uid=f'busca_indexar_{_modelo}')
+    post_delete.connect(remover_do_indice, sender=_modelo, dispatch_uid=f'busca_remover_{_modelo}')
@@ -0,0 +1,160 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from familia.models import Familia
+from funcionario.models import Funcionario
+from pessoa_falecida.forms import PessoaFalecidaForm
+from pessoa_falecida.models import PessoaFalecida
+
+from . import indice
+
+
+class IndiceBuscaTest(TestCase):
+    """Índice FTS5: normalização, sincronização pelos signals e a busca global."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = CustomUser.objects.create_user('vendedor', password='senha123', cargo='vendedor')
+        cls.familia = Familia.objects.create(
+            nome_responsavel='João Conceição', grau_parentesco='Irmão',
+            telefone='(11) 98765-4321', endereco='Rua Teste, 2'
+        )
+        cls.falecido = PessoaFalecida.objects.create(
+            nome='Sebastião Araújo', data_nascimento=date(1940, 5, 1), data_falecimento=date(2026, 10, 1),
+            causa_obito='Natural', local_obito='Hospital', documento_cpf_rg='123.456.789-00', familia=cls.familia
+        )
+        cls.funcionario = Funcionario.objects.create(
+            nome='Márcia Simões', cargo='florista', telefone='(11) 95555-0000', email='marcia@x.com.br'
+        )
+
+    def linhas_indice(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {indice.TABELA}')
+            return cursor.fetchone()[0]
+
+    def nomes(self, termo, **kwargs):
+        return [resultado['name'] for resultado in indice.buscar(termo, **kwargs)]
+
+    def test_normalizacao(self):
+        self.assertEqual(indice.normalizar('  JOÃO  da Conceição-Araújo '), 'joao da conceicao araujo')
+        self.assertEqual(indice.variantes_numero('(11) 98765-4321'), ['11987654321', '987654321', '87654321', '4321'])
+        self.assertEqual(indice.montar_consulta('123.456.789-00'), '"12345678900"*')
+        self.assertEqual(indice.montar_consulta('Sebastião ara'), '"sebastiao"* "ara"*')
+        self.assertIsNone(indice.montar_consulta('  '))
+
+    def test_busca_ignora_acentos_e_pontuacao(self):
+        self.assertTrue(indice.disponivel())
+        self.assertEqual(self.nomes('joao conceicao'), ['João Conceição'])
+        self.assertEqual(self.nomes('SEBASTIÃO'), ['Sebastião Araújo'])
+        self.assertEqual(self.nomes('marc'), ['Márcia Simões'])
+        # Documento com ou sem pontuação e telefone pelo final
+        self.assertEqual(self.nomes('12345678900'), ['Sebastião Araújo'])
+        self.assertEqual(self.nomes('123.456'), ['Sebastião Araújo'])
+        self.assertEqual(self.nomes('4321', tipos=['familia']), ['João Conceição'])
+        self.assertEqual(self.nomes('joao', tipos=['funcionario']), [])
+
+    def test_signals_mantem_indice_sincronizado(self):
+        self.assertEqual(self.linhas_indice(), 3)
+        self.funcionario.nome = 'Márcia Barbosa'
+        self.funcionario.save()
+        self.assertEqual(self.nomes('simoes'), [])
+        self.assertEqual(self.nomes('barbosa'), ['Márcia Barbosa'])
+
+        self.funcionario.delete()
+        self.assertEqual(self.nomes('marcia'), [])
+        self.assertEqual(self.linhas_indice(), 2)
+
+    def test_reconstruir_indice(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {indice.TABELA}')
+        self.assertEqual(self.nomes('joao'), [])
+
+        saida = StringIO()
+        call_command('reconstruir_indice_busca', stdout=saida)
+        self.assertEqual(self.linhas_indice(), 3)
+        self.assertEqual(self.nomes('joao'), ['João Conceição'])
+
+    def test_buscar_json(self):
+        self.client.force_login(self.usuario)
+        dados = self.client.get(reverse('busca:buscar'), {'q': 'araujo', 'limite': 'x'}).json()
+        self.assertEqual(dados['total'], 1)
+        self.assertEqual(dados['resultados'][0]['tipo'], 'falecido')
+        self.assertEqual(dados['resultados'][0]['url'], reverse('pessoa_falecida:detail', kwargs={'pk': self.falecido.pk}))
+
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('busca:buscar'), {'q': 'araujo'}).status_code, 302)
+
+
+class AutocompletarTest(TestCase):
+    """Endpoints de autocomplete e o widget que renderiza só o valor selecionado."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = CustomUser.objects.create_user('vendedor', password='senha123', cargo='vendedor')
+        cls.familias = [
+            Familia.objects.create(
+                nome_responsavel=f'Responsável {i:02d}', grau_parentesco='Filho',
+                telefone='1133334444', endereco='Rua Teste, 1'
+            )
+            for i in range(25)
+        ]
+        cls.joao = Familia.objects.create(
+            nome_responsavel='João Conceição', grau_parentesco='Irmão',
+            telefone='(11) 98765-4321', endereco='Rua Teste, 2'
+        )
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def autocompletar(self, entidade, **params):
+        return self.client.get(reverse('busca:autocompletar', args=[entidade]), params).json()
+
+    def test_paginacao_sem_termo(self):
+        primeira = self.autocompletar('familia')
+        self.assertEqual(len(primeira['resultados']), 20)
+        self.assertTrue(primeira['mais'])
+
+        segunda = self.autocompletar('familia', pagina=2)
+        self.assertEqual(len(segunda['resultados']), 6)
+        self.assertFalse(segunda['mais'])
+        ids = {r['id'] for r in primeira['resultados']} | {r['id'] for r in segunda['resultados']}
+        self.assertEqual(len(ids), 26)
+
+    def test_busca_por_texto_sem_acento(self):
+        dados = self.autocompletar('familia', q='joao conc')
+        self.assertEqual(dados['resultados'], [{'id': self.joao.pk, 'texto': str(self.joao)}])
+
+    def test_entidade_desconhecida(self):
+        resposta = self.client.get(reverse('busca:autocompletar', args=['estoque']))
+        self.assertEqual(resposta.status_code, 404)
+
+    def test_widget_renderiza_apenas_o_selecionado(self):
+        falecido_form = PessoaFalecidaForm(initial={'familia': self.joao.pk})
+        with self.assertNumQueries(1):
+            html = str(falecido_form['familia'])
+        self.assertEqual(html.count('<option'), 2)
+        self.assertIn(f'value="{self.joao.pk}" selected', html)
+        self.assertIn('data-autocompletar="/busca/autocompletar/familia/"', html)
+
+        self.assertEqual(str(PessoaFalecidaForm()['familia']).count('<option'), 1)
+
+    def test_validacao_busca_apenas_o_pk_enviado(self):
+        dados = {
+            'nome': 'Maria', 'data_nascimento': date(1940, 1, 1), 'data_falecimento': date(2024, 1, 1),
+            'causa_obito': 'Natural', 'local_obito': 'Hospital', 'documento_cpf_rg': '12345678900',
+        }
+        form = PessoaFalecidaForm(data={**dados, 'familia': self.joao.pk})
+        # Campo (queryset.get) + validação da ForeignKey no modelo: ambas por pk
+        with self.assertNumQueries(2):
+            self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['familia'], self.joao)
+
+        form = PessoaFalecidaForm(data={**dados, 'familia': 999999})
+        self.assertFalse(form.is_valid())
+        self.assertIn('familia', form.errors)
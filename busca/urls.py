@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'busca'
+
+urlpatterns = [
+    path('', views.buscar_json, name='buscar'),
+    path('autocompletar/<str:entidade>/', views.autocompletar, name='autocompletar'),
+]
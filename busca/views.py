@@ -0,0 +1,52 @@
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+
+from . import autocompletar as autocomplete
+from . import indice
+
+LIMITE_MAXIMO = 50
+
+
+@login_required
+def buscar_json(request):
+    """
+    Busca famílias, falecidos e funcionários de uma só vez.
+
+    Parâmetros GET: ``q`` (texto), ``tipos`` (ex.: "familia,falecido") e
+    ``limite`` (máximo 50).
+    """
+    termo = request.GET.get('q', '').strip()
+    tipos = [tipo for tipo in request.GET.get('tipos', '').split(',') if tipo] or None
+    try:
+        limite = min(max(int(request.GET.get('limite', indice.LIMITE_PADRAO)), 1), LIMITE_MAXIMO)
+    except ValueError:
+        limite = indice.LIMITE_PADRAO
+
+    resultados = indice.buscar(termo, tipos=tipos, limite=limite)
+    return JsonResponse({
+        'q': termo,
+        'total': len(resultados),
+        'resultados': resultados,
+    })
+
+
+@login_required
+def autocompletar(request, entidade):
+    """
+    Página de opções para os campos de autocomplete dos formulários.
+
+    Parâmetros GET: ``q`` (texto, opcional) e ``pagina`` (a partir de 1).
+    """
+    if entidade not in autocomplete.ENTIDADES:
+        raise Http404('Entidade desconhecida.')
+    try:
+        pagina = max(int(request.GET.get('pagina', 1)), 1)
+    except ValueError:
+        pagina = 1
+
+    objetos, mais = autocomplete.paginar(entidade, request.GET.get('q', ''), pagina)
+    return JsonResponse({
+        'resultados': [{'id': objeto.pk, 'texto': str(objeto)} for objeto in objetos],
+        'pagina': pagina,
+        'mais': mais,
+    })
@@ -0,0 +1,41 @@
+from django import forms
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    ``<select>`` que carrega as opções sob demanda via ``busca:autocompletar``.
+
+    Renderiza apenas a opção vazia e o valor selecionado (uma consulta por
+    ``pk``), em vez de todas as linhas do queryset. O script
+    ``js/autocompletar.js`` transforma o campo em uma caixa de busca.
+    A validação continua com o ``ModelChoiceField``, que busca só o ``pk``
+    enviado.
+    """
+
+    class Media:
+        js = ('js/autocompletar.js',)
+
+    def __init__(self, entidade, attrs=None):
+        super().__init__(attrs)
+        self.entidade = entidade
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocompletar'] = reverse('busca:autocompletar', args=[self.entidade])
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        campo = self.choices.field
+        selecionados = {str(v) for v in value if str(v) not in campo.empty_values}
+        opcoes = []
+        if campo.empty_label is not None:
+            opcoes.append(self.create_option(name, '', campo.empty_label, not selecionados, 0))
+        if selecionados:
+            nome_campo = campo.to_field_name or 'pk'
+            for objeto in campo.queryset.filter(**{f'{nome_campo}__in': selecionados}):
+                valor = campo.prepare_value(objeto)
+                opcoes.append(self.create_option(
+                    name, valor, campo.label_from_instance(objeto), str(valor) in selecionados, len(opcoes)
+                ))
+        return [(None, opcoes, 0)]
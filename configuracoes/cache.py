@@ -0,0 +1,76 @@
+"""
+Cache em dois níveis para a configuração ativa da funerária.
+
+Nível 1: cópia em memória do processo (sem custo de I/O).
+Nível 2: cache compartilhado do Django (visível por todos os workers).
+
+Cada gravação ou exclusão de ``ConfiguracaoFuneraria`` troca o carimbo de
+versão guardado no cache compartilhado. Antes de devolver a cópia local,
+o processo confere esse carimbo, de modo que todos os workers enxergam a
+alteração já na requisição seguinte.
+"""
+import threading
+import uuid
+
+from django.core.cache import cache
+
+CACHE_KEY = 'configuracao_funeraria_ativa'
+VERSAO_KEY = 'configuracao_funeraria_versao'
+CACHE_TIMEOUT = None  # Sem expiração: a invalidação é feita pela versão
+
+_lock = threading.RLock()
+_local = {'versao': None, 'configuracao': None}
+
+
+def _nova_versao():
+    """Gera um carimbo de versão único (evita corrida entre incrementos)."""
+    return uuid.uuid4().hex
+
+
+def versao_atual():
+    """Retorna o carimbo de versão vigente, criando-o se necessário."""
+    versao = cache.get(VERSAO_KEY)
+    if versao is None:
+        cache.add(VERSAO_KEY, _nova_versao(), CACHE_TIMEOUT)
+        versao = cache.get(VERSAO_KEY)
+    return versao
+
+
+def obter_configuracao(carregar):
+    """
+    Retorna a configuração ativa usando os dois níveis de cache.
+
+    Args:
+        carregar: função sem argumentos que busca a configuração no banco.
+            Só é chamada quando nenhum dos níveis possui a versão vigente.
+    """
+    versao = versao_atual()
+
+    configuracao = _local['configuracao']
+    if configuracao is not None and _local['versao'] == versao:
+        return configuracao
+
+    with _lock:
+        # Outro thread pode ter recarregado enquanto esperávamos o lock
+        if _local['configuracao'] is not None and _local['versao'] == versao:
+            return _local['configuracao']
+
+        compartilhado = cache.get(CACHE_KEY)
+        if compartilhado and compartilhado[0] == versao:
+            configuracao = compartilhado[1]
+        else:
+            configuracao = carregar()
+            cache.set(CACHE_KEY, (versao, configuracao), CACHE_TIMEOUT)
+
+        _local['versao'] = versao
+        _local['configuracao'] = configuracao
+        return configuracao
+
+
+def invalidar_configuracao():
+    """Troca a versão e descarta as cópias em cache da configuração."""
+    cache.set(VERSAO_KEY, _nova_versao(), CACHE_TIMEOUT)
+    cache.delete(CACHE_KEY)
+    with _lock:
+        _local['versao'] = None
+        _local['configuracao'] = None
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:59
+
+from django.db import migrations, models
+
+
+def manter_uma_ativa(apps, schema_editor):
+    """Bancos antigos podem ter mais de uma ativa: fica só a atualizada por último."""
+    ConfiguracaoFuneraria = apps.get_model('configuracoes', 'ConfiguracaoFuneraria')
+    ativas = ConfiguracaoFuneraria.objects.filter(ativa=True).order_by('-data_atualizacao', '-pk')
+    mais_recente = ativas.first()
+    if mais_recente is not None:
+        ativas.exclude(pk=mais_recente.pk).update(ativa=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuracoes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(manter_uma_ativa, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='configuracaofuneraria',
+            constraint=models.UniqueConstraint(condition=models.Q(('ativa', True)), fields=('ativa',), name='configuracao_unica_ativa'),
+        ),
+    ]
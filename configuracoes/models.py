@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
 from django.core.validators import RegexValidator
 
 
@@ -190,6 +191,10 @@ class ConfiguracaoFuneraria(models.Model):
         verbose_name = "Configuração da Funerária"
         verbose_name_plural = "Configurações da Funerária"
         ordering = ['-ativa', '-data_atualizacao']
+        constraints = [
+            # Dois workers criando a configuração padrão ao mesmo tempo: só um grava
+            models.UniqueConstraint(fields=['ativa'], condition=Q(ativa=True), name='configuracao_unica_ativa'),
+        ]
     
     def __str__(self):
         return f"{self.nome_funeraria} {'(Ativa)' if self.ativa else ''}"
@@ -201,17 +206,34 @@ class ConfiguracaoFuneraria(models.Model):
             ConfiguracaoFuneraria.objects.filter(ativa=True).update(ativa=False)
         super().save(*args, **kwargs)
     
+    def validate_constraints(self, exclude=None):
+        """Não barra a ativação: save() desativa as outras antes de gravar."""
+        if self.ativa:
+            exclude = {*(exclude or ()), 'ativa'}
+        super().validate_constraints(exclude=exclude)
+    
     @classmethod
     def get_configuracao_ativa(cls):
-        """Retorna a configuração ativa ou cria uma padrão."""
-        try:
-            return cls.objects.get(ativa=True)
-        except cls.DoesNotExist:
+        """Retorna a configuração ativa (em cache) ou cria uma padrão."""
+        from .cache import obter_configuracao
+        return obter_configuracao(cls._carregar_configuracao_ativa)
+    
+    @classmethod
+    def _carregar_configuracao_ativa(cls):
+        """Busca a configuração ativa no banco, criando uma padrão se não existir."""
+        configuracao = cls.objects.filter(ativa=True).first()
+        if configuracao is None:
             # Cria configuração padrão se não existir
-            return cls.objects.create(
-                nome_funeraria="Sistema Funerária",
-                ativa=True
-            )
+            # Inserção direta: save() desativaria a configuração que outro worker acabou de criar
+            try:
+                with transaction.atomic():
+                    configuracao, = cls.objects.bulk_create([
+                        cls(nome_funeraria="Sistema Funerária", ativa=True)
+                    ])
+            except IntegrityError:
+                # Outro worker criou a configuração padrão primeiro
+                configuracao = cls.objects.get(ativa=True)
+        return configuracao
     
     def get_whatsapp_link(self):
         """Retorna link do WhatsApp formatado."""
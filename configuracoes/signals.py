@@ -1,14 +1,23 @@
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from django.core.cache import cache
+from .cache import invalidar_configuracao
 from .models import ConfiguracaoFuneraria
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=ConfiguracaoFuneraria)
+@receiver(post_delete, sender=ConfiguracaoFuneraria)
 def limpar_cache_configuracao(sender, instance, **kwargs):
     """Limpa cache das configurações quando alteradas."""
-    cache.delete('configuracao_funeraria_ativa')
-    print(f"[LOG] Cache de configurações limpo após alteração")
+    # Só invalida após o commit, para nenhum worker recarregar dados antigos
+    transaction.on_commit(invalidar_configuracao)
+    logger.info(
+        "Cache de configurações limpo após alteração",
+        extra={'evento': 'configuracao.cache_invalidado', 'dados': {'configuracao_id': instance.pk}}
+    )
 
 
 @receiver(post_save, sender=ConfiguracaoFuneraria)
@@ -28,28 +37,40 @@ def validar_configuracao(sender, instance, **kwargs):
     if instance.cnpj:
         cnpj_limpo = ''.join(filter(str.isdigit, instance.cnpj))
         if len(cnpj_limpo) != 14:
-            print(f"[AVISO] CNPJ pode estar em formato inválido: {instance.cnpj}")
+            logger.warning(
+                f"CNPJ pode estar em formato inválido: {instance.cnpj}",
+                extra={'evento': 'configuracao.validacao', 'dados': {'campo': 'cnpj', 'valor': instance.cnpj}}
+            )
     
     # Valida CEP (formato básico)
     if instance.cep:
         cep_limpo = ''.join(filter(str.isdigit, instance.cep))
         if len(cep_limpo) != 8:
-            print(f"[AVISO] CEP pode estar em formato inválido: {instance.cep}")
+            logger.warning(
+                f"CEP pode estar em formato inválido: {instance.cep}",
+                extra={'evento': 'configuracao.validacao', 'dados': {'campo': 'cep', 'valor': instance.cep}}
+            )
     
     # Valida WhatsApp
     if instance.whatsapp_numero:
         whatsapp_limpo = ''.join(filter(str.isdigit, instance.whatsapp_numero))
         if len(whatsapp_limpo) < 10:
-            print(f"[AVISO] Número do WhatsApp pode estar inválido: {instance.whatsapp_numero}")
+            logger.warning(
+                f"Número do WhatsApp pode estar inválido: {instance.whatsapp_numero}",
+                extra={'evento': 'configuracao.validacao', 'dados': {'campo': 'whatsapp_numero', 'valor': instance.whatsapp_numero}}
+            )
 
 
 @receiver(post_save, sender=ConfiguracaoFuneraria)
 def log_alteracao_configuracao(sender, instance, created, **kwargs):
     """Registra log das alterações de configuração."""
-    if created:
-        print(f"[LOG] Nova configuração criada: {instance.nome_funeraria}")
-    else:
-        print(f"[LOG] Configuração atualizada: {instance.nome_funeraria}")
+    logger.info(
+        f"{'Nova configuração criada' if created else 'Configuração atualizada'}: {instance.nome_funeraria}",
+        extra={'evento': 'configuracao.criada' if created else 'configuracao.atualizada', 'dados': {
+            'configuracao_id': instance.pk,
+            'nome_funeraria': instance.nome_funeraria,
+        }}
+    )
 
 
 @receiver(post_save, sender=ConfiguracaoFuneraria)
@@ -62,8 +83,14 @@ def processar_imagens_configuracao(sender, instance, created, **kwargs):
     # - Conversão de formatos
     
     if instance.logo:
-        print(f"[LOG] Logo processado: {instance.logo.name}")
+        logger.info(
+            f"Logo processado: {instance.logo.name}",
+            extra={'evento': 'configuracao.imagem', 'dados': {'campo': 'logo', 'arquivo': instance.logo.name}}
+        )
     
     if instance.favicon:
-        print(f"[LOG] Favicon processado: {instance.favicon.name}")
+        logger.info(
+            f"Favicon processado: {instance.favicon.name}",
+            extra={'evento': 'configuracao.imagem', 'dados': {'campo': 'favicon', 'arquivo': instance.favicon.name}}
+        )
 
@@ -1,3 +1,69 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.db import IntegrityError, transaction
+from django.core.exceptions import ValidationError
+from django.test import RequestFactory, TestCase
+
+from accounts.models import CustomUser
+
+from .forms import ConfiguracaoFunerariaForm
+from .models import ConfiguracaoFuneraria
+from .views import ConfiguracaoFunerariaUpdateView
+
+
+class ConfiguracaoAtivaTest(TestCase):
+    """Uma única configuração ativa, mesmo com workers concorrentes."""
+
+    def test_banco_recusa_segunda_ativa(self):
+        ConfiguracaoFuneraria.objects.create(nome_funeraria='Primeira')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ConfiguracaoFuneraria.objects.bulk_create([ConfiguracaoFuneraria(nome_funeraria='Segunda', ativa=True)])
+
+    def test_criacao_concorrente_rele_a_configuracao(self):
+        existente = ConfiguracaoFuneraria.objects.create(nome_funeraria='Outro worker')
+        filtrar = ConfiguracaoFuneraria.objects.filter
+        chamadas = []
+
+        def filtro(*args, **kwargs):
+            # A primeira leitura não vê a configuração: o worker tenta criar e perde a corrida
+            chamadas.append(kwargs)
+            return ConfiguracaoFuneraria.objects.none() if len(chamadas) == 1 else filtrar(*args, **kwargs)
+
+        with mock.patch.object(ConfiguracaoFuneraria.objects, 'filter', side_effect=filtro):
+            configuracao = ConfiguracaoFuneraria._carregar_configuracao_ativa()
+        self.assertEqual(configuracao, existente)
+        self.assertEqual(ConfiguracaoFuneraria.objects.count(), 1)
+
+    def test_validacao_permite_ativar_outra_configuracao(self):
+        ConfiguracaoFuneraria.objects.create(nome_funeraria='Atual')
+        nova = ConfiguracaoFuneraria.objects.create(nome_funeraria='Nova', ativa=False)
+        nova.ativa = True
+        nova.full_clean()
+        nova.save()
+        self.assertEqual(list(ConfiguracaoFuneraria.objects.filter(ativa=True)), [nova])
+
+    def test_validacao_ainda_confere_os_demais_campos(self):
+        configuracao = ConfiguracaoFuneraria(nome_funeraria='Telefone ruim', telefone_principal='123')
+        with self.assertRaises(ValidationError):
+            configuracao.full_clean()
+
+
+class EdicaoConfiguracaoTest(TestCase):
+    """O formulário de edição não altera a cópia da configuração em cache."""
+
+    def test_post_invalido_nao_vaza_para_o_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ConfiguracaoFuneraria.objects.create(nome_funeraria='Funerária Paz')
+        request = RequestFactory().post('/configuracoes/editar/')
+        request.user = CustomUser(username='admin', cargo='adm')
+        view = ConfiguracaoFunerariaUpdateView()
+        view.setup(request)
+        configuracao = view.get_object()
+        self.assertIsNot(configuracao, ConfiguracaoFuneraria.get_configuracao_ativa())
+
+        form = ConfiguracaoFunerariaForm(instance=configuracao, data={
+            'nome_funeraria': 'Nome não salvo', 'cor_primaria': '#000000', 'cor_secundaria': '#ffffff',
+            'telefone_principal': 'inválido',
+        })
+        self.assertFalse(form.is_valid())
+        self.assertEqual(ConfiguracaoFuneraria.get_configuracao_ativa().nome_funeraria, 'Funerária Paz')
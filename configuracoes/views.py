@@ -38,8 +38,10 @@ class ConfiguracaoFunerariaUpdateView(LoginRequiredMixin, UserPassesTestMixin, U
         return is_admin(self.request.user)
     
     def get_object(self):
-        """Retorna a configuração ativa."""
-        return ConfiguracaoFuneraria.get_configuracao_ativa()
+        """Retorna a configuração ativa, lida do banco."""
+        # Nunca a cópia em cache: um POST inválido deixaria os valores no objeto compartilhado
+        ativa = ConfiguracaoFuneraria.get_configuracao_ativa()
+        return get_object_or_404(ConfiguracaoFuneraria, pk=ativa.pk)
     
     def form_valid(self, form):
         """Processa o formulário válido."""
@@ -3,6 +3,9 @@ from django.dispatch import receiver
 from django.utils.text import slugify
 from .models import DocumentoGerado, MetaTagsDocumento, TemplateDocumento
 from configuracoes.models import ConfiguracaoFuneraria
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=DocumentoGerado)
@@ -48,14 +51,26 @@ def atualizar_status_documento(sender, instance, created, **kwargs):
 def log_criacao_documento(sender, instance, created, **kwargs):
     """Registra log da criação de documentos para auditoria."""
     if created:
-        # Aqui poderia integrar com sistema de logs mais avançado
-        print(f"[LOG] Documento criado: {instance.titulo} por {instance.usuario_criador.username}")
+        logger.info(
+            f"Documento criado: {instance.titulo} por {instance.usuario_criador.username}",
+            extra={'evento': 'documento.criado', 'dados': {
+                'uuid': str(instance.uuid),
+                'titulo': instance.titulo,
+                'usuario': instance.usuario_criador.username,
+            }}
+        )
 
 
 @receiver(pre_delete, sender=DocumentoGerado)
 def log_exclusao_documento(sender, instance, **kwargs):
     """Registra log da exclusão de documentos."""
-    print(f"[LOG] Documento excluído: {instance.titulo} (UUID: {instance.uuid})")
+    logger.info(
+        f"Documento excluído: {instance.titulo} (UUID: {instance.uuid})",
+        extra={'evento': 'documento.excluido', 'dados': {
+            'uuid': str(instance.uuid),
+            'titulo': instance.titulo,
+        }}
+    )
 
 
 @receiver(post_save, sender=TemplateDocumento)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estoque', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movimentacaoestoque',
+            index=models.Index(fields=['-data_movimentacao', '-id'], name='movimentacao_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='produtoestoque',
+            index=models.Index(fields=['nome', 'id'], name='produto_nome_idx'),
+        ),
+    ]
@@ -164,6 +164,10 @@ class ProdutoEstoque(models.Model):
         verbose_name = "Produto de Estoque"
         verbose_name_plural = "Produtos de Estoque"
         ordering = ['nome']
+        indexes = [
+            # Listagem paginada por cursor (nome, id)
+            models.Index(fields=['nome', 'id'], name='produto_nome_idx'),
+        ]
     
     def __str__(self):
         return f"{self.codigo} - {self.nome}"
@@ -266,6 +270,10 @@ class MovimentacaoEstoque(models.Model):
         verbose_name = "Movimentação de Estoque"
         verbose_name_plural = "Movimentações de Estoque"
         ordering = ['-data_movimentacao']
+        indexes = [
+            # Listagem paginada por cursor (data, id)
+            models.Index(fields=['-data_movimentacao', '-id'], name='movimentacao_data_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_tipo_display()} - {self.produto.nome} - {self.quantidade}"
@@ -1,7 +1,14 @@
 from django.db.models.signals import post_save, pre_save
+from django.contrib.auth import get_user_model
 from django.dispatch import receiver
+from django.urls import reverse
 from django.utils import timezone
+from notificacoes.caixa import notificar
 from .models import ProdutoEstoque, MovimentacaoEstoque, AlertaEstoque
+import logging
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=ProdutoEstoque)
@@ -42,7 +49,16 @@ def verificar_alertas_estoque(sender, instance, created, **kwargs):
 def log_movimentacao_estoque(sender, instance, created, **kwargs):
     """Registra log das movimentações de estoque."""
     if created:
-        print(f"[LOG ESTOQUE] {instance.get_tipo_display()}: {instance.produto.nome} - Qtd: {instance.quantidade} - Usuário: {instance.usuario.username}")
+        logger.info(
+            f"{instance.get_tipo_display()}: {instance.produto.nome} - Qtd: {instance.quantidade} - Usuário: {instance.usuario.username}",
+            extra={'evento': 'estoque.movimentacao', 'dados': {
+                'movimentacao_id': instance.pk,
+                'tipo': instance.tipo,
+                'produto_id': instance.produto_id,
+                'quantidade': str(instance.quantidade),
+                'usuario': instance.usuario.username,
+            }}
+        )
 
 
 @receiver(pre_save, sender=MovimentacaoEstoque)
@@ -75,18 +91,34 @@ def atualizar_preco_custo_medio(sender, instance, created, **kwargs):
             # Atualiza apenas se a diferença for significativa (mais de 5%)
             diferenca_percentual = abs(instance.preco_custo - preco_medio) / instance.preco_custo * 100
             if diferenca_percentual > 5:
-                print(f"[LOG] Preço médio calculado para {instance.nome}: R$ {preco_medio:.2f} (anterior: R$ {instance.preco_custo:.2f})")
+                logger.info(
+                    f"Preço médio calculado para {instance.nome}: R$ {preco_medio:.2f} (anterior: R$ {instance.preco_custo:.2f})",
+                    extra={'evento': 'estoque.preco_medio', 'dados': {
+                        'produto_id': instance.pk,
+                        'preco_medio': f'{preco_medio:.2f}',
+                        'preco_custo': f'{instance.preco_custo:.2f}',
+                    }}
+                )
 
 
 @receiver(post_save, sender=AlertaEstoque)
 def notificar_alerta_estoque(sender, instance, created, **kwargs):
-    """Notifica sobre alertas de estoque (aqui poderia integrar com email/SMS)."""
+    """Notifica os administradores sobre alertas de estoque."""
     if created and instance.ativo:
-        print(f"[ALERTA ESTOQUE] {instance.get_tipo_alerta_display()}: {instance.mensagem}")
-        
-        # Aqui poderia integrar com:
-        # - Envio de email para administradores
-        # - Notificação push
-        # - Integração com WhatsApp Business API
-        # - Slack/Discord webhook
+        logger.warning(
+            f"{instance.get_tipo_alerta_display()}: {instance.mensagem}",
+            extra={'evento': 'estoque.alerta', 'dados': {
+                'alerta_id': instance.pk,
+                'tipo_alerta': instance.tipo_alerta,
+                'produto_id': instance.produto_id,
+            }}
+        )
+
+        # Caixa de entrada dos administradores; e-mail/webhook pelo despachante
+        notificar(
+            User.objects.filter(cargo='adm', is_active=True),
+            instance.tipo_alerta,
+            instance.mensagem,
+            link=reverse('estoque:produto_update', args=[instance.produto_id]),
+        )
 
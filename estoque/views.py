@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 
 from .models import CategoriaEstoque, ProdutoEstoque, MovimentacaoEstoque, AlertaEstoque
 from .forms import CategoriaEstoqueForm, ProdutoEstoqueForm, MovimentacaoEstoqueForm
+from app.mixins import ListaCursorView
 
 
 # Views para CategoriaEstoque
@@ -38,11 +39,17 @@ class CategoriaEstoqueDeleteView(LoginRequiredMixin, PermissionRequiredMixin, De
 
 
 # Views para ProdutoEstoque
-class ProdutoEstoqueListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class ProdutoEstoqueListView(LoginRequiredMixin, PermissionRequiredMixin, ListaCursorView):
     model = ProdutoEstoque
     template_name = 'estoque/produto_list.html'
     context_object_name = 'produtos'
     permission_required = 'estoque.view_produtoestoque'
+    paginate_by = 25
+    select_related = ('categoria',)
+    campos = (
+        'codigo', 'nome', 'categoria__nome', 'unidade_medida', 'preco_custo', 'preco_venda',
+        'quantidade_atual', 'quantidade_minima', 'ativo',
+    )
 
 class ProdutoEstoqueCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     model = ProdutoEstoque
@@ -66,11 +73,14 @@ class ProdutoEstoqueDeleteView(LoginRequiredMixin, PermissionRequiredMixin, Dele
 
 
 # Views para MovimentacaoEstoque
-class MovimentacaoEstoqueListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class MovimentacaoEstoqueListView(LoginRequiredMixin, PermissionRequiredMixin, ListaCursorView):
     model = MovimentacaoEstoque
     template_name = 'estoque/movimentacao_list.html'
     context_object_name = 'movimentacoes'
     permission_required = 'estoque.view_movimentacaoestoque'
+    paginate_by = 25
+    select_related = ('produto', 'usuario')
+    campos = ('tipo', 'quantidade', 'preco_unitario', 'data_movimentacao', 'produto__nome', 'usuario__username')
 
 class MovimentacaoEstoqueCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     model = MovimentacaoEstoque
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('familia', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='familia',
+            index=models.Index(fields=['nome_responsavel', 'id'], name='familia_nome_idx'),
+        ),
+    ]
@@ -14,6 +14,10 @@ class Familia(models.Model):
         verbose_name = "Família"
         verbose_name_plural = "Famílias"
         ordering = ['nome_responsavel']
+        indexes = [
+            # Listagem e autocomplete paginados por nome
+            models.Index(fields=['nome_responsavel', 'id'], name='familia_nome_idx'),
+        ]
     
     def __str__(self):
         return f"{self.nome_responsavel} ({self.grau_parentesco})"
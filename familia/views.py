@@ -1,16 +1,17 @@
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from .models import Familia
 from .forms import FamiliaForm
-from app.mixins import LoginRequiredMixin, AdminDeleteMixin
+from app.mixins import LoginRequiredMixin, AdminDeleteMixin, ListaCursorView
 
 
-class FamiliaListView(LoginRequiredMixin, ListView):
+class FamiliaListView(LoginRequiredMixin, ListaCursorView):
     """View para listar famílias."""
     model = Familia
     template_name = 'familia/familia_list.html'
     context_object_name = 'familias'
     paginate_by = 10
+    campos = ('nome_responsavel', 'grau_parentesco', 'telefone', 'email')
 
 
 class FamiliaDetailView(LoginRequiredMixin, DetailView):
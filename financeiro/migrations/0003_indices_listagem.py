@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0002_alter_financeiro_options_financeiro_data_criacao_and_more'),
+        ('pessoa_falecida', '0003_pessoafalecida_falecido_data_idx'),
+        ('servico_contratado', '0006_servicocontratado_pdf_nota_fiscal'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='financeiro',
+            index=models.Index(fields=['-data_vencimento', '-data_criacao', '-id'], name='financeiro_vencimento_idx'),
+        ),
+    ]
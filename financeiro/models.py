@@ -84,6 +84,10 @@ class Financeiro(models.Model):
         verbose_name = "Financeiro"
         verbose_name_plural = "Financeiros"
         ordering = ['-data_vencimento', '-data_criacao']
+        indexes = [
+            # Listagem paginada por cursor (vencimento, criação, id)
+            models.Index(fields=['-data_vencimento', '-data_criacao', '-id'], name='financeiro_vencimento_idx'),
+        ]
     
     def __str__(self):
         return f"{self.pessoa_falecida.nome} - {self.tipo} - R$ {self.valor}"
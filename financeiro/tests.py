@@ -1,3 +1,113 @@
+import base64
+import re
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from familia.models import Familia
+from pessoa_falecida.models import PessoaFalecida
+
+from .models import Financeiro
+
+
+class ListagemPorCursorTest(TestCase):
+    """Listagem financeira sobre ``app.mixins.ListaCursorView``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = CustomUser.objects.create_user('vendedor', password='senha123', cargo='vendedor')
+        familia = Familia.objects.create(
+            nome_responsavel='Responsável', grau_parentesco='Filho', telefone='1133334444', endereco='Rua Teste, 1'
+        )
+        falecido = PessoaFalecida.objects.create(
+            nome='Falecido', data_nascimento=date(1950, 1, 1), data_falecimento=date(2026, 10, 1),
+            causa_obito='Natural', local_obito='Hospital', documento_cpf_rg='00000000001', familia=familia
+        )
+        criacao = timezone.make_aware(datetime(2026, 10, 1, 12))
+        # Vencimentos e criações repetidos: o desempate fica por conta do id
+        Financeiro.objects.bulk_create([
+            Financeiro(
+                pessoa_falecida=falecido, tipo='receita', descricao=f'Parcela {i}', valor=Decimal('100.00'),
+                data_vencimento=date(2026, 11, 1) + timedelta(days=i % 4),
+                data_criacao=criacao + timedelta(hours=i % 3),
+                status='pago' if i % 5 == 0 else 'pendente',
+            )
+            for i in range(33)
+        ])
+        cls.ordem = list(
+            Financeiro.objects.order_by('-data_vencimento', '-data_criacao', '-id').values_list('pk', flat=True)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.usuario)
+
+    def paginas(self, parametros=None, direcao='depois'):
+        """Percorre a listagem seguindo os links; devolve os ids de cada página."""
+        url = reverse('financeiro:list') + '?' + (parametros or '')
+        paginas = []
+        while url:
+            resposta = self.client.get(url)
+            paginas.append([financeiro.pk for financeiro in resposta.context['financeiros']])
+            pagina = resposta.context['page_obj']
+            avancar = pagina.has_next() if direcao == 'depois' else pagina.has_previous()
+            url = reverse('financeiro:list') + (pagina.url_proxima if direcao == 'depois' else pagina.url_anterior) if avancar else None
+        return paginas, resposta
+
+    def test_percorre_todas_as_paginas_nos_dois_sentidos(self):
+        paginas, ultima = self.paginas()
+        self.assertEqual([pk for pagina in paginas for pk in pagina], self.ordem)
+        self.assertEqual([len(pagina) for pagina in paginas], [10, 10, 10, 3])
+        self.assertEqual(ultima.context['page_obj'].total, 33)
+
+        # Voltando a partir da última página, pelo cursor "antes"
+        de_tras, _ = self.paginas(paginas_url(self, 4)[1:], direcao='antes')
+        self.assertEqual(de_tras, paginas[::-1])
+
+    def test_paginas_profundas_sem_offset_nem_count(self):
+        self.client.get(reverse('financeiro:list'))  # total já em cache
+        url = reverse('financeiro:list') + paginas_url(self, 4)
+        with CaptureQueriesContext(connection) as contexto:
+            resposta = self.client.get(url)
+        consultas = [q['sql'] for q in contexto.captured_queries if 'FROM "financeiro_financeiro"' in q['sql']]
+        listagem = [sql for sql in consultas if 'ORDER BY' in sql]
+        self.assertEqual(len(listagem), 1)
+        self.assertNotIn('OFFSET', listagem[0])
+        self.assertNotIn('"descricao_adicional"', listagem[0])
+        self.assertNotIn('"observacoes"', listagem[0])
+        self.assertEqual(len(resposta.context['financeiros']), 3)
+
+    def test_filtro_preservado_e_cursor_invalido(self):
+        paginas, _ = self.paginas('status=pendente')
+        pendentes = list(
+            Financeiro.objects.filter(status='pendente')
+            .order_by('-data_vencimento', '-data_criacao', '-id').values_list('pk', flat=True)
+        )
+        self.assertEqual([pk for pagina in paginas for pk in pagina], pendentes)
+
+        resposta = self.client.get(reverse('financeiro:list'), {'depois': 'lixo!'})
+        self.assertEqual([f.pk for f in resposta.context['financeiros']], self.ordem[:10])
+        self.assertFalse(resposta.context['page_obj'].has_previous())
+
+    def test_cursor_com_nulos_volta_para_a_primeira_pagina(self):
+        for valores in ('[null, null, null]', '["2026-11-01", null, 5]'):
+            cursor = base64.urlsafe_b64encode(valores.encode()).decode().rstrip('=')
+            for parametro in ('depois', 'antes'):
+                resposta = self.client.get(reverse('financeiro:list'), {parametro: cursor})
+                self.assertEqual(resposta.status_code, 200)
+                self.assertEqual([f.pk for f in resposta.context['financeiros']], self.ordem[:10])
+
 
-# Create your tests here.
+def paginas_url(teste, numero):
+    """Query string da página ``numero`` (1 = primeira), seguindo os cursores."""
+    url = ''
+    for _ in range(numero - 1):
+        url = teste.client.get(reverse('financeiro:list') + url).context['page_obj'].url_proxima
+    return url
@@ -1,4 +1,4 @@
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
@@ -6,15 +6,21 @@ from django.http import HttpResponse
 from django.contrib import messages
 from django.db.models import Sum, Count, Q
 from .models import Financeiro
-from app.mixins import LoginRequiredMixin, AdminDeleteMixin
+from app.mixins import LoginRequiredMixin, AdminDeleteMixin, ListaCursorView
 
 
-class FinanceiroListView(LoginRequiredMixin, ListView):
+class FinanceiroListView(LoginRequiredMixin, ListaCursorView):
     """View para listar registros financeiros."""
     model = Financeiro
     template_name = 'financeiro/financeiro_list.html'
     context_object_name = 'financeiros'
     paginate_by = 10
+    select_related = ('pessoa_falecida__familia', 'servico_contratado')
+    campos = (
+        'tipo', 'descricao', 'valor', 'data_vencimento', 'data_pagamento', 'status',
+        'pessoa_falecida__nome', 'pessoa_falecida__familia__nome_responsavel',
+        'servico_contratado__numero_nota_fiscal', 'servico_contratado__pdf_nota_fiscal',
+    )
     
     def get_queryset(self):
         """Filtrar por status se especificado."""
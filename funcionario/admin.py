@@ -3,14 +3,47 @@ from django.contrib import admin
 # Register your models here.
 
 
-from django.contrib import admin
+import io
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.http import HttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+
+from .importacao import HasherSenhas, criar_contas, escrever_relatorio, importar_csv
 from .models import Funcionario
 
 
+class ImportarFuncionariosForm(forms.Form):
+    arquivo = forms.FileField(
+        label="Arquivo CSV",
+        help_text="Colunas: nome, cargo, telefone, email (separadas por vírgula ou ponto e vírgula)."
+    )
+
+
+def _resposta_credenciais(credenciais):
+    """CSV para download com os usernames e as senhas temporárias."""
+    resposta = HttpResponse(content_type='text/csv; charset=utf-8')
+    nome = f"credenciais_funcionarios_{timezone.localtime():%Y%m%d_%H%M%S}.csv"
+    resposta['Content-Disposition'] = f'attachment; filename="{nome}"'
+    resposta['Cache-Control'] = 'no-store'
+    escrever_relatorio(credenciais, resposta)
+    return resposta
+
+
+def _processos_admin():
+    # Dentro da requisição um pool de processos faria fork do worker web (threads de log,
+    # buffers de métricas e auditoria) e um django.setup() por filho: o padrão é 1
+    return getattr(settings, 'FUNCIONARIOS_IMPORTACAO_PROCESSOS', 1)
+
+
 @admin.register(Funcionario)
 class FuncionarioAdmin(admin.ModelAdmin):
     list_display = (
-        'nome', 'cargo', 'telefone', 'email'
+        'nome', 'cargo', 'telefone', 'email', 'usuario'
     )
     list_filter = (
         'cargo',
@@ -18,5 +51,51 @@ class FuncionarioAdmin(admin.ModelAdmin):
     search_fields = (
         'nome', 'email', 'telefone'
     )
+    list_select_related = ('usuario',)
+    actions = ['criar_contas_login']
+    change_list_template = 'admin/funcionario/funcionario/change_list.html'
+
+    def get_urls(self):
+        urls = [
+            path(
+                'importar-csv/',
+                self.admin_site.admin_view(self.importar_csv_view),
+                name='funcionario_funcionario_importar_csv',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def importar_csv_view(self, request):
+        """Importa funcionários de um CSV e devolve o relatório de credenciais."""
+        if not self.has_add_permission(request):
+            return HttpResponse(status=403)
+        form = ImportarFuncionariosForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            arquivo = io.TextIOWrapper(form.cleaned_data['arquivo'].file, encoding='utf-8-sig', newline='')
+            try:
+                resultado = importar_csv(arquivo, processos=_processos_admin())
+            except (UnicodeDecodeError, ValueError) as e:
+                form.add_error('arquivo', str(e))
+            else:
+                for erro in resultado['erros']:
+                    messages.warning(request, f"Linha {erro['linha']} ignorada ({erro['nome'] or 'sem nome'}): {erro['erro']}")
+                messages.success(request, f"{len(resultado['credenciais'])} funcionários importados.")
+                return _resposta_credenciais(resultado['credenciais'])
+        return TemplateResponse(request, 'admin/funcionario/funcionario/importar_csv.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Importar funcionários (CSV)',
+            'form': form,
+        })
+
+    @admin.action(description='Criar contas de login para os selecionados', permissions=['change'])
+    def criar_contas_login(self, request, queryset):
+        funcionarios = list(queryset.filter(usuario__isnull=True))
+        if not funcionarios:
+            self.message_user(request, 'Todos os selecionados já possuem conta.', messages.INFO)
+            return None
+        with HasherSenhas(_processos_admin()) as hashear:
+            credenciais = criar_contas(funcionarios, hashear)
+        return _resposta_credenciais(credenciais)
 
 
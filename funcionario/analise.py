@@ -0,0 +1,179 @@
+"""
+Carga de trabalho dos funcionários a partir dos agendamentos.
+
+Cada matriz sai de uma única consulta agrupada (``TruncDate``/``TruncWeek``
+ou ``Extract*`` + ``Count``), sem laços por funcionário:
+
+* ``carga``: agendamentos por funcionário e por dia (ou semana);
+* ``sepultamentos_por_cargo``: sepultamentos por cargo do responsável e período;
+* ``horarios_pico``: agendamentos por dia da semana e hora.
+
+O resultado de cada intervalo fica no cache com as versões dos domínios
+``agenda`` e ``funcionarios`` de ``app.fragmentos``, trocadas pelos signals
+de ``accounts.signals`` quando um agendamento ou funcionário muda.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, DateField
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, TruncDate, TruncWeek
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from agendamento.models import Agendamento
+from app import fragmentos
+
+GRANULARIDADES = ('dia', 'semana')
+DIAS_SEMANA = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom']
+INTERVALO_PADRAO = 30  # dias
+INTERVALO_MAXIMO = 366  # dias
+DOMINIOS = ('agenda', 'funcionarios')
+
+
+def _limites(inicio, fim):
+    """Datas locais -> [início 00:00, dia seguinte ao fim 00:00) com fuso."""
+    return (
+        timezone.make_aware(datetime.combine(inicio, time.min)),
+        timezone.make_aware(datetime.combine(fim + timedelta(days=1), time.min)),
+    )
+
+
+def _truncar(campo, granularidade):
+    if granularidade == 'semana':
+        return TruncWeek(campo, output_field=DateField())
+    return TruncDate(campo)
+
+
+def periodos(inicio, fim, granularidade):
+    """Rótulos das colunas: cada dia do intervalo ou a segunda-feira de cada semana."""
+    if granularidade == 'semana':
+        atual, passo = inicio - timedelta(days=inicio.weekday()), timedelta(weeks=1)
+    else:
+        atual, passo = inicio, timedelta(days=1)
+    resultado = []
+    while atual <= fim:
+        resultado.append(atual)
+        atual += passo
+    return resultado
+
+
+def _matriz(contagens, chaves_periodos):
+    """{linha: {período: total}} -> valores na ordem dos períodos, mais o total."""
+    posicao = {periodo: i for i, periodo in enumerate(chaves_periodos)}
+    linhas = {}
+    for linha, periodo, total in contagens:
+        valores = linhas.setdefault(linha, [0] * len(chaves_periodos))
+        if periodo in posicao:
+            valores[posicao[periodo]] += total
+    return linhas
+
+
+def carga_por_funcionario(inicio, fim, granularidade='dia'):
+    colunas = periodos(inicio, fim, granularidade)
+    consulta = (
+        Agendamento.objects.filter(data_agendamento__range=_limites(inicio, fim))
+        .annotate(periodo=_truncar('data_agendamento', granularidade))
+        .values_list('funcionario_id', 'funcionario__nome', 'funcionario__cargo', 'periodo')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    funcionarios = {}
+    contagens = []
+    for funcionario_id, nome, cargo, periodo, total in consulta:
+        funcionarios[funcionario_id] = (nome, cargo)
+        contagens.append((funcionario_id, periodo, total))
+    linhas = [
+        {
+            'id': funcionario_id,
+            'nome': funcionarios[funcionario_id][0],
+            'cargo': funcionarios[funcionario_id][1],
+            'valores': valores,
+            'total': sum(valores),
+        }
+        for funcionario_id, valores in _matriz(contagens, colunas).items()
+    ]
+    linhas.sort(key=lambda linha: (-linha['total'], linha['nome']))
+    return {'periodos': [p.isoformat() for p in colunas], 'linhas': linhas}
+
+
+def sepultamentos_por_cargo(inicio, fim, granularidade='dia'):
+    colunas = periodos(inicio, fim, granularidade)
+    consulta = (
+        Agendamento.objects.filter(data_sepultamento__range=_limites(inicio, fim))
+        .annotate(periodo=_truncar('data_sepultamento', granularidade))
+        .values_list('funcionario__cargo', 'periodo')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    rotulos = dict(CustomUser.CARGO_CHOICES)
+    matriz = _matriz(consulta, colunas)
+    linhas = [
+        {'cargo': cargo, 'rotulo': rotulo, 'valores': matriz[cargo], 'total': sum(matriz[cargo])}
+        for cargo, rotulo in CustomUser.CARGO_CHOICES
+        if cargo in matriz
+    ]
+    linhas.extend(
+        {'cargo': cargo, 'rotulo': cargo, 'valores': valores, 'total': sum(valores)}
+        for cargo, valores in matriz.items() if cargo not in rotulos
+    )
+    return {'periodos': [p.isoformat() for p in colunas], 'linhas': linhas}
+
+
+def horarios_pico(inicio, fim):
+    consulta = (
+        Agendamento.objects.filter(data_agendamento__range=_limites(inicio, fim))
+        .annotate(dia_semana=ExtractIsoWeekDay('data_agendamento'), hora=ExtractHour('hora_agendamento'))
+        .values_list('dia_semana', 'hora')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    valores = [[0] * 24 for _ in DIAS_SEMANA]
+    for dia_semana, hora, total in consulta:
+        valores[dia_semana - 1][hora] += total
+    return {
+        'dias': DIAS_SEMANA,
+        'horas': list(range(24)),
+        'valores': valores,
+        'total': sum(map(sum, valores)),
+    }
+
+
+def calcular(inicio, fim, granularidade='dia'):
+    return {
+        'inicio': inicio.isoformat(),
+        'fim': fim.isoformat(),
+        'granularidade': granularidade,
+        'carga': carga_por_funcionario(inicio, fim, granularidade),
+        'sepultamentos_por_cargo': sepultamentos_por_cargo(inicio, fim, granularidade),
+        'horarios_pico': horarios_pico(inicio, fim),
+    }
+
+
+def obter(inicio, fim, granularidade='dia'):
+    """Matrizes do intervalo, do cache enquanto agenda e funcionários não mudarem."""
+    chave = fragmentos.chave_fragmento(
+        'analise_funcionarios', None, DOMINIOS, extras=(inicio, fim, granularidade)
+    )
+    return fragmentos.obter_ou_renderizar(chave, lambda: calcular(inicio, fim, granularidade))
+
+
+def intervalo_da_requisicao(parametros):
+    """
+    Lê ``inicio``, ``fim`` (AAAA-MM-DD) e ``granularidade`` dos parâmetros GET.
+
+    Padrão: últimos ``INTERVALO_PADRAO`` dias. Levanta ``ValueError`` se o
+    intervalo for inválido ou maior que ``INTERVALO_MAXIMO`` dias.
+    """
+    hoje = timezone.localdate()
+    fim = datetime.strptime(parametros['fim'], '%Y-%m-%d').date() if parametros.get('fim') else hoje
+    if parametros.get('inicio'):
+        inicio = datetime.strptime(parametros['inicio'], '%Y-%m-%d').date()
+    else:
+        inicio = fim - timedelta(days=INTERVALO_PADRAO - 1)
+    granularidade = parametros.get('granularidade') or 'dia'
+    if granularidade not in GRANULARIDADES:
+        raise ValueError(f'Granularidade inválida: {granularidade}')
+    if inicio > fim:
+        raise ValueError('A data inicial é posterior à final.')
+    if (fim - inicio).days >= INTERVALO_MAXIMO:
+        raise ValueError(f'Intervalo máximo: {INTERVALO_MAXIMO} dias.')
+    return inicio, fim, granularidade
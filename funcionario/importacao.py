@@ -0,0 +1,238 @@
+"""
+Cadastro de funcionários e contas de login em lote.
+
+Para importar centenas de funcionários (ex.: uma filial nova):
+
+* o CSV é lido em fluxo, linha a linha, e processado em lotes;
+* os usernames de cada lote saem de uma única consulta por prefixo
+  (``funcionario.utils.resolver_usernames``);
+* o hash das senhas temporárias, que é a parte cara, roda em um pool de
+  processos (``HasherSenhas``);
+* usuários e funcionários são gravados com ``bulk_create``, uma transação
+  por lote.
+
+``bulk_create`` não dispara signals, então os efeitos que eles teriam
+(is_staff do administrador, resumo do dashboard, índice de busca e cache
+de fragmentos) são aplicados aqui, uma vez por lote.
+
+O resultado é a lista de credenciais (username e senha temporária), que
+pode ser exportada com ``escrever_relatorio``.
+"""
+import csv
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from accounts.models import ResumoDashboard
+from app import fragmentos
+from busca import indice as indice_busca
+
+from .models import Funcionario
+from .utils import gerar_senha_temporaria, resolver_usernames
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+COLUNAS = ('nome', 'cargo', 'telefone', 'email')
+COLUNAS_RELATORIO = ('nome', 'username', 'senha', 'cargo', 'email')
+LOTE_PADRAO = 250
+
+
+# ---------------------------------------------------------------------------
+# Hash das senhas em paralelo
+# ---------------------------------------------------------------------------
+
+def _inicializar_processo(settings_module):
+    # Com "spawn" (Windows/macOS) o processo filho começa sem o Django configurado
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+class HasherSenhas:
+    """
+    Calcula ``make_password`` para uma lista de senhas, em paralelo.
+
+    Use como gerenciador de contexto para reaproveitar o pool entre os lotes.
+    Com ``processos=1`` (ou um único núcleo) o hash é feito no próprio processo.
+    """
+
+    def __init__(self, processos=None):
+        self.processos = processos or os.cpu_count() or 1
+        self._executor = None
+
+    def __enter__(self):
+        if self.processos > 1:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processos,
+                initializer=_inicializar_processo,
+                initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'app.settings'),),
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __call__(self, senhas):
+        if self._executor is None or len(senhas) < 2:
+            return [make_password(senha) for senha in senhas]
+        chunksize = max(1, len(senhas) // (self.processos * 4))
+        return list(self._executor.map(make_password, senhas, chunksize=chunksize))
+
+
+# ---------------------------------------------------------------------------
+# Criação das contas
+# ---------------------------------------------------------------------------
+
+def _novo_usuario(funcionario, username, senha_hash):
+    nome_parts = funcionario.nome.split()
+    return User(
+        username=username,
+        email=funcionario.email,
+        first_name=nome_parts[0] if nome_parts else '',
+        last_name=' '.join(nome_parts[1:]),
+        cargo=funcionario.cargo,
+        telefone=funcionario.telefone,
+        password=senha_hash,
+        is_staff=funcionario.cargo == 'adm',  # o que accounts.signals faria no save()
+    )
+
+
+def criar_contas(funcionarios, hashear, reservados=None):
+    """
+    Cria as contas de login de um lote de funcionários.
+
+    Os funcionários ainda não salvos são gravados junto (``bulk_create``);
+    os já existentes só recebem o vínculo com a conta (``bulk_update``).
+
+    Args:
+        funcionarios: lista de ``Funcionario`` sem conta
+        hashear: callable que recebe senhas e devolve os hashes (``HasherSenhas``)
+        reservados: usernames já usados nesta importação (atualizado)
+
+    Returns:
+        list: credenciais (dicts com ``COLUNAS_RELATORIO``)
+    """
+    funcionarios = [funcionario for funcionario in funcionarios if funcionario.usuario_id is None]
+    if not funcionarios:
+        return []
+    senhas = [gerar_senha_temporaria() for _ in funcionarios]
+    # O hash é a parte lenta: fica fora da transação para não segurar o lock de escrita
+    hashes = hashear(senhas)
+
+    with transaction.atomic():
+        usernames = resolver_usernames([f.username_sugerido for f in funcionarios], reservados)
+        usuarios = User.objects.bulk_create([
+            _novo_usuario(funcionario, username, senha_hash)
+            for funcionario, username, senha_hash in zip(funcionarios, usernames, hashes)
+        ])
+        for funcionario, usuario in zip(funcionarios, usuarios):
+            funcionario.usuario = usuario
+
+        novos = [funcionario for funcionario in funcionarios if funcionario.pk is None]
+        existentes = [funcionario for funcionario in funcionarios if funcionario.pk is not None]
+        if novos:
+            Funcionario.objects.bulk_create(novos)
+            ResumoDashboard.aplicar_variacoes({'total_funcionarios': len(novos)})
+            if indice_busca.disponivel():
+                indice_busca.indexar_em_lote(novos)
+        if existentes:
+            Funcionario.objects.bulk_update(existentes, ['usuario'])
+        transaction.on_commit(lambda: fragmentos.invalidar('funcionarios'))
+
+    logger.info(
+        f"{len(usuarios)} contas de funcionários criadas em lote",
+        extra={'evento': 'funcionario.contas_lote', 'dados': {
+            'contas': len(usuarios),
+            'funcionarios_novos': len(novos),
+        }}
+    )
+    return [
+        {
+            'nome': funcionario.nome,
+            'username': usuario.username,
+            'senha': senha,
+            'cargo': funcionario.cargo,
+            'email': funcionario.email,
+        }
+        for funcionario, usuario, senha in zip(funcionarios, usuarios, senhas)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# CSV
+# ---------------------------------------------------------------------------
+
+def ler_csv(arquivo):
+    """
+    Lê em fluxo um CSV de funcionários (colunas ``COLUNAS``; ``,`` ou ``;``).
+
+    Yields:
+        tuple: (número da linha, dict da linha)
+    """
+    linhas = iter(arquivo)
+    cabecalho = next(linhas, '')
+    delimitador = ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+    leitor = csv.DictReader(itertools.chain([cabecalho], linhas), delimiter=delimitador)
+    leitor.fieldnames = [(coluna or '').strip().lower() for coluna in leitor.fieldnames or []]
+    faltando = [coluna for coluna in COLUNAS if coluna not in leitor.fieldnames]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes no CSV: {', '.join(faltando)}")
+    for linha in leitor:
+        yield leitor.line_num, {coluna: (linha.get(coluna) or '').strip() for coluna in COLUNAS}
+
+
+def _funcionarios_validos(linhas, erros):
+    """Converte as linhas em ``Funcionario`` não salvos, anotando as inválidas em ``erros``."""
+    for numero, dados in linhas:
+        funcionario = Funcionario(**dados, ativo=True)
+        try:
+            funcionario.full_clean(exclude=['usuario'])
+        except ValidationError as e:
+            erros.append({'linha': numero, 'nome': dados['nome'], 'erro': '; '.join(
+                f"{campo}: {' '.join(mensagens)}" for campo, mensagens in e.message_dict.items()
+            )})
+            continue
+        yield funcionario
+
+
+def _em_lotes(iteravel, tamanho):
+    iterador = iter(iteravel)
+    while lote := list(itertools.islice(iterador, tamanho)):
+        yield lote
+
+
+def importar_csv(arquivo, processos=None, lote=LOTE_PADRAO):
+    """
+    Importa os funcionários de um CSV e cria as contas de login.
+
+    Args:
+        arquivo: arquivo texto aberto (ou qualquer iterável de linhas)
+        processos: tamanho do pool para o hash das senhas (padrão: núcleos da CPU)
+        lote: funcionários gravados por transação
+
+    Returns:
+        dict: ``credenciais`` (lista) e ``erros`` (linhas ignoradas)
+    """
+    erros = []
+    credenciais = []
+    reservados = set()
+    with HasherSenhas(processos) as hashear:
+        for funcionarios in _em_lotes(_funcionarios_validos(ler_csv(arquivo), erros), lote):
+            credenciais.extend(criar_contas(funcionarios, hashear, reservados))
+    return {'credenciais': credenciais, 'erros': erros}
+
+
+def escrever_relatorio(credenciais, destino):
+    """Escreve o relatório de credenciais (CSV) em um arquivo texto ou resposta HTTP."""
+    escritor = csv.DictWriter(destino, fieldnames=COLUNAS_RELATORIO, extrasaction='ignore')
+    escritor.writeheader()
+    escritor.writerows(credenciais)
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from funcionario.importacao import LOTE_PADRAO, escrever_relatorio, importar_csv
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa funcionários de um CSV (nome, cargo, telefone, email), cria as contas de login '
+        'em lote e grava um relatório com os usernames e as senhas temporárias.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='CSV de entrada (UTF-8, separado por "," ou ";").')
+        parser.add_argument(
+            '--saida',
+            required=True,
+            help='CSV de saída com as credenciais geradas (guarde em local seguro).',
+        )
+        parser.add_argument(
+            '--processos',
+            type=int,
+            default=None,
+            help='Processos para o hash das senhas (padrão: núcleos da CPU).',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=LOTE_PADRAO,
+            help=f'Funcionários gravados por transação (padrão: {LOTE_PADRAO}).',
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        try:
+            with open(options['arquivo'], encoding='utf-8-sig', newline='') as arquivo:
+                resultado = importar_csv(arquivo, processos=options['processos'], lote=options['lote'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        with open(options['saida'], 'w', encoding='utf-8', newline='') as saida:
+            escrever_relatorio(resultado['credenciais'], saida)
+
+        for erro in resultado['erros']:
+            self.stderr.write(f"  Linha {erro['linha']} ({erro['nome'] or 'sem nome'}): {erro['erro']}")
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(resultado['credenciais'])} funcionários importados em {duracao:.1f}s "
+            f"({len(resultado['erros'])} linhas ignoradas). Credenciais em {options['saida']}."
+        ))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('funcionario', '0003_funcionario_ativo_funcionario_usuario'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='funcionario',
+            index=models.Index(fields=['nome', 'id'], name='funcionario_nome_idx'),
+        ),
+    ]
@@ -32,6 +32,10 @@ class Funcionario(models.Model):
         verbose_name = "Funcionário"
         verbose_name_plural = "Funcionários"
         ordering = ['nome']
+        indexes = [
+            # Listagem e autocomplete paginados por nome
+            models.Index(fields=['nome', 'id'], name='funcionario_nome_idx'),
+        ]
     
     def __str__(self):
         return f"{self.nome} - {self.get_cargo_display()}"
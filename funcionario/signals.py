@@ -2,6 +2,7 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from .models import Funcionario
+from .utils import resolver_usernames
 import logging
 
 User = get_user_model()
@@ -16,13 +17,7 @@ def criar_conta_funcionario(sender, instance, created, **kwargs):
     if created and not instance.usuario:
         try:
             # Gerar username único
-            username_base = instance.username_sugerido
-            username = username_base
-            counter = 1
-            
-            while User.objects.filter(username=username).exists():
-                username = f"{username_base}{counter}"
-                counter += 1
+            username = resolver_usernames([instance.username_sugerido])[0]
             
             # Criar usuário
             usuario = User.objects.create_user(
@@ -59,42 +54,26 @@ def deletar_conta_funcionario(sender, instance, **kwargs):
             logger.error(f"Erro ao remover conta do funcionário {instance.nome}: {e}")
 
 
-def criar_contas_funcionarios_existentes():
+def criar_contas_funcionarios_existentes(saida=None, processos=None):
     """
     Função utilitária para criar contas para funcionários existentes que não possuem.
+
+    Usa a criação em lote de ``funcionario.importacao`` (senhas temporárias
+    geradas por funcionário e hash em paralelo). As senhas não são exibidas
+    nem registradas no log: ficam nas credenciais devolvidas e, com ``saida``
+    (caminho de um arquivo), no relatório CSV, como em
+    ``importar_funcionarios --saida``.
     """
-    funcionarios_sem_conta = Funcionario.objects.filter(usuario__isnull=True, ativo=True)
-    
-    for funcionario in funcionarios_sem_conta:
-        try:
-            # Gerar username único
-            username_base = funcionario.username_sugerido
-            username = username_base
-            counter = 1
-            
-            while User.objects.filter(username=username).exists():
-                username = f"{username_base}{counter}"
-                counter += 1
-            
-            # Criar usuário
-            usuario = User.objects.create_user(
-                username=username,
-                email=funcionario.email,
-                first_name=funcionario.nome.split()[0] if funcionario.nome.split() else '',
-                last_name=' '.join(funcionario.nome.split()[1:]) if len(funcionario.nome.split()) > 1 else '',
-                cargo=funcionario.cargo,
-                telefone=funcionario.telefone,
-                password='123456'
-            )
-            
-            # Associar usuário ao funcionário
-            funcionario.usuario = usuario
-            funcionario.save(update_fields=['usuario'])
-            
-            print(f"✅ Conta criada: {funcionario.nome} -> {username}")
-            
-        except Exception as e:
-            print(f"❌ Erro ao criar conta para {funcionario.nome}: {e}")
-    
-    print(f"\n🎉 Processo concluído! {funcionarios_sem_conta.count()} contas criadas.")
+    from .importacao import HasherSenhas, criar_contas, escrever_relatorio
+
+    funcionarios_sem_conta = list(Funcionario.objects.filter(usuario__isnull=True, ativo=True))
+
+    with HasherSenhas(processos) as hashear:
+        credenciais = criar_contas(funcionarios_sem_conta, hashear)
 
+    if saida:
+        with open(saida, 'w', encoding='utf-8', newline='') as destino:
+            escrever_relatorio(credenciais, destino)
+    for credencial in credenciais:
+        logger.info(f"Conta criada para funcionário {credencial['nome']}: {credencial['username']}")
+    return credenciais
@@ -1,3 +1,210 @@
+import csv
+import io
+import os
+import tempfile
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser, ResumoDashboard
+from agendamento.models import Agendamento
+from familia.models import Familia
+from pessoa_falecida.models import PessoaFalecida
+
+from . import analise
+
+from .importacao import importar_csv
+from .models import Funcionario
+from .signals import criar_contas_funcionarios_existentes
+from .utils import resolver_usernames
+
+def _csv(linhas, delimitador=','):
+    saida = io.StringIO()
+    escritor = csv.writer(saida, delimiter=delimitador)
+    escritor.writerow(['nome', 'cargo', 'telefone', 'email'])
+    escritor.writerows(linhas)
+    return io.StringIO(saida.getvalue())
+
+
+def _linhas(quantidade, inicio=0):
+    return [
+        [f'Maria {i} Silva', 'florista', '(11) 99999-0000', f'maria{i}@exemplo.com.br']
+        for i in range(inicio, inicio + quantidade)
+    ]
+
+
+class ImportacaoFuncionariosTest(TestCase):
+    """Importação de funcionários e contas de login em lote."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_usernames_resolvidos_com_uma_consulta(self):
+        CustomUser.objects.bulk_create([
+            CustomUser(username='maria.silva', cargo='vendedor'),
+            CustomUser(username='maria.silva1', cargo='vendedor'),
+        ])
+        with self.assertNumQueries(1):
+            usernames = resolver_usernames(['maria.silva', 'joao.souza', 'maria.silva'])
+        self.assertEqual(usernames, ['maria.silva2', 'joao.souza', 'maria.silva3'])
+
+    def test_importa_csv_e_cria_contas(self):
+        ResumoDashboard.obter()
+        arquivo = _csv([
+            ['Ana Lima', 'adm', '(11) 98888-0000', 'ana@exemplo.com.br'],
+            ['Sem Cargo', 'astronauta', '(11) 97777-0000', 'x@exemplo.com.br'],
+            ['Ana Paula Lima', 'coveiro', '(11) 96666-0000', 'ana.paula@exemplo.com.br'],
+        ], delimitador=';')
+
+        resultado = importar_csv(arquivo, processos=2)
+
+        self.assertEqual([erro['linha'] for erro in resultado['erros']], [3])
+        self.assertEqual([c['username'] for c in resultado['credenciais']], ['ana.lima', 'ana.lima1'])
+        for credencial in resultado['credenciais']:
+            usuario = CustomUser.objects.get(username=credencial['username'])
+            self.assertTrue(usuario.check_password(credencial['senha']))
+            self.assertEqual(usuario.funcionario.nome, credencial['nome'])
+        self.assertTrue(CustomUser.objects.get(username='ana.lima').is_staff)
+        self.assertEqual(ResumoDashboard.obter().total_funcionarios, 2)
+
+    def test_consultas_constantes_por_lote(self):
+        def consultas(linhas):
+            with CaptureQueriesContext(connection) as capturadas:
+                importar_csv(_csv(linhas), processos=1)
+            return len(capturadas)
+
+        self.assertEqual(consultas(_linhas(2)), consultas(_linhas(8, inicio=2)))
+        self.assertEqual(Funcionario.objects.filter(usuario__isnull=False).count(), 10)
+
+    def test_comando_grava_relatorio(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            entrada = os.path.join(diretorio, 'funcionarios.csv')
+            saida = os.path.join(diretorio, 'credenciais.csv')
+            with open(entrada, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(_csv(_linhas(3)).getvalue())
+            call_command('importar_funcionarios', entrada, saida=saida, processos=1, stdout=io.StringIO())
+            with open(saida, encoding='utf-8') as arquivo:
+                relatorio = list(csv.DictReader(arquivo))
+        self.assertEqual([linha['username'] for linha in relatorio], ['maria.silva', 'maria.silva1', 'maria.silva2'])
+
+    def test_acao_do_admin_cria_contas_dos_selecionados(self):
+        admin = CustomUser.objects.create_superuser('root', 'root@exemplo.com.br', 'senha123', cargo='adm')
+        Funcionario.objects.bulk_create([
+            Funcionario(nome=f'João {i} Souza', cargo='coveiro', telefone='(11) 95555-0000', email='j@x.com.br')
+            for i in range(3)
+        ])
+        self.client.force_login(admin)
+        # Dentro da requisição o hash roda no próprio processo, sem pool
+        with mock.patch('funcionario.importacao.ProcessPoolExecutor', side_effect=AssertionError('pool no admin')):
+            resposta = self.client.post(reverse('admin:funcionario_funcionario_changelist'), {
+                'action': 'criar_contas_login',
+                '_selected_action': list(Funcionario.objects.values_list('pk', flat=True)),
+            })
+        self.assertEqual(resposta['Content-Type'], 'text/csv; charset=utf-8')
+        relatorio = list(csv.DictReader(io.StringIO(resposta.content.decode())))
+        self.assertEqual(len(relatorio), 3)
+        self.assertFalse(Funcionario.objects.filter(usuario__isnull=True).exists())
+
+    def test_contas_de_existentes_sem_exibir_senhas(self):
+        Funcionario.objects.bulk_create([
+            Funcionario(nome='Ana Lima', cargo='florista', telefone='(11) 95555-0000', email='a@x.com.br'),
+        ])
+        with tempfile.TemporaryDirectory() as pasta, self.assertLogs('funcionario.signals', 'INFO') as logs:
+            saida = os.path.join(pasta, 'credenciais.csv')
+            credenciais = criar_contas_funcionarios_existentes(saida=saida, processos=1)
+            with open(saida, encoding='utf-8') as arquivo:
+                relatorio = list(csv.DictReader(arquivo))
+        senha = credenciais[0]['senha']
+        self.assertEqual(relatorio[0]['senha'], senha)
+        self.assertIn('ana.lima', logs.output[0])
+        self.assertFalse(any(senha in linha for linha in logs.output))
+
+
+class AnaliseCargaTest(TestCase):
+    """Matrizes de carga de trabalho a partir de consultas agrupadas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='senha123', cargo='adm')
+        cls.coveiro, cls.florista = Funcionario.objects.bulk_create([
+            Funcionario(nome='Carlos Coveiro', cargo='coveiro', telefone='11', email='c@x.com.br'),
+            Funcionario(nome='Flora Florista', cargo='florista', telefone='11', email='f@x.com.br'),
+        ])
+        familia = Familia.objects.create(
+            nome_responsavel='Responsável', grau_parentesco='Filho', telefone='1133334444', endereco='Rua Teste, 1'
+        )
+        cls.falecido = PessoaFalecida.objects.create(
+            nome='Falecido', data_nascimento=date(1950, 1, 1), data_falecimento=date(2026, 10, 1),
+            causa_obito='Natural', local_obito='Hospital', documento_cpf_rg='00000000001', familia=familia
+        )
+        # Segunda 05/10: 2 do coveiro às 9h e 1 da florista às 14h; terça 06/10: 1 do coveiro às 9h
+        for funcionario, dia, hora in [
+            (cls.coveiro, 5, 9), (cls.coveiro, 5, 9), (cls.florista, 5, 14), (cls.coveiro, 6, 9),
+        ]:
+            cls.agendar(funcionario, date(2026, 10, dia), hora)
+
+    @classmethod
+    def agendar(cls, funcionario, dia, hora):
+        momento = timezone.make_aware(datetime.combine(dia, time(hora)))
+        return Agendamento.objects.create(
+            pessoa_falecida=cls.falecido, funcionario=funcionario,
+            data_agendamento=momento, hora_agendamento=time(hora),
+            local_velorio='Capela 1', local_sepultamento='Cemitério Central',
+            data_sepultamento=momento + timedelta(hours=3),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_uma_consulta_por_matriz(self):
+        with self.assertNumQueries(3):
+            dados = analise.calcular(date(2026, 10, 4), date(2026, 10, 7))
+
+        carga = dados['carga']
+        self.assertEqual(carga['periodos'], ['2026-10-04', '2026-10-05', '2026-10-06', '2026-10-07'])
+        self.assertEqual(
+            [(linha['nome'], linha['valores']) for linha in carga['linhas']],
+            [('Carlos Coveiro', [0, 2, 1, 0]), ('Flora Florista', [0, 1, 0, 0])],
+        )
+        self.assertEqual(
+            [(linha['cargo'], linha['total']) for linha in dados['sepultamentos_por_cargo']['linhas']],
+            [('florista', 1), ('coveiro', 3)],
+        )
+        pico = dados['horarios_pico']['valores']
+        self.assertEqual((pico[0][9], pico[0][14], pico[1][9], dados['horarios_pico']['total']), (2, 1, 1, 4))
+
+    def test_granularidade_semanal(self):
+        dados = analise.calcular(date(2026, 10, 1), date(2026, 10, 14), 'semana')
+        self.assertEqual(dados['carga']['periodos'], ['2026-09-28', '2026-10-05', '2026-10-12'])
+        self.assertEqual(dados['carga']['linhas'][0]['valores'], [0, 3, 0])
+
+    def test_cache_por_intervalo_invalidado_pelo_agendamento(self):
+        self.client.force_login(self.admin)
+        url = reverse('funcionario:analise_json')
+        parametros = {'inicio': '2026-10-05', 'fim': '2026-10-05'}
+        self.assertEqual(self.client.get(url, parametros).json()['horarios_pico']['total'], 3)
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get(url, parametros)
+        self.assertFalse(any('agendamento_agendamento' in c['sql'] for c in consultas.captured_queries))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.agendar(self.florista, date(2026, 10, 5), 16)
+        self.assertEqual(self.client.get(url, parametros).json()['horarios_pico']['total'], 4)
+
+    def test_acesso_e_validacao(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse('funcionario:analise')).status_code, 200)
+        resposta = self.client.get(reverse('funcionario:analise_json'), {'inicio': '2026-10-05', 'fim': '2026-10-01'})
+        self.assertEqual(resposta.status_code, 400)
 
-# Create your tests here.
+        vendedor = CustomUser.objects.create_user('vendedor', password='senha123', cargo='vendedor')
+        self.client.force_login(vendedor)
+        self.assertEqual(self.client.get(reverse('funcionario:analise')).status_code, 403)
@@ -5,6 +5,8 @@ app_name = 'funcionario'
 
 urlpatterns = [
     path('', views.FuncionarioListView.as_view(), name='list'),
+    path('analise/', views.AnaliseCargaView.as_view(), name='analise'),
+    path('analise/json/', views.AnaliseCargaJsonView.as_view(), name='analise_json'),
     path('<int:pk>/', views.FuncionarioDetailView.as_view(), name='detail'),
     path('novo/', views.FuncionarioCreateView.as_view(), name='create'),
     path('<int:pk>/editar/', views.FuncionarioUpdateView.as_view(), name='update'),
@@ -1,5 +1,8 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 from .models import Funcionario
+from functools import reduce
+import operator
 import random
 import string
 
@@ -12,6 +15,43 @@ def gerar_senha_temporaria(length=8):
     return ''.join(random.choice(characters) for _ in range(length))
 
 
+def resolver_usernames(bases, reservados=None):
+    """
+    Escolhe usernames livres para uma lista de bases (ex.: "maria.silva").
+
+    Faz uma única consulta por prefixo para todas as bases e segue a regra de
+    sempre: a própria base, senão base1, base2... As bases repetidas na lista
+    recebem sufixos diferentes.
+
+    Args:
+        bases: usernames sugeridos, na ordem dos funcionários
+        reservados: set de usernames já escolhidos nesta operação (é atualizado)
+
+    Returns:
+        list: usernames, na mesma ordem de ``bases``
+    """
+    reservados = set() if reservados is None else reservados
+    if not bases:
+        return []
+    filtro = reduce(operator.or_, (Q(username__startswith=base) for base in set(bases)))
+    ocupados = set(User.objects.filter(filtro).values_list('username', flat=True)) | reservados
+
+    usernames = []
+    proximo_sufixo = {}
+    for base in bases:
+        username = base
+        if username in ocupados:
+            contador = proximo_sufixo.get(base, 1)
+            while f"{base}{contador}" in ocupados:
+                contador += 1
+            username = f"{base}{contador}"
+            proximo_sufixo[base] = contador + 1
+        ocupados.add(username)
+        reservados.add(username)
+        usernames.append(username)
+    return usernames
+
+
 def criar_conta_funcionario(funcionario):
     """
     Cria uma conta de usuário para um funcionário específico.
@@ -27,13 +67,7 @@ def criar_conta_funcionario(funcionario):
     
     try:
         # Gerar username único
-        username_base = funcionario.username_sugerido
-        username = username_base
-        counter = 1
-        
-        while User.objects.filter(username=username).exists():
-            username = f"{username_base}{counter}"
-            counter += 1
+        username = resolver_usernames([funcionario.username_sugerido])[0]
         
         # Gerar senha temporária
         senha_temporaria = gerar_senha_temporaria()
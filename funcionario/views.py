@@ -1,4 +1,4 @@
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 from django.urls import reverse_lazy
 from django.contrib import messages
 from django.shortcuts import redirect, get_object_or_404
@@ -9,7 +9,9 @@ from django.utils.decorators import method_decorator
 from .models import Funcionario
 from .forms import FuncionarioForm, FuncionarioUsuarioForm
 from .utils import criar_conta_funcionario, resetar_senha_funcionario, desativar_conta_funcionario, ativar_conta_funcionario
+from django.contrib.auth.mixins import UserPassesTestMixin
 from app.mixins import LoginRequiredMixin, AdminDeleteMixin
+from . import analise
 
 
 class FuncionarioListView(LoginRequiredMixin, ListView):
@@ -170,3 +172,47 @@ def toggle_ativo_view(request, pk):
         messages.success(request, f'Conta de {funcionario.nome} ativada.')
     
     return redirect('funcionario:detail', pk=pk)
+
+
+class AnaliseCargaView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
+    """
+    Carga de trabalho dos funcionários no intervalo (apenas administradores).
+
+    Parâmetros GET: ``inicio``, ``fim`` (AAAA-MM-DD) e ``granularidade``
+    (``dia`` ou ``semana``). As matrizes vêm de ``funcionario.analise``.
+    """
+    template_name = 'funcionario/analise_carga.html'
+
+    def test_func(self):
+        return self.request.user.is_admin
+
+    def get_analise(self):
+        try:
+            inicio, fim, granularidade = analise.intervalo_da_requisicao(self.request.GET)
+        except ValueError as e:
+            return None, str(e)
+        return analise.obter(inicio, fim, granularidade), None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        dados, erro = self.get_analise()
+        context['erro'] = erro
+        context['analise'] = dados
+        if dados:
+            context['maximo_carga'] = max((max(l['valores']) for l in dados['carga']['linhas']), default=0)
+            context['maximo_sepultamentos'] = max(
+                (max(l['valores']) for l in dados['sepultamentos_por_cargo']['linhas']), default=0
+            )
+            context['maximo_pico'] = max(map(max, dados['horarios_pico']['valores']))
+            context['dias_pico'] = zip(dados['horarios_pico']['dias'], dados['horarios_pico']['valores'])
+        return context
+
+
+class AnaliseCargaJsonView(AnaliseCargaView):
+    """Mesmas matrizes de ``AnaliseCargaView`` em JSON."""
+
+    def get(self, request, *args, **kwargs):
+        dados, erro = self.get_analise()
+        if erro:
+            return JsonResponse({'erro': erro}, status=400)
+        return JsonResponse(dados)
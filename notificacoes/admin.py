@@ -0,0 +1,24 @@
+from django.contrib import admin
+from .models import Notificacao, EntregaNotificacao
+
+
+class EntregaNotificacaoInline(admin.TabularInline):
+    model = EntregaNotificacao
+    extra = 0
+    readonly_fields = ('canal', 'status', 'tentativas', 'proxima_tentativa', 'ultimo_erro', 'data_envio')
+
+
+@admin.register(Notificacao)
+class NotificacaoAdmin(admin.ModelAdmin):
+    list_display = ('usuario', 'tipo', 'lida', 'data_criacao')
+    search_fields = ('mensagem', 'usuario__username')
+    list_filter = ('tipo', 'lida')
+    raw_id_fields = ('usuario',)
+    inlines = [EntregaNotificacaoInline]
+
+
+@admin.register(EntregaNotificacao)
+class EntregaNotificacaoAdmin(admin.ModelAdmin):
+    list_display = ('notificacao', 'canal', 'status', 'tentativas', 'proxima_tentativa', 'data_envio')
+    list_filter = ('canal', 'status')
+    raw_id_fields = ('notificacao',)
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class NotificacoesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'notificacoes'
+    verbose_name = 'Notificações'
@@ -0,0 +1,83 @@
+"""
+Caixa de entrada de notificações.
+
+``notificar()`` grava as notificações de vários destinatários com um único
+``bulk_create`` e enfileira as entregas externas (e-mail e webhook) para o
+despachante (``notificacoes.despachante``), que roda fora das requisições.
+
+A quantidade de não lidas de cada usuário fica no cache compartilhado: o
+badge da navbar só consulta o banco depois que a contagem é invalidada (nova
+notificação ou leitura) ou expira.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EntregaNotificacao, Notificacao
+
+NAO_LIDAS_KEY = 'notificacoes_nao_lidas:{}'
+NAO_LIDAS_TIMEOUT_PADRAO = 300  # segundos
+
+
+def canais_ativos():
+    """Canais externos configurados (``NOTIFICACOES_CANAIS``)."""
+    canais = getattr(settings, 'NOTIFICACOES_CANAIS', ('email', 'webhook'))
+    if not getattr(settings, 'NOTIFICACOES_WEBHOOK_URL', ''):
+        canais = [canal for canal in canais if canal != 'webhook']
+    return tuple(canais)
+
+
+def _canais_do_usuario(usuario, canais):
+    return [canal for canal in canais if canal != 'email' or usuario.email]
+
+
+def invalidar_nao_lidas(*usuario_ids):
+    """Descarta a contagem em cache após o commit da transação atual."""
+    chaves = [NAO_LIDAS_KEY.format(pk) for pk in usuario_ids]
+    transaction.on_commit(lambda: cache.delete_many(chaves))
+
+
+def notificar(usuarios, tipo, mensagem, link=''):
+    """
+    Cria uma notificação para cada usuário (e as entregas externas).
+
+    Retorna a lista de notificações criadas. São duas inserções em lote,
+    independentemente da quantidade de destinatários.
+    """
+    usuarios = [usuario for usuario in usuarios if usuario is not None]
+    if not usuarios:
+        return []
+    notificacoes = Notificacao.objects.bulk_create([
+        Notificacao(usuario=usuario, tipo=tipo, mensagem=mensagem, link=link)
+        for usuario in usuarios
+    ])
+    canais = canais_ativos()
+    EntregaNotificacao.objects.bulk_create([
+        EntregaNotificacao(notificacao=notificacao, canal=canal)
+        for notificacao in notificacoes
+        for canal in _canais_do_usuario(notificacao.usuario, canais)
+    ])
+    invalidar_nao_lidas(*{usuario.pk for usuario in usuarios})
+    return notificacoes
+
+
+def nao_lidas(usuario):
+    """Quantidade de notificações não lidas do usuário (via cache)."""
+    chave = NAO_LIDAS_KEY.format(usuario.pk)
+    quantidade = cache.get(chave)
+    if quantidade is None:
+        quantidade = Notificacao.objects.filter(usuario=usuario, lida=False).count()
+        cache.set(chave, quantidade, getattr(settings, 'NOTIFICACOES_NAO_LIDAS_TIMEOUT', NAO_LIDAS_TIMEOUT_PADRAO))
+    return quantidade
+
+
+def marcar_como_lidas(usuario, ids=None):
+    """Marca como lidas as notificações do usuário (todas ou as de ``ids``)."""
+    notificacoes = Notificacao.objects.filter(usuario=usuario, lida=False)
+    if ids is not None:
+        notificacoes = notificacoes.filter(pk__in=ids)
+    atualizadas = notificacoes.update(lida=True, data_leitura=timezone.now())
+    if atualizadas:
+        invalidar_nao_lidas(usuario.pk)
+    return atualizadas
@@ -0,0 +1,61 @@
+"""
+Canais externos de entrega.
+
+Cada canal recebe um destinatário e a lista das notificações dele que estão
+pendentes naquele canal, e faz um único envio para todas (um e-mail, um POST).
+Falhas são sinalizadas com exceção; as novas tentativas ficam por conta do
+despachante.
+"""
+import json
+import urllib.request
+
+from django.conf import settings
+from django.core.mail import send_mail
+
+WEBHOOK_TIMEOUT_PADRAO = 5  # segundos
+
+
+def enviar_email(usuario, notificacoes):
+    """Um e-mail por destinatário, listando todas as notificações pendentes."""
+    if len(notificacoes) == 1:
+        assunto = f'[Notificação] {notificacoes[0].mensagem[:80]}'
+    else:
+        assunto = f'[Notificações] {len(notificacoes)} novas notificações'
+    corpo = '\n\n'.join(
+        f'{notificacao.data_criacao:%d/%m/%Y %H:%M} - {notificacao.mensagem}'
+        for notificacao in notificacoes
+    )
+    send_mail(assunto, corpo, settings.DEFAULT_FROM_EMAIL, [usuario.email])
+
+
+def enviar_webhook(usuario, notificacoes):
+    """Um POST JSON por destinatário em ``NOTIFICACOES_WEBHOOK_URL``."""
+    corpo = json.dumps({
+        'usuario': usuario.username,
+        'notificacoes': [
+            {
+                'id': notificacao.pk,
+                'tipo': notificacao.tipo,
+                'mensagem': notificacao.mensagem,
+                'link': notificacao.link,
+                'data': notificacao.data_criacao.isoformat(),
+            }
+            for notificacao in notificacoes
+        ],
+    }).encode()
+    requisicao = urllib.request.Request(
+        settings.NOTIFICACOES_WEBHOOK_URL,
+        data=corpo,
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
+    timeout = getattr(settings, 'NOTIFICACOES_WEBHOOK_TIMEOUT', WEBHOOK_TIMEOUT_PADRAO)
+    # Respostas 4xx/5xx viram HTTPError e contam como falha
+    with urllib.request.urlopen(requisicao, timeout=timeout) as resposta:
+        resposta.read()
+
+
+CANAIS = {
+    'email': enviar_email,
+    'webhook': enviar_webhook,
+}
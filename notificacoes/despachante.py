@@ -0,0 +1,121 @@
+"""
+Despachante das entregas externas de notificações.
+
+Roda em um processo próprio (``python manage.py despachar_notificacoes``),
+nunca na thread de uma requisição. A cada ciclo pega as entregas pendentes
+vencidas, agrupa por destinatário e canal e faz um único envio por grupo.
+Se o envio falhar, todas as entregas do grupo são reagendadas com espera
+exponencial (``NOTIFICACOES_BACKOFF_BASE`` * 2^(tentativas-1), limitada a
+``NOTIFICACOES_BACKOFF_MAXIMO``) até ``NOTIFICACOES_MAX_TENTATIVAS``; depois
+disso ficam como ``falhou``.
+
+Use um único despachante por banco: dois processos pegariam as mesmas
+entregas pendentes.
+"""
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .canais import CANAIS
+from .models import EntregaNotificacao
+
+logger = logging.getLogger(__name__)
+
+LOTE_PADRAO = 200
+MAX_TENTATIVAS_PADRAO = 5
+BACKOFF_BASE_PADRAO = 30  # segundos
+BACKOFF_MAXIMO_PADRAO = 3600  # segundos
+
+
+class Despachante:
+    """Entrega em lote as notificações pendentes, com novas tentativas."""
+
+    def __init__(self, lote=None):
+        self.lote = lote or getattr(settings, 'NOTIFICACOES_LOTE', LOTE_PADRAO)
+        self.max_tentativas = getattr(settings, 'NOTIFICACOES_MAX_TENTATIVAS', MAX_TENTATIVAS_PADRAO)
+        self.backoff_base = getattr(settings, 'NOTIFICACOES_BACKOFF_BASE', BACKOFF_BASE_PADRAO)
+        self.backoff_maximo = getattr(settings, 'NOTIFICACOES_BACKOFF_MAXIMO', BACKOFF_MAXIMO_PADRAO)
+
+    def atraso(self, tentativas):
+        """Espera antes da próxima tentativa, após ``tentativas`` falhas."""
+        return timedelta(seconds=min(self.backoff_base * 2 ** (tentativas - 1), self.backoff_maximo))
+
+    def pendentes(self, agora):
+        return list(
+            EntregaNotificacao.objects.filter(status='pendente', proxima_tentativa__lte=agora)
+            .select_related('notificacao__usuario')
+            .order_by('proxima_tentativa', 'id')[:self.lote]
+        )
+
+    def executar_ciclo(self):
+        """Processa um lote. Retorna a contagem de entregas por resultado."""
+        agora = timezone.now()
+        grupos = defaultdict(list)
+        for entrega in self.pendentes(agora):
+            grupos[entrega.notificacao.usuario_id, entrega.canal].append(entrega)
+
+        resumo = {'enviadas': 0, 'reagendadas': 0, 'falharam': 0}
+        for (_usuario_id, canal), entregas in grupos.items():
+            usuario = entregas[0].notificacao.usuario
+            try:
+                CANAIS[canal](usuario, [entrega.notificacao for entrega in entregas])
+            except Exception as e:
+                self._registrar_falha(entregas, canal, usuario, e, resumo)
+            else:
+                self._registrar_envio(entregas, resumo)
+        return resumo
+
+    def _registrar_envio(self, entregas, resumo):
+        agora = timezone.now()
+        for entrega in entregas:
+            entrega.status = 'enviada'
+            entrega.tentativas += 1
+            entrega.data_envio = agora
+            entrega.ultimo_erro = ''
+        EntregaNotificacao.objects.bulk_update(entregas, ['status', 'tentativas', 'data_envio', 'ultimo_erro'])
+        resumo['enviadas'] += len(entregas)
+
+    def _registrar_falha(self, entregas, canal, usuario, erro, resumo):
+        agora = timezone.now()
+        for entrega in entregas:
+            entrega.tentativas += 1
+            entrega.ultimo_erro = str(erro)[:1000]
+            if entrega.tentativas >= self.max_tentativas:
+                entrega.status = 'falhou'
+                resumo['falharam'] += 1
+            else:
+                entrega.proxima_tentativa = agora + self.atraso(entrega.tentativas)
+                resumo['reagendadas'] += 1
+        EntregaNotificacao.objects.bulk_update(
+            entregas, ['status', 'tentativas', 'proxima_tentativa', 'ultimo_erro']
+        )
+        logger.warning(
+            f"Falha ao enviar {len(entregas)} notificação(ões) por {canal} para {usuario.username}: {erro}",
+            extra={'evento': 'notificacao.falha', 'dados': {
+                'canal': canal,
+                'usuario': usuario.username,
+                'entregas': [entrega.pk for entrega in entregas],
+                'tentativas': max(entrega.tentativas for entrega in entregas),
+            }}
+        )
+
+    def executar(self, intervalo, parar=None):
+        """Laço do processo despachante; termina quando ``parar`` é sinalizado."""
+        parar = parar or threading.Event()
+        while not parar.is_set():
+            close_old_connections()
+            resumo = self.executar_ciclo()
+            if sum(resumo.values()):
+                logger.info(
+                    f"Notificações: {resumo['enviadas']} enviadas, {resumo['reagendadas']} reagendadas, "
+                    f"{resumo['falharam']} falharam",
+                    extra={'evento': 'notificacao.despacho', 'dados': resumo}
+                )
+            # Lote cheio: provavelmente há mais pendentes, segue sem esperar
+            if sum(resumo.values()) < self.lote:
+                parar.wait(intervalo)
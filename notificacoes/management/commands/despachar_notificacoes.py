@@ -0,0 +1,49 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from notificacoes.despachante import Despachante
+
+
+class Command(BaseCommand):
+    help = (
+        'Envia por e-mail e webhook as notificações pendentes, agrupadas por destinatário '
+        'e canal, com novas tentativas e espera exponencial. Rode um único processo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--uma-vez',
+            action='store_true',
+            help='Processa um lote e termina (para uso em cron).',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=5,
+            help='Segundos entre consultas quando a fila está vazia (padrão: 5).',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=None,
+            help='Entregas processadas por ciclo (padrão: NOTIFICACOES_LOTE).',
+        )
+
+    def handle(self, *args, **options):
+        despachante = Despachante(lote=options['lote'])
+        if options['uma_vez']:
+            resumo = despachante.executar_ciclo()
+            self.stdout.write(self.style.SUCCESS(
+                f"{resumo['enviadas']} enviadas, {resumo['reagendadas']} reagendadas, "
+                f"{resumo['falharam']} falharam."
+            ))
+            return
+
+        parar = threading.Event()
+        for sinal in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sinal, lambda *args: parar.set())
+        self.stdout.write(f"Despachante de notificações iniciado (intervalo {options['intervalo']}s).")
+        despachante.executar(options['intervalo'], parar)
+        self.stdout.write('Despachante encerrado.')
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notificacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(help_text='Origem da notificação (ex.: estoque_baixo)', max_length=50, verbose_name='Tipo')),
+                ('mensagem', models.TextField(verbose_name='Mensagem')),
+                ('link', models.CharField(blank=True, max_length=200, verbose_name='Link')),
+                ('lida', models.BooleanField(default=False, verbose_name='Lida')),
+                ('data_criacao', models.DateTimeField(auto_now_add=True, verbose_name='Data de Criação')),
+                ('data_leitura', models.DateTimeField(blank=True, null=True, verbose_name='Data de Leitura')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notificacoes', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Notificação',
+                'verbose_name_plural': 'Notificações',
+                'ordering': ['-data_criacao', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EntregaNotificacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('canal', models.CharField(choices=[('email', 'E-mail'), ('webhook', 'Webhook')], max_length=20, verbose_name='Canal')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviada', 'Enviada'), ('falhou', 'Falhou')], default='pendente', max_length=20, verbose_name='Status')),
+                ('tentativas', models.PositiveSmallIntegerField(default=0, verbose_name='Tentativas')),
+                ('proxima_tentativa', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próxima Tentativa')),
+                ('ultimo_erro', models.TextField(blank=True, verbose_name='Último Erro')),
+                ('data_envio', models.DateTimeField(blank=True, null=True, verbose_name='Data de Envio')),
+                ('notificacao', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entregas', to='notificacoes.notificacao', verbose_name='Notificação')),
+            ],
+            options={
+                'verbose_name': 'Entrega de Notificação',
+                'verbose_name_plural': 'Entregas de Notificações',
+                'ordering': ['proxima_tentativa', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(fields=['usuario', '-data_criacao', '-id'], name='notificacao_usuario_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(condition=models.Q(('lida', False)), fields=['usuario'], name='notificacao_nao_lida_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entreganotificacao',
+            index=models.Index(condition=models.Q(('status', 'pendente')), fields=['proxima_tentativa', 'id'], name='entrega_pendente_idx'),
+        ),
+    ]
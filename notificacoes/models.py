@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Notificacao(models.Model):
+    """Notificação da caixa de entrada de um usuário."""
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notificacoes',
+        verbose_name="Usuário"
+    )
+    tipo = models.CharField(
+        max_length=50,
+        verbose_name="Tipo",
+        help_text="Origem da notificação (ex.: estoque_baixo)"
+    )
+    mensagem = models.TextField(
+        verbose_name="Mensagem"
+    )
+    link = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name="Link"
+    )
+    lida = models.BooleanField(
+        default=False,
+        verbose_name="Lida"
+    )
+    data_criacao = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Data de Criação"
+    )
+    data_leitura = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Data de Leitura"
+    )
+
+    class Meta:
+        verbose_name = "Notificação"
+        verbose_name_plural = "Notificações"
+        ordering = ['-data_criacao', '-id']
+        indexes = [
+            models.Index(fields=['usuario', '-data_criacao', '-id'], name='notificacao_usuario_idx'),
+            # Contagem de não lidas (badge da navbar) sem varrer as já lidas
+            models.Index(fields=['usuario'], condition=Q(lida=False), name='notificacao_nao_lida_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario} - {self.tipo}"
+
+
+class EntregaNotificacao(models.Model):
+    """Envio de uma notificação por um canal externo (e-mail, webhook)."""
+
+    CANAL_CHOICES = [
+        ('email', 'E-mail'),
+        ('webhook', 'Webhook'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('enviada', 'Enviada'),
+        ('falhou', 'Falhou'),
+    ]
+
+    notificacao = models.ForeignKey(
+        Notificacao,
+        on_delete=models.CASCADE,
+        related_name='entregas',
+        verbose_name="Notificação"
+    )
+    canal = models.CharField(
+        max_length=20,
+        choices=CANAL_CHOICES,
+        verbose_name="Canal"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pendente',
+        verbose_name="Status"
+    )
+    tentativas = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Tentativas"
+    )
+    proxima_tentativa = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Próxima Tentativa"
+    )
+    ultimo_erro = models.TextField(
+        blank=True,
+        verbose_name="Último Erro"
+    )
+    data_envio = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Data de Envio"
+    )
+
+    class Meta:
+        verbose_name = "Entrega de Notificação"
+        verbose_name_plural = "Entregas de Notificações"
+        ordering = ['proxima_tentativa', 'id']
+        indexes = [
+            # Fila do despachante: só as pendentes, pela ordem de vencimento
+            models.Index(
+                fields=['proxima_tentativa', 'id'],
+                condition=Q(status='pendente'),
+                name='entrega_pendente_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.notificacao} via {self.get_canal_display()} ({self.get_status_display()})"
@@ -0,0 +1,164 @@
+import json
+import logging
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from accounts.signals import notificacao_sistema
+
+from .caixa import nao_lidas, notificar
+from .despachante import Despachante
+from .models import EntregaNotificacao, Notificacao
+
+
+class ReceptorWebhook:
+    """Servidor HTTP local que guarda os corpos recebidos e responde ``status``."""
+
+    def __init__(self, status=204):
+        receptor = self
+        self.status = status
+        self.recebidos = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                tamanho = int(self.headers['Content-Length'])
+                receptor.recebidos.append(json.loads(self.rfile.read(tamanho)))
+                self.send_response(receptor.status)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.servidor.server_port}/notificacoes'
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+
+    def fechar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+
+@override_settings(NOTIFICACOES_WEBHOOK_URL='')
+class CaixaNotificacoesTest(TestCase):
+    """Gravação em lote e contagem de não lidas em cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='senha123', cargo='adm', email='admin@x.local')
+        cls.vendedores = CustomUser.objects.bulk_create(
+            CustomUser(username=f'vendedor{i}', cargo='vendedor') for i in range(30)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_notificacoes_gravadas_em_lote(self):
+        with CaptureQueriesContext(connection) as consultas:
+            notificar(self.vendedores + [self.admin], 'aviso', 'Reunião às 18h')
+        inserts = [c for c in consultas.captured_queries if c['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(Notificacao.objects.count(), 31)
+        # Só o administrador tem e-mail; o webhook está desativado
+        self.assertEqual(list(EntregaNotificacao.objects.values_list('canal', flat=True)), ['email'])
+
+    def test_badge_usa_cache_ate_mudar(self):
+        self.client.force_login(self.admin)
+        url = reverse('accounts:profile')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(url)
+        self.assertEqual(resposta.context['notificacoes_nao_lidas'], 0)
+        self.assertFalse(any(
+            'COUNT(' in c['sql'] and 'notificacoes_notificacao' in c['sql'] for c in consultas.captured_queries
+        ))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notificar([self.admin], 'aviso', 'Primeira')
+            notificar([self.admin], 'aviso', 'Segunda')
+        self.assertEqual(nao_lidas(self.admin), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('notificacoes:marcar_lidas'))
+        self.assertEqual(nao_lidas(self.admin), 0)
+        self.assertFalse(Notificacao.objects.filter(lida=False).exists())
+
+    def test_signal_do_sistema_notifica_administradores(self):
+        notificacao_sistema.send(sender=None, tipo='estoque_baixo', mensagem='Urnas acabando')
+        self.assertEqual(
+            list(Notificacao.objects.values_list('usuario__username', 'mensagem')),
+            [('admin', 'Urnas acabando')],
+        )
+
+
+@override_settings(
+    NOTIFICACOES_MAX_TENTATIVAS=2, NOTIFICACOES_BACKOFF_BASE=30,
+)
+class DespachanteTest(TestCase):
+    """Entrega agrupada por destinatário e canal, com novas tentativas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuarios = [
+            CustomUser.objects.create_user(f'adm{i}', password='senha123', cargo='adm', email=f'adm{i}@x.local')
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        self.receptor = ReceptorWebhook()
+        self.addCleanup(self.receptor.fechar)
+
+    def _notificar(self, quantidade, canais=('email', 'webhook')):
+        with self.settings(NOTIFICACOES_WEBHOOK_URL=self.receptor.url, NOTIFICACOES_CANAIS=canais):
+            for i in range(quantidade):
+                notificar(self.usuarios, 'aviso', f'Mensagem {i}')
+
+    def test_logs_do_despachante_seguem_para_o_log_json(self):
+        # Sem o logger 'notificacoes' no LOGGING, as falhas iam para o stderr e os resumos se perdiam
+        logger = logging.getLogger('notificacoes.despachante')
+        self.assertTrue(logger.isEnabledFor(logging.INFO))
+        self.assertTrue(logging.getLogger('notificacoes').handlers)
+        self.assertFalse(logging.getLogger('notificacoes').propagate)
+
+    def test_um_envio_por_destinatario_e_canal(self):
+        self._notificar(3)
+        with self.settings(NOTIFICACOES_WEBHOOK_URL=self.receptor.url):
+            resumo = Despachante().executar_ciclo()
+
+        self.assertEqual(resumo, {'enviadas': 12, 'reagendadas': 0, 'falharam': 0})
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox), ['adm0@x.local', 'adm1@x.local'])
+        self.assertIn('Mensagem 2', mail.outbox[0].body)
+        self.assertEqual(len(self.receptor.recebidos), 2)
+        self.assertEqual([len(corpo['notificacoes']) for corpo in self.receptor.recebidos], [3, 3])
+        self.assertFalse(EntregaNotificacao.objects.exclude(status='enviada').exists())
+
+    def test_falha_reagenda_com_espera_e_desiste(self):
+        self._notificar(1, canais=('webhook',))
+        self.receptor.status = 500
+        with self.settings(NOTIFICACOES_WEBHOOK_URL=self.receptor.url):
+            antes = timezone.now()
+            with self.assertLogs('notificacoes.despachante', 'WARNING'):
+                resumo = Despachante().executar_ciclo()
+            self.assertEqual(resumo, {'enviadas': 0, 'reagendadas': 2, 'falharam': 0})
+            webhook = EntregaNotificacao.objects.all()
+            for entrega in webhook:
+                self.assertEqual(entrega.tentativas, 1)
+                self.assertGreaterEqual(entrega.proxima_tentativa, antes + timedelta(seconds=30))
+
+            # Ainda não venceu: nada a fazer
+            self.assertEqual(sum(Despachante().executar_ciclo().values()), 0)
+
+            webhook.update(proxima_tentativa=timezone.now())
+            with self.assertLogs('notificacoes.despachante', 'WARNING'):
+                resumo = Despachante().executar_ciclo()
+        self.assertEqual(resumo['falharam'], 2)
+        self.assertEqual(set(webhook.values_list('status', flat=True)), {'falhou'})
+        self.assertIn('500', webhook.first().ultimo_erro)
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'notificacoes'
+
+urlpatterns = [
+    path('', views.NotificacaoListView.as_view(), name='list'),
+    path('marcar-lidas/', views.marcar_lidas, name='marcar_lidas'),
+]
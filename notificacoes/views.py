@@ -0,0 +1,38 @@
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.shortcuts import redirect
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
+from django.views.generic import ListView
+
+from .caixa import marcar_como_lidas
+from .models import Notificacao
+
+
+class NotificacaoListView(LoginRequiredMixin, ListView):
+    """Caixa de entrada do usuário logado."""
+    model = Notificacao
+    template_name = 'notificacoes/notificacao_list.html'
+    context_object_name = 'notificacoes'
+    paginate_by = 20
+
+    def get_queryset(self):
+        return Notificacao.objects.filter(usuario=self.request.user).only(
+            'tipo', 'mensagem', 'link', 'lida', 'data_criacao'
+        )
+
+
+@login_required
+@require_POST
+def marcar_lidas(request):
+    """Marca como lida uma notificação (``id``) ou todas; segue para ``next``."""
+    notificacao_id = request.POST.get('id', '')
+    if not notificacao_id:
+        marcar_como_lidas(request.user)
+    elif notificacao_id.isdigit():
+        marcar_como_lidas(request.user, ids=[int(notificacao_id)])
+
+    destino = request.POST.get('next', '')
+    if not url_has_allowed_host_and_scheme(destino, allowed_hosts={request.get_host()}):
+        destino = 'notificacoes:list'
+    return redirect(destino)
@@ -1,6 +1,7 @@
 from django import forms
 from .models import PessoaFalecida
 from familia.models import Familia
+from busca.widgets import AutocompleteSelect
 
 
 class PessoaFalecidaForm(forms.ModelForm):
@@ -35,7 +36,7 @@ class PessoaFalecidaForm(forms.ModelForm):
                 'class': 'form-control',
                 'placeholder': 'CPF ou RG'
             }),
-            'familia': forms.Select(attrs={
+            'familia': AutocompleteSelect('familia', attrs={
                 'class': 'form-select'
             }),
             'imagem': forms.FileInput(attrs={
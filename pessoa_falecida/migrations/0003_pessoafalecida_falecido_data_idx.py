@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('familia', '0002_familia_familia_nome_idx'),
+        ('pessoa_falecida', '0002_pessoafalecida_imagem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pessoafalecida',
+            index=models.Index(fields=['-data_falecimento', '-id'], name='falecido_data_idx'),
+        ),
+    ]
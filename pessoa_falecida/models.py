@@ -23,6 +23,10 @@ class PessoaFalecida(models.Model):
         verbose_name = "Pessoa Falecida"
         verbose_name_plural = "Pessoas Falecidas"
         ordering = ['-data_falecimento']
+        indexes = [
+            # Listagem e autocomplete paginados (mais recentes primeiro)
+            models.Index(fields=['-data_falecimento', '-id'], name='falecido_data_idx'),
+        ]
     
     def __str__(self):
         return f"{self.nome} - {self.data_falecimento}"
@@ -1,16 +1,18 @@
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from .models import PessoaFalecida
 from .forms import PessoaFalecidaForm
-from app.mixins import LoginRequiredMixin, AdminDeleteMixin
+from app.mixins import LoginRequiredMixin, AdminDeleteMixin, ListaCursorView
 
 
-class PessoaFalecidaListView(LoginRequiredMixin, ListView):
+class PessoaFalecidaListView(LoginRequiredMixin, ListaCursorView):
     """View para listar pessoas falecidas."""
     model = PessoaFalecida
     template_name = 'pessoa_falecida/pessoa_falecida_list.html'
     context_object_name = 'pessoas_falecidas'
     paginate_by = 10
+    select_related = ('familia',)
+    campos = ('nome', 'data_nascimento', 'data_falecimento', 'familia__nome_responsavel')
 
 
 class PessoaFalecidaDetailView(LoginRequiredMixin, DetailView):
@@ -3,6 +3,7 @@ from django.forms import inlineformset_factory
 from .models import ServicoContratado, ItemServicoContratado
 from pessoa_falecida.models import PessoaFalecida
 from item_servico.models import ItemServico
+from busca.widgets import AutocompleteSelect
 
 
 class ServicoContratadoForm(forms.ModelForm):
@@ -12,7 +13,7 @@ class ServicoContratadoForm(forms.ModelForm):
         model = ServicoContratado
         fields = ['pessoa_falecida', 'descricao_adicional', 'taxa_imposto']
         widgets = {
-            'pessoa_falecida': forms.Select(attrs={
+            'pessoa_falecida': AutocompleteSelect('falecido', attrs={
                 'class': 'form-select',
                 'id': 'id_pessoa_falecida'
             }),
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pessoa_falecida', '0003_pessoafalecida_falecido_data_idx'),
+        ('servico_contratado', '0006_servicocontratado_pdf_nota_fiscal'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicocontratado',
+            index=models.Index(fields=['-data_contratacao', '-id'], name='servico_data_idx'),
+        ),
+    ]
@@ -46,6 +46,10 @@ class ServicoContratado(models.Model):
         verbose_name = "Serviço Contratado"
         verbose_name_plural = "Serviços Contratados"
         ordering = ['-data_contratacao', 'pessoa_falecida']
+        indexes = [
+            # Listagem paginada por cursor (data da contratação, id)
+            models.Index(fields=['-data_contratacao', '-id'], name='servico_data_idx'),
+        ]
     
     def __str__(self):
         return f"{self.pessoa_falecida.nome} - {self.data_contratacao.strftime('%d/%m/%Y')}"
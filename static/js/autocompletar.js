@@ -0,0 +1,135 @@
+/*
+ * Autocomplete para <select data-autocompletar="URL"> (busca.widgets.AutocompleteSelect).
+ *
+ * O select continua no formulário (é ele que envia o pk), mas fica oculto;
+ * no lugar aparece uma caixa de texto que consulta o endpoint paginado
+ * {resultados: [{id, texto}], pagina, mais}.
+ */
+(function () {
+    'use strict';
+
+    var ESPERA_MS = 250;
+
+    function iniciar(select) {
+        var wrapper = document.createElement('div');
+        wrapper.className = 'position-relative';
+
+        var input = document.createElement('input');
+        input.type = 'text';
+        input.className = 'form-control';
+        input.autocomplete = 'off';
+        input.id = select.id + '_busca';
+        input.placeholder = 'Digite para buscar...';
+        input.required = select.required;
+        select.required = false;
+
+        var lista = document.createElement('div');
+        lista.className = 'list-group position-absolute w-100 shadow-sm d-none';
+        lista.style.zIndex = 1050;
+        lista.style.maxHeight = '18rem';
+        lista.style.overflowY = 'auto';
+
+        var selecionada = select.options[select.selectedIndex];
+        if (selecionada && selecionada.value) {
+            input.value = selecionada.text;
+        }
+
+        select.classList.add('d-none');
+        select.parentNode.insertBefore(wrapper, select);
+        wrapper.appendChild(input);
+        wrapper.appendChild(lista);
+        wrapper.appendChild(select);
+
+        var label = document.querySelector('label[for="' + select.id + '"]');
+        if (label) {
+            label.htmlFor = input.id;
+        }
+
+        var temporizador = null;
+        var requisicao = 0;
+
+        function fechar() {
+            lista.classList.add('d-none');
+        }
+
+        function escolher(id, texto) {
+            var opcao = select.querySelector('option[value="' + id + '"]');
+            if (!opcao) {
+                opcao = new Option(texto, id);
+                select.appendChild(opcao);
+            }
+            select.value = String(id);
+            input.value = texto;
+            fechar();
+            select.dispatchEvent(new Event('change', {bubbles: true}));
+        }
+
+        function carregar(pagina) {
+            var numero = ++requisicao;
+            var url = select.dataset.autocompletar + '?q=' + encodeURIComponent(input.value.trim()) + '&pagina=' + pagina;
+            fetch(url, {headers: {'X-Requested-With': 'XMLHttpRequest'}, credentials: 'same-origin'})
+                .then(function (resposta) { return resposta.json(); })
+                .then(function (dados) {
+                    if (numero !== requisicao) {
+                        return;  // resposta de uma digitação anterior
+                    }
+                    if (pagina === 1) {
+                        lista.innerHTML = '';
+                    }
+                    var anterior = lista.querySelector('.autocompletar-mais');
+                    if (anterior) {
+                        anterior.remove();
+                    }
+                    dados.resultados.forEach(function (item) {
+                        var botao = document.createElement('button');
+                        botao.type = 'button';
+                        botao.className = 'list-group-item list-group-item-action';
+                        botao.textContent = item.texto;
+                        botao.addEventListener('click', function () { escolher(item.id, item.texto); });
+                        lista.appendChild(botao);
+                    });
+                    if (dados.mais) {
+                        var mais = document.createElement('button');
+                        mais.type = 'button';
+                        mais.className = 'list-group-item list-group-item-action text-center text-primary autocompletar-mais';
+                        mais.textContent = 'Carregar mais...';
+                        mais.addEventListener('click', function () { carregar(pagina + 1); });
+                        lista.appendChild(mais);
+                    }
+                    if (!lista.children.length) {
+                        var vazio = document.createElement('div');
+                        vazio.className = 'list-group-item text-muted';
+                        vazio.textContent = 'Nenhum resultado encontrado';
+                        lista.appendChild(vazio);
+                    }
+                    lista.classList.remove('d-none');
+                });
+        }
+
+        input.addEventListener('input', function () {
+            if (!input.value.trim()) {
+                select.value = '';
+            }
+            clearTimeout(temporizador);
+            temporizador = setTimeout(function () { carregar(1); }, ESPERA_MS);
+        });
+        input.addEventListener('focus', function () { carregar(1); });
+        input.addEventListener('keydown', function (evento) {
+            if (evento.key === 'Escape') {
+                fechar();
+            }
+        });
+        document.addEventListener('click', function (evento) {
+            if (!wrapper.contains(evento.target)) {
+                fechar();
+                // Texto digitado sem escolher uma opção volta para a seleção atual
+                var atual = select.options[select.selectedIndex];
+                input.value = atual && atual.value ? atual.text : '';
+            }
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('select[data-autocompletar]').forEach(iniciar);
+    });
+})();
@@ -0,0 +1,14 @@
+// Preview da foto
+document.getElementById('id_foto_perfil').addEventListener('change', function(e) {
+    const file = e.target.files[0];
+    if (file) {
+        const reader = new FileReader();
+        reader.onload = function(e) {
+            document.getElementById('photo-preview').src = e.target.result;
+        };
+        reader.readAsDataURL(file);
+    }
+});
+
+// Esconder o input file
+document.getElementById('id_foto_perfil').style.display = 'none';